@@ -5,6 +5,15 @@ import respx
 from httpx import Response
 
 
+@pytest.fixture(autouse=True)
+def isolated_state(monkeypatch, tmp_path):
+    """Keep the tests out of ~/.trioexplorer and away from a running daemon."""
+    monkeypatch.setenv("TRIOEXPLORER_CACHE_FILE", str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setenv("TRIOEXPLORER_HISTORY_FILE", str(tmp_path / "history.sqlite3"))
+    monkeypatch.setenv("TRIOEXPLORER_FILTER_INDEX_FILE", str(tmp_path / "filters.sqlite3"))
+    monkeypatch.setenv("TRIOEXPLORER_DAEMON_SOCKET", str(tmp_path / "no-daemon.sock"))
+
+
 @pytest.fixture
 def mock_api():
     """Create a respx mock for the Search API."""
@@ -0,0 +1,197 @@
+"""Tests for the slow-query analysis."""
+
+import json
+import random
+
+import pytest
+from httpx import Response
+
+from trioexplorer.analyze import LinearFit, SlowQueryAnalyzer, extract_features, template_key
+from trioexplorer.main import main
+from trioexplorer.mirror import HistoryMirror
+
+
+def _entry(i, duration_ms, **payload):
+    return {
+        "id": f"h{i:04d}",
+        "search_type": payload.pop("search_type", "hybrid"),
+        "query": "chest pain",
+        "request_payload": {"query": "chest pain", **payload},
+        "duration_ms": duration_ms,
+        "status_code": 200,
+        "error_message": None,
+        "created_at": f"2025-01-01T00:{i // 60 % 60:02d}:{i % 60:02d}Z",
+    }
+
+
+def _synthetic(count=400, seed=7):
+    """Entries whose duration is an exact linear function of k, rerank and filters."""
+    rng = random.Random(seed)
+    entries = []
+    for i in range(count):
+        k = rng.choice([5, 10, 20, 50])
+        rerank = rng.choice([True, False])
+        filters = rng.choice([None, ["age", "Gte", 65], ["And", [["age", "Gte", 65], ["sex", "Eq", "F"]]]])
+        conditions = 0 if filters is None else (1 if filters[0] == "age" else 2)
+        duration = 50 + 3 * k + 200 * rerank + 40 * conditions
+        payload = {"k": k, "rerank": rerank}
+        if filters:
+            payload["filters"] = json.dumps(filters)
+        entries.append(_entry(i, duration, **payload))
+    return entries
+
+
+class TestFeatures:
+    """Tests for feature extraction from request payloads."""
+
+    def test_defaults(self):
+        """Test that a bare payload gets the search command's defaults."""
+        features = extract_features(_entry(1, 100))
+        assert features == {
+            "k": 10, "rerank": 1.0, "chunk_multiplier": 2.0, "top_k_retrieval": 0,
+            "cohorts": 0.0, "filter_conditions": 0.0, "distinct": "encounter",
+            "search_type": "hybrid",
+        }
+
+    def test_query_string_spellings(self):
+        """Test hyphenated keys, string values, cohorts and entity filters."""
+        entry = _entry(
+            1, 100, search_type="keyword", **{
+                "k": "25", "rerank": "false", "chunk-multiplier": "3.5",
+                "cohort-ids": "c1,c2,c3", "distinct": "patient",
+                "entity-filters": '{"condition": ["diabetes"], "medication": ["metformin"]}',
+                "filters": '["Or", [["age", "Gte", 65], ["sex", "Eq", "F"]]]',
+            }
+        )
+        features = extract_features(entry)
+        assert features["k"] == 25
+        assert features["rerank"] == 0.0
+        assert features["chunk_multiplier"] == 3.5
+        assert features["cohorts"] == 3
+        assert features["filter_conditions"] == 4
+        assert features["distinct"] == "patient"
+        assert features["search_type"] == "keyword"
+        assert template_key(features) == (
+            "type=keyword k=25 rerank=off chunk-multiplier=3.5 distinct=patient cohorts=3 filters=4"
+        )
+
+
+class TestFit:
+    """Tests for the streaming least-squares fit."""
+
+    def test_recovers_known_costs(self):
+        """Test that exact linear data yields its coefficients."""
+        analyzer = SlowQueryAnalyzer()
+        analyzer.add_all(_synthetic())
+
+        fit = analyzer.report()["fit"]
+
+        assert fit["intercept"] == pytest.approx(50, abs=1e-3)
+        assert fit["r2"] == pytest.approx(1.0, abs=1e-4)
+        costs = fit["coefficients"]
+        assert costs["k"]["ms_per_unit"] == pytest.approx(3, abs=1e-4)
+        assert costs["rerank"]["ms_per_unit"] == pytest.approx(200, abs=1e-3)
+        assert costs["filter_conditions"]["ms_per_unit"] == pytest.approx(40, abs=1e-3)
+        # Parameters that never vary are reported without a cost
+        assert costs["chunk_multiplier"]["ms_per_unit"] is None
+        assert costs["search_type=semantic"]["ms_per_unit"] is None
+
+    def test_merge_matches_single_pass(self):
+        """Test that merged partial fits equal one fit over all rows."""
+        rows = [([1.0, float(x), float(x % 3)], 2.0 * x + 5) for x in range(50)]
+        whole, first, second = LinearFit(["a", "b"]), LinearFit(["a", "b"]), LinearFit(["a", "b"])
+        for row, y in rows:
+            whole.add(row, y)
+        for row, y in rows[:20]:
+            first.add(row, y)
+        for row, y in rows[20:]:
+            second.add(row, y)
+        first.merge(second)
+        merged, single = first.result(), whole.result()
+        assert merged["n"] == single["n"] == 50
+        assert merged["intercept"] == pytest.approx(single["intercept"])
+        assert merged["coefficients"]["a"]["ms_per_unit"] == pytest.approx(2.0)
+        assert merged["coefficients"]["b"]["ms_per_unit"] == pytest.approx(0.0, abs=1e-6)
+
+    def test_too_few_rows(self):
+        """Test that an underdetermined fit reports no coefficients."""
+        analyzer = SlowQueryAnalyzer()
+        analyzer.add(_entry(1, 100))
+        assert analyzer.report()["fit"]["intercept"] is None
+
+
+class TestTemplates:
+    """Tests for the template ranking."""
+
+    def test_ranking_and_skips(self):
+        """Test p95 and total-time orderings, min_count and failed entries."""
+        analyzer = SlowQueryAnalyzer()
+        for i in range(10):
+            analyzer.add(_entry(i, 900, k=50))
+        for i in range(40):
+            analyzer.add(_entry(100 + i, 300))
+        for i in range(3):
+            analyzer.add(_entry(200 + i, 5000, k=100))
+        analyzer.add({**_entry(300, 10), "status_code": 500})
+        analyzer.add({**_entry(301, None)})
+
+        report = analyzer.report(min_count=5)
+        assert report["entries"] == 55
+        assert report["skipped"] == 2
+        assert report["distinct_templates"] == 3
+        assert [t["count"] for t in report["templates"]] == [10, 40]
+
+        by_total = analyzer.report(min_count=5, sort="total")["templates"]
+        assert [t["count"] for t in by_total] == [40, 10]
+        assert sum(t["time_share"] for t in by_total) < 1
+
+        with pytest.raises(ValueError):
+            analyzer.report(sort="max")
+
+
+class TestCommand:
+    """Tests for the analyze slow command."""
+
+    def test_from_api(self, mock_api, env_with_api_key, monkeypatch, capsys):
+        """Test that every history page is analyzed."""
+        entries = _synthetic(150)
+
+        def history(request):
+            page, size = int(request.url.params["page"]), int(request.url.params["page_size"])
+            return Response(200, json={
+                "items": entries[(page - 1) * size:page * size],
+                "total_count": len(entries),
+                "page": page,
+                "page_size": size,
+                "has_more": page * size < len(entries),
+            })
+
+        route = mock_api.get("/search-history").mock(side_effect=history)
+        monkeypatch.setattr("sys.argv", [
+            "trioexplorer", "analyze", "slow", "--type", "hybrid", "--min-count", "1", "-o", "json",
+        ])
+        main()
+
+        output = json.loads(capsys.readouterr().out)
+        assert route.call_count == 2
+        assert route.calls[0].request.url.params["search-type"] == "hybrid"
+        assert output["analyzed"] == 150
+        assert output["fit"]["coefficients"]["rerank"]["ms_per_unit"] == pytest.approx(200, abs=1e-3)
+        assert output["failed_pages"] == []
+
+    def test_local_table(self, mock_api, env_with_api_key, tmp_path, monkeypatch, capsys):
+        """Test the mirror source and table output, without requests."""
+        path = tmp_path / "mirror.sqlite3"
+        monkeypatch.setenv("TRIOEXPLORER_HISTORY_FILE", str(path))
+        with HistoryMirror(path) as mirror:
+            mirror.upsert(_synthetic(100))
+        route = mock_api.get("/search-history")
+
+        monkeypatch.setattr("sys.argv", ["trioexplorer", "analyze", "slow", "--local"])
+        main()
+
+        output = capsys.readouterr().out
+        assert route.call_count == 0
+        assert "Marginal Cost" in output
+        assert "rerank" in output
+        assert "Top Parameter Combinations" in output
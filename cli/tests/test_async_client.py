@@ -0,0 +1,153 @@
+"""Tests for the asynchronous client and request scheduler."""
+
+import asyncio
+
+import pytest
+from httpx import Response
+
+from trioexplorer.async_client import RequestScheduler, create_async_client
+from trioexplorer.errors import (
+    APIStatusError,
+    APITimeoutError,
+    AuthenticationError,
+)
+
+
+class TestAsyncSearchClient:
+    """Tests for AsyncSearchClient requests."""
+
+    async def test_basic_get(self, mock_api, sample_search_response, env_with_api_key):
+        """Test a basic async GET request."""
+        mock_api.get("/search").mock(
+            return_value=Response(200, json=sample_search_response)
+        )
+
+        async with create_async_client() as client:
+            response = await client.get("/search", params={"query": "chest pain"})
+
+        assert len(response["results"]) == 2
+
+    async def test_get_many_preserves_order(self, mock_api, env_with_api_key):
+        """Test that concurrent requests return results in input order."""
+        mock_api.get("/search").mock(
+            side_effect=lambda request: Response(
+                200, json={"query": request.url.params["query"]}
+            )
+        )
+
+        queries = [f"q{i}" for i in range(10)]
+        async with create_async_client(max_concurrency=3) as client:
+            responses = await client.get_many(("/search", {"query": q}) for q in queries)
+
+        assert [r["query"] for r in responses] == queries
+
+    async def test_auth_error_raises_typed(self, mock_api, env_with_api_key):
+        """Test that 401 raises AuthenticationError instead of exiting."""
+        mock_api.get("/search").mock(
+            return_value=Response(401, json={"detail": "Invalid API key"})
+        )
+
+        async with create_async_client() as client:
+            with pytest.raises(AuthenticationError) as exc_info:
+                await client.get("/search", params={"query": "test"})
+
+        assert exc_info.value.status_code == 401
+
+    async def test_status_error_detail(self, mock_api, env_with_api_key):
+        """Test that non-auth errors carry the API detail message."""
+        mock_api.get("/search").mock(
+            return_value=Response(404, json={"detail": "Cohort not found"})
+        )
+
+        async with create_async_client() as client:
+            with pytest.raises(APIStatusError) as exc_info:
+                await client.get("/search", params={"query": "test"})
+
+        assert exc_info.value.detail == "Cohort not found"
+        assert not isinstance(exc_info.value, AuthenticationError)
+
+    async def test_timeout_raises_typed(self, mock_api, env_with_api_key):
+        """Test that timeouts raise APITimeoutError."""
+        import httpx
+
+        mock_api.get("/search").mock(side_effect=httpx.ReadTimeout("timed out"))
+
+        async with create_async_client(max_retries=0) as client:
+            with pytest.raises(APITimeoutError):
+                await client.get("/search", params={"query": "test"})
+
+    async def test_get_many_returns_errors(self, mock_api, env_with_api_key):
+        """Test that get_many returns errors in place rather than raising."""
+        mock_api.get("/search").mock(
+            side_effect=lambda request: Response(500, json={"detail": "boom"})
+            if request.url.params["query"] == "bad"
+            else Response(200, json={"ok": True})
+        )
+
+        async with create_async_client(max_retries=0) as client:
+            responses = await client.get_many(
+                [("/search", {"query": "good"}), ("/search", {"query": "bad"})]
+            )
+
+        assert responses[0] == {"ok": True}
+        assert isinstance(responses[1], APIStatusError)
+
+
+class TestRequestScheduler:
+    """Tests for bounded-concurrency scheduling."""
+
+    async def test_global_limit(self):
+        """Test that no more than max_concurrency slots are held at once."""
+        scheduler = RequestScheduler(max_concurrency=2, per_host_limit=None)
+
+        async def work():
+            async with scheduler.slot("http://a.example/search"):
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(work() for _ in range(8)))
+        assert scheduler.peak_in_flight == 2
+        assert scheduler.in_flight == 0
+
+    async def test_per_host_limit(self):
+        """Test that each host is limited independently."""
+        scheduler = RequestScheduler(max_concurrency=10, per_host_limit=1)
+        active: dict[str, int] = {"a.example": 0, "b.example": 0}
+        peaks: dict[str, int] = {"a.example": 0, "b.example": 0}
+
+        async def work(host):
+            async with scheduler.slot(f"http://{host}/search"):
+                active[host] += 1
+                peaks[host] = max(peaks[host], active[host])
+                await asyncio.sleep(0.01)
+                active[host] -= 1
+
+        await asyncio.gather(*(work(h) for h in ["a.example", "b.example"] * 4))
+        assert peaks == {"a.example": 1, "b.example": 1}
+        assert scheduler.peak_in_flight == 2
+
+    async def test_saturated_host_does_not_starve_others(self):
+        """Test that requests waiting on a busy host hold no global slot."""
+        scheduler = RequestScheduler(max_concurrency=2, per_host_limit=1)
+        release = asyncio.Event()
+
+        async def busy():
+            async with scheduler.slot("http://a.example/search"):
+                await release.wait()
+
+        waiting = [asyncio.create_task(busy()) for _ in range(3)]
+        await asyncio.sleep(0)
+
+        async def other():
+            async with scheduler.slot("http://b.example/search"):
+                return scheduler.in_flight
+
+        assert await asyncio.wait_for(other(), timeout=1) == 2
+        release.set()
+        await asyncio.gather(*waiting)
+
+    def test_invalid_limits(self):
+        """Test that non-positive limits are rejected."""
+        with pytest.raises(ValueError):
+            RequestScheduler(max_concurrency=0)
+        with pytest.raises(ValueError):
+            RequestScheduler(per_host_limit=0)
@@ -0,0 +1,171 @@
+"""Tests for the batch-search command."""
+
+import argparse
+import io
+import json
+
+import pytest
+from httpx import Response
+
+from trioexplorer.async_client import create_async_client
+from trioexplorer.commands.batch import (
+    build_query_args,
+    execute_batch,
+    parse_batch_line,
+    prepare_search_params,
+    read_batch_records,
+)
+from trioexplorer.main import create_parser
+
+
+def _defaults(*extra):
+    """Parse batch-search defaults from the real CLI parser."""
+    return create_parser().parse_args(["batch-search", *extra])
+
+
+class TestParseBatchLine:
+    """Tests for parsing input lines."""
+
+    def test_plain_text(self):
+        """Test that plain lines become query records."""
+        assert parse_batch_line("chest pain\n") == {"query": "chest pain"}
+
+    def test_blank_and_comment(self):
+        """Test that blank lines and comments are skipped."""
+        assert parse_batch_line("   \n") is None
+        assert parse_batch_line("# nightly set") is None
+
+    def test_json_record(self):
+        """Test JSON object lines."""
+        record = parse_batch_line('{"query": "sepsis", "k": 5}')
+        assert record == {"query": "sepsis", "k": 5}
+
+    def test_json_without_query(self):
+        """Test that JSON records must have a query."""
+        with pytest.raises(ValueError):
+            parse_batch_line('{"k": 5}')
+
+    def test_malformed_lines_are_yielded(self):
+        """Test that malformed lines surface as errors, not exceptions."""
+        records = list(read_batch_records(["fever", "{bad", ""]))
+        assert records[0] == (1, {"query": "fever"})
+        assert isinstance(records[1][1], ValueError)
+        assert len(records) == 2
+
+
+class TestQueryOverrides:
+    """Tests for merging per-query overrides with CLI defaults."""
+
+    def test_defaults_apply(self):
+        """Test that CLI options act as defaults."""
+        params = prepare_search_params(_defaults("-k", "25"), {"query": "fever"})
+        assert params["k"] == 25
+        assert params["query"] == "fever"
+
+    def test_record_overrides(self):
+        """Test that record fields override defaults."""
+        params = prepare_search_params(
+            _defaults("-k", "25"),
+            {"query": "fever", "k": 3, "type": "semantic", "cohort-ids": [1, 2]},
+        )
+        assert params["k"] == 3
+        assert params["search-type"] == "semantic"
+        assert params["cohort-ids"] == "1,2"
+
+    def test_filters_follow_build_filters_from_args(self):
+        """Test that record filters merge with flag-derived filters."""
+        params = prepare_search_params(
+            _defaults("--date-from", "2025-01-01"),
+            {"query": "fever", "filters": ["note_type", "Eq", "Progress Note"]},
+        )
+        assert json.loads(params["filters"]) == [
+            "And",
+            [["note_date", "Gte", "2025-01-01"], ["note_type", "Eq", "Progress Note"]],
+        ]
+
+    def test_entity_filters_as_string(self):
+        """Test that JSON-string entity filters are accepted."""
+        params = prepare_search_params(
+            _defaults(),
+            {"query": "fever", "entity_filters": '{"medications_present": ["metformin"]}'},
+        )
+        assert json.loads(params["entity-filters"]) == {"medications_present": ["metformin"]}
+
+    def test_unknown_field(self):
+        """Test that unknown fields are rejected."""
+        with pytest.raises(ValueError):
+            build_query_args(_defaults(), {"query": "fever", "bogus": 1})
+
+
+class TestExecuteBatch:
+    """Tests for concurrent batch execution."""
+
+    async def test_streams_one_record_per_query(self, mock_api, env_with_api_key):
+        """Test that every query produces exactly one JSONL record."""
+        mock_api.get("/search").mock(
+            side_effect=lambda request: Response(
+                200,
+                json={
+                    "results": [{"note_id": request.url.params["query"]}],
+                    "metadata": {"total_results": 1},
+                },
+            )
+        )
+
+        lines = [f"query {i}" for i in range(12)] + ['{"id": "x", "query": "tagged"}']
+        out = io.StringIO()
+        async with create_async_client(max_concurrency=4) as client:
+            summary = await execute_batch(
+                client, read_batch_records(lines), _defaults(), out, parallelism=4
+            )
+
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        assert len(records) == 13
+        assert {r["query"] for r in records} == set(lines[:-1]) | {"tagged"}
+        assert all(r["status"] == "ok" for r in records)
+        assert next(r for r in records if r["query"] == "tagged")["id"] == "x"
+        assert summary["succeeded"] == 13
+        assert summary["latency_ms"]["count"] == 13
+
+    async def test_errors_do_not_abort(self, mock_api, env_with_api_key):
+        """Test that failed queries are reported and the batch continues."""
+        mock_api.get("/search").mock(
+            side_effect=lambda request: Response(500, json={"detail": "boom"})
+            if request.url.params["query"] == "bad"
+            else Response(200, json={"results": [], "metadata": {}})
+        )
+
+        out = io.StringIO()
+        async with create_async_client(max_retries=0) as client:
+            summary = await execute_batch(
+                client, read_batch_records(["good", "bad", "{oops"]), _defaults(), out
+            )
+
+        records = {r["line"]: r for r in map(json.loads, out.getvalue().splitlines())}
+        assert records[1]["status"] == "ok"
+        assert records[2]["status"] == "error"
+        assert records[2]["status_code"] == 500
+        assert records[3]["status"] == "error"
+        assert summary["failed"] == 2
+
+
+class TestRunBatchSearch:
+    """Tests for the batch-search command line."""
+
+    def test_unwritable_output(self, env_with_api_key, tmp_path, monkeypatch, capsys):
+        """Test that a bad --output path is reported without a traceback."""
+        from trioexplorer.main import main
+
+        queries = tmp_path / "queries.txt"
+        queries.write_text("chest pain\n")
+        output = tmp_path / "missing" / "out.jsonl"
+        monkeypatch.setattr("sys.argv", [
+            "trioexplorer", "batch-search", str(queries), "--output", str(output),
+        ])
+
+        with pytest.raises(SystemExit) as exc_info:
+            main()
+
+        assert exc_info.value.code == 1
+        # rich wraps long lines
+        assert f"Cannot write {output}" in " ".join(capsys.readouterr().err.split())
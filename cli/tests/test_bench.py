@@ -0,0 +1,177 @@
+"""Tests for the bench command and latency histogram."""
+
+import json
+import math
+import random
+
+import pytest
+from httpx import Response
+
+from trioexplorer.async_client import create_async_client
+from trioexplorer.bench import BenchRecorder, group_key, request_sequence, run_benchmark
+from trioexplorer.commands.bench import run_bench
+from trioexplorer.main import create_parser
+from trioexplorer.metrics import LatencyHistogram
+
+
+class TestLatencyHistogram:
+    """Tests for the HDR-style histogram."""
+
+    def test_percentiles_within_precision(self):
+        """Test that percentiles are within the configured relative error."""
+        rng = random.Random(7)
+        values = [rng.lognormvariate(10, 1) for _ in range(20000)]
+        histogram = LatencyHistogram(significant_digits=3)
+        for value in values:
+            histogram.record(value)
+
+        exact = sorted(int(round(v)) for v in values)
+        for q in (50, 90, 99, 99.9):
+            expected = exact[math.ceil(q / 100 * len(exact)) - 1]
+            assert abs(histogram.value_at_percentile(q) - expected) <= expected * 1e-3 + 1
+
+    def test_small_values_are_exact(self):
+        """Test that values below the sub-bucket count are stored exactly."""
+        histogram = LatencyHistogram()
+        for value in (1, 2, 3, 1000):
+            histogram.record(value)
+        assert histogram.value_at_percentile(50) == 2
+        assert histogram.value_at_percentile(100) == 1000
+        assert histogram.min == 1 and histogram.max == 1000
+
+    def test_merge(self):
+        """Test that merged histograms match recording everything in one."""
+        a, b, both = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+        for value in range(1, 5000, 7):
+            (a if value % 2 else b).record(value)
+            both.record(value)
+        a.merge(b)
+        assert a.count == both.count
+        assert a.summary_ms() == both.summary_ms()
+
+    def test_empty_summary(self):
+        """Test the summary of an empty histogram."""
+        summary = LatencyHistogram().summary_ms()
+        assert summary["count"] == 0
+        assert summary["p99.9"] is None
+
+    def test_invalid_precision(self):
+        """Test that unsupported precision is rejected."""
+        with pytest.raises(ValueError):
+            LatencyHistogram(significant_digits=6)
+
+
+class TestBenchRecorder:
+    """Tests for grouping and reporting."""
+
+    def test_groups_and_error_rates(self):
+        """Test per-group counts, error rates and error kinds."""
+        recorder = BenchRecorder()
+        hybrid = group_key({"search-type": "hybrid", "rerank": "true", "k": 10})
+        keyword = group_key({"search-type": "keyword", "rerank": "false", "k": 50})
+        for _ in range(3):
+            recorder.record(hybrid, 2000)
+        recorder.record(hybrid, 5000, error="HTTP 503")
+        recorder.record(keyword, 1000)
+
+        report = recorder.report(wall_seconds=2.0)
+        assert report["requests"] == 5
+        assert report["errors"] == 1
+        assert report["errors_by_kind"] == {"HTTP 503": 1}
+        assert report["throughput_rps"] == 2.5
+        groups = {(g["search_type"], g["k"]): g for g in report["groups"]}
+        assert groups[("hybrid", "10")]["error_rate"] == 0.25
+        assert groups[("hybrid", "10")]["latency_ms"]["count"] == 3
+        assert groups[("keyword", "50")]["latency_ms"]["p50"] == 1.0
+
+    def test_request_sequence_cycles(self):
+        """Test that the query set is cycled up to the request count."""
+        sequence = list(request_sequence([{"q": 1}, {"q": 2}], total=5))
+        assert [p["q"] for p in sequence] == [1, 2, 1, 2, 1]
+        assert len(list(request_sequence([{"q": 1}, {"q": 2}]))) == 2
+
+
+class TestRunBenchmark:
+    """Tests for the load generators."""
+
+    @pytest.mark.parametrize("mode, rate", [("closed", None), ("open", 500.0)])
+    async def test_modes(self, mock_api, env_with_api_key, mode, rate):
+        """Test that both load models send every request and record latency."""
+        route = mock_api.get("/search").mock(return_value=Response(200, json={"results": []}))
+        requests = [
+            {"query": "a", "search-type": "hybrid", "rerank": "true", "k": 10},
+            {"query": "b", "search-type": "semantic", "rerank": "false", "k": 10},
+        ]
+
+        async with create_async_client(max_concurrency=4, max_retries=0) as client:
+            report = await run_benchmark(
+                client, requests, mode=mode, workers=4, rate=rate, total=20, warmup=2,
+            )
+
+        assert route.call_count == 22
+        assert report["requests"] == 20
+        assert report["errors"] == 0
+        assert len(report["groups"]) == 2
+        assert report["latency_ms"]["count"] == 20
+        assert report["latency_ms"]["p99.9"] is not None
+
+    async def test_open_loop_requires_rate(self, env_with_api_key):
+        """Test that open-loop mode without a rate is rejected."""
+        async with create_async_client() as client:
+            with pytest.raises(ValueError):
+                await run_benchmark(client, [{"query": "a"}], mode="open")
+
+
+class TestRunBench:
+    """Tests for the bench command."""
+
+    def test_json_report_by_group(self, mock_api, env_with_api_key, tmp_path, capsys):
+        """Test that per-query overrides produce separate groups."""
+        mock_api.get("/search").mock(return_value=Response(200, json={"results": []}))
+        queries = tmp_path / "queries.jsonl"
+        queries.write_text('chest pain\n{"query": "sepsis", "k": 50, "type": "keyword"}\n')
+
+        args = create_parser().parse_args(["bench", str(queries), "-n", "6", "-o", "json"])
+        run_bench(args)
+
+        report = json.loads(capsys.readouterr().out)
+        assert report["requests"] == 6
+        assert {(g["search_type"], g["k"]) for g in report["groups"]} == {
+            ("hybrid", "10"), ("keyword", "50"),
+        }
+
+    def test_errors_exit_nonzero(self, mock_api, env_with_api_key, tmp_path, capsys):
+        """Test that server errors are counted without retries and fail the run."""
+        route = mock_api.get("/search").mock(return_value=Response(503, json={"detail": "busy"}))
+        queries = tmp_path / "queries.txt"
+        queries.write_text("chest pain\n")
+
+        args = create_parser().parse_args(["bench", str(queries), "-n", "3", "-o", "json"])
+        with pytest.raises(SystemExit) as exc_info:
+            run_bench(args)
+
+        assert exc_info.value.code == 1
+        assert route.call_count == 3
+        assert json.loads(capsys.readouterr().out)["errors_by_kind"] == {"HTTP 503": 3}
+
+    @pytest.mark.parametrize("extra", [["--mode", "open"], ["--rate", "10"], ["-j", "0"]])
+    def test_invalid_options(self, env_with_api_key, tmp_path, extra):
+        """Test that inconsistent load options are rejected."""
+        queries = tmp_path / "queries.txt"
+        queries.write_text("chest pain\n")
+        args = create_parser().parse_args(["bench", str(queries), *extra])
+        with pytest.raises(SystemExit) as exc_info:
+            run_bench(args)
+        assert exc_info.value.code == 1
+
+    def test_table_output(self, mock_api, env_with_api_key, tmp_path, capsys):
+        """Test the table report."""
+        mock_api.get("/search").mock(return_value=Response(200, json={"results": []}))
+        queries = tmp_path / "queries.txt"
+        queries.write_text("chest pain\n")
+
+        run_bench(create_parser().parse_args(["bench", str(queries), "--mode", "open", "--rate", "100"]))
+
+        out = capsys.readouterr().out
+        assert "open loop at 100 req/s" in out
+        assert "p99.9" in out
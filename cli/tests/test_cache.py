@@ -0,0 +1,211 @@
+"""Tests for the on-disk response cache."""
+
+import pytest
+from httpx import Response
+
+from trioexplorer.cache import ResponseCache, make_cache_key, normalize_params
+from trioexplorer.client import create_client
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Create a response cache in a temporary directory."""
+    cache = ResponseCache(tmp_path / "cache.sqlite3")
+    yield cache
+    cache.close()
+
+
+class TestCacheKeys:
+    """Tests for canonical cache keys."""
+
+    def test_param_order_and_types(self):
+        """Test that param order and int/str spelling do not change the key."""
+        a = make_cache_key("http://x", "/search", {"query": "q", "k": 10})
+        b = make_cache_key("http://x", "/search", {"k": "10", "query": "q"})
+        assert a == b
+
+    def test_none_params_dropped(self):
+        """Test that None-valued params are ignored."""
+        assert normalize_params({"a": None, "b": True}) == {"b": "true"}
+
+    def test_identity_changes_key(self):
+        """Test that different API keys never share entries."""
+        a = make_cache_key("http://x", "/search", {"query": "q"}, identity="key-a")
+        b = make_cache_key("http://x", "/search", {"query": "q"}, identity="key-b")
+        assert a != b
+
+    def test_equivalent_filters_share_key(self):
+        """Test that reordered or redundant filters map to the same entry."""
+        a = make_cache_key("http://x", "/search", {
+            "query": "q",
+            "filters": '["And", [["note_type", "In", ["B", "A"]], ["note_date", "Gte", "2024-01-01"]]]',
+        })
+        b = make_cache_key("http://x", "/search", {
+            "query": "q",
+            "filters": '["And", [["note_date", "Gte", "2024-01-01"], ["And", [["note_type", "In", ["A", "B"]]]]]]',
+        })
+        assert a == b
+
+    def test_negated_empty_group_keys(self):
+        """Test that a negated empty And is keyed as the filter matching nothing."""
+        a = make_cache_key("http://x", "/search", {"query": "q", "filters": '["Not", ["And", []]]'})
+        b = make_cache_key("http://x", "/search", {"query": "q", "filters": '["Or", []]'})
+        assert a == b
+        assert a != make_cache_key("http://x", "/search", {"query": "q"})
+
+    def test_unparseable_filters_kept_verbatim(self):
+        """Test that filters that do not parse are keyed as sent."""
+        assert normalize_params({"filters": "not json"}) == {"filters": "not json"}
+
+
+class TestResponseCache:
+    """Tests for storage, TTLs and eviction."""
+
+    def test_round_trip(self, cache):
+        """Test storing and reading back a response."""
+        cache.put("k1", "/search", {"results": [1, 2]}, ttl=60)
+        assert cache.get("k1") == {"results": [1, 2]}
+        assert cache.stats["hits"] == 1
+
+    def test_miss(self, cache):
+        """Test that unknown keys count as misses."""
+        assert cache.get("missing") is None
+        assert cache.stats["misses"] == 1
+
+    def test_expired_entries_miss(self, cache):
+        """Test that expired entries are not returned."""
+        cache.put("k1", "/search", {"a": 1}, ttl=0)
+        assert cache.get("k1") is None
+
+    def test_per_endpoint_ttls(self, cache):
+        """Test TTL lookup by endpoint."""
+        assert cache.ttl_for("/search") == 3600
+        assert cache.ttl_for("/namespaces/ns1/filter-fields") == 86400
+        assert cache.ttl_for("/namespaces/ns1/filter-values/medications") == 86400
+        assert cache.ttl_for("/search-history") is None
+
+    def test_lru_eviction(self, tmp_path):
+        """Test that least-recently-used entries are evicted over the cap."""
+        payload = {"blob": "x" * 2000, "n": 0}
+        probe = ResponseCache(tmp_path / "probe.sqlite3")
+        probe.put("p", "/search", payload, ttl=60)
+        entry_size = probe.size_bytes()
+        probe.close()
+
+        cache = ResponseCache(tmp_path / "lru.sqlite3", max_bytes=entry_size * 2 + 10)
+        cache.put("a", "/search", {**payload, "n": 1}, ttl=60)
+        cache.put("b", "/search", {**payload, "n": 2}, ttl=60)
+        cache._db.execute("UPDATE responses SET last_access = last_access - 10 WHERE key = 'b'")
+        cache.get("a")
+        cache.put("c", "/search", {**payload, "n": 3}, ttl=60)
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+        assert cache.stats["evictions"] == 1
+        cache.close()
+
+    def test_size_total_is_maintained(self, tmp_path):
+        """Test that the running size follows stores, replacements and clears."""
+        path = tmp_path / "size.sqlite3"
+        cache = ResponseCache(path)
+        cache.put("a", "/search", {"n": 1}, ttl=60)
+        cache.put("b", "/search", {"n": "x" * 500}, ttl=60)
+        cache.put("a", "/search", {"n": "y" * 900}, ttl=60)
+
+        assert len(cache) == 2
+        assert cache.size_bytes() == cache._db.execute("SELECT SUM(size) FROM responses").fetchone()[0]
+        cache.clear()
+        assert cache.size_bytes() == 0
+        cache.close()
+
+        # A cache created before the running total is summed once when opened
+        cache = ResponseCache(path)
+        cache.put("c", "/search", {"n": 3}, ttl=60)
+        with cache._db:
+            cache._db.execute("DROP TABLE cache_size")
+        expected = cache._db.execute("SELECT SUM(size) FROM responses").fetchone()[0]
+        cache.close()
+        reopened = ResponseCache(path)
+        assert reopened.size_bytes() == expected
+        reopened.close()
+
+    def test_locked_database_is_a_miss(self, tmp_path, mock_api, env_with_api_key):
+        """Test that a locked cache neither fails the request nor stores it."""
+        import sqlite3
+
+        path = tmp_path / "locked.sqlite3"
+        cache = ResponseCache(path)
+        cache.put("k", "/search", {"n": 1}, ttl=60)
+        cache._db.execute("PRAGMA busy_timeout = 0")
+        holder = sqlite3.connect(str(path))
+        holder.execute("BEGIN EXCLUSIVE")
+        route = mock_api.get("/search").mock(return_value=Response(200, json={"results": []}))
+        try:
+            assert cache.get("k") is None
+            assert create_client(cache=cache).get("/search", params={"query": "q"}) == {"results": []}
+        finally:
+            holder.rollback()
+            holder.close()
+
+        assert route.call_count == 1
+        # The last-access update of the hit and the store both failed
+        assert cache.stats["errors"] == 2
+        assert "2 errors" in cache.format_stats()
+
+
+class TestClientCaching:
+    """Tests for cache integration in SearchClient."""
+
+    def test_second_call_served_from_cache(
+        self, mock_api, cache, sample_search_response, env_with_api_key
+    ):
+        """Test that a repeated search does not hit the network."""
+        route = mock_api.get("/search").mock(
+            return_value=Response(200, json=sample_search_response)
+        )
+
+        client = create_client(cache=cache)
+        first = client.get("/search", params={"query": "chest pain", "k": 10})
+        second = client.get("/search", params={"k": "10", "query": "chest pain"})
+
+        assert first == second
+        assert route.call_count == 1
+        assert cache.stats["hits"] == 1
+
+    def test_refresh_bypasses_reads(
+        self, mock_api, cache, sample_search_response, env_with_api_key
+    ):
+        """Test that refresh mode always goes to the network."""
+        route = mock_api.get("/search").mock(
+            return_value=Response(200, json=sample_search_response)
+        )
+
+        create_client(cache=cache).get("/search", params={"query": "q"})
+        create_client(cache=cache, refresh=True).get("/search", params={"query": "q"})
+
+        assert route.call_count == 2
+
+    def test_uncacheable_path(self, mock_api, cache, sample_history_response, env_with_api_key):
+        """Test that search history is never cached."""
+        route = mock_api.get("/search-history").mock(
+            return_value=Response(200, json=sample_history_response)
+        )
+
+        client = create_client(cache=cache)
+        client.get("/search-history")
+        client.get("/search-history")
+
+        assert route.call_count == 2
+        assert len(cache) == 0
+
+    def test_errors_not_cached(self, mock_api, cache, env_with_api_key):
+        """Test that error responses are not stored."""
+        mock_api.get("/search").mock(
+            return_value=Response(500, json={"detail": "boom"})
+        )
+
+        client = create_client(cache=cache, max_retries=0)
+        with pytest.raises(SystemExit):
+            client.get("/search", params={"query": "q"})
+        assert len(cache) == 0
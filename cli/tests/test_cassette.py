@@ -0,0 +1,139 @@
+"""Tests for recording and replaying HTTP cassettes."""
+
+import gzip
+import json
+import time
+
+import pytest
+
+from trioexplorer import cassette
+from trioexplorer.async_client import create_async_client
+from trioexplorer.client import create_client
+from trioexplorer.main import main
+from trioexplorer.stub import StubConfig, parse_latency, running_stub_server
+
+
+@pytest.fixture(autouse=True)
+def no_session():
+    """Make sure no cassette session leaks between tests."""
+    yield
+    cassette._session = None
+
+
+def _record(path, requests, config=None):
+    """Record /search exchanges against a stub server."""
+    with running_stub_server(config) as server:
+        cassette.start_recording(str(path))
+        with create_client(base_url=server.url, max_retries=0) as client:
+            responses = [client.get("/search", params=params) for params in requests]
+        cassette.stop_session()
+    return responses
+
+
+class TestRecord:
+    """Tests for recording."""
+
+    def test_cassette_is_compressed_and_redacted(self, env_with_api_key, tmp_path):
+        """Test that the cassette is gzipped JSON Lines without the API key."""
+        path = tmp_path / "run.cassette"
+        _record(path, [{"query": "chest pain", "k": 3}])
+
+        raw = gzip.decompress(path.read_bytes()).decode()
+        header, entry = [json.loads(line) for line in raw.splitlines()]
+        assert header["version"] == cassette.CASSETTE_VERSION
+        assert "test-api-key-12345" not in raw
+        assert ["x-api-key", cassette.REDACTED] in entry["request_headers"]
+        assert entry["status"] == 200
+        assert entry["elapsed"] > 0
+        assert len(json.loads(entry["body"])["results"]) == 3
+
+
+class TestReplay:
+    """Tests for replaying."""
+
+    def test_replays_without_network_or_key(self, env_with_api_key, tmp_path, monkeypatch):
+        """Test that replay needs neither the server nor an API key."""
+        path = tmp_path / "run.cassette"
+        recorded = _record(path, [{"query": "a", "k": 2}, {"query": "b", "k": 5}])
+        monkeypatch.delenv("TRIOEXPLORER_API_KEY")
+
+        cassette.start_replay(str(path))
+        with create_client(base_url="http://nowhere.invalid", max_retries=0) as client:
+            # Parameter order does not matter
+            assert client.get("/search", params={"k": 5, "query": "b"}) == recorded[1]
+            assert client.get("/search", params={"query": "a", "k": 2}) == recorded[0]
+
+    def test_unrecorded_request_fails(self, env_with_api_key, tmp_path):
+        """Test that a request missing from the cassette is an error."""
+        path = tmp_path / "run.cassette"
+        _record(path, [{"query": "a"}])
+
+        cassette.start_replay(str(path))
+        with create_client(max_retries=0) as client:
+            with pytest.raises(SystemExit):
+                client.get("/search", params={"query": "other"})
+
+    def test_replay_speed(self, env_with_api_key, tmp_path):
+        """Test that recorded latency is reproduced, scaled by speed."""
+        path = tmp_path / "run.cassette"
+        _record(path, [{"query": "a"}], StubConfig(latency=parse_latency("fixed:100")))
+
+        cassette.start_replay(str(path), speed=2.0)
+        with create_client(max_retries=0) as client:
+            started = time.perf_counter()
+            client.get("/search", params={"query": "a"})
+            elapsed = time.perf_counter() - started
+        recorded = cassette.load_cassette(str(path))[0]["elapsed"]
+        assert recorded / 2 <= elapsed < recorded
+
+    async def test_async_and_streaming(self, env_with_api_key, tmp_path):
+        """Test replay through the async client and the streaming decoder."""
+        path = tmp_path / "run.cassette"
+        recorded = _record(path, [{"query": "a", "k": 50}])
+
+        cassette.start_replay(str(path))
+        async with create_async_client(max_retries=0) as client:
+            assert await client.get("/search", params={"query": "a", "k": 50}) == recorded[0]
+        with create_client(max_retries=0) as client:
+            with client.stream_get("/search", params={"query": "a", "k": 50}) as stream:
+                assert len(list(stream)) == 50
+
+    def test_invalid_cassette(self, tmp_path):
+        """Test that a file that is not a cassette is rejected."""
+        path = tmp_path / "bad.cassette"
+        path.write_text("not gzip")
+        with pytest.raises(cassette.CassetteError):
+            cassette.start_replay(str(path))
+
+
+class TestGlobalOptions:
+    """Tests for --record / --replay on the command line."""
+
+    def test_record_then_replay_search(self, env_with_api_key, tmp_path, monkeypatch, capsys):
+        """Test that a recorded search command replays to identical output."""
+        path = tmp_path / "search.cassette"
+        with running_stub_server() as server:
+            monkeypatch.setattr("sys.argv", [
+                "trioexplorer", "--api-url", server.url, "--record", str(path),
+                "search", "chest pain", "-k", "4", "-o", "json",
+            ])
+            main()
+        recorded_output = capsys.readouterr().out
+
+        monkeypatch.delenv("TRIOEXPLORER_API_KEY")
+        monkeypatch.setattr("sys.argv", [
+            "trioexplorer", "--replay", str(path), "search", "chest pain", "-k", "4", "-o", "json",
+        ])
+        main()
+
+        assert capsys.readouterr().out == recorded_output
+        assert len(json.loads(recorded_output)["results"]) == 4
+
+    def test_record_and_replay_are_exclusive(self, tmp_path, monkeypatch):
+        """Test that --record and --replay cannot be combined."""
+        monkeypatch.setattr("sys.argv", [
+            "trioexplorer", "--record", "a", "--replay", "b", "search", "x",
+        ])
+        with pytest.raises(SystemExit) as exc_info:
+            main()
+        assert exc_info.value.code == 2
@@ -0,0 +1,71 @@
+"""Tests for the HTTP client transport."""
+
+import pytest
+from httpx import Response
+
+from trioexplorer.client import SearchClient, build_limits, create_client
+
+
+class TestPooledTransport:
+    """Tests for the pooled, long-lived HTTP transport."""
+
+    def test_reuses_single_transport(self, mock_api, sample_cohorts_response, env_with_api_key):
+        """Test that consecutive requests go through the same httpx.Client."""
+        mock_api.get("/cohorts/indexed").mock(
+            return_value=Response(200, json=sample_cohorts_response)
+        )
+
+        client = create_client()
+        transport = client._http
+        client.get("/cohorts/indexed")
+        client.get("/cohorts/indexed")
+
+        assert client._http is transport
+        assert mock_api.calls.call_count == 2
+        client.close()
+
+    def test_auth_header_sent(self, mock_api, sample_cohorts_response, env_with_api_key):
+        """Test that the API key is attached to pooled requests."""
+        route = mock_api.get("/cohorts/indexed").mock(
+            return_value=Response(200, json=sample_cohorts_response)
+        )
+
+        with create_client() as client:
+            client.get("/cohorts/indexed")
+
+        assert route.calls.last.request.headers["X-API-Key"] == "test-api-key-12345"
+
+    def test_context_manager_closes(self, env_with_api_key):
+        """Test that leaving the context closes the transport."""
+        with create_client() as client:
+            assert not client.is_closed
+        assert client.is_closed
+
+    def test_http2_falls_back_without_h2(self, env_with_api_key, monkeypatch):
+        """Test that HTTP/2 degrades to HTTP/1.1 when h2 is missing."""
+        monkeypatch.setattr("trioexplorer.client.http2_available", lambda: False)
+
+        client = SearchClient(http2=True)
+        assert client.http2 is False
+        client.close()
+
+    def test_build_limits_caps_keepalive(self):
+        """Test that keep-alive connections never exceed the pool size."""
+        limits = build_limits(max_connections=4, max_keepalive=10)
+        assert limits.max_connections == 4
+        assert limits.max_keepalive_connections == 4
+
+
+class TestClientProvider:
+    """Tests for sharing one client across a CLI run."""
+
+    def test_provider_returns_same_client(self, env_with_api_key):
+        """Test that the provider memoizes the client."""
+        from trioexplorer.main import ClientProvider, create_parser
+
+        args = create_parser().parse_args(["list", "cohorts"])
+        provider = ClientProvider(args)
+        first = provider()
+        assert provider() is first
+        provider.close()
+        assert first.is_closed
@@ -0,0 +1,130 @@
+"""Tests for Parquet / Arrow columnar output."""
+
+import datetime
+import io
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from trioexplorer.columnar import (
+    HISTORY_COLUMNS,
+    SEARCH_COLUMNS,
+    ColumnarWriter,
+    write_columnar,
+)
+from trioexplorer.output import output_columnar
+
+
+def read_arrow(data: bytes) -> "pa.Table":
+    return pa.ipc.open_file(pa.py_buffer(data)).read_all()
+
+
+class TestSearchColumns:
+    """Tests for typed search result columns."""
+
+    def test_parquet_types(self, sample_search_response):
+        """Test that scores, dates and categories get proper types."""
+        sink = io.BytesIO()
+        count = write_columnar(sample_search_response["results"], SEARCH_COLUMNS, "parquet", sink)
+        table = pq.read_table(io.BytesIO(sink.getvalue()))
+
+        assert count == 2
+        assert table.schema.field("score").type == pa.float64()
+        assert table.schema.field("note_date").type == pa.date32()
+        assert pa.types.is_dictionary(table.schema.field("note_type").type)
+        assert pa.types.is_dictionary(table.schema.field("patient_id").type)
+        assert table.column("note_date")[0].as_py() == datetime.date(2025, 1, 10)
+        assert table.column("score").to_pylist() == [0.85, 0.72]
+        assert table.column("chunk_index").type == pa.int64()
+
+    def test_arrow_roundtrip(self, sample_search_response):
+        """Test Arrow IPC file output."""
+        sink = io.BytesIO()
+        write_columnar(sample_search_response["results"], SEARCH_COLUMNS, "arrow", sink)
+        table = read_arrow(sink.getvalue())
+
+        assert table.column_names == [name for name, _ in SEARCH_COLUMNS]
+        assert table.column("note_id").to_pylist() == ["N11111", "N11112"]
+
+    def test_missing_and_invalid_values_are_null(self):
+        """Test that missing fields and unparseable dates become nulls."""
+        sink = io.BytesIO()
+        write_columnar([{"score": None, "note_date": "unknown"}], SEARCH_COLUMNS, "arrow", sink)
+        row = read_arrow(sink.getvalue()).to_pylist()[0]
+
+        assert row["score"] is None
+        assert row["note_date"] is None
+        assert row["note_type"] is None
+
+    def test_empty_results(self):
+        """Test that an empty result set still writes a valid file."""
+        sink = io.BytesIO()
+        assert write_columnar([], SEARCH_COLUMNS, "parquet", sink) == 0
+        table = pq.read_table(io.BytesIO(sink.getvalue()))
+        assert table.num_rows == 0
+        assert table.column_names[0] == "score"
+
+
+class TestBatching:
+    """Tests for record batch writing."""
+
+    def test_dictionary_stable_across_batches(self):
+        """Test that new categories in later batches extend the dictionary."""
+        rows = ({"note_id": f"N{i}", "note_type": f"Type {i // 3}"} for i in range(7))
+        sink = io.BytesIO()
+        with ColumnarWriter(sink, SEARCH_COLUMNS, "arrow", batch_size=3) as writer:
+            writer.write_rows(rows)
+
+        table = read_arrow(sink.getvalue())
+        assert writer.row_count == 7
+        assert table.column("note_type").num_chunks == 3
+        assert table.column("note_type").to_pylist() == [f"Type {i // 3}" for i in range(7)]
+
+    def test_parquet_multiple_batches(self):
+        """Test that Parquet output concatenates all batches."""
+        rows = [{"score": i / 10, "patient_id": f"P{i % 2}"} for i in range(10)]
+        sink = io.BytesIO()
+        write_columnar(rows, SEARCH_COLUMNS, "parquet", sink, batch_size=4)
+        table = pq.read_table(io.BytesIO(sink.getvalue()))
+
+        assert table.num_rows == 10
+        assert table.column("patient_id").to_pylist() == [f"P{i % 2}" for i in range(10)]
+
+    def test_unknown_format(self):
+        """Test that an unknown format is rejected."""
+        with pytest.raises(ValueError):
+            ColumnarWriter(io.BytesIO(), SEARCH_COLUMNS, "orc")
+
+
+class TestHistoryColumns:
+    """Tests for history columns."""
+
+    def test_created_at_is_utc_timestamp(self, sample_history_response):
+        """Test that history timestamps are parsed as UTC."""
+        sink = io.BytesIO()
+        write_columnar(sample_history_response["items"], HISTORY_COLUMNS, "parquet", sink)
+        table = pq.read_table(io.BytesIO(sink.getvalue()))
+
+        assert table.schema.field("created_at").type == pa.timestamp("us", tz="UTC")
+        created = table.column("created_at")[0].as_py()
+        assert created.tzinfo is not None
+        assert table.column("result_count").type == pa.int64()
+
+
+class TestOutputColumnar:
+    """Tests for writing columnar output to stdout."""
+
+    def test_refuses_terminal(self, monkeypatch):
+        """Test that binary output is not written to a terminal."""
+        monkeypatch.setattr("sys.stdout.isatty", lambda: True)
+        with pytest.raises(SystemExit) as exc_info:
+            output_columnar([], SEARCH_COLUMNS, "parquet")
+        assert exc_info.value.code == 1
+
+    def test_writes_stdout_buffer(self, capsysbinary):
+        """Test that output goes to the binary stdout buffer."""
+        output_columnar([{"note_id": "N1", "score": 0.5}], SEARCH_COLUMNS, "arrow")
+        table = read_arrow(capsysbinary.readouterr().out)
+        assert table.column("note_id").to_pylist() == ["N1"]
@@ -0,0 +1,171 @@
+"""Tests for the local request daemon."""
+
+import json
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+
+import pytest
+from httpx import Response
+
+from trioexplorer.daemon import DaemonClient, DaemonServer, request
+from trioexplorer.main import main
+
+
+@pytest.fixture
+def daemon(env_with_api_key, mock_api, monkeypatch):
+    # Unix socket paths are limited to about 100 characters
+    directory = Path(tempfile.mkdtemp(prefix="trioexplorer-", dir="/tmp"))
+    path = directory / "daemon.sock"
+    monkeypatch.setenv("TRIOEXPLORER_DAEMON_SOCKET", str(path))
+    monkeypatch.setenv("TRIOEXPLORER_CACHE_FILE", str(directory / "cache.sqlite3"))
+    server = DaemonServer(path, max_retries=0, workers=2)
+    ready = threading.Event()
+    thread = threading.Thread(target=server.serve_forever, kwargs={"ready": ready}, daemon=True)
+    thread.start()
+    assert ready.wait(5)
+    yield server
+    server.stop()
+    thread.join(5)
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def _run(monkeypatch, *argv):
+    monkeypatch.setattr("sys.argv", ["trioexplorer", *argv])
+    main()
+
+
+class TestForwarding:
+    """Tests for commands forwarded to a running daemon."""
+
+    def test_search_is_forwarded(self, daemon, mock_api, monkeypatch, capsys, sample_search_response):
+        """Test that the CLI process makes no client of its own."""
+        import trioexplorer.client as client_module
+
+        route = mock_api.get("/search").mock(return_value=Response(200, json=sample_search_response))
+        monkeypatch.setattr(client_module, "create_client", None)
+
+        _run(monkeypatch, "search", "chest pain", "-o", "json")
+
+        output = json.loads(capsys.readouterr().out)
+        assert output["metadata"]["query"] == "chest pain"
+        assert route.call_count == 1
+        assert daemon.requests == 1
+
+    def test_cache_and_refresh(self, daemon, mock_api, monkeypatch, capsys, sample_search_response):
+        """Test that the daemon's cache serves repeats and --refresh bypasses it."""
+        route = mock_api.get("/note-types").mock(return_value=Response(200, json={"items": [], "total_count": 0}))
+
+        _run(monkeypatch, "list", "notetypes", "-o", "json")
+        _run(monkeypatch, "list", "notetypes", "-o", "json")
+        assert route.call_count == 1
+        _run(monkeypatch, "list", "notetypes", "-o", "json", "--refresh")
+        assert route.call_count == 2
+        assert daemon.requests == 3
+
+    def test_reused_client_follows_cache_options(self, daemon, mock_api):
+        """Test that a provider reused across commands forwards each --no-cache."""
+        from trioexplorer.main import ClientProvider, create_parser
+
+        route = mock_api.get("/note-types").mock(return_value=Response(200, json={"items": [], "total_count": 0}))
+        parser = create_parser()
+        provider = ClientProvider(parser.parse_args(["list", "notetypes"]))
+        try:
+            provider().get("/note-types")
+            provider.args = parser.parse_args(["list", "notetypes", "--no-cache"])
+            provider().get("/note-types")
+            provider.args = parser.parse_args(["list", "notetypes"])
+            provider().get("/note-types")
+        finally:
+            provider.close()
+
+        assert route.call_count == 2
+        assert daemon.requests == 3
+
+    def test_errors_are_reported_by_the_cli(self, daemon, mock_api, monkeypatch, capsys):
+        """Test that an API error exits the CLI process, not the daemon."""
+        mock_api.get("/search").mock(return_value=Response(404, json={"detail": "Not found"}))
+
+        with pytest.raises(SystemExit) as exc_info:
+            _run(monkeypatch, "search", "chest pain")
+
+        assert exc_info.value.code == 1
+        assert "404" in capsys.readouterr().err
+        assert daemon.errors == 1
+        assert request(daemon.path, {"op": "hello"})["pid"]
+
+    def test_local_requests_when_not_eligible(self, daemon, mock_api, monkeypatch, capsys,
+                                              sample_search_response):
+        """Test --no-daemon, local-only options and another API key."""
+        mock_api.get("/search").mock(return_value=Response(200, json=sample_search_response))
+
+        _run(monkeypatch, "--no-daemon", "search", "chest pain", "-o", "json", "--no-cache")
+        _run(monkeypatch, "--timings", "search", "chest pain", "-o", "json", "--no-cache")
+        monkeypatch.setenv("TRIOEXPLORER_API_KEY", "another-key")
+        _run(monkeypatch, "search", "chest pain", "-o", "json", "--no-cache")
+
+        assert daemon.requests == 0
+
+    def test_idle_connections_hold_no_worker(self, daemon, mock_api, monkeypatch, capsys):
+        """Test that more connected processes than workers are all served."""
+        from trioexplorer.daemon import _connect
+
+        mock_api.get("/note-types").mock(return_value=Response(200, json={"items": [], "total_count": 0}))
+        clients = [
+            DaemonClient(_connect(daemon.path), {"api_url": daemon.api_url}) for _ in range(daemon.workers + 2)
+        ]
+        try:
+            for client in clients:
+                assert client.get("/note-types") == {"items": [], "total_count": 0}
+
+            _run(monkeypatch, "list", "notetypes", "-o", "json")
+
+            assert json.loads(capsys.readouterr().out)["total_count"] == 0
+            assert daemon.requests == len(clients) + 1
+            assert clients[0].get("/note-types")["items"] == []
+        finally:
+            for client in clients:
+                client.close()
+
+    def test_stream_get(self, daemon, mock_api, monkeypatch, capsys, sample_search_response):
+        """Test that --stream output works from a complete forwarded response."""
+        mock_api.get("/search").mock(return_value=Response(200, json=sample_search_response))
+
+        _run(monkeypatch, "search", "chest pain", "--stream", "-o", "ndjson")
+
+        lines = capsys.readouterr().out.strip().splitlines()
+        assert [json.loads(line)["note_id"] for line in lines] == ["N11111", "N11112"]
+
+
+class TestCommands:
+    """Tests for daemon status and stop."""
+
+    def test_status_and_stop(self, daemon, monkeypatch, capsys):
+        """Test status output and a clean stop that removes the socket."""
+        _run(monkeypatch, "daemon", "status", "-o", "json")
+        status = json.loads(capsys.readouterr().out)
+        assert status["api_url"] == "http://localhost:8001"
+        assert status["workers"] == 2
+        assert "test-api-key" not in json.dumps(status)
+
+        _run(monkeypatch, "daemon", "stop")
+        assert "Stopped daemon" in capsys.readouterr().err
+        assert not daemon.path.exists()
+
+        with pytest.raises(SystemExit):
+            _run(monkeypatch, "daemon", "status")
+
+    def test_second_server_is_refused(self, daemon):
+        """Test that a live socket is not taken over."""
+        from trioexplorer.daemon import DaemonError
+
+        with pytest.raises(DaemonError):
+            DaemonServer(daemon.path).serve_forever()
+
+    def test_client_is_a_context_manager(self, daemon):
+        """Test DaemonClient closing."""
+        from trioexplorer.daemon import _connect
+
+        with DaemonClient(_connect(daemon.path), {"api_url": daemon.api_url}) as client:
+            assert client.base_url == daemon.api_url
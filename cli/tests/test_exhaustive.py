@@ -0,0 +1,210 @@
+"""Tests for exhaustive date-window retrieval."""
+
+import asyncio
+import datetime
+import json
+
+import pytest
+from httpx import Response
+
+from trioexplorer.async_client import create_async_client
+from trioexplorer.commands.search import run_exhaustive_search
+from trioexplorer.exhaustive import bisect_window, exhaustive_search, split_range
+from trioexplorer.main import create_parser
+
+D = datetime.date
+
+
+def _date_bounds(filters):
+    """Extract the note_date bounds from a filter expression."""
+    bounds = {}
+    stack = [filters]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list) and len(node) == 3 and node[0] == "note_date":
+            bounds[node[1]] = node[2]
+        elif isinstance(node, list):
+            stack.extend(item for item in node if isinstance(item, list))
+    return bounds["Gte"], bounds["Lte"]
+
+
+def _corpus_handler(corpus, seen_filters=None):
+    """Serve /search from a corpus of results, honoring date filters and k."""
+    def handler(request):
+        filters = json.loads(request.url.params["filters"])
+        if seen_filters is not None:
+            seen_filters.append(filters)
+        date_from, date_to = _date_bounds(filters)
+        k = int(request.url.params["k"])
+        matches = [r for r in corpus if date_from <= r["note_date"] <= date_to]
+        return Response(200, json={"results": matches[:k], "metadata": {}})
+    return handler
+
+
+def _corpus(per_day, days, start=D(2024, 1, 1)):
+    return [
+        {
+            "encounter_id": f"E{day}-{i}",
+            "note_id": f"N{day}-{i}",
+            "note_date": (start + datetime.timedelta(days=day)).isoformat(),
+            "score": 0.5,
+        }
+        for day in range(days)
+        for i in range(per_day)
+    ]
+
+
+class TestWindows:
+    """Tests for date window arithmetic."""
+
+    def test_split_range_covers_every_day(self):
+        """Test that windows are contiguous and cover the range."""
+        windows = split_range(D(2024, 1, 1), D(2024, 1, 10), 3)
+        assert windows == [
+            (D(2024, 1, 1), D(2024, 1, 4)),
+            (D(2024, 1, 5), D(2024, 1, 7)),
+            (D(2024, 1, 8), D(2024, 1, 10)),
+        ]
+
+    def test_split_range_more_parts_than_days(self):
+        """Test that windows are never empty."""
+        assert split_range(D(2024, 1, 1), D(2024, 1, 2), 8) == [
+            (D(2024, 1, 1), D(2024, 1, 1)),
+            (D(2024, 1, 2), D(2024, 1, 2)),
+        ]
+
+    def test_bisect(self):
+        """Test bisecting a window into two non-overlapping halves."""
+        assert bisect_window((D(2024, 1, 1), D(2024, 1, 4))) == (
+            (D(2024, 1, 1), D(2024, 1, 2)),
+            (D(2024, 1, 3), D(2024, 1, 4)),
+        )
+
+    def test_bisect_single_day(self):
+        """Test that a single day cannot be bisected."""
+        assert bisect_window((D(2024, 1, 1), D(2024, 1, 1))) is None
+
+
+class TestExhaustiveSearch:
+    """Tests for the window search engine."""
+
+    async def test_bisects_saturated_windows(self, mock_api, env_with_api_key):
+        """Test that every result is found although windows exceed k."""
+        corpus = _corpus(per_day=3, days=16)
+        mock_api.get("/search").mock(side_effect=_corpus_handler(corpus))
+
+        def params_for(window):
+            filters = ["And", [["note_date", "Gte", window[0].isoformat()],
+                               ["note_date", "Lte", window[1].isoformat()]]]
+            return {"query": "x", "k": 10, "filters": json.dumps(filters)}
+
+        emitted = []
+        async with create_async_client() as client:
+            summary = await exhaustive_search(
+                client, [(D(2024, 1, 1), D(2024, 1, 16))], params_for, emitted.append,
+                distinct="encounter", concurrency=4, k=10,
+            )
+
+        assert sorted(r["encounter_id"] for r in emitted) == sorted(r["encounter_id"] for r in corpus)
+        assert summary["bisected"] > 0
+        assert summary["saturated"] == []
+        assert summary["results"] == len(corpus)
+
+    async def test_saturated_single_day_is_reported(self, mock_api, env_with_api_key):
+        """Test that a day with more than k matches is flagged."""
+        mock_api.get("/search").mock(side_effect=_corpus_handler(_corpus(per_day=5, days=1)))
+
+        def params_for(window):
+            filters = [["note_date", "Gte", window[0].isoformat()],
+                       ["note_date", "Lte", window[1].isoformat()]]
+            return {"query": "x", "k": 3, "filters": json.dumps(filters)}
+
+        emitted = []
+        async with create_async_client() as client:
+            summary = await exhaustive_search(
+                client, [(D(2024, 1, 1), D(2024, 1, 1))], params_for, emitted.append, k=3,
+            )
+
+        assert len(emitted) == 3
+        assert summary["saturated"] == ["2024-01-01"]
+
+    async def test_deduplicates_on_distinct_key(self, mock_api, env_with_api_key):
+        """Test that a patient matched in two windows is emitted once."""
+        corpus = [
+            {"patient_id": "P1", "note_date": "2024-01-01"},
+            {"patient_id": "P1", "note_date": "2024-01-03"},
+            {"patient_id": "P2", "note_date": "2024-01-03"},
+        ]
+        mock_api.get("/search").mock(side_effect=_corpus_handler(corpus))
+
+        def params_for(window):
+            filters = [["note_date", "Gte", window[0].isoformat()],
+                       ["note_date", "Lte", window[1].isoformat()]]
+            return {"query": "x", "k": 300, "filters": json.dumps(filters)}
+
+        emitted = []
+        async with create_async_client() as client:
+            summary = await exhaustive_search(
+                client, split_range(D(2024, 1, 1), D(2024, 1, 4), 2), params_for,
+                emitted.append, distinct="patient",
+            )
+
+        assert sorted(r["patient_id"] for r in emitted) == ["P1", "P2"]
+        assert summary["duplicates"] == 1
+
+    @pytest.mark.parametrize("concurrency", [1, 3])
+    async def test_emit_failure_is_raised(self, mock_api, env_with_api_key, concurrency):
+        """Test that an error from emit stops the search instead of hanging."""
+        mock_api.get("/search").mock(side_effect=_corpus_handler(_corpus(per_day=2, days=8)))
+
+        def params_for(window):
+            filters = [["note_date", "Gte", window[0].isoformat()],
+                       ["note_date", "Lte", window[1].isoformat()]]
+            return {"query": "x", "k": 300, "filters": json.dumps(filters)}
+
+        def emit(result):
+            raise BrokenPipeError("stdout closed")
+
+        async with create_async_client() as client:
+            with pytest.raises(BrokenPipeError):
+                await asyncio.wait_for(
+                    exhaustive_search(
+                        client, split_range(D(2024, 1, 1), D(2024, 1, 8), 8), params_for, emit,
+                        concurrency=concurrency,
+                    ),
+                    timeout=5,
+                )
+
+
+class TestRunExhaustiveSearch:
+    """Tests for search --exhaustive."""
+
+    def test_window_filters_compose_with_user_filters(
+        self, mock_api, env_with_api_key, capsys
+    ):
+        """Test that window dates are added to --filters and results stream as NDJSON."""
+        seen_filters = []
+        mock_api.get("/search").mock(
+            side_effect=_corpus_handler(_corpus(per_day=1, days=4), seen_filters)
+        )
+
+        args = create_parser().parse_args([
+            "search", "q", "--exhaustive", "--windows", "2", "--no-cache", "-o", "ndjson",
+            "--date-from", "2024-01-01", "--date-to", "2024-01-04",
+            "--filters", '["note_type", "Eq", "Discharge"]',
+        ])
+        run_exhaustive_search(args)
+
+        lines = capsys.readouterr().out.splitlines()
+        assert len(lines) == 4
+        assert all(["note_type", "Eq", "Discharge"] in f[1] for f in seen_filters)
+        assert all(
+            json.loads(r.request.url.params["k"]) == 300 for r in mock_api.routes[0].calls
+        )
+
+    def test_requires_date_from(self, env_with_api_key):
+        """Test that --exhaustive without --date-from is rejected."""
+        args = create_parser().parse_args(["search", "q", "--exhaustive"])
+        with pytest.raises(SystemExit) as exc_info:
+            run_exhaustive_search(args)
+        assert exc_info.value.code == 1
@@ -0,0 +1,147 @@
+"""Tests for cohort-sharded fan-out search."""
+
+import json
+
+import pytest
+from httpx import Response
+
+from trioexplorer.async_client import create_async_client
+from trioexplorer.commands.search import run_fan_out_search
+from trioexplorer.fanout import fan_out_search, merge_top_k, split_cohorts
+from trioexplorer.main import create_parser
+
+
+def _result(note_id, score, encounter_id=None, patient_id="P1"):
+    return {
+        "note_id": note_id,
+        "chunk_id": f"C-{note_id}",
+        "encounter_id": encounter_id or f"E-{note_id}",
+        "patient_id": patient_id,
+        "score": score,
+    }
+
+
+class TestSplitCohorts:
+    """Tests for parsing the cohort list."""
+
+    def test_split(self):
+        """Test splitting, trimming and de-duplicating cohort IDs."""
+        assert split_cohorts(" 1, 2,,1 ,3") == ["1", "2", "3"]
+
+    def test_empty(self):
+        """Test that missing cohort IDs yield no shards."""
+        assert split_cohorts(None) == []
+
+
+class TestMergeTopK:
+    """Tests for the heap-based top-k merge."""
+
+    def test_interleaves_by_score(self):
+        """Test that shard rankings are merged by descending score."""
+        shard_a = [_result("a1", 0.9), _result("a2", 0.5)]
+        shard_b = [_result("b1", 0.8), _result("b2", 0.7)]
+        merged = merge_top_k([shard_a, shard_b], k=3, distinct="note")
+        assert [r["note_id"] for r in merged] == ["a1", "b1", "b2"]
+
+    def test_distinct_patient(self):
+        """Test that a patient present in several cohorts is kept once."""
+        shard_a = [_result("a1", 0.9, patient_id="P1"), _result("a2", 0.4, patient_id="P2")]
+        shard_b = [_result("b1", 0.8, patient_id="P1"), _result("b2", 0.7, patient_id="P3")]
+        merged = merge_top_k([shard_a, shard_b], k=10, distinct="patient")
+        assert [r["patient_id"] for r in merged] == ["P1", "P3", "P2"]
+
+    def test_distinct_encounter(self):
+        """Test that the best-scoring result per encounter wins."""
+        shard_a = [_result("a1", 0.6, encounter_id="E1")]
+        shard_b = [_result("b1", 0.9, encounter_id="E1")]
+        merged = merge_top_k([shard_a, shard_b], k=10, distinct="encounter")
+        assert [r["note_id"] for r in merged] == ["b1"]
+
+    def test_distinct_none_keeps_distinct_chunks(self):
+        """Test that 'none' keeps every chunk of the same note."""
+        chunk_1 = {**_result("n1", 0.9), "chunk_id": "C1"}
+        chunk_2 = {**_result("n1", 0.8), "chunk_id": "C2"}
+        merged = merge_top_k([[chunk_1], [chunk_2, chunk_1]], k=10, distinct="none")
+        assert [r["chunk_id"] for r in merged] == ["C1", "C2"]
+
+    def test_missing_scores_rank_last(self):
+        """Test that results without a score sort after scored ones."""
+        merged = merge_top_k([[_result("a", None)], [_result("b", 0.1)]], k=2, distinct="note")
+        assert [r["note_id"] for r in merged] == ["b", "a"]
+
+
+class TestFanOutSearch:
+    """Tests for concurrent per-cohort requests."""
+
+    async def test_one_request_per_cohort(self, mock_api, env_with_api_key):
+        """Test that each shard searches exactly one cohort."""
+        route = mock_api.get("/search").mock(
+            side_effect=lambda request: Response(
+                200,
+                json={
+                    "results": [_result(f"N{request.url.params['cohort-ids']}", 0.5)],
+                    "metadata": {"search_type": "hybrid"},
+                },
+            )
+        )
+
+        async with create_async_client() as client:
+            shards, wall_ms = await fan_out_search(client, {"query": "x"}, ["1", "2", "3"])
+
+        assert route.call_count == 3
+        assert sorted(r.request.url.params["cohort-ids"] for r in route.calls) == ["1", "2", "3"]
+        assert [s["cohort_id"] for s in shards] == ["1", "2", "3"]
+        assert all(s["status"] == "ok" and s["latency_ms"] >= 0 for s in shards)
+        assert wall_ms >= 0
+
+    async def test_shard_errors_are_reported(self, mock_api, env_with_api_key):
+        """Test that a failing shard is reported, not raised."""
+        mock_api.get("/search").mock(
+            side_effect=lambda request: Response(403, json={"detail": "no access"})
+            if request.url.params["cohort-ids"] == "2"
+            else Response(200, json={"results": [], "metadata": {}})
+        )
+
+        async with create_async_client(max_retries=0) as client:
+            shards, _ = await fan_out_search(client, {"query": "x"}, ["1", "2"])
+
+        assert shards[0]["status"] == "ok"
+        assert shards[1]["status"] == "error"
+
+
+class TestRunFanOutSearch:
+    """Tests for search --fan-out."""
+
+    def test_merged_json_output(self, mock_api, env_with_api_key, capsys):
+        """Test the merged output with per-shard metadata."""
+        scores = {"1": [0.9, 0.3], "2": [0.8, 0.7]}
+        mock_api.get("/search").mock(
+            side_effect=lambda request: Response(
+                200,
+                json={
+                    "results": [
+                        _result(f"{request.url.params['cohort-ids']}-{i}", score)
+                        for i, score in enumerate(scores[request.url.params["cohort-ids"]])
+                    ],
+                    "metadata": {},
+                },
+            )
+        )
+
+        args = create_parser().parse_args(
+            ["search", "q", "--cohort-ids", "1,2", "--fan-out", "-k", "3", "-o", "json", "--no-cache"]
+        )
+        run_fan_out_search(args)
+
+        output = json.loads(capsys.readouterr().out)
+        assert [r["note_id"] for r in output["results"]] == ["1-0", "2-0", "2-1"]
+        shards = output["metadata"]["fan_out"]["shards"]
+        assert [s["cohort_id"] for s in shards] == ["1", "2"]
+        assert all("latency_ms" in s and "results" not in s for s in shards)
+
+    def test_requires_cohorts(self, env_with_api_key):
+        """Test that --fan-out without --cohort-ids is rejected."""
+        args = create_parser().parse_args(["search", "q", "--fan-out"])
+        with pytest.raises(SystemExit) as exc_info:
+            run_fan_out_search(args)
+        assert exc_info.value.code == 1
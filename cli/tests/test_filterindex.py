@@ -0,0 +1,238 @@
+"""Tests for the local filter value index."""
+
+import json
+
+import pytest
+from httpx import Response
+
+from trioexplorer.async_client import create_async_client
+from trioexplorer.filterindex import FilterIndex, sync_filter_values
+from trioexplorer.main import main
+
+API_URL = "http://localhost:8001"
+
+VALUES = {
+    "medications_present": ["metformin", "Metformin ER", "metoprolol", "insulin", "lisinopril"],
+    "symptoms_present": ["chest pain", "Chills", "cough"],
+}
+
+
+class FakeFilterValues:
+    """In-memory /filter-fields and /filter-values/{field} with pagination."""
+
+    def __init__(self, values, fail_field=None, understate=0):
+        self.values = values
+        self.fail_field = fail_field
+        self.understate = understate
+        self.requests = []
+
+    def fields(self, request):
+        return Response(200, json={"namespace": "default", "fields": [
+            {"field_name": name, "field_category": "entity_assertion",
+             "value_count": max(0, len(values) - self.understate)}
+            for name, values in self.values.items()
+        ], "total_fields": len(self.values)})
+
+    def field_values(self, request, field):
+        params = request.url.params
+        self.requests.append((field, int(params["offset"])))
+        if field == self.fail_field:
+            return Response(400, json={"detail": "bad field"})
+        limit, offset = int(params["limit"]), int(params["offset"])
+        values = self.values[field]
+        return Response(200, json={
+            "namespace": "default",
+            "field_name": field,
+            "field_category": "entity_assertion",
+            "values": [
+                {"id": f"{field}-{i}", "text_value": text, "cui": f"C{i:07d}", "occurrence_count": 10 * i}
+                for i, text in enumerate(values[offset:offset + limit], start=offset)
+            ],
+            "total_values": len(values),
+        })
+
+
+@pytest.fixture
+def index_file(tmp_path, monkeypatch):
+    path = tmp_path / "filters.sqlite3"
+    monkeypatch.setenv("TRIOEXPLORER_FILTER_INDEX_FILE", str(path))
+    return path
+
+
+@pytest.fixture
+def index(index_file):
+    with FilterIndex(index_file) as index:
+        yield index
+
+
+def _mock(mock_api, fake):
+    mock_api.get("/namespaces/default/filter-fields").mock(side_effect=fake.fields)
+    mock_api.get(url__regex=r"/namespaces/default/filter-values/(?P<field>\w+)").mock(
+        side_effect=fake.field_values
+    )
+
+
+async def _sync(index, **kwargs):
+    async with create_async_client(max_retries=0) as client:
+        return await sync_filter_values(client, index, "default", API_URL, **kwargs)
+
+
+class TestSync:
+    """Tests for downloading filter values."""
+
+    async def test_all_pages_of_all_fields(self, mock_api, env_with_api_key, index):
+        """Test that every page is fetched and every value indexed."""
+        fake = FakeFilterValues(VALUES)
+        _mock(mock_api, fake)
+
+        summary = await _sync(index, page_size=2)
+
+        assert summary["fields"] == 2
+        assert summary["values"] == 8
+        assert summary["pages"] == 5
+        assert sorted(fake.requests) == [
+            ("medications_present", 0), ("medications_present", 2), ("medications_present", 4),
+            ("symptoms_present", 0), ("symptoms_present", 2),
+        ]
+        assert [f["value_count"] for f in index.fields("default")] == [5, 3]
+        assert index.namespace_info("default")["api_url"] == API_URL
+
+    async def test_pages_beyond_value_count(self, mock_api, env_with_api_key, index):
+        """Test that values past the advertised count are still fetched."""
+        _mock(mock_api, FakeFilterValues(VALUES, understate=3))
+
+        summary = await _sync(index, page_size=2)
+
+        assert summary["values"] == 8
+
+    async def test_failed_field_keeps_old_values(self, mock_api, env_with_api_key, index):
+        """Test that a failed field is reported and not emptied."""
+        _mock(mock_api, FakeFilterValues(VALUES))
+        await _sync(index)
+        mock_api.reset()
+        changed = {**VALUES, "medications_present": ["aspirin"]}
+        _mock(mock_api, FakeFilterValues(changed, fail_field="symptoms_present"))
+
+        summary = await _sync(index)
+
+        assert summary["errors"] == [{"field": "symptoms_present", "error": "Error 400: bad field"}]
+        assert index.count("default", "symptoms_present") == 3
+        assert [v["text_value"] for v in index.lookup("default", "medications_present")] == ["aspirin"]
+
+
+class TestLookup:
+    """Tests for prefix lookups."""
+
+    def test_prefix_ignores_case(self, index):
+        """Test casefolded prefix ranges, value order and limits."""
+        index.replace_field("default", {"field_name": "medications_present"}, [
+            {"text_value": text} for text in VALUES["medications_present"]
+        ])
+
+        assert [v["text_value"] for v in index.lookup("default", "medications_present", "METF")] == [
+            "metformin", "Metformin ER",
+        ]
+        assert [v["text_value"] for v in index.lookup("default", "medications_present", "met", limit=2)] == [
+            "metformin", "Metformin ER",
+        ]
+        assert index.count("default", "medications_present", "met") == 3
+        assert index.lookup("default", "medications_present", "x") == []
+        assert index.lookup("other", "medications_present", "met") == []
+        assert index.contains("default", "medications_present", "INSULIN")
+        assert not index.contains("default", "medications_present", "insul")
+
+
+class TestCommands:
+    """Tests for filters sync and list filters --prefix."""
+
+    def _run(self, monkeypatch, *argv):
+        monkeypatch.setattr("sys.argv", ["trioexplorer", *argv])
+        main()
+
+    def test_sync_then_prefix(self, mock_api, env_with_api_key, index_file, monkeypatch, capsys):
+        """Test that lookups after a sync make no request."""
+        _mock(mock_api, FakeFilterValues(VALUES))
+        self._run(monkeypatch, "filters", "sync", "-j", "2")
+        assert "Indexed 8 values of 2 fields" in capsys.readouterr().err
+
+        mock_api.reset()
+        self._run(monkeypatch, "list", "filters", "--field", "medications_present",
+                  "--prefix", "met", "-o", "json")
+
+        response = json.loads(capsys.readouterr().out)
+        assert [v["text_value"] for v in response["values"]] == ["metformin", "Metformin ER", "metoprolol"]
+        assert response["total_values"] == 3
+        assert not mock_api.calls
+
+    def test_prefix_without_index(self, mock_api, env_with_api_key, index_file, monkeypatch, capsys):
+        """Test that the API search is narrowed to the prefix."""
+        route = mock_api.get("/namespaces/default/filter-values/medications_present").mock(
+            return_value=Response(200, json={"values": [
+                {"text_value": "metformin"}, {"text_value": "dimethicone"},
+            ], "total_values": 2})
+        )
+
+        self._run(monkeypatch, "list", "filters", "--field", "medications_present",
+                  "--prefix", "met", "-o", "csv", "--no-cache")
+
+        captured = capsys.readouterr()
+        assert route.calls[0].request.url.params["search"] == "met"
+        assert "metformin" in captured.out
+        assert "dimethicone" not in captured.out
+        assert "filters sync" in captured.err
+
+    def test_prefix_needs_field(self, env_with_api_key, index_file, monkeypatch, capsys):
+        """Test that --prefix without --field is refused."""
+        with pytest.raises(SystemExit) as exc_info:
+            self._run(monkeypatch, "list", "filters", "--prefix", "met")
+
+        assert exc_info.value.code == 1
+        assert "--prefix needs --field" in capsys.readouterr().err
+
+
+class TestExport:
+    """Tests for export filters."""
+
+    def _run(self, monkeypatch, *argv):
+        monkeypatch.setattr("sys.argv", ["trioexplorer", "export", "filters", *argv])
+        main()
+
+    def test_parquet_has_every_value(self, mock_api, env_with_api_key, tmp_path, monkeypatch, capsys):
+        """Test that every page of every field ends up in one file."""
+        pq = pytest.importorskip("pyarrow.parquet")
+        fake = FakeFilterValues(VALUES, understate=2)
+        _mock(mock_api, fake)
+        path = tmp_path / "filters.parquet"
+
+        self._run(monkeypatch, "--output", str(path), "-j", "3")
+
+        table = pq.read_table(path)
+        assert table.column_names == ["field_name", "text_value", "cui", "occurrence_count"]
+        rows = sorted(zip(table["field_name"].to_pylist(), table["text_value"].to_pylist()))
+        assert rows == sorted((field, text) for field, values in VALUES.items() for text in values)
+        assert "Exported 8 values of 2 fields" in capsys.readouterr().err
+
+    def test_failed_field_is_reported(self, mock_api, env_with_api_key, tmp_path, monkeypatch, capsys):
+        """Test that the other fields are written and the export fails."""
+        pa = pytest.importorskip("pyarrow")
+        _mock(mock_api, FakeFilterValues(VALUES, fail_field="symptoms_present"))
+        path = tmp_path / "filters.arrow"
+
+        with pytest.raises(SystemExit) as exc_info:
+            self._run(monkeypatch, "--output", str(path), "-o", "arrow")
+
+        assert exc_info.value.code == 1
+        assert "symptoms_present: Error 400: bad field" in capsys.readouterr().err
+        with pa.ipc.open_file(path) as reader:
+            assert set(reader.read_all()["field_name"].to_pylist()) == {"medications_present"}
+
+    def test_field_list_failure_removes_file(self, mock_api, env_with_api_key, tmp_path, monkeypatch):
+        """Test that no partial file is left when nothing can be exported."""
+        pytest.importorskip("pyarrow")
+        mock_api.get("/namespaces/default/filter-fields").mock(return_value=Response(404, json={"detail": "no"}))
+        path = tmp_path / "filters.parquet"
+
+        with pytest.raises(SystemExit):
+            self._run(monkeypatch, "--output", str(path))
+
+        assert not path.exists()
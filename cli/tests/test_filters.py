@@ -0,0 +1,190 @@
+"""Tests for the filter AST."""
+
+import pytest
+
+from trioexplorer.filters import (
+    And,
+    Condition,
+    FilterSyntaxError,
+    Not,
+    canonical_json,
+    canonicalize,
+    compile_filter,
+    filter_hash,
+    normalize,
+    parse_filter,
+    to_dsl,
+)
+
+
+class TestParseFilter:
+    """Tests for parsing the filter DSL."""
+
+    def test_condition(self):
+        """Test parsing a single comparison."""
+        assert parse_filter(["note_type", "Eq", "Progress Note"]) == Condition(
+            "note_type", "Eq", "Progress Note"
+        )
+
+    def test_list_values_become_tuples(self):
+        """Test that list values are stored immutably."""
+        node = parse_filter(["note_type", "In", ["A", "B"]])
+        assert node.value == ("A", "B")
+        assert to_dsl(node) == ["note_type", "In", ["A", "B"]]
+
+    def test_logical(self):
+        """Test parsing And / Not."""
+        node = parse_filter(["And", [["a", "Eq", 1], ["Not", ["b", "Eq", 2]]]])
+        assert node == And((Condition("a", "Eq", 1), Not(Condition("b", "Eq", 2))))
+
+    def test_roundtrip(self):
+        """Test that serialization inverts parsing."""
+        data = ["Or", [["a", "Gte", 1], ["Not", ["b", "In", [1, 2]]]]]
+        assert to_dsl(parse_filter(data)) == data
+
+    @pytest.mark.parametrize("data", [
+        "note_type",
+        [],
+        ["note_type", "Like", "x"],
+        ["note_type", "In", "x"],
+        ["note_type", "Eq", ["x"]],
+        ["And", ["note_type", "Eq", "x"], "extra"],
+        ["And", "x"],
+    ])
+    def test_invalid(self, data):
+        """Test that malformed expressions are rejected."""
+        with pytest.raises(FilterSyntaxError):
+            parse_filter(data)
+
+
+class TestNormalize:
+    """Tests for filter simplification."""
+
+    def _compile(self, data):
+        return compile_filter(data)
+
+    def test_flattens_nested_and(self):
+        """Test that And inside And is flattened."""
+        result = self._compile(["And", [["a", "Eq", 1], ["And", [["b", "Eq", 2], ["c", "Eq", 3]]]]])
+        assert result == ["And", [["a", "Eq", 1], ["b", "Eq", 2], ["c", "Eq", 3]]]
+
+    def test_unwraps_single_child(self):
+        """Test that a one-child group is replaced by its child."""
+        assert self._compile(["Or", [["And", [["a", "Eq", 1]]]]]) == ["a", "Eq", 1]
+
+    def test_dedupes(self):
+        """Test that duplicate clauses are dropped."""
+        result = self._compile(["And", [["a", "Eq", 1], ["b", "Eq", 2], ["a", "Eq", 1]]])
+        assert result == ["And", [["a", "Eq", 1], ["b", "Eq", 2]]]
+
+    def test_or_merges_eq_into_in(self):
+        """Test that Eq clauses on a field under Or become one In."""
+        result = self._compile(["Or", [
+            ["patient_id", "Eq", "P1"], ["patient_id", "Eq", "P2"], ["patient_id", "In", ["P2", "P3"]],
+        ]])
+        assert result == ["patient_id", "In", ["P1", "P2", "P3"]]
+
+    def test_or_merges_contains_into_contains_any(self):
+        """Test that Contains clauses on a field under Or become ContainsAny."""
+        result = self._compile(["Or", [["cohort_ids", "Contains", 1], ["cohort_ids", "Contains", 2]]])
+        assert result == ["cohort_ids", "ContainsAny", [1, 2]]
+
+    def test_and_folds_ranges(self):
+        """Test that range bounds fold to the tightest pair."""
+        result = self._compile(["And", [
+            ["note_date", "Gte", "2024-01-01"],
+            ["note_date", "Gte", "2024-03-01"],
+            ["note_date", "Lte", "2024-12-31"],
+            ["note_date", "Lt", "2024-06-01"],
+        ]])
+        assert result == ["And", [["note_date", "Gte", "2024-03-01"], ["note_date", "Lt", "2024-06-01"]]]
+
+    def test_strict_bound_wins_on_tie(self):
+        """Test that Gt beats Gte at the same value."""
+        result = self._compile(["And", [["score", "Gte", 0.5], ["score", "Gt", 0.5]]])
+        assert result == ["score", "Gt", 0.5]
+
+    def test_equal_bounds_become_eq(self):
+        """Test that Gte x and Lte x fold to Eq x."""
+        result = self._compile(["And", [["note_date", "Gte", "2024-01-01"], ["note_date", "Lte", "2024-01-01"]]])
+        assert result == ["note_date", "Eq", "2024-01-01"]
+
+    def test_mixed_type_ranges_are_kept(self):
+        """Test that incomparable bounds are not folded."""
+        data = ["And", [["x", "Gte", 1], ["x", "Gte", "a"]]]
+        assert self._compile(data) == data
+
+    def test_and_intersects_members(self):
+        """Test that Eq and In on a field under And intersect."""
+        result = self._compile(["And", [["note_type", "In", ["A", "B", "C"]], ["note_type", "In", ["B", "C", "D"]]]])
+        assert result == ["note_type", "In", ["B", "C"]]
+
+    def test_contradiction_is_kept(self):
+        """Test that disjoint Eq clauses are left for the server."""
+        data = ["And", [["note_type", "Eq", "A"], ["note_type", "Eq", "B"]]]
+        assert self._compile(data) == data
+
+    def test_and_merges_exclusions(self):
+        """Test that NotEq clauses on a field under And become one NotIn."""
+        result = self._compile(["And", [["note_type", "NotEq", "A"], ["note_type", "NotIn", ["B", "A"]]]])
+        assert result == ["note_type", "NotIn", ["A", "B"]]
+
+    def test_double_negation(self):
+        """Test that Not(Not(x)) becomes x."""
+        assert self._compile(["Not", ["Not", ["a", "Eq", 1]]]) == ["a", "Eq", 1]
+
+    def test_single_value_in(self):
+        """Test that a one-element In becomes Eq."""
+        assert self._compile(["a", "In", ["x", "x"]]) == ["a", "Eq", "x"]
+
+    def test_bool_and_int_values_are_distinct(self):
+        """Test that True and 1 are not merged as duplicates."""
+        assert self._compile(["Or", [["a", "Eq", True], ["a", "Eq", 1]]]) == ["a", "In", [True, 1]]
+
+    def test_empty_and_matches_everything(self):
+        """Test that an empty And normalizes to no filter."""
+        assert normalize(parse_filter(["And", []])) is None
+        assert self._compile(["And", [["And", []], ["a", "Eq", 1]]]) == ["a", "Eq", 1]
+
+    def test_empty_or_matches_nothing(self):
+        """Test that an empty Or is kept and empties an And containing it."""
+        assert self._compile(["Or", []]) == ["Or", []]
+        assert self._compile(["And", [["a", "Eq", 1], ["Or", []]]]) == ["Or", []]
+        assert self._compile(["Or", [["a", "Eq", 1], ["Or", []]]]) == ["a", "Eq", 1]
+        assert self._compile(["Not", ["And", []]]) == ["Or", []]
+        assert self._compile(["Not", ["Or", []]]) is None
+
+
+class TestCanonicalForm:
+    """Tests for canonical serialization and hashing."""
+
+    def test_order_independent(self):
+        """Test that clause and value order do not change the hash."""
+        a = parse_filter(["And", [["note_type", "In", ["B", "A"]], ["note_date", "Gte", "2024-01-01"]]])
+        b = parse_filter(["And", [["note_date", "Gte", "2024-01-01"], ["note_type", "In", ["A", "B"]]]])
+        assert canonicalize(a) == canonicalize(b)
+        assert filter_hash(a) == filter_hash(b)
+
+    def test_equivalent_redundant_filter_hashes_equal(self):
+        """Test that a redundant filter hashes like its simplified form."""
+        redundant = parse_filter(["And", [["And", [["a", "Eq", 1]]], ["a", "Eq", 1], ["b", "Gte", 2], ["b", "Gte", 5]]])
+        minimal = parse_filter(["And", [["b", "Gte", 5], ["a", "Eq", 1]]])
+        assert filter_hash(redundant) == filter_hash(minimal)
+
+    def test_different_filters_differ(self):
+        """Test that different filters hash differently."""
+        assert filter_hash(parse_filter(["a", "Eq", 1])) != filter_hash(parse_filter(["a", "Eq", 2]))
+
+    def test_canonical_json_is_compact(self):
+        """Test the compact canonical serialization."""
+        assert canonical_json(parse_filter(["Or", [["b", "Eq", 1], ["a", "Eq", 1]]])) == (
+            '["Or",[["a","Eq",1],["b","Eq",1]]]'
+        )
+        assert canonical_json(None) == "null"
+
+    def test_match_nothing_is_distinct(self):
+        """Test that negated and empty groups canonicalize without crashing."""
+        assert canonical_json(parse_filter(["Not", ["And", []]])) == '["Or",[]]'
+        assert filter_hash(parse_filter(["And", [["a", "Eq", 1], ["Or", []]]])) != filter_hash(
+            parse_filter(["a", "Eq", 1])
+        )
@@ -0,0 +1,183 @@
+"""Tests for search history latency analytics."""
+
+import json
+
+import pytest
+from httpx import Response
+
+from trioexplorer.async_client import create_async_client
+from trioexplorer.latency import NO_USER, LatencyStats, collect_latency
+from trioexplorer.main import main
+
+TYPES = ("hybrid", "semantic", "keyword")
+
+
+def _history(count):
+    """History entries with durations 1..count ms over three types and days."""
+    return [
+        {
+            "id": f"h{i}",
+            "search_type": TYPES[i % 3],
+            "user_id": None if i % 2 else "alice",
+            "created_at": f"2025-01-0{1 + i % 3}T12:00:00Z",
+            "duration_ms": i,
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def _history_handler(entries, requested_pages=None, extra_pages=0):
+    """Serve ``entries`` page by page like /search-history.
+
+    ``total_count`` understates the history by ``extra_pages`` pages, like
+    entries added while paging.
+    """
+    def handler(request):
+        page = int(request.url.params["page"])
+        size = int(request.url.params["page_size"])
+        if requested_pages is not None:
+            requested_pages.append(page)
+        items = entries[(page - 1) * size:page * size]
+        return Response(200, json={
+            "items": items,
+            "total_count": max(0, len(entries) - extra_pages * size),
+            "page": page,
+            "page_size": size,
+            "has_more": page * size < len(entries),
+        })
+    return handler
+
+
+class TestLatencyStats:
+    """Tests for grouped latency sketches."""
+
+    def test_groups_and_percentiles(self):
+        """Test percentiles overall and per group."""
+        stats = LatencyStats()
+        for entry in _history(300):
+            stats.add(entry)
+        stats.add({"search_type": "hybrid", "duration_ms": None})
+        report = stats.report()
+
+        assert report["entries"] == 301
+        assert report["missing_duration"] == 1
+        assert report["overall"]["count"] == 300
+        assert report["overall"]["p50"] == pytest.approx(150, rel=0.01)
+        assert report["overall"]["p99"] == pytest.approx(297, rel=0.01)
+        assert set(report["search_type"]) == set(TYPES)
+        assert list(report["day"]) == ["2025-01-01", "2025-01-02", "2025-01-03"]
+        assert report["user"]["alice"]["count"] == 150
+        assert report["user"][NO_USER]["count"] == 150
+
+    def test_merge_matches_single_pass(self):
+        """Test that merging partial sketches equals one sketch over everything."""
+        entries = _history(1000)
+        whole = LatencyStats()
+        for entry in entries:
+            whole.add(entry)
+        parts = [LatencyStats() for _ in range(3)]
+        for i, entry in enumerate(entries):
+            parts[i % 3].add(entry)
+        merged = LatencyStats()
+        for part in parts:
+            merged.merge(part)
+
+        assert merged.report() == whole.report()
+
+
+class TestCollectLatency:
+    """Tests for concurrent paging."""
+
+    async def test_fetches_every_page(self, mock_api, env_with_api_key):
+        """Test that all pages are read once and folded into the sketches."""
+        pages = []
+        mock_api.get("/search-history").mock(side_effect=_history_handler(_history(950), pages))
+
+        async with create_async_client() as client:
+            stats, summary = await collect_latency(client, page_size=100, concurrency=4)
+
+        assert sorted(pages) == list(range(1, 11))
+        assert summary["pages"] == 10
+        assert stats.entries == 950
+        assert summary["errors"] == []
+
+    async def test_follows_has_more_past_total(self, mock_api, env_with_api_key):
+        """Test that pages beyond the initial total_count are still read."""
+        mock_api.get("/search-history").mock(
+            side_effect=_history_handler(_history(500), extra_pages=2)
+        )
+
+        async with create_async_client() as client:
+            stats, summary = await collect_latency(client, page_size=100)
+
+        assert stats.entries == 500
+        assert summary["pages"] == 5
+
+    async def test_max_pages(self, mock_api, env_with_api_key):
+        """Test that --max-pages bounds the scan."""
+        mock_api.get("/search-history").mock(side_effect=_history_handler(_history(500), extra_pages=2))
+
+        async with create_async_client() as client:
+            stats, summary = await collect_latency(client, page_size=100, max_pages=2)
+
+        assert stats.entries == 200
+
+    async def test_failed_page_is_reported(self, mock_api, env_with_api_key):
+        """Test that a failing page is recorded while the others are counted."""
+        handler = _history_handler(_history(300))
+
+        def flaky(request):
+            if request.url.params["page"] == "2":
+                return Response(400, json={"detail": "bad page"})
+            return handler(request)
+
+        mock_api.get("/search-history").mock(side_effect=flaky)
+
+        async with create_async_client(max_retries=0) as client:
+            stats, summary = await collect_latency(client, page_size=100)
+
+        assert stats.entries == 200
+        assert [error["page"] for error in summary["errors"]] == [2]
+
+
+class TestStatsLatencyCommand:
+    """Tests for the stats latency command."""
+
+    def test_json_output(self, mock_api, env_with_api_key, monkeypatch, capsys):
+        """Test JSON output restricted to the requested groupings."""
+        route = mock_api.get("/search-history").mock(side_effect=_history_handler(_history(250)))
+        monkeypatch.setattr("sys.argv", [
+            "trioexplorer", "stats", "latency", "--type", "hybrid",
+            "--group-by", "day", "-o", "json",
+        ])
+        main()
+
+        output = json.loads(capsys.readouterr().out)
+        assert output["entries"] == 250
+        assert output["pages"] == 3
+        assert set(output) >= {"overall", "day"}
+        assert "user" not in output
+        assert route.calls[0].request.url.params["search-type"] == "hybrid"
+
+    def test_table_output(self, mock_api, env_with_api_key, monkeypatch, capsys):
+        """Test that the table shows one row per group, limited by --top."""
+        mock_api.get("/search-history").mock(side_effect=_history_handler(_history(30)))
+        monkeypatch.setattr("sys.argv", [
+            "trioexplorer", "stats", "latency", "--group-by", "search_type", "--top", "2",
+        ])
+        main()
+
+        out = capsys.readouterr().out
+        assert "Search Latency" in out
+        assert "p95" in out
+        # semantic holds the fastest searches (1, 4, ..., 28)
+        assert "hybrid" in out
+        assert "keyword" in out
+        assert "semantic" not in out
+
+    def test_invalid_group(self, monkeypatch):
+        """Test that an unknown grouping is rejected."""
+        monkeypatch.setattr("sys.argv", ["trioexplorer", "stats", "latency", "--group-by", "hour"])
+        with pytest.raises(SystemExit) as exc_info:
+            main()
+        assert exc_info.value.code == 1
@@ -0,0 +1,181 @@
+"""Tests for the local search history mirror."""
+
+import json
+
+import pytest
+from httpx import Response
+
+from trioexplorer.async_client import create_async_client
+from trioexplorer.main import main
+from trioexplorer.mirror import HistoryMirror, MirrorError, fts_query, sync_history
+
+API_URL = "http://localhost:8001"
+QUERIES = ("chest pain", "diabetes metformin", "shortness of breath", "chest x-ray")
+
+
+def _entry(i):
+    return {
+        "id": f"h{i:04d}",
+        "api_key_id": "key1",
+        "user_id": "alice" if i % 2 else "bob",
+        "search_type": ("hybrid", "semantic")[i % 2],
+        "query": QUERIES[i % len(QUERIES)],
+        "request_payload": {"query": QUERIES[i % len(QUERIES)], "k": 10},
+        "response_payload": {"results": [{"note_id": "n"}] * 3, "metadata": {"total_results": 3}},
+        "result_count": 3,
+        "duration_ms": 100 + i,
+        "status_code": 200,
+        "error_message": None,
+        "created_at": f"2025-01-{1 + i // 24:02d}T{i % 24:02d}:00:00Z",
+    }
+
+
+class FakeHistory:
+    """In-memory /search-history honoring date filters and pagination."""
+
+    def __init__(self, entries, fail_page=None):
+        self.entries = list(entries)
+        self.fail_page = fail_page
+        self.requests = []
+
+    def __call__(self, request):
+        params = request.url.params
+        self.requests.append(dict(params))
+        page, size = int(params["page"]), int(params["page_size"])
+        if page == self.fail_page:
+            return Response(400, json={"detail": "bad page"})
+        matching = [
+            e for e in sorted(self.entries, key=lambda e: e["created_at"], reverse=True)
+            if e["created_at"] >= params.get("date-from", "").replace("+00:00", "Z")
+        ]
+        return Response(200, json={
+            "items": matching[(page - 1) * size:page * size],
+            "total_count": len(matching),
+            "page": page,
+            "page_size": size,
+            "has_more": page * size < len(matching),
+        })
+
+
+@pytest.fixture
+def mirror(tmp_path):
+    with HistoryMirror(tmp_path / "history.sqlite3") as mirror:
+        yield mirror
+
+
+async def _sync(mirror, **kwargs):
+    async with create_async_client(max_retries=0) as client:
+        return await sync_history(client, mirror, API_URL, page_size=10, **kwargs)
+
+
+class TestSync:
+    """Tests for watermark-based synchronization."""
+
+    async def test_initial_sync(self, mock_api, env_with_api_key, mirror):
+        """Test that every entry is mirrored without result rows."""
+        mock_api.get("/search-history").mock(side_effect=FakeHistory(_entry(i) for i in range(45)))
+
+        summary = await _sync(mirror)
+
+        assert summary["pages"] == 5
+        assert summary["entries"] == 45
+        assert len(mirror) == 45
+        assert mirror.watermark == _entry(44)["created_at"]
+        item = mirror.query(page_size=1)["items"][0]
+        assert item["id"] == "h0044"
+        assert item["request_payload"] == {"query": QUERIES[0], "k": 10}
+        assert item["response_payload"] == {"metadata": {"total_results": 3}}
+
+    async def test_incremental_sync_fetches_only_new_entries(self, mock_api, env_with_api_key, mirror):
+        """Test that the second sync starts at the watermark."""
+        history = FakeHistory(_entry(i) for i in range(30))
+        mock_api.get("/search-history").mock(side_effect=history)
+        await _sync(mirror)
+
+        history.entries += [_entry(i) for i in range(30, 35)]
+        history.requests.clear()
+        summary = await _sync(mirror)
+
+        assert history.requests[0]["date-from"] == _entry(29)["created_at"]
+        assert "date-to" in history.requests[0]
+        # The watermark entry itself is re-read and upserted
+        assert summary["entries"] == 6
+        assert len(mirror) == 35
+        assert mirror.watermark == _entry(34)["created_at"]
+
+    async def test_failed_page_keeps_watermark(self, mock_api, env_with_api_key, mirror):
+        """Test that the watermark does not move past a missed page."""
+        mock_api.get("/search-history").mock(
+            side_effect=FakeHistory((_entry(i) for i in range(30)), fail_page=2)
+        )
+
+        summary = await _sync(mirror)
+
+        assert [error["page"] for error in summary["errors"]] == [2]
+        assert len(mirror) == 20
+        assert mirror.watermark is None
+
+    async def test_other_api_url_is_refused(self, mock_api, env_with_api_key, mirror):
+        """Test that a mirror is bound to the API URL it was synced from."""
+        mirror.set_state(api_url="https://other.example.com")
+        with pytest.raises(MirrorError):
+            await _sync(mirror)
+
+
+class TestQuery:
+    """Tests for local queries."""
+
+    @pytest.fixture
+    def filled(self, mirror):
+        mirror.upsert([_entry(i) for i in range(48)])
+        return mirror
+
+    def test_full_text(self, filled):
+        """Test that all words must match, in any order."""
+        result = filled.query(text="pain chest", page_size=100)
+        assert result["total_count"] == 12
+        assert {item["query"] for item in result["items"]} == {"chest pain"}
+        assert filled.query(text="chest")["total_count"] == 24
+
+    def test_operators_are_literal(self, filled):
+        """Test that FTS syntax in the text does not raise."""
+        assert fts_query('x-ray "AND') == '"x-ray" """AND"'
+        assert filled.query(text='x-ray AND (')["total_count"] == 0
+        assert filled.query(text="x-ray")["total_count"] == 12
+
+    def test_filters_and_paging(self, filled):
+        """Test type, user and date filters with pagination, newest first."""
+        result = filled.query(search_type="semantic", user_id="alice", date_to="2025-01-01", page_size=5)
+        assert result["total_count"] == 12
+        assert result["has_more"]
+        dates = [item["created_at"] for item in result["items"]]
+        assert dates == sorted(dates, reverse=True)
+        assert filled.query(date_from="2025-01-02")["total_count"] == 24
+        second = filled.query(page=2, page_size=40)
+        assert len(second["items"]) == 8
+        assert not second["has_more"]
+
+
+class TestCommands:
+    """Tests for history sync and list history --local."""
+
+    def test_sync_then_list_local(self, mock_api, env_with_api_key, tmp_path, monkeypatch, capsys):
+        """Test a sync followed by a local query that makes no request."""
+        monkeypatch.setenv("TRIOEXPLORER_HISTORY_FILE", str(tmp_path / "mirror.sqlite3"))
+        route = mock_api.get("/search-history").mock(side_effect=FakeHistory(_entry(i) for i in range(25)))
+
+        monkeypatch.setattr("sys.argv", ["trioexplorer", "history", "sync", "-j", "2"])
+        main()
+        assert "25 mirrored" in capsys.readouterr().err
+        calls = route.call_count
+
+        monkeypatch.setattr("sys.argv", [
+            "trioexplorer", "list", "history", "--local", "--query", "metformin",
+            "--type", "semantic", "-o", "json",
+        ])
+        main()
+
+        output = json.loads(capsys.readouterr().out)
+        assert route.call_count == calls
+        assert output["total_count"] == 6
+        assert all(item["query"] == "diabetes metformin" for item in output["items"])
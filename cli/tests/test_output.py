@@ -11,6 +11,9 @@ from trioexplorer.output import (
     output_json,
     output_csv,
     output_search_csv,
+    output_ndjson,
+    CSVRowWriter,
+    NDJSONRowWriter,
     output_history_csv,
     output_cohorts_csv,
     output_notetypes_csv,
@@ -169,6 +172,51 @@ class TestSearchCsvOutput:
         assert "patient_id" in lines[0]
 
 
+class TestRowWriters:
+    """Tests for the streaming row writers."""
+
+    def test_csv_writer_to_file(self):
+        """Test that the CSV writer targets any text stream."""
+        out = io.StringIO()
+        count = CSVRowWriter(out, fields=["a", "b"]).write_rows([{"a": 1, "b": None, "c": 3}])
+        assert count == 1
+        assert out.getvalue().splitlines() == ["a,b", "1,"]
+
+    def test_csv_writer_streams_rows(self):
+        """Test that each row is written before the next is produced."""
+        out = io.StringIO()
+        writer = CSVRowWriter(out)
+
+        def rows():
+            for i in range(3):
+                yield {"n": i}
+                # Header plus every previous row is already written
+                assert len(out.getvalue().splitlines()) == i + 2
+
+        assert writer.write_rows(rows()) == 3
+
+    def test_csv_writer_header_from_first_row(self):
+        """Test that the header comes from the first row when fields is None."""
+        out = io.StringIO()
+        CSVRowWriter(out).write_rows(iter([{"x": 1, "y": 2}, {"x": 3, "y": 4}]))
+        assert out.getvalue().splitlines()[0] == "x,y"
+
+    def test_ndjson_writer(self):
+        """Test NDJSON writing to a stream."""
+        out = io.StringIO()
+        writer = NDJSONRowWriter(out, flush_each=True)
+        writer.write({"a": 1})
+        writer.write({"b": [1, 2]})
+        assert [json.loads(line) for line in out.getvalue().splitlines()] == [{"a": 1}, {"b": [1, 2]}]
+        assert writer.count == 2
+
+    def test_output_ndjson(self, capsys):
+        """Test NDJSON output to stdout from a generator."""
+        output_ndjson({"id": i} for i in range(2))
+        lines = capsys.readouterr().out.splitlines()
+        assert [json.loads(line)["id"] for line in lines] == [0, 1]
+
+
 class TestHistoryCsvOutput:
     """Tests for history-specific CSV output."""
 
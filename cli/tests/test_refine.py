@@ -0,0 +1,172 @@
+"""Tests for local refinement of saved result sets."""
+
+import io
+import json
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+from trioexplorer.columnar import SEARCH_COLUMNS, write_columnar
+from trioexplorer.commands.refine import run_refine
+from trioexplorer.filters import parse_filter
+from trioexplorer.main import create_parser
+from trioexplorer.refine import FilterEvaluationError, evaluate, load_results, refine
+
+
+def _rows():
+    return [
+        {"note_id": "N1", "note_date": "2024-01-05", "note_type": "Progress Note",
+         "note_quality_score": 0.9, "chunk_quality_score": 0.4, "score": 0.8},
+        {"note_id": "N2", "note_date": "2024-02-10", "note_type": "Discharge Summary",
+         "note_quality_score": 0.5, "chunk_quality_score": 0.9, "score": 0.7},
+        {"note_id": "N3", "note_date": "2024-03-15", "note_type": "Progress Note",
+         "note_quality_score": None, "chunk_quality_score": 0.8, "score": 0.6},
+        {"note_id": "N4", "note_date": "2024-04-20", "note_type": "Radiology",
+         "note_quality_score": 0.7, "chunk_quality_score": 0.7, "score": 0.5},
+    ]
+
+
+@pytest.fixture
+def saved_json(tmp_path):
+    path = tmp_path / "results.json"
+    path.write_text(json.dumps({"results": _rows(), "metadata": {"total_results": 4}}))
+    return path
+
+
+def _ids(rows):
+    return [row["note_id"] for row in rows]
+
+
+class TestEvaluate:
+    """Tests for vectorized filter evaluation."""
+
+    @pytest.fixture
+    def result_set(self, saved_json):
+        return load_results(str(saved_json))
+
+    @pytest.mark.parametrize("data, expected", [
+        (["note_type", "Eq", "Progress Note"], ["N1", "N3"]),
+        (["note_type", "NotEq", "Progress Note"], ["N2", "N4"]),
+        (["note_type", "In", ["Radiology", "Discharge Summary"]], ["N2", "N4"]),
+        (["note_type", "NotIn", ["Radiology"]], ["N1", "N2", "N3"]),
+        (["note_date", "Gte", "2024-02-10"], ["N2", "N3", "N4"]),
+        (["note_date", "Lt", "2024-02-10"], ["N1"]),
+        (["chunk_quality_score", "Gt", 0.7], ["N2", "N3"]),
+        (["And", [["note_date", "Lte", "2024-03-31"], ["note_type", "Eq", "Progress Note"]]], ["N1", "N3"]),
+        (["Or", [["note_type", "Eq", "Radiology"], ["note_date", "Lt", "2024-02-01"]]], ["N1", "N4"]),
+        (["Not", ["note_type", "Eq", "Progress Note"]], ["N2", "N4"]),
+    ])
+    def test_operators(self, result_set, data, expected):
+        """Test each supported operator against the typed columns."""
+        assert _ids(refine(result_set, parse_filter(data))) == expected
+
+    def test_missing_values_do_not_match(self, result_set):
+        """Test that a null score fails comparisons, negated or not."""
+        assert _ids(refine(result_set, parse_filter(["note_quality_score", "Gte", 0.5]))) == ["N1", "N2", "N4"]
+        assert _ids(refine(result_set, parse_filter(["note_quality_score", "Lt", 0.5]))) == []
+
+    def test_no_filter_keeps_everything(self, result_set):
+        """Test that no filter keeps all rows and -k limits them in order."""
+        assert _ids(refine(result_set, None, limit=2)) == ["N1", "N2"]
+
+    def test_mask_length(self, result_set):
+        """Test that evaluation returns one boolean per row."""
+        mask = evaluate(parse_filter(["note_type", "Eq", "Radiology"]), result_set.table)
+        assert mask.to_pylist() == [False, False, False, True]
+
+    def test_unknown_field(self, result_set):
+        """Test that filtering on a field absent from the results fails clearly."""
+        with pytest.raises(FilterEvaluationError, match="cohort_ids"):
+            refine(result_set, parse_filter(["cohort_ids", "Contains", 1]))
+
+    def test_unsupported_operator(self, result_set):
+        """Test that Contains on a scalar column is rejected."""
+        with pytest.raises(FilterEvaluationError, match="Contains"):
+            refine(result_set, parse_filter(["note_type", "Contains", "x"]))
+
+    def test_keeps_extra_fields_from_json(self, result_set):
+        """Test that JSON rows are returned as saved."""
+        row = refine(result_set, parse_filter(["note_id", "Eq", "N1"]))[0]
+        assert row == _rows()[0]
+
+
+class TestLoadResults:
+    """Tests for reading saved result sets."""
+
+    @pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+    def test_columnar(self, tmp_path, fmt):
+        """Test that Parquet and Arrow IPC files load with typed columns."""
+        path = tmp_path / f"results.{fmt}"
+        with open(path, "wb") as sink:
+            write_columnar(_rows(), SEARCH_COLUMNS, fmt, sink)
+
+        result_set = load_results(str(path))
+        assert len(result_set) == 4
+        rows = refine(result_set, parse_filter(["note_date", "Gte", "2024-03-01"]))
+        assert _ids(rows) == ["N3", "N4"]
+
+    def test_ndjson_stdin(self):
+        """Test reading NDJSON from stdin."""
+        stdin = io.StringIO("\n".join(json.dumps(row) for row in _rows()))
+        assert len(load_results("-", stdin=stdin)) == 4
+
+    def test_csv_values_are_typed(self, tmp_path):
+        """Test that CSV strings are compared as numbers and dates."""
+        path = tmp_path / "results.csv"
+        path.write_text(
+            "note_id,note_date,note_quality_score\n"
+            "N1,2024-01-05,0.9\n"
+            "N2,2024-02-10,0.10\n"
+        )
+        rows = refine(load_results(str(path)), parse_filter(["note_quality_score", "Gt", 0.5]))
+        assert _ids(rows) == ["N1"]
+        assert rows[0]["note_quality_score"] == 0.9
+
+    def test_unknown_extension(self, tmp_path):
+        """Test that an unrecognized extension asks for --input-format."""
+        with pytest.raises(ValueError, match="--input-format"):
+            load_results(str(tmp_path / "results.txt"))
+
+
+class TestRunRefine:
+    """Tests for the refine command."""
+
+    def test_flags_and_filters(self, saved_json, capsys):
+        """Test that CLI flags and --filters combine into one filter."""
+        args = create_parser().parse_args([
+            "refine", str(saved_json), "-o", "json",
+            "--note-types", "Progress Note,Discharge Summary",
+            "--min-chunk-quality-score", "0.5",
+            "--filters", '["note_date", "Gte", "2024-02-01"]',
+        ])
+        run_refine(args)
+
+        output = json.loads(capsys.readouterr().out)
+        assert _ids(output["results"]) == ["N2", "N3"]
+        assert output["metadata"]["total_results"] == 2
+        assert output["metadata"]["refined_from"] == 4
+
+    def test_ndjson_output(self, saved_json, capsys):
+        """Test streaming refined results as NDJSON."""
+        args = create_parser().parse_args([
+            "refine", str(saved_json), "-o", "ndjson", "--date-to", "2024-01-31",
+        ])
+        run_refine(args)
+
+        lines = capsys.readouterr().out.splitlines()
+        assert [json.loads(line)["note_id"] for line in lines] == ["N1"]
+
+    def test_invalid_filters(self, saved_json):
+        """Test that malformed --filters exit with an error."""
+        args = create_parser().parse_args(["refine", str(saved_json), "--filters", '["x"]'])
+        with pytest.raises(SystemExit) as exc_info:
+            run_refine(args)
+        assert exc_info.value.code == 1
+
+    def test_missing_file(self, tmp_path):
+        """Test that an unreadable input exits with an error."""
+        args = create_parser().parse_args(["refine", str(tmp_path / "missing.json")])
+        with pytest.raises(SystemExit) as exc_info:
+            run_refine(args)
+        assert exc_info.value.code == 1
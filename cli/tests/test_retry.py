@@ -0,0 +1,180 @@
+"""Tests for retry policy and rate limiting."""
+
+import httpx
+import pytest
+from httpx import Response
+
+from trioexplorer.async_client import AsyncSearchClient
+from trioexplorer.client import SearchClient
+from trioexplorer.retry import RetryPolicy, TokenBucket, parse_retry_after
+
+
+def _status_error(status_code, headers=None):
+    """Build an HTTPStatusError with the given status code."""
+    request = httpx.Request("GET", "http://localhost:8001/search")
+    response = httpx.Response(status_code, headers=headers, request=request)
+    return httpx.HTTPStatusError("error", request=request, response=response)
+
+
+class TestParseRetryAfter:
+    """Tests for Retry-After header parsing."""
+
+    def test_seconds(self):
+        """Test delay-seconds values."""
+        assert parse_retry_after("5") == 5.0
+
+    def test_http_date(self):
+        """Test HTTP-date values relative to now."""
+        delay = parse_retry_after("Wed, 21 Oct 2015 07:28:10 GMT", now=1445412480.0)
+        assert delay == pytest.approx(10.0)
+
+    def test_invalid(self):
+        """Test that garbage and missing values are ignored."""
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("soon") is None
+
+
+class TestRetryPolicy:
+    """Tests for retry decisions and backoff."""
+
+    def test_retries_transient_get(self):
+        """Test that 429/5xx and timeouts are retried for GET."""
+        policy = RetryPolicy(jitter=False)
+        assert policy.next_delay("GET", 0, _status_error(503)) == 0.5
+        assert policy.next_delay("GET", 0, httpx.ReadTimeout("t")) == 0.5
+
+    def test_client_errors_not_retried(self):
+        """Test that 4xx other than 429 are not retried."""
+        policy = RetryPolicy()
+        assert policy.next_delay("GET", 0, _status_error(404)) is None
+        assert policy.next_delay("GET", 0, _status_error(401)) is None
+
+    def test_post_not_retried_by_default(self):
+        """Test that POST (e.g. /judgement-lists) is not retried after sending."""
+        policy = RetryPolicy()
+        assert policy.next_delay("POST", 0, _status_error(503)) is None
+        assert policy.next_delay("POST", 0, httpx.ReadTimeout("t")) is None
+
+    def test_post_retried_when_never_sent(self):
+        """Test that connection failures are retried for any method."""
+        policy = RetryPolicy(jitter=False)
+        assert policy.next_delay("POST", 0, httpx.ConnectError("refused")) == 0.5
+
+    def test_post_retried_after_429(self):
+        """Test that a rate-limited POST is retried, honoring Retry-After."""
+        policy = RetryPolicy(jitter=False)
+        assert policy.next_delay("POST", 0, _status_error(429)) == 0.5
+        assert policy.next_delay("POST", 0, _status_error(429, headers={"Retry-After": "3"})) == 3.0
+
+    def test_post_opt_in(self):
+        """Test retrying non-idempotent requests when enabled."""
+        policy = RetryPolicy(jitter=False, retry_non_idempotent=True)
+        assert policy.next_delay("POST", 0, _status_error(503)) == 0.5
+
+    def test_exponential_backoff_capped(self):
+        """Test exponential growth and the delay cap."""
+        policy = RetryPolicy(jitter=False, max_retries=10, base_delay=1, max_delay=5)
+        delays = [policy.next_delay("GET", n, _status_error(500)) for n in range(5)]
+        assert delays == [1, 2, 4, 5, 5]
+
+    def test_jitter(self):
+        """Test that jitter scales the delay."""
+        policy = RetryPolicy(random_func=lambda: 0.25)
+        assert policy.backoff(2) == pytest.approx(0.5)
+
+    def test_gives_up_after_max_retries(self):
+        """Test that retries stop after max_retries."""
+        policy = RetryPolicy(max_retries=2)
+        assert policy.next_delay("GET", 2, _status_error(500)) is None
+
+    def test_honors_retry_after(self):
+        """Test that Retry-After overrides computed backoff."""
+        policy = RetryPolicy()
+        error = _status_error(429, headers={"Retry-After": "7"})
+        assert policy.next_delay("GET", 0, error) == 7.0
+
+    def test_retry_after_too_long(self):
+        """Test giving up when the server asks for an excessive wait."""
+        policy = RetryPolicy(max_retry_after=10)
+        error = _status_error(429, headers={"Retry-After": "3600"})
+        assert policy.next_delay("GET", 0, error) is None
+
+
+class TestTokenBucket:
+    """Tests for the token-bucket rate limiter."""
+
+    def test_burst_then_wait(self):
+        """Test that a full bucket allows a burst, then spaces requests."""
+        now = [0.0]
+        bucket = TokenBucket(rate=2, capacity=2, clock=lambda: now[0])
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == pytest.approx(0.5)
+        assert bucket.reserve() == pytest.approx(1.0)
+
+    def test_refill(self):
+        """Test that tokens refill over time up to capacity."""
+        now = [0.0]
+        bucket = TokenBucket(rate=1, capacity=1, clock=lambda: now[0])
+        bucket.reserve()
+        now[0] = 10.0
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == pytest.approx(1.0)
+
+    def test_invalid_rate(self):
+        """Test that non-positive rates are rejected."""
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0)
+
+
+class TestClientRetries:
+    """Tests for retries in the sync and async clients."""
+
+    def test_sync_retries_then_succeeds(self, mock_api, env_with_api_key):
+        """Test that a transient 503 is retried transparently."""
+        route = mock_api.get("/search").mock(
+            side_effect=[
+                Response(503, json={"detail": "busy"}),
+                Response(429, headers={"Retry-After": "0"}),
+                Response(200, json={"results": []}),
+            ]
+        )
+
+        client = SearchClient(retry_policy=RetryPolicy(base_delay=0))
+        assert client.get("/search", params={"query": "q"}) == {"results": []}
+        assert route.call_count == 3
+
+    def test_sync_exhausted_exits(self, mock_api, env_with_api_key):
+        """Test that the client still exits once retries are exhausted."""
+        route = mock_api.get("/search").mock(
+            return_value=Response(500, json={"detail": "boom"})
+        )
+
+        client = SearchClient(retry_policy=RetryPolicy(max_retries=2, base_delay=0))
+        with pytest.raises(SystemExit):
+            client.get("/search", params={"query": "q"})
+        assert route.call_count == 3
+
+    def test_sync_post_not_retried(self, mock_api, env_with_api_key):
+        """Test that POST /judgement-lists is attempted once."""
+        route = mock_api.post("/judgement-lists").mock(
+            return_value=Response(503, json={"detail": "busy"})
+        )
+
+        client = SearchClient(retry_policy=RetryPolicy(base_delay=0))
+        with pytest.raises(SystemExit):
+            client.post("/judgement-lists", json_data={"name": "x"})
+        assert route.call_count == 1
+
+    async def test_async_retries_then_succeeds(self, mock_api, env_with_api_key):
+        """Test that the async client retries transient failures."""
+        route = mock_api.get("/search").mock(
+            side_effect=[
+                httpx.ReadTimeout("slow"),
+                Response(200, json={"results": []}),
+            ]
+        )
+
+        async with AsyncSearchClient(retry_policy=RetryPolicy(base_delay=0)) as client:
+            assert await client.get("/search", params={"query": "q"}) == {"results": []}
+        assert route.call_count == 2
@@ -291,3 +291,22 @@ class TestBuildFiltersFromArgs:
         user_filters = ["note_type", "Eq", "Discharge Summary"]
         result = build_filters_from_args(args, user_filters)
         assert result == ["note_type", "Eq", "Discharge Summary"]
+
+    def test_user_filters_are_simplified(self):
+        """Test that nested and redundant user filters are flattened and folded."""
+        args = self._make_args(date_from="2025-01-01")
+        user_filters = ["And", [
+            ["note_date", "Gte", "2025-03-01"],
+            ["Or", [["note_type", "Eq", "A"], ["note_type", "Eq", "B"]]],
+        ]]
+        result = build_filters_from_args(args, user_filters)
+        assert result == [
+            "And",
+            [["note_date", "Gte", "2025-03-01"], ["note_type", "In", ["A", "B"]]],
+        ]
+
+    def test_malformed_user_filters(self):
+        """Test that malformed user filters raise ValueError."""
+        args = self._make_args()
+        with pytest.raises(ValueError):
+            build_filters_from_args(args, ["note_type", "Like", "x"])
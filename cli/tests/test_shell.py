@@ -0,0 +1,220 @@
+"""Tests for the interactive shell."""
+
+import io
+import json
+
+import pytest
+from httpx import Response
+
+from trioexplorer.main import create_parser, main
+from trioexplorer.shell import CompletionIndex, Completer, split_partial
+
+FILTER_VALUES = {
+    "namespace": "default",
+    "fields": {
+        "symptoms_present": [
+            {"id": "1", "text_value": "chest pain", "occurrence_count": 40},
+            {"id": "2", "text_value": "Chills", "occurrence_count": 12},
+            {"id": "3", "text_value": "cough", "occurrence_count": 30},
+        ],
+        "medications_present": [
+            {"id": "4", "text_value": "metformin", "occurrence_count": 20},
+        ],
+    },
+    "total_fields": 2,
+    "total_values": 4,
+}
+
+
+@pytest.fixture
+def completion_api(mock_api):
+    routes = {
+        "cohorts": mock_api.get("/cohorts/indexed").mock(return_value=Response(200, json={
+            "items": [{"cohort_id": "cardio-2024"}, {"cohort_id": "cardio-2025"}, {"cohort_id": "renal"}],
+            "total_count": 3,
+        })),
+        "note_types": mock_api.get("/note-types").mock(return_value=Response(200, json={
+            "items": [{"note_type": "Progress Note"}, {"note_type": "Procedure Note"},
+                      {"note_type": "Discharge Summary"}],
+            "total_count": 3,
+        })),
+        "filter_values": mock_api.get("/namespaces/default/filter-values").mock(
+            return_value=Response(200, json=FILTER_VALUES)
+        ),
+    }
+    return routes
+
+
+@pytest.fixture
+def completer(env_with_api_key, completion_api):
+    from trioexplorer.client import create_client
+
+    with create_client(max_retries=0) as client:
+        yield Completer(create_parser(), CompletionIndex(lambda: client))
+
+
+class TestSplitPartial:
+    """Tests for splitting the line being typed."""
+
+    def test_words_and_current(self):
+        """Test that quotes group words and an unclosed quote runs to the end."""
+        assert split_partial('search "chest pain" -k ') == (["search", "chest pain", "-k"], "")
+        assert split_partial("search --note-types 'Progress No") == (
+            ["search", "--note-types"], "Progress No"
+        )
+        assert split_partial("""-e '{"symptoms_present": ["ch""") == (
+            ["-e"], '{"symptoms_present": ["ch'
+        )
+
+
+class TestCompleter:
+    """Tests for completion candidates."""
+
+    def test_commands_and_options(self, completer):
+        """Test command, subcommand, option and choice completion."""
+        assert completer.candidates("se") == ["search"]
+        assert "exit" in completer.candidates("")
+        assert completer.candidates("list no") == ["notetypes"]
+        assert "--cohort-ids" in completer.candidates('search "x" --co')
+        assert completer.candidates('search "x" -t se') == ["semantic"]
+        assert completer.candidates("refine @") == ["@last"]
+
+    def test_index_values(self, completer, completion_api):
+        """Test cohort, note type and filter field values, fetched once."""
+        assert completer.candidates('search "x" -c car') == ["cardio-2024", "cardio-2025"]
+        assert completer.candidates('search "x" -c renal,cardio-2025,car') == [
+            "renal,cardio-2025,cardio-2024", "renal,cardio-2025,cardio-2025",
+        ]
+        assert completer.candidates('search "x" --note-types "Pro') == ["Procedure Note", "Progress Note"]
+        assert completer.candidates("list filters --field med") == ["medications_present"]
+        completer.candidates('search "x" -c ')
+        assert completion_api["cohorts"].call_count == 1
+
+        completer.index.clear()
+        completer.candidates('search "x" -c ')
+        assert completion_api["cohorts"].call_count == 2
+
+    def test_entity_filter_json(self, completer):
+        """Test completion of entity filter keys and values inside JSON."""
+        assert completer.candidates("""search x -e '{"sym""") == ['{"symptoms_present']
+        assert completer.candidates("""search x -e '{"symptoms_present": ["c""") == [
+            '{"symptoms_present": ["Chills',
+            '{"symptoms_present": ["chest pain',
+            '{"symptoms_present": ["cough',
+        ]
+        assert completer.candidates("""search x -e '{"symptoms_present": ["cough", "ch""") == [
+            '{"symptoms_present": ["cough", "Chills',
+            '{"symptoms_present": ["cough", "chest pain',
+        ]
+
+    def test_entity_filter_values_from_local_index(self, completer, completion_api, tmp_path, monkeypatch):
+        """Test that a synced namespace completes every value without a request."""
+        from trioexplorer.filterindex import FilterIndex
+
+        path = tmp_path / "filters.sqlite3"
+        monkeypatch.setenv("TRIOEXPLORER_FILTER_INDEX_FILE", str(path))
+        with FilterIndex(path) as index:
+            index.replace_field("default", {"field_name": "medications_present"}, [
+                {"text_value": "metformin"}, {"text_value": "Metoprolol"}, {"text_value": "insulin"},
+            ])
+            index.mark_synced("default", "http://localhost:8001", "2025-01-01T00:00:00+00:00")
+
+        assert completer.candidates("""search x -e '{"medications_present": ["met""") == [
+            '{"medications_present": ["Metoprolol',
+            '{"medications_present": ["metformin',
+        ]
+        assert completion_api["filter_values"].call_count == 0
+        completer.index.clear()
+
+
+class TestShell:
+    """Tests for running commands in the shell."""
+
+    def _run(self, monkeypatch, lines):
+        monkeypatch.setattr("sys.stdin", io.StringIO("\n".join(lines) + "\n"))
+        monkeypatch.setattr("sys.argv", ["trioexplorer", "shell"])
+        main()
+
+    def test_search_then_refine_last(self, mock_api, env_with_api_key, monkeypatch, capsys,
+                                     sample_search_response):
+        """Test that errors do not end the shell and @last refines the kept results."""
+        route = mock_api.get("/search").mock(return_value=Response(200, json=sample_search_response))
+
+        self._run(monkeypatch, [
+            "refine @last",
+            "search --no-such-option",
+            'search "chest pain" -o ndjson --no-cache',
+            "last",
+            "refine @last --note-types 'Discharge Summary' -o json",
+            "exit",
+            'search "never run"',
+        ])
+
+        captured = capsys.readouterr()
+        assert route.call_count == 1
+        assert "none is kept yet" in captured.err
+        assert "2 results kept for 'chest pain'" in captured.err
+        lines = captured.out.strip().splitlines()
+        assert len(lines) > 2
+        refined = json.loads("\n".join(lines[2:]))
+        assert [r["note_id"] for r in refined["results"]] == ["N11112"]
+        assert refined["metadata"]["refined_from"] == 2
+
+    def test_streamed_search_is_kept(self, mock_api, env_with_api_key, monkeypatch, capsys,
+                                     sample_search_response):
+        """Test that refine @last uses the rows of a --stream search, not older ones."""
+        streamed = {
+            "results": sample_search_response["results"][1:],
+            "metadata": {**sample_search_response["metadata"], "query": "syncope"},
+        }
+        mock_api.get("/search").mock(side_effect=[
+            Response(200, json=sample_search_response),
+            Response(200, json=streamed),
+        ])
+
+        self._run(monkeypatch, [
+            'search "chest pain" -o ndjson --no-cache',
+            "search syncope --stream -o ndjson --no-cache",
+            "last",
+            "refine @last -o json",
+        ])
+
+        captured = capsys.readouterr()
+        assert "1 results kept for 'syncope'" in captured.err
+        lines = captured.out.strip().splitlines()
+        refined = json.loads("\n".join(lines[3:]))
+        assert [r["note_id"] for r in refined["results"]] == ["N11112"]
+
+    def test_client_is_shared(self, mock_api, env_with_api_key, monkeypatch, capsys,
+                              sample_search_response):
+        """Test that every command in the session uses one client."""
+        import trioexplorer.client as client_module
+
+        created = []
+        create_client = client_module.create_client
+
+        def counting_create_client(**kwargs):
+            created.append(kwargs)
+            return create_client(**kwargs)
+
+        monkeypatch.setattr(client_module, "create_client", counting_create_client)
+        mock_api.get("/search").mock(return_value=Response(200, json=sample_search_response))
+
+        self._run(monkeypatch, ['search "a" -o json --no-cache', 'search "b" -o json --no-cache'])
+
+        assert len(created) == 1
+
+    def test_cache_options_per_command(self, mock_api, env_with_api_key, monkeypatch, capsys,
+                                       sample_search_response):
+        """Test that the shared client follows each command's --no-cache."""
+        route = mock_api.get("/search").mock(return_value=Response(200, json=sample_search_response))
+
+        self._run(monkeypatch, [
+            'search "a" -o json --no-cache',
+            'search "a" -o json',
+            'search "a" -o json --no-cache',
+            'search "a" -o json',
+        ])
+
+        # Only the last search is served from the cache the second one filled
+        assert route.call_count == 3
@@ -0,0 +1,84 @@
+"""Startup regression tests for the Trioexplorer CLI.
+
+These run the CLI in a fresh interpreter, since import state in the test
+process is already warm.
+"""
+
+import json
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+# Cumulative import budget for trioexplorer.main, in microseconds
+IMPORT_BUDGET_US = int(os.environ.get("TRIOEXPLORER_IMPORT_BUDGET_US", "100000"))
+
+# Modules that must only be imported by commands that need them
+HEAVY_MODULES = ["httpx", "asyncio", "sqlite3", "dotenv", "rich"]
+
+
+def run_python(code: str, *args: str) -> subprocess.CompletedProcess:
+    """Run code in a fresh interpreter with API config removed."""
+    env = {k: v for k, v in os.environ.items() if not k.startswith("TRIOEXPLORER_")}
+    return subprocess.run(
+        [sys.executable, *args, "-c", code],
+        capture_output=True,
+        text=True,
+        env=env,
+        timeout=60,
+    )
+
+
+def loaded_heavy_modules(argv: list[str]) -> list[str]:
+    """Run main() with argv and return the heavy modules it imported."""
+    code = f"""
+import json, sys
+sys.argv = ["trioexplorer", *{argv!r}]
+from trioexplorer.main import main
+try:
+    main()
+except SystemExit:
+    pass
+print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]), file=sys.stderr)
+"""
+    result = run_python(code)
+    return json.loads(result.stderr.strip().splitlines()[-1])
+
+
+class TestImportTime:
+    """Tests for the cost of importing the CLI."""
+
+    def test_main_import_within_budget(self):
+        """Test that importing trioexplorer.main stays within the budget."""
+        result = run_python("import trioexplorer.main", "-X", "importtime")
+        match = re.search(r"\|\s*(\d+)\s*\|\s*trioexplorer\.main$", result.stderr, re.MULTILINE)
+        assert match, result.stderr
+        assert int(match.group(1)) < IMPORT_BUDGET_US
+
+    def test_main_import_skips_heavy_modules(self):
+        """Test that importing the CLI does not import heavy dependencies."""
+        code = (
+            "import json, sys, trioexplorer.main; "
+            f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+        )
+        result = run_python(code)
+        assert json.loads(result.stdout) == []
+
+
+class TestLazyCommands:
+    """Tests that light commands do not load the HTTP stack."""
+
+    @pytest.mark.parametrize("argv", [["--version"], ["--help"], []])
+    def test_meta_commands(self, argv):
+        """Test that --version and --help import no heavy modules."""
+        assert loaded_heavy_modules(argv) == []
+
+    def test_list_entities_json(self):
+        """Test that static JSON output needs neither the client nor rich."""
+        assert loaded_heavy_modules(["list", "entities", "-o", "json"]) == []
+
+    def test_list_entities_table_loads_rich_only(self):
+        """Test that table output loads rich but not the HTTP stack."""
+        assert loaded_heavy_modules(["list", "entities"]) == ["rich"]
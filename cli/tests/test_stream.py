@@ -0,0 +1,148 @@
+"""Tests for incremental JSON decoding of streamed responses."""
+
+import json
+import random
+
+import pytest
+from httpx import Response
+
+from trioexplorer.client import create_client
+from trioexplorer.stream import (
+    StreamDecodeError,
+    StreamedResponse,
+    StreamingJSONDecoder,
+)
+
+
+def _chunked(raw: bytes, size: int):
+    """Split bytes into fixed-size chunks."""
+    return [raw[i:i + size] for i in range(0, len(raw), size)]
+
+
+class TestStreamingJSONDecoder:
+    """Tests for the push decoder."""
+
+    def test_yields_items_incrementally(self):
+        """Test that elements are emitted as soon as they are complete."""
+        decoder = StreamingJSONDecoder()
+        assert decoder.feed('{"results": [{"a": 1}, {"a"') == [{"a": 1}]
+        assert decoder.feed(': 2}]') == [{"a": 2}]
+        assert decoder.feed(', "metadata": {"total_results": 2}}') == []
+        decoder.close()
+        assert decoder.members == {"metadata": {"total_results": 2}}
+
+    def test_tricky_strings(self):
+        """Test strings containing brackets, quotes and escapes."""
+        doc = {"results": [{"t": 'a "quoted" ] } [ { , \\\\ value'}, "x]"], "metadata": {}}
+        raw = json.dumps(doc).encode()
+        assert list(StreamedResponse(_chunked(raw, 1))) == doc["results"]
+
+    def test_random_chunking(self, sample_search_response):
+        """Test that any chunk boundaries decode identically."""
+        raw = json.dumps(sample_search_response, indent=2).encode()
+        rng = random.Random(7)
+        for _ in range(50):
+            cuts = sorted(rng.sample(range(1, len(raw)), 20))
+            chunks = [raw[i:j] for i, j in zip([0] + cuts, cuts + [len(raw)])]
+            stream = StreamedResponse(chunks)
+            assert list(stream) == sample_search_response["results"]
+            assert stream.metadata == sample_search_response["metadata"]
+
+    def test_element_larger_than_many_chunks(self):
+        """Test that a large element is scanned once, not once per chunk."""
+        text = 'x "y" \\ [{' * 100_000
+        raw = json.dumps({"results": [{"text_full": text}, 7], "metadata": {}}).encode()
+        assert list(StreamedResponse(_chunked(raw, 64))) == [{"text_full": text}, 7]
+
+    def test_multibyte_utf8_split(self):
+        """Test that UTF-8 sequences split across chunks decode correctly."""
+        raw = json.dumps({"results": ["naïve café ✓"]}, ensure_ascii=False).encode()
+        assert list(StreamedResponse(_chunked(raw, 1))) == ["naïve café ✓"]
+
+    def test_metadata_before_results(self):
+        """Test members appearing before the streamed array."""
+        raw = b'{"metadata": {"k": 1}, "results": [1, 2, 3]}'
+        stream = StreamedResponse(_chunked(raw, 4))
+        assert list(stream) == [1, 2, 3]
+        assert stream.metadata == {"k": 1}
+
+    def test_truncated_body(self):
+        """Test that a truncated body raises."""
+        with pytest.raises(StreamDecodeError):
+            list(StreamedResponse([b'{"results": [{"a": 1}, {"a":']))
+
+    def test_not_an_object(self):
+        """Test that non-object bodies are rejected."""
+        with pytest.raises(StreamDecodeError):
+            list(StreamedResponse([b"[1, 2]"]))
+
+
+class TestStreamGet:
+    """Tests for SearchClient.stream_get."""
+
+    def test_stream_search(self, mock_api, sample_search_response, env_with_api_key):
+        """Test streaming results from the client."""
+        mock_api.get("/search").mock(
+            return_value=Response(200, json=sample_search_response)
+        )
+
+        client = create_client()
+        with client.stream_get("/search", params={"query": "chest pain"}) as stream:
+            results = list(stream)
+
+        assert results == sample_search_response["results"]
+        assert stream.metadata["total_results"] == 2
+
+    def test_stream_error_exits(self, mock_api, env_with_api_key):
+        """Test that HTTP errors still produce a clean exit."""
+        mock_api.get("/search").mock(
+            return_value=Response(404, json={"detail": "Cohort not found"})
+        )
+
+        client = create_client()
+        with pytest.raises(SystemExit):
+            with client.stream_get("/search", params={"query": "x"}):
+                pass
+
+    def test_streamed_csv_output(self, mock_api, sample_search_response, env_with_api_key, capsys):
+        """Test that streamed results feed the CSV writer."""
+        from trioexplorer.output import output_search_csv
+
+        mock_api.get("/search").mock(
+            return_value=Response(200, json=sample_search_response)
+        )
+
+        client = create_client()
+        with client.stream_get("/search", params={"query": "chest pain"}) as stream:
+            output_search_csv(stream)
+
+        lines = capsys.readouterr().out.strip().split("\n")
+        assert len(lines) == 3
+        assert "P12345" in lines[1]
+
+    def test_streamed_table_is_printed_in_batches(self, monkeypatch):
+        """Test that a streamed table is rendered every STREAM_TABLE_ROWS rows."""
+        from rich.table import Table
+
+        from trioexplorer import output
+
+        printed = []
+        consumed = []
+
+        class FakeConsole:
+            def print(self, *objects, **kwargs):
+                printed.append((objects[0] if objects else None, len(consumed)))
+
+        def rows():
+            for i in range(output.STREAM_TABLE_ROWS * 2 + 20):
+                consumed.append(i)
+                yield {"note_id": f"N{i}", "score": 0.5}
+
+        monkeypatch.setattr(output, "console", FakeConsole())
+        output.output_search_table(rows(), lambda: {"total_results": len(consumed)})
+
+        tables = [(obj, seen) for obj, seen in printed if isinstance(obj, Table)]
+        assert [table.row_count for table, _ in tables] == [50, 50, 20]
+        assert tables[0][1] == 50
+        assert [table.show_header for table, _ in tables] == [True, False, False]
+        assert "Search Results (120 results)" in printed[3][0]
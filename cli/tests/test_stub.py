@@ -0,0 +1,151 @@
+"""Tests for the local stub Search API server."""
+
+import json
+
+import pytest
+
+from trioexplorer.async_client import create_async_client
+from trioexplorer.bench import run_benchmark
+from trioexplorer.client import create_client
+from trioexplorer.errors import APIStatusError
+from trioexplorer.stub import (
+    StubAPI,
+    StubConfig,
+    check_schema,
+    load_spec,
+    parse_latency,
+    running_stub_server,
+)
+
+SPEC = load_spec()
+
+
+def _operations():
+    for path, operations in SPEC["paths"].items():
+        for method, operation in operations.items():
+            yield method.upper(), path, operation
+
+
+class TestParseLatency:
+    """Tests for latency model specifications."""
+
+    def test_models(self):
+        """Test that each model samples non-negative delays."""
+        import random
+
+        rng = random.Random(1)
+        assert parse_latency("25")(rng) == 25
+        assert parse_latency("fixed:5")(rng) == 5
+        assert 10 <= parse_latency("uniform:10:20")(rng) <= 20
+        assert parse_latency("normal:0:100")(rng) >= 0
+        assert parse_latency("lognormal:20:0.5")(rng) > 0
+        assert parse_latency("exponential:10")(rng) >= 0
+
+    @pytest.mark.parametrize("spec", ["slow", "uniform:1", "lognormal:0:1", "pareto:1:2"])
+    def test_invalid(self, spec):
+        """Test that malformed models are rejected."""
+        with pytest.raises(ValueError):
+            parse_latency(spec)
+
+
+class TestStubAPI:
+    """Tests for request routing and synthetic data."""
+
+    @pytest.mark.parametrize(
+        "method, path, operation", list(_operations()), ids=lambda v: v if isinstance(v, str) else ""
+    )
+    def test_every_path_is_schema_valid(self, method, path, operation):
+        """Test that every operation in the spec answers with schema-valid data."""
+        api = StubAPI(SPEC)
+        params = {
+            p["name"]: "3" for p in operation.get("parameters", [])
+            if p.get("in") == "query" and p.get("required")
+        }
+        status, body, content_type = api.handle(method, path.replace("{", "x").replace("}", ""), params)
+
+        assert 200 <= status < 300
+        schema = operation["responses"][str(status)].get("content", {}).get("application/json", {}).get("schema")
+        if schema and body and content_type == "application/json":
+            check_schema(SPEC, json.loads(body), schema)
+
+    def test_search_sized_by_k(self):
+        """Test that /search returns k ranked results."""
+        api = StubAPI(SPEC, StubConfig(text_bytes=500))
+        status, body, _ = api.handle("GET", "/search", {"query": "x", "k": "42"})
+        data = json.loads(body)
+
+        assert status == 200
+        assert len(data["results"]) == 42
+        scores = [r["score"] for r in data["results"]]
+        assert scores == sorted(scores, reverse=True)
+        assert len(data["results"][0]["text_full"]) == 500
+        assert data["metadata"]["query"] == "x"
+
+    def test_list_sized_by_limit(self):
+        """Test that list endpoints honor limit."""
+        status, body, _ = StubAPI(SPEC).handle("GET", "/note-types", {"limit": "17"})
+        assert len(json.loads(body)["items"]) == 17
+
+    @pytest.mark.parametrize("params", [{}, {"query": "x", "k": "301"}, {"query": "x", "k": "ten"}])
+    def test_validation(self, params):
+        """Test that missing and out-of-range parameters answer 422."""
+        status, body, _ = StubAPI(SPEC).handle("GET", "/search", params)
+        assert status == 422
+        assert json.loads(body)["detail"][0]["loc"][0] == "query"
+
+    def test_unknown_path_and_method(self):
+        """Test 404 and 405 answers."""
+        api = StubAPI(SPEC)
+        assert api.handle("GET", "/nope", {})[0] == 404
+        assert api.handle("DELETE", "/search", {})[0] == 405
+
+    def test_error_injection(self):
+        """Test that injected errors use the configured status codes."""
+        api = StubAPI(SPEC, StubConfig(error_rate=1.0, error_statuses=(429,)))
+        assert api.handle("GET", "/health", {})[0] == 429
+
+    def test_seeded_data_is_repeatable(self):
+        """Test that the same seed produces the same data."""
+        a = StubAPI(SPEC, StubConfig(seed=3)).handle("GET", "/search", {"query": "x"})
+        b = StubAPI(SPEC, StubConfig(seed=3)).handle("GET", "/search", {"query": "x"})
+        assert a == b
+
+
+class TestStubServer:
+    """Tests against the server over real sockets."""
+
+    def test_sync_client_reuses_connection(self, env_with_api_key):
+        """Test that the pooled client keeps one connection for many requests."""
+        with running_stub_server() as server:
+            client = create_client(base_url=server.url, max_retries=0)
+            try:
+                for _ in range(5):
+                    response = client.get("/search", params={"query": "x", "k": 7})
+                    assert len(response["results"]) == 7
+                stats = client.get("/search-history/stats/summary")
+                assert "total_searches" in stats
+            finally:
+                client.close()
+            assert server.connections == 1
+
+    async def test_injected_errors_reach_the_client(self, env_with_api_key):
+        """Test that injected errors surface as APIStatusError."""
+        with running_stub_server(StubConfig(error_rate=1.0, error_statuses=(503,))) as server:
+            async with create_async_client(base_url=server.url, max_retries=0) as client:
+                with pytest.raises(APIStatusError) as exc_info:
+                    await client.get("/health")
+        assert exc_info.value.status_code == 503
+
+    async def test_bench_against_stub(self, env_with_api_key):
+        """Test a closed-loop benchmark over real connections."""
+        config = StubConfig(latency=parse_latency("fixed:2"))
+        with running_stub_server(config) as server:
+            async with create_async_client(base_url=server.url, max_concurrency=4, max_retries=0) as client:
+                report = await run_benchmark(
+                    client, [{"query": "x", "k": 10}], workers=4, total=40,
+                )
+
+        assert report["errors"] == 0
+        assert report["latency_ms"]["count"] == 40
+        assert report["latency_ms"]["p50"] >= 2.0
+        assert report["peak_in_flight"] <= 4
@@ -0,0 +1,128 @@
+"""Tests for per-phase request timings."""
+
+import json
+
+import pytest
+
+from trioexplorer import timings
+from trioexplorer.async_client import create_async_client
+from trioexplorer.client import create_client
+from trioexplorer.errors import APIStatusError
+from trioexplorer.main import main
+from trioexplorer.stub import StubConfig, parse_latency, running_stub_server
+
+
+@pytest.fixture(autouse=True)
+def no_timings():
+    """Make sure collected timings do not leak between tests."""
+    yield
+    timings._timings = None
+
+
+class TestRequestTrace:
+    """Tests for phases derived from httpcore trace events."""
+
+    def test_sync_phases_and_connection_reuse(self, env_with_api_key):
+        """Test that only the first request on a pooled connection pays connect."""
+        collected = timings.start_timings()
+        with running_stub_server(StubConfig(latency=parse_latency("fixed:20"))) as server:
+            with create_client(base_url=server.url, max_retries=0) as client:
+                client.get("/search", params={"query": "x"})
+                client.get("/search", params={"query": "y"})
+
+        first, second = collected.requests
+        assert first.span.attributes["status"] == 200
+        assert first.span.attributes["bytes"] > 0
+        assert {"connect", "send", "ttfb", "download", "decode"} <= set(first.phases)
+        assert "connect" not in second.phases
+        assert "tls" not in first.phases
+        assert first.phases["ttfb"] >= 20
+        assert sum(first.phases.values()) <= first.span.duration_ms
+
+    async def test_async_client(self, env_with_api_key):
+        """Test that the async client installs an awaitable trace callback."""
+        collected = timings.start_timings()
+        with running_stub_server() as server:
+            async with create_async_client(base_url=server.url, max_retries=0) as client:
+                await client.get("/search", params={"query": "x"})
+
+        (trace,) = collected.requests
+        assert {"connect", "ttfb", "download", "decode"} <= set(trace.phases)
+
+    async def test_error_is_recorded(self, env_with_api_key):
+        """Test that a failed request closes its span with the error."""
+        collected = timings.start_timings()
+        with running_stub_server(StubConfig(error_rate=1.0, error_statuses=(503,))) as server:
+            async with create_async_client(base_url=server.url, max_retries=0) as client:
+                with pytest.raises(APIStatusError):
+                    await client.get("/health")
+
+        (trace,) = collected.requests
+        assert trace.span.attributes["error"] == "HTTPStatusError"
+        assert trace.span.end is not None
+
+    def test_disabled_is_a_no_op(self):
+        """Test that request_trace does nothing when timings are off."""
+        trace = timings.request_trace("GET", "http://x/search")
+        assert trace is timings.NULL_TRACE
+        assert trace.extensions == {}
+        with trace.phase("decode"):
+            pass
+
+
+class TestTimed:
+    """Tests for render spans."""
+
+    def test_nested_calls_are_timed_once(self):
+        """Test that a writer calling another writer yields one render span."""
+        @timings.timed("render")
+        def inner():
+            pass
+
+        @timings.timed("render")
+        def outer():
+            inner()
+
+        collected = timings.start_timings()
+        outer()
+        timings.stop_timings()
+
+        render = [span for span in collected.spans if span.name == "render"]
+        assert len(render) == 1
+        assert render[0].attributes == {"function": "outer"}
+        assert render[0].parent is collected.root
+
+
+class TestGlobalOptions:
+    """Tests for --timings / --timings-export on the command line."""
+
+    def test_export_span_tree(self, env_with_api_key, tmp_path, monkeypatch, capsys):
+        """Test that exported spans link requests and phases to the run."""
+        path = tmp_path / "spans.jsonl"
+        with running_stub_server() as server:
+            monkeypatch.setattr("sys.argv", [
+                "trioexplorer", "--api-url", server.url, "--timings", "--timings-export", str(path),
+                "search", "chest pain", "-o", "json", "--no-cache",
+            ])
+            main()
+
+        records = [json.loads(line) for line in path.read_text().splitlines()]
+        by_id = {record["span_id"]: record for record in records}
+        root, request = records[0], by_id[records[1]["span_id"]]
+        assert root["name"] == "trioexplorer search"
+        assert root["parent_span_id"] is None
+        assert request["name"] == "GET /search"
+        assert request["parent_span_id"] == root["span_id"]
+        assert len({record["trace_id"] for record in records}) == 1
+
+        phases = {r["name"] for r in records if r["parent_span_id"] == request["span_id"]}
+        assert {"connect", "ttfb", "decode"} <= phases
+        render = [r for r in records if r["name"] == "render"]
+        assert render[0]["attributes"]["function"] == "output_json"
+        for record in records:
+            assert record["end_time_unix_nano"] >= record["start_time_unix_nano"]
+
+        captured = capsys.readouterr()
+        assert json.loads(captured.out)["results"]
+        assert "Timings (ms)" in captured.err
+        assert "ttfb" in captured.err
@@ -0,0 +1,210 @@
+"""Tests for entity filter checking."""
+
+import io
+import json
+
+import pytest
+from httpx import Response
+
+from trioexplorer.async_client import create_async_client
+from trioexplorer.commands.batch import execute_batch, read_batch_records
+from trioexplorer.main import create_parser, main
+from trioexplorer.vocabulary import (
+    TrigramIndex,
+    Vocabulary,
+    check_entity_filters,
+    entity_namespace,
+    trigrams,
+    unresolved,
+)
+
+FILTER_VALUES = {
+    "namespace": "default",
+    "fields": {
+        "medications_present": [
+            {"id": "1", "text_value": "metformin", "occurrence_count": 1234},
+            {"id": "2", "text_value": "metoprolol", "occurrence_count": 567},
+            {"id": "3", "text_value": "Insulin", "occurrence_count": 890},
+        ],
+        "symptoms_present": [
+            {"id": "4", "text_value": "chest pain", "occurrence_count": 40},
+            {"id": "5", "text_value": "cough", "occurrence_count": 30},
+        ],
+    },
+    "total_fields": 2,
+    "total_values": 5,
+}
+
+
+@pytest.fixture
+def vocabulary():
+    return Vocabulary.from_response("default", FILTER_VALUES)
+
+
+@pytest.fixture
+def vocabulary_api(mock_api, tmp_path, monkeypatch):
+    monkeypatch.setenv("TRIOEXPLORER_FILTER_INDEX_FILE", str(tmp_path / "filters.sqlite3"))
+    return mock_api.get("/namespaces/default/filter-values").mock(
+        return_value=Response(200, json=FILTER_VALUES)
+    )
+
+
+class TestTrigramIndex:
+    """Tests for fuzzy lookups."""
+
+    def test_trigrams_are_padded_per_word(self):
+        """Test pg_trgm-style trigrams."""
+        assert trigrams("Cat") == {"  c", " ca", "cat", "at "}
+        assert trigrams("a b") == {"  a", " a ", "  b", " b "}
+
+    def test_suggest_ranks_by_similarity_then_count(self):
+        """Test that a transposition finds the intended value first."""
+        index = TrigramIndex({"metformin": 1234, "metoprolol": 567, "insulin": 890})
+
+        suggestions = index.suggest("metfromin")
+
+        assert suggestions[0][:2] == ("metformin", 1234)
+        assert 0.4 < suggestions[0][2] < 1
+        assert index.suggest("zzz") == []
+        assert TrigramIndex({"ab": 1, "AB": 9}).suggest("ab")[0][:2] == ("AB", 9)
+
+
+class TestCheckEntityFilters:
+    """Tests for checking and correcting entity filters."""
+
+    def test_known_values_ignore_case(self, vocabulary):
+        """Test that known values raise no issue."""
+        filters = {"medications_present": ["METFORMIN", "insulin"], "symptoms_present": "cough"}
+
+        assert check_entity_filters(filters, vocabulary) == (filters, [])
+
+    def test_unknown_value_gets_suggestions(self, vocabulary):
+        """Test that a typo is reported with suggestions and left alone."""
+        filters, issues = check_entity_filters({"medications_present": ["metfromin"]}, vocabulary)
+
+        assert filters == {"medications_present": ["metfromin"]}
+        assert len(issues) == 1
+        assert issues[0].suggestions[0][:2] == ("metformin", 1234)
+        assert "did you mean 'metformin' (1,234)" in issues[0].describe()
+        assert unresolved(issues) == issues
+
+    def test_correct_values_and_fields(self, vocabulary):
+        """Test that fix replaces misspelled fields and values."""
+        filters, issues = check_entity_filters(
+            {"medication_present": ["metfromin", "unheard-of"]}, vocabulary, correct=True
+        )
+
+        assert filters == {"medications_present": ["metformin", "unheard-of"]}
+        assert [issue.correction for issue in issues] == ["medications_present", "metformin", None]
+        assert [issue.value for issue in unresolved(issues)] == ["unheard-of"]
+
+    def test_truncated_fields_are_unverified(self):
+        """Test that values of a field at the request limit are not rejected."""
+        vocabulary = Vocabulary.from_response("default", FILTER_VALUES, limit=3)
+
+        filters, issues = check_entity_filters(
+            {"medications_present": ["metfromin"], "symptoms_present": ["coughh"]}, vocabulary, correct=True
+        )
+
+        assert filters == {"medications_present": ["metfromin"], "symptoms_present": ["cough"]}
+        assert issues[0].unverified
+        assert "filters sync" in issues[0].describe()
+        assert unresolved(issues) == []
+
+    def test_other_shapes_pass_through(self, vocabulary):
+        """Test that non-string values and empty vocabularies are not checked."""
+        filters = {"medication": {"present": True}}
+
+        assert check_entity_filters(filters, vocabulary)[0] == filters
+        assert check_entity_filters({"x": ["y"]}, Vocabulary("default", {})) == ({"x": ["y"]}, [])
+
+    def test_entity_namespace(self):
+        """Test the namespace of a single cohort, an explicit one and the default."""
+        assert entity_namespace("c1") == "v2-cohort-c1-arctic"
+        assert entity_namespace("c1,c2") == "default"
+        assert entity_namespace(None, "ns") == "ns"
+
+
+class TestSearchCheck:
+    """Tests for search --check-entities."""
+
+    def _run(self, monkeypatch, *argv):
+        monkeypatch.setattr("sys.argv", ["trioexplorer", "search", "x", "-o", "json", "--no-cache", *argv])
+        main()
+
+    def test_warn_searches_anyway(self, mock_api, env_with_api_key, vocabulary_api, monkeypatch, capsys,
+                                  sample_search_response):
+        """Test that warn reports the typo and still searches."""
+        route = mock_api.get("/search").mock(return_value=Response(200, json=sample_search_response))
+
+        self._run(monkeypatch, "-e", '{"medications_present": ["metfromin"]}', "--check-entities", "warn")
+
+        assert "did you mean 'metformin'" in capsys.readouterr().err
+        assert route.call_count == 1
+
+    def test_strict_does_not_search(self, mock_api, env_with_api_key, vocabulary_api, monkeypatch, capsys):
+        """Test that strict exits before the search request."""
+        route = mock_api.get("/search").mock(return_value=Response(200, json={}))
+
+        with pytest.raises(SystemExit) as exc_info:
+            self._run(monkeypatch, "-e", '{"medications_present": ["metfromin"]}', "--check-entities", "strict")
+
+        assert exc_info.value.code == 1
+        assert "Not searching" in capsys.readouterr().err
+        assert route.call_count == 0
+
+    def test_fix_searches_corrected_values(self, mock_api, env_with_api_key, vocabulary_api, monkeypatch,
+                                           capsys, sample_search_response):
+        """Test that fix sends the corrected entity filters."""
+        route = mock_api.get("/search").mock(return_value=Response(200, json=sample_search_response))
+
+        self._run(monkeypatch, "-e", '{"medications_present": ["metfromin"]}', "--check-entities", "fix")
+
+        sent = json.loads(route.calls[0].request.url.params["entity-filters"])
+        assert sent == {"medications_present": ["metformin"]}
+        assert "corrected to 'metformin'" in capsys.readouterr().err
+
+    def test_local_index_and_filter_namespace(self, mock_api, env_with_api_key, vocabulary_api, tmp_path,
+                                              monkeypatch, capsys):
+        """Test that a synced namespace is checked without a request."""
+        from trioexplorer.filterindex import FilterIndex
+
+        with FilterIndex(tmp_path / "filters.sqlite3") as index:
+            index.replace_field("cardio", {"field_name": "medications_present"}, [{"text_value": "metformin"}])
+            index.mark_synced("cardio", "http://localhost:8001", "2025-01-01T00:00:00+00:00")
+        route = mock_api.get("/search").mock(return_value=Response(200, json={}))
+
+        with pytest.raises(SystemExit):
+            self._run(monkeypatch, "-e", '{"medications_present": ["metfromin"]}',
+                      "--check-entities", "strict", "--filter-namespace", "cardio")
+
+        assert vocabulary_api.call_count == 0
+        assert route.call_count == 0
+
+
+class TestBatchCheck:
+    """Tests for batch-search --check-entities."""
+
+    async def test_fix_and_refuse_per_query(self, mock_api, env_with_api_key, vocabulary_api):
+        """Test that each query is corrected or refused on its own, with one vocabulary fetch."""
+        route = mock_api.get("/search").mock(return_value=Response(200, json={"results": [], "metadata": {}}))
+        lines = [
+            '{"query": "a", "entity_filters": {"medications_present": ["metfromin"]}}',
+            '{"query": "b", "entity_filters": {"medications_present": ["unheard-of"]}}',
+            '{"query": "c", "entity_filters": {"symptoms_present": ["cough"]}}',
+        ]
+        defaults = create_parser().parse_args(["batch-search", "--check-entities", "fix"])
+
+        out = io.StringIO()
+        async with create_async_client(max_retries=0) as client:
+            summary = await execute_batch(client, read_batch_records(lines), defaults, out, parallelism=3)
+
+        records = {r["query"]: r for r in map(json.loads, out.getvalue().splitlines())}
+        assert records["a"]["status"] == "ok"
+        assert records["a"]["entity_issues"][0]["correction"] == "metformin"
+        assert records["b"]["status"] == "error"
+        assert "unheard-of" in records["b"]["error"]
+        assert "entity_issues" not in records["c"]
+        assert summary["failed"] == 1
+        assert route.call_count == 2
+        assert vocabulary_api.call_count == 1
@@ -0,0 +1,340 @@
+"""Slow-query analysis of the search history.
+
+Each successful history entry is reduced to the search parameters that
+plausibly drive its cost (see ``extract_features``), read from its
+``request_payload``. Two views are built in a single pass over the entries:
+
+- a least-squares fit of ``duration_ms`` on those parameters, giving the
+  marginal cost of each one with the others held fixed. Only the normal
+  equations (X'X and X'y) are accumulated, so the fit is streaming and
+  mergeable, and solving it is a small dense system whatever the history
+  size;
+- a LatencyHistogram per parameter combination (a "query template"), to
+  rank the templates that are slowest or that consume the most total time.
+
+Categorical parameters (``distinct``, search type) enter the fit as
+indicator columns against a baseline value. Columns with no variance are
+left out of the fit.
+"""
+
+import json
+import math
+from typing import Any, Iterable, Optional
+
+from .filters import FilterSyntaxError, condition_count, normalize, parse_filter
+from .metrics import LatencyHistogram
+
+# Numeric features and their value when the payload omits them (the
+# search command's defaults)
+NUMERIC_FEATURES: dict[str, float] = {
+    "k": 10,
+    "rerank": 1,
+    "chunk_multiplier": 2.0,
+    "top_k_retrieval": 0,
+    "cohorts": 0,
+    "filter_conditions": 0,
+}
+
+# Categorical features; the first value is the baseline of the fit
+CATEGORICAL_FEATURES: dict[str, tuple[str, ...]] = {
+    "distinct": ("encounter", "patient", "note", "none"),
+    "search_type": ("hybrid", "semantic", "keyword"),
+}
+
+# Orderings for the template ranking
+SORT_KEYS = ("p95", "total")
+
+# Percentiles reported per template
+TEMPLATE_QUANTILES = (50, 95)
+
+
+def _payload_value(payload: dict[str, Any], name: str) -> Any:
+    """Look a parameter up under its query-string or snake_case spelling."""
+    for key in (name, name.replace("_", "-")):
+        if key in payload:
+            return payload[key]
+    return None
+
+
+def _as_bool(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() not in ("false", "0", "no", "off", "")
+    return bool(value)
+
+
+def _as_json(value: Any) -> Any:
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return None
+    return value
+
+
+def _filter_conditions(payload: dict[str, Any]) -> int:
+    """Comparisons in the metadata filter plus fields in the entity filter."""
+    count = 0
+    filters = _as_json(_payload_value(payload, "filters"))
+    if filters:
+        try:
+            count += condition_count(normalize(parse_filter(filters)))
+        except FilterSyntaxError:
+            count += 1
+    entity_filters = _as_json(_payload_value(payload, "entity_filters"))
+    if isinstance(entity_filters, dict):
+        count += len(entity_filters)
+    return count
+
+
+def _cohort_count(value: Any) -> int:
+    if not value:
+        return 0
+    if isinstance(value, (list, tuple)):
+        return len(value)
+    return len([part for part in str(value).split(",") if part.strip()])
+
+
+def extract_features(entry: dict[str, Any]) -> dict[str, Any]:
+    """Reduce a history entry to its cost-relevant search parameters."""
+    payload = entry.get("request_payload") or {}
+
+    def number(name: str) -> float:
+        value = _payload_value(payload, name)
+        try:
+            return float(value) if value is not None else NUMERIC_FEATURES[name]
+        except (TypeError, ValueError):
+            return NUMERIC_FEATURES[name]
+
+    rerank = _payload_value(payload, "rerank")
+    search_type = _payload_value(payload, "search_type") or entry.get("search_type")
+    return {
+        "k": number("k"),
+        "rerank": float(_as_bool(rerank)) if rerank is not None else NUMERIC_FEATURES["rerank"],
+        "chunk_multiplier": number("chunk_multiplier"),
+        "top_k_retrieval": number("top_k_retrieval"),
+        "cohorts": float(_cohort_count(_payload_value(payload, "cohort_ids"))),
+        "filter_conditions": float(_filter_conditions(payload)),
+        "distinct": str(_payload_value(payload, "distinct") or CATEGORICAL_FEATURES["distinct"][0]),
+        "search_type": str(search_type or CATEGORICAL_FEATURES["search_type"][0]),
+    }
+
+
+def template_key(features: dict[str, Any]) -> str:
+    """Readable identifier of a parameter combination."""
+    def fmt(value: float) -> str:
+        return f"{value:g}"
+
+    parts = [
+        f"type={features['search_type']}",
+        f"k={fmt(features['k'])}",
+        f"rerank={'on' if features['rerank'] else 'off'}",
+        f"chunk-multiplier={fmt(features['chunk_multiplier'])}",
+    ]
+    if features["top_k_retrieval"]:
+        parts.append(f"top_k_retrieval={fmt(features['top_k_retrieval'])}")
+    parts.append(f"distinct={features['distinct']}")
+    if features["cohorts"]:
+        parts.append(f"cohorts={fmt(features['cohorts'])}")
+    if features["filter_conditions"]:
+        parts.append(f"filters={fmt(features['filter_conditions'])}")
+    return " ".join(parts)
+
+
+def design_columns() -> list[str]:
+    """Names of the regression columns after the intercept."""
+    columns = list(NUMERIC_FEATURES)
+    for name, values in CATEGORICAL_FEATURES.items():
+        columns.extend(f"{name}={value}" for value in values[1:])
+    return columns
+
+
+def design_row(features: dict[str, Any]) -> list[float]:
+    """Regression row for a feature dict: intercept, numerics, indicators."""
+    row = [1.0]
+    row.extend(float(features[name]) for name in NUMERIC_FEATURES)
+    for name, values in CATEGORICAL_FEATURES.items():
+        row.extend(1.0 if features[name] == value else 0.0 for value in values[1:])
+    return row
+
+
+def solve(matrix: list[list[float]], vector: list[float]) -> Optional[list[float]]:
+    """Solve a small dense linear system by Gaussian elimination.
+
+    Returns:
+        The solution, or None if the system is singular.
+    """
+    size = len(vector)
+    a = [row[:] + [vector[i]] for i, row in enumerate(matrix)]
+    for col in range(size):
+        pivot = max(range(col, size), key=lambda r: abs(a[r][col]))
+        if abs(a[pivot][col]) < 1e-12:
+            return None
+        a[col], a[pivot] = a[pivot], a[col]
+        for r in range(col + 1, size):
+            factor = a[r][col] / a[col][col]
+            if factor:
+                for c in range(col, size + 1):
+                    a[r][c] -= factor * a[col][c]
+    solution = [0.0] * size
+    for r in range(size - 1, -1, -1):
+        total = a[r][size] - sum(a[r][c] * solution[c] for c in range(r + 1, size))
+        solution[r] = total / a[r][r]
+    return solution
+
+
+class LinearFit:
+    """Streaming ordinary least squares through the normal equations."""
+
+    def __init__(self, columns: list[str]):
+        """Initialize an empty fit.
+
+        Args:
+            columns: Names of the columns after the intercept.
+        """
+        self.columns = columns
+        size = len(columns) + 1
+        self.xtx = [[0.0] * size for _ in range(size)]
+        self.xty = [0.0] * size
+        self.yty = 0.0
+        self.n = 0
+
+    def add(self, row: list[float], y: float) -> None:
+        """Add one observation (``row`` starts with the intercept 1)."""
+        for i, xi in enumerate(row):
+            if xi:
+                self.xty[i] += xi * y
+                xtx_i = self.xtx[i]
+                for j, xj in enumerate(row):
+                    if xj:
+                        xtx_i[j] += xi * xj
+        self.yty += y * y
+        self.n += 1
+
+    def merge(self, other: "LinearFit") -> None:
+        """Add another fit's observations (same columns) to this one."""
+        for i, row in enumerate(other.xtx):
+            self.xty[i] += other.xty[i]
+            for j, value in enumerate(row):
+                self.xtx[i][j] += value
+        self.yty += other.yty
+        self.n += other.n
+
+    def column_std(self, index: int) -> float:
+        """Standard deviation of a column (index counts the intercept as 0)."""
+        if not self.n:
+            return 0.0
+        mean = self.xtx[0][index] / self.n
+        return math.sqrt(max(0.0, self.xtx[index][index] / self.n - mean * mean))
+
+    def result(self) -> dict[str, Any]:
+        """Solve the fit.
+
+        Returns:
+            Dictionary with ``n``, ``intercept``, ``r2`` and
+            ``coefficients``: per column, the marginal cost in ms per unit
+            (``None`` for columns without variance) and ``ms_per_std``, its
+            effect over one standard deviation of the column.
+        """
+        result: dict[str, Any] = {"n": self.n, "intercept": None, "r2": None, "coefficients": {}}
+        active = [0] + [i for i in range(1, len(self.xty)) if self.column_std(i) > 1e-9]
+        if self.n <= len(active):
+            return result
+
+        matrix = [[self.xtx[i][j] for j in active] for i in active]
+        # A tiny ridge keeps exactly collinear columns solvable
+        ridge = 1e-9 * max(matrix[i][i] for i in range(len(active)))
+        for i in range(1, len(active)):
+            matrix[i][i] += ridge
+        vector = [self.xty[i] for i in active]
+        beta = solve(matrix, vector)
+        if beta is None:
+            return result
+
+        coefficients = dict(zip(active, beta))
+        sse = self.yty - 2 * sum(b * v for b, v in zip(beta, vector)) + sum(
+            beta[i] * matrix[i][j] * beta[j] for i in range(len(active)) for j in range(len(active))
+        )
+        mean_y = self.xty[0] / self.n
+        sst = self.yty - self.n * mean_y * mean_y
+        result["intercept"] = coefficients[0]
+        result["r2"] = 1 - sse / sst if sst > 0 else None
+        for index, name in enumerate(self.columns, 1):
+            coefficient = coefficients.get(index)
+            result["coefficients"][name] = {
+                "ms_per_unit": coefficient,
+                "ms_per_std": coefficient * self.column_std(index) if coefficient is not None else None,
+            }
+        return result
+
+
+class SlowQueryAnalyzer:
+    """Accumulate history entries into the fit and per-template sketches."""
+
+    def __init__(self) -> None:
+        self.fit = LinearFit(design_columns())
+        self.templates: dict[str, LatencyHistogram] = {}
+        self.entries = 0
+        self.skipped = 0
+
+    def add(self, entry: dict[str, Any]) -> None:
+        """Record an entry; failed searches and entries without a duration are skipped."""
+        self.entries += 1
+        duration_ms = entry.get("duration_ms")
+        status = entry.get("status_code") or 200
+        if duration_ms is None or status >= 400 or entry.get("error_message"):
+            self.skipped += 1
+            return
+        features = extract_features(entry)
+        self.fit.add(design_row(features), float(duration_ms))
+        key = template_key(features)
+        histogram = self.templates.get(key)
+        if histogram is None:
+            histogram = self.templates[key] = LatencyHistogram()
+        histogram.record(float(duration_ms) * 1000)
+
+    def add_all(self, entries: Iterable[dict[str, Any]]) -> None:
+        """Record many entries."""
+        for entry in entries:
+            self.add(entry)
+
+    def report(self, top: int = 10, min_count: int = 5, sort: str = "p95") -> dict[str, Any]:
+        """Summarize the analysis.
+
+        Args:
+            top: Number of templates to list.
+            min_count: Ignore templates seen fewer times than this.
+            sort: "p95" ranks the slowest templates; "total" ranks those
+                consuming the most total time.
+
+        Returns:
+            Dictionary with entry counts, ``fit`` (see LinearFit.result) and
+            ``templates``: the top templates with count, mean, p50, p95 and
+            share of total time.
+        """
+        if sort not in SORT_KEYS:
+            raise ValueError(f"sort must be one of {', '.join(SORT_KEYS)}")
+        grand_total = sum(h.total for h in self.templates.values()) or 1
+        templates = []
+        for key, histogram in self.templates.items():
+            if histogram.count < min_count:
+                continue
+            summary = histogram.summary_ms(TEMPLATE_QUANTILES)
+            templates.append({
+                "template": key,
+                "count": histogram.count,
+                "mean_ms": summary["mean"],
+                "p50_ms": summary["p50"],
+                "p95_ms": summary["p95"],
+                "total_ms": histogram.total / 1000,
+                "time_share": histogram.total / grand_total,
+            })
+        rank = "p95_ms" if sort == "p95" else "total_ms"
+        templates.sort(key=lambda t: t[rank], reverse=True)
+        return {
+            "entries": self.entries,
+            "analyzed": self.fit.n,
+            "skipped": self.skipped,
+            "distinct_templates": len(self.templates),
+            "fit": self.fit.result(),
+            "templates": templates[:top],
+        }
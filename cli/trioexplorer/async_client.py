@@ -0,0 +1,388 @@
+"""Asynchronous HTTP client for the Search API."""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Iterable, Optional, Union
+
+import httpx
+from rich.console import Console
+
+from .auth import get_auth_headers
+from .cache import ResponseCache
+from .cassette import active_session
+from .client import (
+    DEFAULT_KEEPALIVE_EXPIRY,
+    DEFAULT_MAX_KEEPALIVE,
+    DEFAULT_TIMEOUT,
+    build_limits,
+    http2_available,
+)
+from .config import get_api_url
+from .errors import SearchAPIError, translate_error
+from .retry import DEFAULT_MAX_RETRIES, RetryPolicy, TokenBucket
+from .timings import NULL_TRACE, RequestTrace, request_trace
+
+console = Console(stderr=True)
+
+# Default concurrency limits
+DEFAULT_MAX_CONCURRENCY = 16
+DEFAULT_PER_HOST_LIMIT = 8
+
+
+class RequestScheduler:
+    """Bound the number of in-flight requests, globally and per host.
+
+    A request must hold both a global slot and a slot for its target host
+    before it is sent, so one slow host cannot starve the others and the
+    process never exceeds ``max_concurrency`` open requests.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        per_host_limit: Optional[int] = DEFAULT_PER_HOST_LIMIT,
+    ):
+        """Initialize the scheduler.
+
+        Args:
+            max_concurrency: Maximum number of requests in flight overall.
+            per_host_limit: Maximum requests in flight per host. None means
+                only the global limit applies.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        if per_host_limit is not None and per_host_limit < 1:
+            raise ValueError("per_host_limit must be at least 1")
+
+        self.max_concurrency = max_concurrency
+        self.per_host_limit = per_host_limit
+        self._global = asyncio.Semaphore(max_concurrency)
+        self._hosts: dict[str, asyncio.Semaphore] = {}
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def _host_semaphore(self, host: str) -> Optional[asyncio.Semaphore]:
+        """Get (or lazily create) the semaphore for a host."""
+        if self.per_host_limit is None:
+            return None
+        semaphore = self._hosts.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.per_host_limit)
+            self._hosts[host] = semaphore
+        return semaphore
+
+    @asynccontextmanager
+    async def slot(self, url: Union[str, httpx.URL]) -> AsyncIterator[None]:
+        """Acquire a per-host and global slot for the duration of a request.
+
+        The host slot is taken first, so requests queued behind a saturated
+        host do not hold global slots that requests to other hosts could use.
+
+        Args:
+            url: Request URL; its host selects the per-host limit.
+        """
+        host_semaphore = self._host_semaphore(httpx.URL(str(url)).host)
+        if host_semaphore is not None:
+            await host_semaphore.acquire()
+        try:
+            async with self._global:
+                self.in_flight += 1
+                self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+                try:
+                    yield
+                finally:
+                    self.in_flight -= 1
+        finally:
+            if host_semaphore is not None:
+                host_semaphore.release()
+
+
+class AsyncSearchClient:
+    """Asynchronous HTTP client wrapper for the Search API.
+
+    Mirrors SearchClient, but raises SearchAPIError subclasses instead of
+    exiting the process, and schedules requests through a RequestScheduler
+    so many calls can run concurrently without overwhelming the API.
+    Transient failures are retried per ``retry_policy`` (the scheduler slot
+    is released while backing off), and an optional TokenBucket shared by
+    every in-flight request keeps the aggregate rate under quota.
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        debug: bool = False,
+        timeout: float = DEFAULT_TIMEOUT,
+        http2: bool = False,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        per_host_limit: Optional[int] = DEFAULT_PER_HOST_LIMIT,
+        scheduler: Optional[RequestScheduler] = None,
+        cache: Optional[ResponseCache] = None,
+        refresh: bool = False,
+        retry_policy: Optional[RetryPolicy] = None,
+        rate_limiter: Optional[TokenBucket] = None,
+    ):
+        """Initialize the client.
+
+        Args:
+            base_url: Override for the API base URL.
+            debug: Enable debug logging of requests/responses.
+            timeout: Request timeout in seconds.
+            http2: Enable HTTP/2 multiplexing (requires the ``h2`` package).
+            max_concurrency: Maximum number of requests in flight overall.
+            per_host_limit: Maximum number of requests in flight per host.
+            scheduler: Share an existing scheduler instead of creating one.
+            cache: Optional on-disk response cache (owned and closed by the client).
+            refresh: Skip cache reads (responses are still stored).
+            retry_policy: Retry policy (defaults to RetryPolicy()).
+            rate_limiter: Optional token bucket shared by all requests.
+        """
+        session = active_session()
+        self.base_url = get_api_url(base_url)
+        self.debug = debug
+        self.timeout = timeout
+        self.headers = get_auth_headers(require_auth=session is None or not session.replaying)
+        self.http2 = http2 and http2_available()
+        self.scheduler = scheduler or RequestScheduler(max_concurrency, per_host_limit)
+        self.cache = cache
+        self.refresh = refresh
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.rate_limiter = rate_limiter
+
+        limits = build_limits(
+            self.scheduler.max_concurrency,
+            DEFAULT_MAX_KEEPALIVE,
+            DEFAULT_KEEPALIVE_EXPIRY,
+        )
+        self._http = httpx.AsyncClient(
+            headers=self.headers,
+            timeout=timeout,
+            limits=limits,
+            http2=self.http2,
+            # --record / --replay swap in a cassette transport
+            transport=session.async_transport(limits=limits, http2=self.http2) if session else None,
+        )
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP transport and release its connections."""
+        await self._http.aclose()
+        if self.cache is not None:
+            if self.debug:
+                console.print(f"[dim]{self.cache.format_stats()}[/dim]")
+            self.cache.close()
+            self.cache = None
+
+    async def __aenter__(self) -> "AsyncSearchClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    def _log_request(self, method: str, url: str, **kwargs) -> None:
+        """Log request details if debug is enabled."""
+        if not self.debug:
+            return
+        console.print(f"[dim]>>> {method} {url}[/dim]")
+        if kwargs.get("params"):
+            console.print(f"[dim]    params: {kwargs['params']}[/dim]")
+        if kwargs.get("json"):
+            console.print(f"[dim]    json: {kwargs['json']}[/dim]")
+
+    def _log_response(self, response: httpx.Response) -> None:
+        """Log response details if debug is enabled."""
+        if not self.debug:
+            return
+        console.print(f"[dim]<<< {response.status_code} ({len(response.content)} bytes)[/dim]")
+
+    def _handle_error(self, error: Exception, url: str) -> SearchAPIError:
+        """Translate request errors into typed exceptions."""
+        return translate_error(error, self.base_url, self.timeout)
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[dict] = None,
+        json_data: Optional[dict] = None,
+    ) -> dict[str, Any]:
+        """Make a scheduled request to the API.
+
+        Args:
+            method: HTTP method.
+            path: API endpoint path (e.g., "/search")
+            params: Query parameters
+            json_data: JSON body data
+
+        Returns:
+            Parsed JSON response
+
+        Raises:
+            SearchAPIError: On any request error.
+        """
+        url = f"{self.base_url}{path}"
+        cache_entry = None
+        if self.cache is not None and method == "GET":
+            cache_entry = self.cache.key_for(
+                self.base_url, path, params, self.headers.get("X-API-Key", "")
+            )
+        if cache_entry and not self.refresh:
+            cached = self.cache.get(cache_entry[0])
+            if cached is not None:
+                if self.debug:
+                    console.print(f"[dim]>>> {method} {url} (cache hit)[/dim]")
+                return cached
+
+        self._log_request(method, url, params=params, json=json_data)
+
+        trace = request_trace(method, url)
+        try:
+            response = await self._send(method, url, trace=trace, params=params, json=json_data)
+            with trace.phase("decode"):
+                data = response.json()
+        except Exception as error:
+            trace.finish(error=error)
+            raise self._handle_error(error, url) from error
+        trace.finish(response.status_code, num_bytes=response.num_bytes_downloaded)
+
+        if cache_entry:
+            self.cache.put(cache_entry[0], path, data, cache_entry[1])
+        return data
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        trace: RequestTrace = NULL_TRACE,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """Send a scheduled request, retrying transient failures.
+
+        Args:
+            method: HTTP method.
+            url: Full request URL.
+            trace: Per-phase timings of the request (see --timings).
+            **kwargs: Passed to httpx (params, json, ...).
+
+        Raises:
+            Exception: The last error once retries are exhausted.
+        """
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                delay = self.rate_limiter.reserve()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            trace.attempt()
+            try:
+                async with self.scheduler.slot(url):
+                    response = await self._http.request(
+                        method, url, extensions=trace.async_extensions, **kwargs
+                    )
+                    self._log_response(response)
+                    response.raise_for_status()
+                    return response
+            except Exception as error:
+                delay = self.retry_policy.next_delay(method, attempt, error)
+                if delay is None:
+                    raise
+                if self.debug:
+                    console.print(
+                        f"[yellow]    retry {attempt + 1}/{self.retry_policy.max_retries} "
+                        f"in {delay:.2f}s ({error})[/yellow]"
+                    )
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    async def get(self, path: str, params: Optional[dict] = None) -> dict[str, Any]:
+        """Make a GET request to the API.
+
+        Args:
+            path: API endpoint path (e.g., "/search")
+            params: Query parameters
+
+        Returns:
+            Parsed JSON response
+
+        Raises:
+            SearchAPIError: On any request error.
+        """
+        return await self.request("GET", path, params=params)
+
+    async def post(self, path: str, json_data: Optional[dict] = None) -> dict[str, Any]:
+        """Make a POST request to the API.
+
+        Args:
+            path: API endpoint path
+            json_data: JSON body data
+
+        Returns:
+            Parsed JSON response
+
+        Raises:
+            SearchAPIError: On any request error.
+        """
+        return await self.request("POST", path, json_data=json_data)
+
+    async def get_many(
+        self,
+        requests: Iterable[tuple[str, Optional[dict]]],
+    ) -> list[Union[dict[str, Any], SearchAPIError]]:
+        """Run many GET requests concurrently, bounded by the scheduler.
+
+        Args:
+            requests: Iterable of (path, params) pairs.
+
+        Returns:
+            Responses in input order; failed requests yield their
+            SearchAPIError instead of raising.
+        """
+        async def _one(path: str, params: Optional[dict]) -> Union[dict[str, Any], SearchAPIError]:
+            try:
+                return await self.get(path, params=params)
+            except SearchAPIError as error:
+                return error
+
+        return await asyncio.gather(*(_one(path, params) for path, params in requests))
+
+
+def create_async_client(
+    base_url: Optional[str] = None,
+    debug: bool = False,
+    timeout: float = DEFAULT_TIMEOUT,
+    http2: bool = False,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    per_host_limit: Optional[int] = DEFAULT_PER_HOST_LIMIT,
+    cache: Optional[ResponseCache] = None,
+    refresh: bool = False,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    rate_limit: Optional[float] = None,
+) -> AsyncSearchClient:
+    """Create a configured AsyncSearchClient instance.
+
+    Args:
+        base_url: Override for the API base URL.
+        debug: Enable debug logging.
+        timeout: Request timeout in seconds.
+        http2: Enable HTTP/2 multiplexing.
+        max_concurrency: Maximum number of requests in flight overall.
+        per_host_limit: Maximum number of requests in flight per host.
+        cache: Optional on-disk response cache.
+        refresh: Skip cache reads (responses are still stored).
+        max_retries: Retries for transient failures (0 disables retrying).
+        rate_limit: Maximum sustained requests per second (None for unlimited).
+
+    Returns:
+        Configured AsyncSearchClient instance.
+    """
+    return AsyncSearchClient(
+        base_url=base_url,
+        debug=debug,
+        timeout=timeout,
+        http2=http2,
+        max_concurrency=max_concurrency,
+        per_host_limit=per_host_limit,
+        cache=cache,
+        refresh=refresh,
+        retry_policy=RetryPolicy(max_retries=max_retries),
+        rate_limiter=TokenBucket(rate_limit) if rate_limit else None,
+    )
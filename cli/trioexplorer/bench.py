@@ -0,0 +1,255 @@
+"""Load generation and latency measurement for the Search API.
+
+Two load models are supported:
+
+- closed loop: ``workers`` concurrent workers each send their next request
+  as soon as the previous one completes. Throughput is whatever the server
+  sustains at that concurrency.
+- open loop: requests arrive at a fixed ``rate`` regardless of how quickly
+  earlier ones complete. Latency is measured from each request's scheduled
+  arrival time rather than from when it was actually sent, so time spent
+  queued behind slow responses is counted instead of hidden (coordinated
+  omission).
+
+Successful latencies are recorded in LatencyHistogram instances, overall
+and per (search type, rerank, k) group; failures are counted per group and
+by kind.
+"""
+
+import itertools
+import time
+from typing import TYPE_CHECKING, Any, Iterator, Optional
+
+from .metrics import LatencyHistogram
+
+if TYPE_CHECKING:
+    from .async_client import AsyncSearchClient
+
+BENCH_MODES = ("closed", "open")
+
+# /search parameters that identify a benchmark group
+GROUP_PARAMS = ("search-type", "rerank", "k")
+
+# Percentiles reported for every group
+BENCH_QUANTILES = (50, 90, 99, 99.9)
+
+Group = tuple[str, str, str]
+
+
+def group_key(params: dict[str, Any]) -> Group:
+    """Benchmark group of a request: (search type, rerank, k)."""
+    return tuple(str(params.get(name, "")) for name in GROUP_PARAMS)  # type: ignore[return-value]
+
+
+class BenchRecorder:
+    """Collect latencies and errors for a benchmark run."""
+
+    def __init__(self, significant_digits: int = 3):
+        self.significant_digits = significant_digits
+        self.overall = LatencyHistogram(significant_digits)
+        self.groups: dict[Group, LatencyHistogram] = {}
+        self.requests: dict[Group, int] = {}
+        self.errors: dict[Group, int] = {}
+        self.error_kinds: dict[str, int] = {}
+
+    def record(self, group: Group, latency_us: float, error: Optional[str] = None) -> None:
+        """Record one completed request.
+
+        Args:
+            group: Benchmark group of the request.
+            latency_us: Latency in microseconds.
+            error: Error kind if the request failed (its latency is not
+                added to the histograms).
+        """
+        self.requests[group] = self.requests.get(group, 0) + 1
+        if error is not None:
+            self.errors[group] = self.errors.get(group, 0) + 1
+            self.error_kinds[error] = self.error_kinds.get(error, 0) + 1
+            return
+        histogram = self.groups.get(group)
+        if histogram is None:
+            histogram = self.groups[group] = LatencyHistogram(self.significant_digits)
+        histogram.record(latency_us)
+        self.overall.record(latency_us)
+
+    def report(self, wall_seconds: float) -> dict[str, Any]:
+        """Build the benchmark report.
+
+        Args:
+            wall_seconds: Duration of the measured phase.
+
+        Returns:
+            Totals, throughput, error rates and latency percentiles (ms),
+            overall and per group.
+        """
+        def rate(count: int) -> float:
+            return count / wall_seconds if wall_seconds > 0 else 0.0
+
+        groups = []
+        for group in sorted(self.requests):
+            requests = self.requests[group]
+            errors = self.errors.get(group, 0)
+            histogram = self.groups.get(group, LatencyHistogram(self.significant_digits))
+            search_type, rerank, k = group
+            groups.append({
+                "search_type": search_type,
+                "rerank": rerank,
+                "k": k,
+                "requests": requests,
+                "errors": errors,
+                "error_rate": errors / requests,
+                "throughput_rps": rate(requests),
+                "latency_ms": histogram.summary_ms(BENCH_QUANTILES),
+            })
+
+        requests = sum(self.requests.values())
+        errors = sum(self.errors.values())
+        return {
+            "requests": requests,
+            "succeeded": requests - errors,
+            "errors": errors,
+            "error_rate": errors / requests if requests else 0.0,
+            "errors_by_kind": dict(sorted(self.error_kinds.items())),
+            "wall_seconds": wall_seconds,
+            "throughput_rps": rate(requests),
+            "latency_ms": self.overall.summary_ms(BENCH_QUANTILES),
+            "groups": groups,
+        }
+
+
+def request_sequence(
+    requests: list[dict[str, Any]],
+    total: Optional[int] = None,
+    duration: Optional[float] = None,
+) -> Iterator[dict[str, Any]]:
+    """Cycle through the query set until ``total`` requests or ``duration`` seconds.
+
+    With neither limit, each query is sent once.
+    """
+    if not requests:
+        return iter(())
+    if total is None and duration is None:
+        total = len(requests)
+    sequence: Iterator[dict[str, Any]] = itertools.cycle(requests)
+    if total is not None:
+        sequence = itertools.islice(sequence, total)
+    if duration is None:
+        return sequence
+    deadline = time.perf_counter() + duration
+    return itertools.takewhile(lambda _: time.perf_counter() < deadline, sequence)
+
+
+async def _timed_request(
+    client: "AsyncSearchClient",
+    params: dict[str, Any],
+    recorder: Optional[BenchRecorder],
+    started_at: float,
+) -> None:
+    """Send one /search and record its latency from ``started_at``."""
+    from .errors import APIStatusError, SearchAPIError
+
+    error = None
+    try:
+        await client.get("/search", params=params)
+    except APIStatusError as e:
+        error = f"HTTP {e.status_code}"
+    except SearchAPIError as e:
+        error = type(e).__name__
+    if recorder is not None:
+        recorder.record(group_key(params), (time.perf_counter() - started_at) * 1e6, error)
+
+
+async def _closed_loop(
+    client: "AsyncSearchClient",
+    sequence: Iterator[dict[str, Any]],
+    workers: int,
+    recorder: Optional[BenchRecorder],
+) -> None:
+    import asyncio
+
+    async def worker() -> None:
+        for params in sequence:
+            await _timed_request(client, params, recorder, time.perf_counter())
+
+    await asyncio.gather(*(worker() for _ in range(max(1, workers))))
+
+
+async def _open_loop(
+    client: "AsyncSearchClient",
+    sequence: Iterator[dict[str, Any]],
+    rate: float,
+    recorder: BenchRecorder,
+) -> None:
+    import asyncio
+
+    interval = 1 / rate
+    start = time.perf_counter()
+    tasks = []
+    for i, params in enumerate(sequence):
+        scheduled = start + i * interval
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(_timed_request(client, params, recorder, scheduled)))
+    await asyncio.gather(*tasks)
+
+
+async def run_benchmark(
+    client: "AsyncSearchClient",
+    requests: list[dict[str, Any]],
+    mode: str = "closed",
+    workers: int = 8,
+    rate: Optional[float] = None,
+    total: Optional[int] = None,
+    duration: Optional[float] = None,
+    warmup: int = 0,
+    significant_digits: int = 3,
+) -> dict[str, Any]:
+    """Replay a query set against /search and measure latency.
+
+    Args:
+        client: Async client. Its scheduler bounds requests in flight, so in
+            open-loop mode arrivals beyond that limit queue (and the wait
+            is part of their latency).
+        requests: /search parameter sets, replayed in order and cycled.
+        mode: "closed" (``workers`` concurrent loops) or "open" (fixed
+            arrival ``rate``).
+        workers: Concurrent workers in closed-loop mode (and for warmup).
+        rate: Arrivals per second in open-loop mode.
+        total: Number of measured requests.
+        duration: Length of the measured phase in seconds.
+        warmup: Requests sent closed-loop before measuring, to open
+            connections; they are not recorded.
+        significant_digits: Histogram precision.
+
+    Returns:
+        Benchmark report (see BenchRecorder.report), with the run settings
+        and the peak number of requests in flight.
+
+    Raises:
+        ValueError: If the mode or rate is invalid.
+    """
+    if mode not in BENCH_MODES:
+        raise ValueError(f"Unknown benchmark mode: {mode}")
+    if mode == "open" and (rate is None or rate <= 0):
+        raise ValueError("Open-loop mode requires a positive rate")
+
+    if warmup:
+        await _closed_loop(client, request_sequence(requests, total=warmup), workers, None)
+        client.scheduler.peak_in_flight = 0
+
+    recorder = BenchRecorder(significant_digits)
+    sequence = request_sequence(requests, total, duration)
+    started = time.perf_counter()
+    if mode == "closed":
+        await _closed_loop(client, sequence, workers, recorder)
+    else:
+        await _open_loop(client, sequence, rate, recorder)
+    wall_seconds = time.perf_counter() - started
+
+    report = recorder.report(wall_seconds)
+    report["mode"] = mode
+    report["workers"] = workers
+    report["target_rate_rps"] = rate if mode == "open" else None
+    report["peak_in_flight"] = client.scheduler.peak_in_flight
+    return report
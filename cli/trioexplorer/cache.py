@@ -0,0 +1,294 @@
+"""Persistent on-disk response cache for the Trioexplorer CLI.
+
+Responses are stored in a SQLite database under ``~/.trioexplorer/`` keyed
+on a canonical hash of the request (base URL, path, normalized params and
+the API key identity). Each endpoint has its own TTL, and the database is
+kept under a size cap by evicting least-recently-used entries. Triggers
+keep the total payload size in ``cache_size``, so a store checks the cap
+without summing the table.
+
+Caching is best-effort: a failed read (e.g. "database is locked" under
+many concurrent processes) counts as a miss and a failed write skips the
+store, so the request still succeeds.
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from .config import get_cache_path
+
+# Default maximum cache size in bytes (compressed payloads)
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Per-endpoint TTLs in seconds. Paths not listed here are never cached.
+DEFAULT_TTLS: list[tuple[str, int]] = [
+    (r"^/search$", 60 * 60),
+    (r"^/cohorts/indexed$", 24 * 60 * 60),
+    (r"^/note-types$", 24 * 60 * 60),
+    (r"^/namespaces/[^/]+/filter-fields$", 24 * 60 * 60),
+    (r"^/namespaces/[^/]+/filter-values(/[^/]+)?$", 24 * 60 * 60),
+]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access);
+CREATE INDEX IF NOT EXISTS responses_expires_at ON responses (expires_at);
+
+CREATE TABLE IF NOT EXISTS cache_size (total INTEGER NOT NULL);
+CREATE TRIGGER IF NOT EXISTS responses_size_insert AFTER INSERT ON responses
+BEGIN
+    UPDATE cache_size SET total = total + NEW.size;
+END;
+CREATE TRIGGER IF NOT EXISTS responses_size_delete AFTER DELETE ON responses
+BEGIN
+    UPDATE cache_size SET total = total - OLD.size;
+END;
+-- Caches created before cache_size existed are summed once
+INSERT INTO cache_size (total)
+SELECT (SELECT COALESCE(SUM(size), 0) FROM responses)
+WHERE NOT EXISTS (SELECT 1 FROM cache_size);
+"""
+
+
+def normalize_params(params: Optional[dict]) -> dict[str, str]:
+    """Normalize query parameters the way they are sent on the wire.
+
+    None values are dropped, booleans are lowercased and everything else is
+    stringified, so ``{"k": 10}`` and ``{"k": "10"}`` hash identically.
+    Metadata filters are keyed by their canonical form, so equivalent
+    filters written in a different order share a cache entry.
+    """
+    normalized = {}
+    for key, value in (params or {}).items():
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            value = str(value).lower()
+        normalized[str(key)] = str(value)
+    if "filters" in normalized:
+        normalized["filters"] = _canonical_filters(normalized["filters"])
+    return dict(sorted(normalized.items()))
+
+
+def _canonical_filters(value: str) -> str:
+    """Canonical JSON for a filters parameter (unchanged if it does not parse)."""
+    from .filters import canonical_json, parse_filter
+
+    try:
+        return canonical_json(parse_filter(json.loads(value)))
+    except ValueError:
+        return value
+
+
+def make_cache_key(
+    base_url: str,
+    path: str,
+    params: Optional[dict] = None,
+    identity: str = "",
+) -> str:
+    """Build a canonical cache key for a GET request.
+
+    Args:
+        base_url: API base URL.
+        path: API endpoint path.
+        params: Query parameters.
+        identity: Caller identity (e.g. API key); hashed, never stored raw.
+
+    Returns:
+        Hex SHA-256 digest identifying the request.
+    """
+    canonical = json.dumps(
+        {
+            "url": f"{base_url}{path}",
+            "params": normalize_params(params),
+            "identity": hashlib.sha256(identity.encode()).hexdigest(),
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed response cache with per-endpoint TTLs and LRU eviction."""
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttls: Optional[list[tuple[str, int]]] = None,
+    ):
+        """Initialize the cache, creating the database if needed.
+
+        Args:
+            path: Database file path (defaults to ~/.trioexplorer/cache.sqlite3).
+            max_bytes: Size cap for stored payloads.
+            ttls: (path regex, seconds) pairs; first match wins.
+        """
+        self.path = Path(path) if path else get_cache_path()
+        self.max_bytes = max_bytes
+        self._ttls = [(re.compile(pattern), ttl) for pattern, ttl in (ttls or DEFAULT_TTLS)]
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "errors": 0}
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), timeout=10.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._db.close()
+
+    def ttl_for(self, path: str) -> Optional[int]:
+        """Return the TTL for an endpoint path, or None if it is not cacheable."""
+        for pattern, ttl in self._ttls:
+            if pattern.match(path):
+                return ttl
+        return None
+
+    def key_for(
+        self,
+        base_url: str,
+        path: str,
+        params: Optional[dict],
+        identity: str = "",
+    ) -> Optional[tuple[str, int]]:
+        """Return (cache key, TTL) for a request, or None if it is not cacheable."""
+        ttl = self.ttl_for(path)
+        if ttl is None:
+            return None
+        return make_cache_key(base_url, path, params, identity), ttl
+
+    def get(self, key: str) -> Optional[Any]:
+        """Look up a cached response.
+
+        Args:
+            key: Cache key from make_cache_key.
+
+        Returns:
+            The decoded JSON response, or None on miss, expiry or a database
+            error.
+        """
+        now = time.time()
+        try:
+            row = self._db.execute(
+                "SELECT body, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and row[1] > now:
+                with self._db:
+                    self._db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+        except sqlite3.Error:
+            self.stats["errors"] += 1
+            row = None
+        if row is None or row[1] <= now:
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["hits"] += 1
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, key: str, path: str, value: Any, ttl: int) -> None:
+        """Store a response and evict old entries if over the size cap.
+
+        A database error skips the store.
+
+        Args:
+            key: Cache key from make_cache_key.
+            path: Endpoint path (kept for inspection/invalidation).
+            value: JSON-serializable response.
+            ttl: Time to live in seconds.
+        """
+        body = zlib.compress(json.dumps(value, separators=(",", ":")).encode())
+        if len(body) > self.max_bytes:
+            return
+
+        now = time.time()
+        try:
+            with self._db:
+                # Not INSERT OR REPLACE: its implicit delete fires no trigger
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._db.execute(
+                    "INSERT INTO responses "
+                    "(key, path, body, size, created_at, expires_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, path, body, len(body), now, now + ttl, now),
+                )
+            self.stats["stores"] += 1
+            self._evict(now)
+        except sqlite3.Error:
+            self.stats["errors"] += 1
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then least-recently-used ones over the cap."""
+        with self._db:
+            expired = self._db.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+            self.stats["evictions"] += expired.rowcount
+
+            total = self._total()
+            if total <= self.max_bytes:
+                return
+
+            victims = []
+            for key, size in self._db.execute(
+                "SELECT key, size FROM responses ORDER BY last_access ASC"
+            ):
+                if total <= self.max_bytes:
+                    break
+                victims.append((key,))
+                total -= size
+            self._db.executemany("DELETE FROM responses WHERE key = ?", victims)
+            self.stats["evictions"] += len(victims)
+
+    def _total(self) -> int:
+        return self._db.execute("SELECT total FROM cache_size").fetchone()[0]
+
+    def format_stats(self) -> str:
+        """Format hit/miss counters for debug output."""
+        text = (
+            f"cache: {self.stats['hits']} hits, {self.stats['misses']} misses, "
+            f"{self.stats['stores']} stored, {self.stats['evictions']} evicted"
+        )
+        if self.stats["errors"]:
+            text += f", {self.stats['errors']} errors"
+        return text
+
+    def clear(self) -> None:
+        """Remove every cached response."""
+        with self._db:
+            self._db.execute("DELETE FROM responses")
+
+    def size_bytes(self) -> int:
+        """Total size of stored payloads in bytes."""
+        return self._total()
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+def open_cache(args: argparse.Namespace) -> Optional[ResponseCache]:
+    """Open the response cache unless the command disabled it.
+
+    Returns None when ``--no-cache`` was given or the cache cannot be opened
+    (for example on a read-only home directory); caching is best-effort.
+    """
+    if getattr(args, "no_cache", False):
+        return None
+    try:
+        return ResponseCache()
+    except (OSError, sqlite3.Error):
+        return None
@@ -0,0 +1,352 @@
+"""Record and replay HTTP exchanges ("cassettes").
+
+With ``--record FILE`` every HTTP exchange made by the sync and async
+clients goes through a recording transport. The transport captures the
+request, the response and its timing. The API key is redacted. At exit the
+exchanges are written to FILE as gzip-compressed JSON Lines.
+
+With ``--replay FILE`` the clients get a transport that answers from the
+cassette instead of the network, and no API key is needed. A request
+matches a recorded exchange by method, path, sorted query string and body;
+the host is ignored, so ``--api-url`` does not matter. Repeated identical requests get their
+recorded responses in order, cycling when exhausted. Responses are served
+immediately by default, or after their recorded latency divided by
+``speed`` (1 = original speed, 2 = twice as fast).
+
+The session is process-wide: ``main`` starts it from the global options and
+the clients pick up its transports (see ``active_session``).
+"""
+
+import base64
+import gzip
+import json
+import time
+from typing import Any, AsyncIterator, Iterator, Optional
+from urllib.parse import parse_qsl, urlencode
+
+import httpx
+
+CASSETTE_VERSION = 1
+
+# Header values replaced by REDACTED in recordings
+REDACTED_HEADERS = ("x-api-key", "authorization", "cookie", "set-cookie")
+REDACTED = "REDACTED"
+
+# Size of the chunks a replayed body is streamed in
+REPLAY_CHUNK_SIZE = 64 * 1024
+
+
+class CassetteError(Exception):
+    """A cassette cannot be read or written."""
+
+
+class CassetteMiss(httpx.TransportError):
+    """No recorded exchange matches a replayed request."""
+
+
+def match_key(method: str, url: httpx.URL, body: bytes) -> str:
+    """Identify a request independently of host and query parameter order."""
+    query = urlencode(sorted(parse_qsl(url.query.decode("ascii"), keep_blank_values=True)))
+    return f"{method} {url.path}?{query} {body.decode('utf-8', 'replace')}"
+
+
+def _redact_headers(headers: httpx.Headers) -> list[list[str]]:
+    return [
+        [name, REDACTED if name.lower() in REDACTED_HEADERS else value]
+        for name, value in headers.multi_items()
+    ]
+
+
+def _encode_body(body: bytes) -> dict[str, str]:
+    try:
+        return {"body": body.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"body_b64": base64.b64encode(body).decode("ascii")}
+
+
+def _decode_body(entry: dict[str, Any], prefix: str = "") -> bytes:
+    if f"{prefix}body_b64" in entry:
+        return base64.b64decode(entry[f"{prefix}body_b64"])
+    return entry.get(f"{prefix}body", "").encode("utf-8")
+
+
+class Recorder:
+    """Collect exchanges and write them as a cassette."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: list[dict[str, Any]] = []
+        self.started = time.perf_counter()
+
+    def add(self, request: httpx.Request, response_headers: httpx.Headers, status: int,
+            body: bytes, started: float, elapsed: float) -> None:
+        """Record one completed exchange."""
+        secrets = [value for name, value in request.headers.items() if name.lower() in REDACTED_HEADERS]
+        url = str(request.url)
+        for secret in secrets:
+            url = url.replace(secret, REDACTED)
+        entry: dict[str, Any] = {
+            "method": request.method,
+            "url": url,
+            "request_headers": _redact_headers(request.headers),
+            "status": status,
+            "response_headers": _redact_headers(response_headers),
+            "started": round(started - self.started, 6),
+            "elapsed": round(elapsed, 6),
+        }
+        request_body = request.content
+        if request_body:
+            entry.update({f"request_{k}": v for k, v in _encode_body(request_body).items()})
+        entry.update(_encode_body(body))
+        self.entries.append(entry)
+
+    def save(self) -> None:
+        """Write the cassette (gzip-compressed JSON Lines).
+
+        Raises:
+            CassetteError: If the file cannot be written.
+        """
+        header = {"version": CASSETTE_VERSION, "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())}
+        try:
+            with gzip.open(self.path, "wt", encoding="utf-8") as f:
+                for record in [header, *self.entries]:
+                    f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        except OSError as e:
+            raise CassetteError(f"Cannot write cassette {self.path}: {e}") from e
+
+
+def load_cassette(path: str) -> list[dict[str, Any]]:
+    """Read the recorded exchanges from a cassette.
+
+    Raises:
+        CassetteError: If the file is missing or not a cassette.
+    """
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            records = [json.loads(line) for line in f if line.strip()]
+    except (OSError, EOFError, ValueError) as e:
+        raise CassetteError(f"Cannot read cassette {path}: {e}") from e
+    if not records or records[0].get("version") != CASSETTE_VERSION:
+        raise CassetteError(f"{path} is not a version {CASSETTE_VERSION} cassette")
+    return records[1:]
+
+
+class Player:
+    """Serve recorded exchanges by request."""
+
+    def __init__(self, entries: list[dict[str, Any]], speed: float = 0.0):
+        """Initialize the player.
+
+        Args:
+            entries: Recorded exchanges (see load_cassette).
+            speed: Latency scaling; 0 replays instantly, 1 at the recorded
+                latency, 2 at half of it.
+        """
+        self.speed = speed
+        self.served = 0
+        self._exchanges: dict[str, list[dict[str, Any]]] = {}
+        self._positions: dict[str, int] = {}
+        for entry in entries:
+            key = match_key(entry["method"], httpx.URL(entry["url"]), _decode_body(entry, "request_"))
+            self._exchanges.setdefault(key, []).append(entry)
+
+    def lookup(self, request: httpx.Request) -> tuple[dict[str, Any], float]:
+        """Find the next recorded exchange for a request.
+
+        Returns:
+            (exchange, seconds to wait before answering).
+
+        Raises:
+            CassetteMiss: If the request was never recorded.
+        """
+        key = match_key(request.method, request.url, request.content)
+        exchanges = self._exchanges.get(key)
+        if not exchanges:
+            raise CassetteMiss(f"No recorded response for {request.method} {request.url}", request=request)
+        position = self._positions.get(key, 0)
+        self._positions[key] = position + 1
+        self.served += 1
+        entry = exchanges[position % len(exchanges)]
+        delay = entry["elapsed"] / self.speed if self.speed > 0 else 0.0
+        return entry, delay
+
+
+class _ReplayStream(httpx.SyncByteStream, httpx.AsyncByteStream):
+    """Yield a recorded body in fixed-size chunks, like a socket would."""
+
+    def __init__(self, body: bytes):
+        self._body = body
+
+    def _chunks(self) -> Iterator[bytes]:
+        for start in range(0, len(self._body), REPLAY_CHUNK_SIZE):
+            yield self._body[start:start + REPLAY_CHUNK_SIZE]
+
+    def __iter__(self) -> Iterator[bytes]:
+        return self._chunks()
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for chunk in self._chunks():
+            yield chunk
+
+
+def _replayed_response(entry: dict[str, Any], request: httpx.Request) -> httpx.Response:
+    headers = [(name, value) for name, value in entry["response_headers"]]
+    return httpx.Response(
+        entry["status"],
+        headers=headers,
+        stream=_ReplayStream(_decode_body(entry)),
+        request=request,
+    )
+
+
+class RecordingTransport(httpx.BaseTransport):
+    """Pass requests to a real transport and record the exchanges."""
+
+    def __init__(self, recorder: Recorder, inner: httpx.BaseTransport):
+        self.recorder = recorder
+        self.inner = inner
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        response = self.inner.handle_request(request)
+        try:
+            # Raw bytes: any Content-Encoding is decoded by the client later
+            body = b"".join(response.iter_raw())
+        finally:
+            response.close()
+        self.recorder.add(request, response.headers, response.status_code, body,
+                          started, time.perf_counter() - started)
+        return httpx.Response(response.status_code, headers=response.headers,
+                              content=body, request=request)
+
+    def close(self) -> None:
+        self.inner.close()
+
+
+class AsyncRecordingTransport(httpx.AsyncBaseTransport):
+    """Async counterpart of RecordingTransport."""
+
+    def __init__(self, recorder: Recorder, inner: httpx.AsyncBaseTransport):
+        self.recorder = recorder
+        self.inner = inner
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        response = await self.inner.handle_async_request(request)
+        try:
+            body = b"".join([chunk async for chunk in response.aiter_raw()])
+        finally:
+            await response.aclose()
+        self.recorder.add(request, response.headers, response.status_code, body,
+                          started, time.perf_counter() - started)
+        return httpx.Response(response.status_code, headers=response.headers,
+                              content=body, request=request)
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+class ReplayTransport(httpx.BaseTransport):
+    """Answer requests from a cassette."""
+
+    def __init__(self, player: Player):
+        self.player = player
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.read()
+        entry, delay = self.player.lookup(request)
+        if delay:
+            time.sleep(delay)
+        return _replayed_response(entry, request)
+
+
+class AsyncReplayTransport(httpx.AsyncBaseTransport):
+    """Async counterpart of ReplayTransport."""
+
+    def __init__(self, player: Player):
+        self.player = player
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        import asyncio
+
+        await request.aread()
+        entry, delay = self.player.lookup(request)
+        if delay:
+            await asyncio.sleep(delay)
+        return _replayed_response(entry, request)
+
+
+class CassetteSession:
+    """A recording or replay in progress for this process."""
+
+    def __init__(self, recorder: Optional[Recorder] = None, player: Optional[Player] = None):
+        self.recorder = recorder
+        self.player = player
+
+    @property
+    def replaying(self) -> bool:
+        return self.player is not None
+
+    def transport(self, **transport_options: Any) -> httpx.BaseTransport:
+        """Build the transport for a sync client.
+
+        Args:
+            **transport_options: Options for the real httpx.HTTPTransport
+                (limits, http2) used when recording.
+        """
+        if self.player is not None:
+            return ReplayTransport(self.player)
+        return RecordingTransport(self.recorder, httpx.HTTPTransport(**transport_options))
+
+    def async_transport(self, **transport_options: Any) -> httpx.AsyncBaseTransport:
+        """Build the transport for an async client (see ``transport``)."""
+        if self.player is not None:
+            return AsyncReplayTransport(self.player)
+        return AsyncRecordingTransport(self.recorder, httpx.AsyncHTTPTransport(**transport_options))
+
+    def close(self) -> None:
+        """Write the recording, if any.
+
+        Raises:
+            CassetteError: If the cassette cannot be written.
+        """
+        if self.recorder is not None:
+            self.recorder.save()
+
+
+_session: Optional[CassetteSession] = None
+
+
+def start_recording(path: str) -> CassetteSession:
+    """Record all client traffic of this process to ``path``."""
+    global _session
+    _session = CassetteSession(recorder=Recorder(path))
+    return _session
+
+
+def start_replay(path: str, speed: float = 0.0) -> CassetteSession:
+    """Serve all client traffic of this process from ``path``.
+
+    Raises:
+        CassetteError: If the cassette cannot be read.
+    """
+    global _session
+    _session = CassetteSession(player=Player(load_cassette(path), speed))
+    return _session
+
+
+def stop_session() -> None:
+    """End the active session, writing any recording.
+
+    Raises:
+        CassetteError: If the cassette cannot be written.
+    """
+    global _session
+    session, _session = _session, None
+    if session is not None:
+        session.close()
+
+
+def active_session() -> Optional[CassetteSession]:
+    """The recording or replay session in progress, if any."""
+    return _session
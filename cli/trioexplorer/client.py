@@ -1,28 +1,91 @@
 """HTTP client for the Search API."""
 
 import sys
-from typing import Any, Optional
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
 
 import httpx
 from rich.console import Console
 
-from .config import get_api_url
-from .auth import get_auth_headers, check_auth_error
+from .config import DEFAULT_MAX_CONNECTIONS, get_api_url
+from .auth import get_auth_headers
+from .cache import ResponseCache
+from .cassette import active_session
+from .errors import translate_error
+from .retry import DEFAULT_MAX_RETRIES, RetryPolicy, TokenBucket
+from .stream import StreamDecodeError, StreamedResponse
+from .timings import NULL_TRACE, RequestTrace, request_trace
 
 console = Console(stderr=True)
 
 # Default timeout in seconds
 DEFAULT_TIMEOUT = 60.0
 
+# Default connection pool limits (DEFAULT_MAX_CONNECTIONS lives in config)
+DEFAULT_MAX_KEEPALIVE = 10
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+
+
+def build_limits(
+    max_connections: int = DEFAULT_MAX_CONNECTIONS,
+    max_keepalive: int = DEFAULT_MAX_KEEPALIVE,
+    keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+) -> httpx.Limits:
+    """Build connection pool limits for the HTTP transport.
+
+    Args:
+        max_connections: Maximum number of concurrent connections.
+        max_keepalive: Maximum number of idle keep-alive connections.
+        keepalive_expiry: Seconds an idle connection is kept open.
+
+    Returns:
+        Configured httpx.Limits instance.
+    """
+    return httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=min(max_keepalive, max_connections),
+        keepalive_expiry=keepalive_expiry,
+    )
+
+
+def http2_available() -> bool:
+    """Check whether the optional h2 package needed for HTTP/2 is installed."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
 
 class SearchClient:
-    """HTTP client wrapper for the Search API."""
+    """HTTP client wrapper for the Search API.
+
+    The client owns a single pooled ``httpx.Client`` so that consecutive
+    requests reuse keep-alive connections instead of paying a new TCP/TLS
+    handshake each time. Use it as a context manager or call ``close()``
+    when done.
+
+    When a ResponseCache is supplied, cacheable GET responses are served
+    from and stored in it; the client takes ownership and closes it.
+
+    Transient failures are retried according to ``retry_policy`` before an
+    error is reported, and an optional TokenBucket paces outgoing requests.
+    """
 
     def __init__(
         self,
         base_url: Optional[str] = None,
         debug: bool = False,
         timeout: float = DEFAULT_TIMEOUT,
+        http2: bool = False,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        max_keepalive: int = DEFAULT_MAX_KEEPALIVE,
+        keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+        cache: Optional[ResponseCache] = None,
+        refresh: bool = False,
+        retry_policy: Optional[RetryPolicy] = None,
+        rate_limiter: Optional[TokenBucket] = None,
     ):
         """Initialize the client.
 
@@ -30,11 +93,60 @@ class SearchClient:
             base_url: Override for the API base URL.
             debug: Enable debug logging of requests/responses.
             timeout: Request timeout in seconds.
+            http2: Enable HTTP/2 multiplexing (requires the ``h2`` package).
+            max_connections: Maximum number of pooled connections.
+            max_keepalive: Maximum number of idle keep-alive connections.
+            keepalive_expiry: Seconds an idle connection is kept open.
+            cache: Optional on-disk response cache.
+            refresh: Skip cache reads (responses are still stored).
+            retry_policy: Retry policy (defaults to RetryPolicy()).
+            rate_limiter: Optional token bucket shared by all requests.
         """
+        session = active_session()
         self.base_url = get_api_url(base_url)
         self.debug = debug
         self.timeout = timeout
-        self.headers = get_auth_headers(require_auth=True)
+        self.headers = get_auth_headers(require_auth=session is None or not session.replaying)
+        self.cache = cache
+        self.refresh = refresh
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.rate_limiter = rate_limiter
+
+        if http2 and not http2_available():
+            console.print("[yellow]HTTP/2 requested but 'h2' is not installed; using HTTP/1.1[/yellow]")
+            console.print("[dim]Install with: pip install 'trioexplorer[http2]'[/dim]")
+            http2 = False
+        self.http2 = http2
+
+        limits = build_limits(max_connections, max_keepalive, keepalive_expiry)
+        self._http = httpx.Client(
+            headers=self.headers,
+            timeout=timeout,
+            limits=limits,
+            http2=http2,
+            # --record / --replay swap in a cassette transport
+            transport=session.transport(limits=limits, http2=http2) if session else None,
+        )
+
+    def close(self) -> None:
+        """Close the pooled HTTP transport and release its connections."""
+        self._http.close()
+        if self.cache is not None:
+            if self.debug:
+                console.print(f"[dim]{self.cache.format_stats()}[/dim]")
+            self.cache.close()
+            self.cache = None
+
+    @property
+    def is_closed(self) -> bool:
+        """Whether the underlying HTTP transport has been closed."""
+        return self._http.is_closed
+
+    def __enter__(self) -> "SearchClient":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
 
     def _log_request(self, method: str, url: str, **kwargs) -> None:
         """Log request details if debug is enabled."""
@@ -46,45 +158,69 @@ class SearchClient:
         if kwargs.get("json"):
             console.print(f"[dim]    json: {kwargs['json']}[/dim]")
 
-    def _log_response(self, response: httpx.Response) -> None:
+    def _log_response(self, response: httpx.Response, streaming: bool = False) -> None:
         """Log response details if debug is enabled."""
         if not self.debug:
             return
+        if streaming:
+            console.print(f"[dim]<<< {response.status_code} (streaming)[/dim]")
+            return
         console.print(f"[dim]<<< {response.status_code} ({len(response.content)} bytes)[/dim]")
 
     def _handle_error(self, error: Exception, url: str) -> None:
         """Handle request errors with user-friendly messages."""
-        if isinstance(error, httpx.HTTPStatusError):
-            auth_error = check_auth_error(
-                error.response.status_code,
-                error.response.text
-            )
-            if auth_error:
-                console.print(f"[red]{auth_error}[/red]")
-            else:
-                try:
-                    detail = error.response.json().get("detail", error.response.text)
-                except Exception:
-                    detail = error.response.text
-                console.print(f"[red]Error {error.response.status_code}: {detail}[/red]")
-            sys.exit(1)
-
-        elif isinstance(error, httpx.ConnectError):
-            console.print(f"[red]Cannot connect to Search API at {self.base_url}[/red]")
-            console.print("[dim]Is the server running?[/dim]")
-            sys.exit(1)
-
-        elif isinstance(error, httpx.TimeoutException):
-            console.print(f"[red]Request timed out after {self.timeout}s[/red]")
-            sys.exit(1)
-
-        elif isinstance(error, httpx.RequestError):
-            console.print(f"[red]Network error: {error}[/red]")
-            sys.exit(1)
-
-        else:
-            console.print(f"[red]Unexpected error: {error}[/red]")
-            sys.exit(1)
+        api_error = translate_error(error, self.base_url, self.timeout)
+        console.print(f"[red]{api_error.message}[/red]")
+        if api_error.hint:
+            console.print(f"[dim]{api_error.hint}[/dim]")
+        sys.exit(1)
+
+    def _send(
+        self,
+        method: str,
+        url: str,
+        stream: bool = False,
+        trace: RequestTrace = NULL_TRACE,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """Send a request, retrying transient failures per the retry policy.
+
+        Args:
+            method: HTTP method.
+            url: Full request URL.
+            stream: Return as soon as headers arrive, leaving the body
+                unread (the caller must close the response).
+            trace: Per-phase timings of the request (see --timings).
+            **kwargs: Passed to httpx (params, json, ...).
+
+        Raises:
+            Exception: The last error once retries are exhausted.
+        """
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            trace.attempt()
+            try:
+                request = self._http.build_request(method, url, extensions=trace.extensions, **kwargs)
+                response = self._http.send(request, stream=stream)
+                self._log_response(response, streaming=stream)
+                if stream and response.is_error:
+                    # Read the (small) error body so error handling can use it.
+                    response.read()
+                response.raise_for_status()
+                return response
+            except Exception as error:
+                delay = self.retry_policy.next_delay(method, attempt, error)
+                if delay is None:
+                    raise
+                if self.debug:
+                    console.print(
+                        f"[yellow]    retry {attempt + 1}/{self.retry_policy.max_retries} "
+                        f"in {delay:.2f}s ({error})[/yellow]"
+                    )
+                time.sleep(delay)
+                attempt += 1
 
     def get(self, path: str, params: Optional[dict] = None) -> dict[str, Any]:
         """Make a GET request to the API.
@@ -100,17 +236,93 @@ class SearchClient:
             SystemExit: On any request error.
         """
         url = f"{self.base_url}{path}"
+        cache_entry = None
+        if self.cache is not None:
+            cache_entry = self.cache.key_for(
+                self.base_url, path, params, self.headers.get("X-API-Key", "")
+            )
+        if cache_entry and not self.refresh:
+            cached = self.cache.get(cache_entry[0])
+            if cached is not None:
+                if self.debug:
+                    console.print(f"[dim]>>> GET {url} (cache hit)[/dim]")
+                return cached
+
         self._log_request("GET", url, params=params)
 
+        trace = request_trace("GET", url)
         try:
-            with httpx.Client(timeout=self.timeout) as client:
-                response = client.get(url, headers=self.headers, params=params)
-                self._log_response(response)
-                response.raise_for_status()
-                return response.json()
+            response = self._send("GET", url, trace=trace, params=params)
+            with trace.phase("decode"):
+                data = response.json()
         except Exception as error:
+            trace.finish(error=error)
             self._handle_error(error, url)
             raise  # For type checker; _handle_error always exits
+        trace.finish(response.status_code, num_bytes=response.num_bytes_downloaded)
+
+        if cache_entry:
+            self.cache.put(cache_entry[0], path, data, cache_entry[1])
+        return data
+
+    @contextmanager
+    def stream_get(
+        self,
+        path: str,
+        params: Optional[dict] = None,
+        array_key: str = "results",
+    ) -> Iterator[StreamedResponse]:
+        """Make a GET request and decode one array of the response incrementally.
+
+        Elements of ``array_key`` are yielded as they arrive off the socket,
+        so peak memory stays flat regardless of response size. Streamed
+        responses bypass the response cache.
+
+        Args:
+            path: API endpoint path (e.g., "/search")
+            params: Query parameters
+            array_key: Top-level array to stream (default: "results")
+
+        Yields:
+            StreamedResponse to iterate; other top-level members (such as
+            ``metadata``) are complete once iteration finishes.
+
+        Raises:
+            SystemExit: On any request or decoding error.
+        """
+        url = f"{self.base_url}{path}"
+        self._log_request("GET", url, params=params)
+
+        # The download phase of a streamed response spans its consumption
+        trace = request_trace("GET", url)
+        try:
+            response = self._send("GET", url, stream=True, trace=trace, params=params)
+        except Exception as error:
+            trace.finish(error=error)
+            self._handle_error(error, url)
+            raise
+
+        def _chunks() -> Iterator[bytes]:
+            try:
+                yield from response.iter_bytes()
+            except Exception as error:
+                self._handle_error(error, url)
+
+        def _on_complete(streamed: StreamedResponse) -> None:
+            if self.debug:
+                console.print(
+                    f"[dim]<<< streamed {streamed.item_count} items "
+                    f"({response.num_bytes_downloaded} bytes)[/dim]"
+                )
+
+        try:
+            yield StreamedResponse(_chunks(), array_key, on_complete=_on_complete)
+        except StreamDecodeError as error:
+            trace.finish(response.status_code, error=error)
+            self._handle_error(error, url)
+        finally:
+            response.close()
+            trace.finish(response.status_code, num_bytes=response.num_bytes_downloaded)
 
     def post(self, path: str, json_data: Optional[dict] = None) -> dict[str, Any]:
         """Make a POST request to the API.
@@ -128,21 +340,30 @@ class SearchClient:
         url = f"{self.base_url}{path}"
         self._log_request("POST", url, json=json_data)
 
+        trace = request_trace("POST", url)
         try:
-            with httpx.Client(timeout=self.timeout) as client:
-                response = client.post(url, headers=self.headers, json=json_data)
-                self._log_response(response)
-                response.raise_for_status()
-                return response.json()
+            response = self._send("POST", url, trace=trace, json=json_data)
+            with trace.phase("decode"):
+                data = response.json()
         except Exception as error:
+            trace.finish(error=error)
             self._handle_error(error, url)
             raise
+        trace.finish(response.status_code, num_bytes=response.num_bytes_downloaded)
+        return data
 
 
 def create_client(
     base_url: Optional[str] = None,
     debug: bool = False,
     timeout: float = DEFAULT_TIMEOUT,
+    http2: bool = False,
+    max_connections: int = DEFAULT_MAX_CONNECTIONS,
+    max_keepalive: int = DEFAULT_MAX_KEEPALIVE,
+    cache: Optional[ResponseCache] = None,
+    refresh: bool = False,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    rate_limit: Optional[float] = None,
 ) -> SearchClient:
     """Create a configured SearchClient instance.
 
@@ -150,8 +371,26 @@ def create_client(
         base_url: Override for the API base URL.
         debug: Enable debug logging.
         timeout: Request timeout in seconds.
+        http2: Enable HTTP/2 multiplexing.
+        max_connections: Maximum number of pooled connections.
+        max_keepalive: Maximum number of idle keep-alive connections.
+        cache: Optional on-disk response cache.
+        refresh: Skip cache reads (responses are still stored).
+        max_retries: Retries for transient failures (0 disables retrying).
+        rate_limit: Maximum sustained requests per second (None for unlimited).
 
     Returns:
         Configured SearchClient instance.
     """
-    return SearchClient(base_url=base_url, debug=debug, timeout=timeout)
+    return SearchClient(
+        base_url=base_url,
+        debug=debug,
+        timeout=timeout,
+        http2=http2,
+        max_connections=max_connections,
+        max_keepalive=max_keepalive,
+        cache=cache,
+        refresh=refresh,
+        retry_policy=RetryPolicy(max_retries=max_retries),
+        rate_limiter=TokenBucket(rate_limit) if rate_limit else None,
+    )
@@ -0,0 +1,332 @@
+"""Columnar (Parquet / Arrow IPC) output for the Trioexplorer CLI.
+
+Rows are converted to typed Arrow record batches as they are consumed:
+scores are float64, ``note_date`` is a date, timestamps are UTC timestamps,
+and low-cardinality columns such as ``note_type`` and ``patient_id`` are
+dictionary-encoded. Dictionaries are kept stable across batches (new values
+are appended), so Arrow IPC files only carry dictionary deltas and can be
+memory-mapped and read without copying.
+
+pyarrow is an optional dependency (``pip install 'trioexplorer[arrow]'``)
+and is only imported when a columnar format is requested.
+"""
+
+import datetime
+from typing import TYPE_CHECKING, Any, BinaryIO, Iterable, Optional
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+# Output formats handled by this module
+COLUMNAR_FORMATS = ("parquet", "arrow")
+
+# Rows per record batch
+DEFAULT_BATCH_SIZE = 10_000
+
+# Parquet compression codec
+PARQUET_COMPRESSION = "zstd"
+
+# Column kinds: float, int, string, category (dictionary-encoded string),
+# date and timestamp
+SEARCH_COLUMNS = [
+    ("score", "float"),
+    ("distance", "float"),
+    ("keyword_score", "float"),
+    ("patient_id", "category"),
+    ("encounter_id", "string"),
+    ("note_id", "string"),
+    ("note_date", "date"),
+    ("note_type", "category"),
+    ("text_full", "string"),
+    ("text_chunk", "string"),
+    ("chunk_id", "string"),
+    ("chunk_index", "int"),
+    ("chunk_count", "int"),
+    ("note_quality_score", "float"),
+    ("chunk_quality_score", "float"),
+]
+
+HISTORY_COLUMNS = [
+    ("id", "string"),
+    ("search_type", "category"),
+    ("query", "string"),
+    ("result_count", "int"),
+    ("duration_ms", "float"),
+    ("status_code", "int"),
+    ("user_id", "category"),
+    ("created_at", "timestamp"),
+]
+
+NOTETYPE_COLUMNS = [
+    ("id", "string"),
+    ("note_type", "category"),
+    ("note_count", "int"),
+    ("first_seen_at", "timestamp"),
+    ("last_seen_at", "timestamp"),
+]
+
+FILTER_FIELD_COLUMNS = [
+    ("field_name", "string"),
+    ("field_category", "category"),
+    ("value_count", "int"),
+]
+
+FILTER_VALUE_COLUMNS = [
+    ("text_value", "string"),
+    ("cui", "string"),
+    ("occurrence_count", "int"),
+]
+
+# Every value of a namespace, as written by export filters
+FILTER_EXPORT_COLUMNS = [
+    ("field_name", "category"),
+    ("text_value", "string"),
+    ("cui", "string"),
+    ("occurrence_count", "int"),
+]
+
+
+class ColumnarUnavailableError(ImportError):
+    """pyarrow is not installed."""
+
+
+def import_pyarrow() -> Any:
+    """Import pyarrow, raising ColumnarUnavailableError if it is missing."""
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ColumnarUnavailableError(
+            "Parquet and Arrow output require pyarrow. "
+            "Install with: pip install 'trioexplorer[arrow]'"
+        ) from e
+    return pyarrow
+
+
+def arrow_type(kind: str) -> "pa.DataType":
+    """Map a column kind to its Arrow type."""
+    pa = import_pyarrow()
+    return {
+        "float": pa.float64(),
+        "int": pa.int64(),
+        "string": pa.string(),
+        "category": pa.dictionary(pa.int32(), pa.string()),
+        "date": pa.date32(),
+        "timestamp": pa.timestamp("us", tz="UTC"),
+    }[kind]
+
+
+def build_schema(columns: list[tuple[str, str]]) -> "pa.Schema":
+    """Build the Arrow schema for a column specification."""
+    pa = import_pyarrow()
+    return pa.schema([(name, arrow_type(kind)) for name, kind in columns])
+
+
+def _to_string(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+def _to_number(cast: type) -> Any:
+    """Build a converter that also accepts numeric strings (e.g. from CSV)."""
+    def convert(value: Any) -> Any:
+        if not isinstance(value, str):
+            return value
+        try:
+            return cast(value) if value.strip() else None
+        except ValueError:
+            return None
+    return convert
+
+
+def _to_date(value: Any) -> Optional[datetime.date]:
+    """Parse an ISO date (or the date part of a datetime); None if invalid."""
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date) or value is None:
+        return value
+    try:
+        return datetime.date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+def _to_timestamp(value: Any) -> Optional[datetime.datetime]:
+    """Parse an ISO timestamp; naive values are taken as UTC."""
+    if value is None or isinstance(value, datetime.datetime):
+        parsed = value
+    else:
+        try:
+            parsed = datetime.datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if parsed is not None and parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed
+
+
+class _DictionaryEncoder:
+    """Incrementally dictionary-encode a string column.
+
+    Indices are stable across batches and each batch's dictionary extends
+    the previous one, which Arrow IPC writers emit as a delta.
+    """
+
+    def __init__(self):
+        self._index: dict[str, int] = {}
+        self._values: list[str] = []
+
+    def encode(self, values: list[Any]) -> "pa.DictionaryArray":
+        pa = import_pyarrow()
+        indices: list[Optional[int]] = []
+        for value in values:
+            if value is None:
+                indices.append(None)
+                continue
+            value = str(value)
+            index = self._index.get(value)
+            if index is None:
+                index = self._index[value] = len(self._values)
+                self._values.append(value)
+            indices.append(index)
+        return pa.DictionaryArray.from_arrays(
+            pa.array(indices, type=pa.int32()),
+            pa.array(self._values, type=pa.string()),
+        )
+
+
+# Per-kind value converters applied before building Arrow arrays
+_CONVERTERS = {
+    "float": _to_number(float),
+    "int": _to_number(int),
+    "string": _to_string,
+    "date": _to_date,
+    "timestamp": _to_timestamp,
+}
+
+
+def rows_to_record_batch(
+    rows: list[dict],
+    columns: list[tuple[str, str]],
+    encoders: Optional[dict[str, _DictionaryEncoder]] = None,
+) -> "pa.RecordBatch":
+    """Convert rows to a typed record batch.
+
+    Args:
+        rows: Row dictionaries; missing fields become nulls.
+        columns: (name, kind) pairs selecting and typing the columns.
+        encoders: Dictionary encoders for category columns, shared across
+            batches to keep dictionaries stable (new ones if omitted).
+    """
+    pa = import_pyarrow()
+    arrays = []
+    for name, kind in columns:
+        values = [row.get(name) for row in rows]
+        if kind == "category":
+            encoder = encoders.get(name) if encoders is not None else None
+            arrays.append((encoder or _DictionaryEncoder()).encode(values))
+        else:
+            convert = _CONVERTERS[kind]
+            arrays.append(pa.array([convert(v) for v in values], type=arrow_type(kind)))
+    return pa.record_batch(arrays, schema=build_schema(columns))
+
+
+def rows_to_table(rows: list[dict], columns: list[tuple[str, str]]) -> "pa.Table":
+    """Convert rows to a typed Arrow table."""
+    pa = import_pyarrow()
+    return pa.Table.from_batches([rows_to_record_batch(rows, columns)])
+
+
+class ColumnarWriter:
+    """Write rows as typed record batches to a Parquet or Arrow IPC file.
+
+    Use as a context manager or call ``close()`` to finish the file.
+    """
+
+    def __init__(
+        self,
+        sink: BinaryIO,
+        columns: list[tuple[str, str]],
+        fmt: str,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ):
+        """Initialize the writer.
+
+        Args:
+            sink: Binary stream receiving the file (need not be seekable).
+            columns: (name, kind) pairs selecting and typing the columns.
+            fmt: Either "parquet" or "arrow" (Arrow IPC file format).
+            batch_size: Rows per record batch.
+
+        Raises:
+            ColumnarUnavailableError: If pyarrow is not installed.
+            ValueError: If the format is unknown.
+        """
+        if fmt not in COLUMNAR_FORMATS:
+            raise ValueError(f"Unknown columnar format: {fmt}")
+        pa = import_pyarrow()
+
+        self.columns = columns
+        self.fmt = fmt
+        self.batch_size = batch_size
+        self.schema = build_schema(columns)
+        self.row_count = 0
+        self._encoders = {name: _DictionaryEncoder() for name, kind in columns if kind == "category"}
+        self._buffer: list[dict] = []
+        self._sink = pa.PythonFile(sink, mode="w")
+
+        if fmt == "parquet":
+            import pyarrow.parquet as pq
+
+            self._writer = pq.ParquetWriter(self._sink, self.schema, compression=PARQUET_COMPRESSION)
+        else:
+            self._writer = pa.ipc.new_file(
+                self._sink,
+                self.schema,
+                options=pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True),
+            )
+
+    def __enter__(self) -> "ColumnarWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _flush(self) -> None:
+        """Write buffered rows as one record batch."""
+        if not self._buffer:
+            return
+        self._writer.write_batch(rows_to_record_batch(self._buffer, self.columns, self._encoders))
+        self.row_count += len(self._buffer)
+        self._buffer = []
+
+    def write_rows(self, rows: Iterable[dict]) -> None:
+        """Buffer rows, writing a record batch every ``batch_size`` rows."""
+        for row in rows:
+            self._buffer.append(row)
+            if len(self._buffer) >= self.batch_size:
+                self._flush()
+
+    def close(self) -> None:
+        """Write remaining rows and the file footer."""
+        if self._writer is None:
+            return
+        self._flush()
+        self._writer.close()
+        self._writer = None
+        self._sink.flush()
+
+
+def write_columnar(
+    rows: Iterable[dict],
+    columns: list[tuple[str, str]],
+    fmt: str,
+    sink: BinaryIO,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """Write rows to ``sink`` in a columnar format.
+
+    Returns:
+        Number of rows written.
+    """
+    with ColumnarWriter(sink, columns, fmt, batch_size) as writer:
+        writer.write_rows(rows)
+    return writer.row_count
@@ -0,0 +1,208 @@
+"""Analyze commands for the Trioexplorer CLI."""
+
+import argparse
+import sys
+
+from ..analyze import SORT_KEYS
+from ..paging import DEFAULT_CONCURRENCY, MAX_PAGE_SIZE
+
+# Default number of templates listed
+DEFAULT_TOP = 10
+
+# Default minimum number of searches for a template to be ranked
+DEFAULT_MIN_COUNT = 5
+
+
+def add_analyze_parser(subparsers: argparse._SubParsersAction) -> None:
+    """Add the analyze command parser."""
+    analyze_parser = subparsers.add_parser(
+        "analyze",
+        help="Analyze the search history",
+        description="Analyze search history entries.",
+    )
+
+    analyze_subparsers = analyze_parser.add_subparsers(
+        dest="analyze_command",
+        title="analyses",
+        description="Available analyses",
+    )
+
+    slow_parser = analyze_subparsers.add_parser(
+        "slow",
+        help="Find which search parameters make searches slow",
+        description=(
+            "Relate duration_ms of past searches to their parameters (k, rerank, "
+            "chunk-multiplier, top_k_retrieval, distinct, cohort count, filter "
+            "conditions, search type). Reports the marginal cost of each parameter "
+            "from a least-squares fit and the slowest parameter combinations."
+        ),
+    )
+    slow_parser.add_argument(
+        "--local",
+        action="store_true",
+        help="Read the local mirror kept by 'history sync' instead of the API",
+    )
+    slow_parser.add_argument(
+        "--date-from",
+        metavar="DATE",
+        help="Filter from date (ISO format)",
+    )
+    slow_parser.add_argument(
+        "--date-to",
+        metavar="DATE",
+        help="Filter to date (ISO format)",
+    )
+    slow_parser.add_argument(
+        "--user-id",
+        metavar="ID",
+        help="Filter by user ID",
+    )
+    slow_parser.add_argument(
+        "--type",
+        dest="search_type",
+        choices=["hybrid", "semantic", "keyword"],
+        help="Filter by search type",
+    )
+    slow_parser.add_argument(
+        "--top",
+        type=int,
+        default=DEFAULT_TOP,
+        metavar="NUM",
+        help=f"Parameter combinations to list (default: {DEFAULT_TOP})",
+    )
+    slow_parser.add_argument(
+        "--min-count",
+        type=int,
+        default=DEFAULT_MIN_COUNT,
+        metavar="NUM",
+        help=f"Ignore combinations seen fewer times (default: {DEFAULT_MIN_COUNT})",
+    )
+    slow_parser.add_argument(
+        "--sort",
+        choices=SORT_KEYS,
+        default="p95",
+        help="Rank combinations by p95 latency or by total time spent (default: p95)",
+    )
+    slow_parser.add_argument(
+        "-j", "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        metavar="NUM",
+        help=f"Pages fetched at once from the API (default: {DEFAULT_CONCURRENCY})",
+    )
+    slow_parser.add_argument(
+        "--max-pages",
+        type=int,
+        metavar="NUM",
+        help="Stop after this many pages from the API (default: all)",
+    )
+    slow_parser.add_argument(
+        "-o", "--format",
+        dest="output_format",
+        choices=["table", "json"],
+        default="table",
+        help="Output format (default: table)",
+    )
+
+
+def run_analyze(args: argparse.Namespace) -> None:
+    """Execute the analyze command."""
+    if args.analyze_command == "slow":
+        run_analyze_slow(args)
+    else:
+        from rich.console import Console
+        console = Console(stderr=True)
+        console.print("[red]Please specify an analysis: slow[/red]")
+        raise SystemExit(1)
+
+
+def run_analyze_slow(args: argparse.Namespace) -> None:
+    """Relate search durations to search parameters."""
+    import sqlite3
+
+    from rich.console import Console
+
+    from ..analyze import SlowQueryAnalyzer
+    from ..errors import SearchAPIError
+    from ..output import output_json, output_slow_report
+
+    console = Console(stderr=True)
+    if args.top < 1 or args.min_count < 1:
+        console.print("[red]--top and --min-count must be at least 1[/red]")
+        sys.exit(1)
+    if args.concurrency < 1:
+        console.print("[red]--concurrency must be at least 1[/red]")
+        sys.exit(1)
+
+    analyzer = SlowQueryAnalyzer()
+    failed_pages: list[int] = []
+    if args.local:
+        from ..mirror import HistoryMirror
+
+        try:
+            with HistoryMirror() as mirror:
+                analyzer.add_all(mirror.entries(
+                    search_type=args.search_type,
+                    user_id=args.user_id,
+                    date_from=args.date_from,
+                    date_to=args.date_to,
+                ))
+        except (OSError, sqlite3.Error) as e:
+            console.print(f"[red]Cannot read the history mirror: {e}[/red]")
+            sys.exit(1)
+    else:
+        try:
+            failed_pages = _analyze_from_api(analyzer, args)
+        except SearchAPIError as e:
+            console.print(f"[red]{e.message}[/red]")
+            if e.hint:
+                console.print(f"[dim]{e.hint}[/dim]")
+            sys.exit(1)
+
+    report = analyzer.report(top=args.top, min_count=args.min_count, sort=args.sort)
+    for page in failed_pages:
+        console.print(f"[red]page {page} could not be read[/red]")
+
+    if args.output_format == "json":
+        output_json({**report, "failed_pages": failed_pages})
+    else:
+        output_slow_report(report, args.sort)
+
+    if failed_pages:
+        sys.exit(1)
+
+
+def _analyze_from_api(analyzer, args: argparse.Namespace) -> list[int]:
+    """Feed /search-history pages into the analyzer; returns failed page numbers."""
+    import asyncio
+
+    from ..async_client import create_async_client
+    from ..paging import Pager
+
+    params = {}
+    if args.date_from:
+        params["date-from"] = args.date_from
+    if args.date_to:
+        params["date-to"] = args.date_to
+    if args.user_id:
+        params["user-id"] = args.user_id
+    if args.search_type:
+        params["search-type"] = args.search_type
+
+    async def _run() -> list[int]:
+        async with create_async_client(
+            base_url=args.api_url,
+            debug=args.debug,
+            http2=args.http2,
+            max_concurrency=args.concurrency,
+            per_host_limit=args.concurrency,
+            max_retries=args.retries,
+            rate_limit=args.rate_limit,
+        ) as client:
+            pager = Pager(client, "/search-history", params, MAX_PAGE_SIZE,
+                          args.concurrency, args.max_pages)
+            async for _, response in pager:
+                analyzer.add_all(response.get("items", []))
+            return [error["page"] for error in pager.errors]
+
+    return asyncio.run(_run())
@@ -0,0 +1,368 @@
+"""Batch search command for the Trioexplorer CLI."""
+
+import argparse
+import json
+import sys
+import time
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Optional, TextIO
+
+from ..metrics import format_ms, summarize_latencies
+from .common import add_cache_options
+from .search import (
+    add_search_options,
+    aload_entity_vocabulary,
+    build_filters_from_args,
+    build_search_params,
+    check_params_entities,
+    entity_check_namespace,
+)
+
+if TYPE_CHECKING:
+    from ..async_client import AsyncSearchClient
+
+# Default number of concurrent searches
+DEFAULT_PARALLELISM = 8
+
+# Per-query fields that may override the command-line defaults
+OVERRIDABLE_FIELDS = {
+    "query",
+    "k",
+    "search_type",
+    "distinct",
+    "cohort_ids",
+    "patient_id",
+    "encounter_id",
+    "note_types",
+    "date_from",
+    "date_to",
+    "include_noise",
+    "rerank",
+    "vector_weight",
+    "top_k_retrieval",
+    "distance_threshold",
+    "chunk_multiplier",
+    "min_quality_score",
+    "min_chunk_quality_score",
+    "filters",
+    "entity_filters",
+}
+
+# Alternative spellings accepted in query records
+FIELD_ALIASES = {
+    "type": "search_type",
+}
+
+
+def add_batch_parser(subparsers: argparse._SubParsersAction) -> None:
+    """Add the batch-search command parser."""
+    parser = subparsers.add_parser(
+        "batch-search",
+        help="Run many searches concurrently",
+        description=(
+            "Run many searches concurrently and stream one JSONL record per query. "
+            "Input lines are either plain query text or JSON objects with a 'query' "
+            "key and optional per-query overrides (k, filters, entity_filters, "
+            "cohort_ids, ...). Command-line search options apply as defaults."
+        ),
+    )
+
+    parser.add_argument(
+        "input",
+        nargs="?",
+        default="-",
+        help="Query file (JSONL or one query per line); '-' reads stdin (default)",
+    )
+
+    parser.add_argument(
+        "-j", "--parallelism",
+        type=int,
+        default=DEFAULT_PARALLELISM,
+        metavar="NUM",
+        help=f"Number of concurrent searches (default: {DEFAULT_PARALLELISM})",
+    )
+
+    parser.add_argument(
+        "--output",
+        metavar="FILE",
+        help="Write JSONL results to FILE instead of stdout",
+    )
+
+    add_search_options(parser)
+    add_cache_options(parser)
+
+
+def parse_batch_line(line: str) -> Optional[dict[str, Any]]:
+    """Parse one input line into a query record.
+
+    Args:
+        line: Raw input line.
+
+    Returns:
+        Query record, or None for blank lines and ``#`` comments.
+
+    Raises:
+        ValueError: If a JSON line is malformed or has no query.
+    """
+    text = line.strip()
+    if not text or text.startswith("#"):
+        return None
+
+    if not text.startswith("{"):
+        return {"query": text}
+
+    try:
+        record = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON: {e}") from e
+    if not isinstance(record, dict) or not record.get("query"):
+        raise ValueError("JSON records must be objects with a 'query' field")
+    return record
+
+
+def read_batch_records(lines: Iterable[str]) -> Iterator[tuple[int, Any]]:
+    """Yield (line number, record) pairs from input lines.
+
+    Malformed lines yield their ValueError instead of a record so they can
+    be reported in the output stream without aborting the batch.
+    """
+    for lineno, line in enumerate(lines, 1):
+        try:
+            record = parse_batch_line(line)
+        except ValueError as e:
+            yield lineno, e
+            continue
+        if record is not None:
+            yield lineno, record
+
+
+def _parse_json_field(value: Any, name: str) -> Any:
+    """Accept JSON fields either pre-parsed or as JSON strings."""
+    if value is None or not isinstance(value, str):
+        return value
+    try:
+        return json.loads(value)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON for {name}: {e}") from e
+
+
+def build_query_args(defaults: argparse.Namespace, record: dict[str, Any]) -> argparse.Namespace:
+    """Merge a query record over the command-line defaults.
+
+    Args:
+        defaults: Parsed batch-search arguments.
+        record: Query record with optional overrides.
+
+    Returns:
+        Namespace usable with build_filters_from_args and build_search_params.
+
+    Raises:
+        ValueError: If the record contains an unknown field.
+    """
+    merged = vars(defaults).copy()
+    for key, value in record.items():
+        if key == "id":
+            continue
+        dest = key.replace("-", "_")
+        dest = FIELD_ALIASES.get(dest, dest)
+        if dest not in OVERRIDABLE_FIELDS:
+            raise ValueError(f"Unknown field '{key}'")
+        if dest in ("cohort_ids", "note_types") and isinstance(value, list):
+            value = ",".join(str(v) for v in value)
+        merged[dest] = value
+    return argparse.Namespace(**merged)
+
+
+def prepare_search_params(defaults: argparse.Namespace, record: dict[str, Any]) -> dict[str, Any]:
+    """Build /search parameters for one query record.
+
+    Raises:
+        ValueError: If the record is invalid.
+    """
+    args = build_query_args(defaults, record)
+    user_filters = _parse_json_field(args.filters, "filters")
+    entity_filters = _parse_json_field(args.entity_filters, "entity_filters")
+    filters = build_filters_from_args(args, user_filters)
+    return build_search_params(args, filters, entity_filters)
+
+
+async def execute_batch(
+    client: "AsyncSearchClient",
+    records: Iterable[tuple[int, Any]],
+    defaults: argparse.Namespace,
+    out: TextIO,
+    parallelism: int = DEFAULT_PARALLELISM,
+) -> dict[str, Any]:
+    """Run query records concurrently and stream JSONL results.
+
+    Args:
+        client: Async client used for all requests.
+        records: (line number, record or ValueError) pairs.
+        defaults: Parsed batch-search arguments used as defaults.
+        out: Stream receiving one JSON line per query as it finishes.
+        parallelism: Number of concurrent workers.
+
+    Returns:
+        Summary dictionary with counts, wall time and latency statistics.
+    """
+    import asyncio
+
+    from ..errors import APIStatusError, SearchAPIError
+    from ..output import NDJSONRowWriter
+    from ..vocabulary import unresolved
+
+    pending = iter(records)
+    vocabularies: dict[str, asyncio.Future] = {}
+    latencies: list[float] = []
+    counts = {"ok": 0, "error": 0}
+    writer = NDJSONRowWriter(out, flush_each=True)
+
+    def emit(result: dict[str, Any]) -> None:
+        counts[result["status"]] += 1
+        writer.write(result)
+
+    def vocabulary_for(namespace: str) -> asyncio.Future:
+        # Loaded once per namespace, however many workers ask at once
+        if namespace not in vocabularies:
+            vocabularies[namespace] = asyncio.ensure_future(aload_entity_vocabulary(client, namespace))
+        return vocabularies[namespace]
+
+    async def worker() -> None:
+        for lineno, record in pending:
+            result: dict[str, Any] = {"line": lineno}
+            if isinstance(record, ValueError):
+                emit({**result, "status": "error", "error": str(record)})
+                continue
+
+            result["id"] = record.get("id")
+            result["query"] = record.get("query")
+            try:
+                params = prepare_search_params(defaults, record)
+            except ValueError as e:
+                emit({**result, "status": "error", "error": str(e)})
+                continue
+
+            namespace = entity_check_namespace(defaults, params)
+            vocabulary = await vocabulary_for(namespace) if namespace is not None else None
+            if vocabulary:
+                params, issues = check_params_entities(defaults, params, vocabulary)
+                if issues:
+                    result["entity_issues"] = [issue.as_dict() for issue in issues]
+                missing = unresolved(issues)
+                if missing and defaults.check_entities in ("strict", "fix"):
+                    error = "; ".join(issue.describe() for issue in missing)
+                    emit({**result, "status": "error", "error": f"Not searched: {error}"})
+                    continue
+
+            start = time.perf_counter()
+            try:
+                response = await client.get("/search", params=params)
+            except SearchAPIError as e:
+                result["latency_ms"] = (time.perf_counter() - start) * 1000
+                result.update(status="error", error=e.message)
+                if isinstance(e, APIStatusError):
+                    result["status_code"] = e.status_code
+                emit(result)
+                continue
+
+            latency_ms = (time.perf_counter() - start) * 1000
+            latencies.append(latency_ms)
+            results = response.get("results", [])
+            result.update(
+                status="ok",
+                latency_ms=latency_ms,
+                result_count=len(results),
+                results=results,
+                metadata=response.get("metadata", {}),
+            )
+            emit(result)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, parallelism))))
+    wall_seconds = time.perf_counter() - started
+
+    total = counts["ok"] + counts["error"]
+    return {
+        "total": total,
+        "succeeded": counts["ok"],
+        "failed": counts["error"],
+        "wall_seconds": wall_seconds,
+        "throughput_qps": total / wall_seconds if wall_seconds > 0 else 0.0,
+        "latency_ms": summarize_latencies(latencies),
+    }
+
+
+def print_batch_summary(summary: dict[str, Any]) -> None:
+    """Print the batch summary to stderr."""
+    from rich.console import Console
+    console = Console(stderr=True)
+
+    latency = summary["latency_ms"]
+    console.print(
+        f"[bold]Batch complete:[/bold] {summary['total']} queries "
+        f"([green]{summary['succeeded']} ok[/green], "
+        f"[red]{summary['failed']} failed[/red]) in {summary['wall_seconds']:.2f}s "
+        f"({summary['throughput_qps']:.1f} queries/s)"
+    )
+    console.print(
+        f"[dim]Latency p50: {format_ms(latency['p50'])} | "
+        f"p90: {format_ms(latency['p90'])} | "
+        f"p99: {format_ms(latency['p99'])} | "
+        f"max: {format_ms(latency['max'])}[/dim]"
+    )
+
+
+def run_batch_search(args: argparse.Namespace) -> None:
+    """Execute the batch-search command."""
+    import asyncio
+
+    from rich.console import Console
+
+    from ..async_client import create_async_client
+    from ..cache import open_cache
+
+    console = Console(stderr=True)
+    if args.parallelism < 1:
+        console.print("[red]--parallelism must be at least 1[/red]")
+        sys.exit(1)
+
+    try:
+        source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    except OSError as e:
+        console.print(f"[red]Cannot read {args.input}: {e}[/red]")
+        sys.exit(1)
+
+    try:
+        out = sys.stdout if not args.output else open(args.output, "w", encoding="utf-8")
+    except OSError as e:
+        if source is not sys.stdin:
+            source.close()
+        console.print(f"[red]Cannot write {args.output}: {e}[/red]")
+        sys.exit(1)
+
+    async def _run() -> dict[str, Any]:
+        async with create_async_client(
+            base_url=args.api_url,
+            debug=args.debug,
+            http2=args.http2,
+            max_concurrency=args.parallelism,
+            per_host_limit=args.parallelism,
+            cache=open_cache(args),
+            refresh=args.refresh,
+            max_retries=args.retries,
+            rate_limit=args.rate_limit,
+        ) as client:
+            return await execute_batch(
+                client, read_batch_records(source), args, out, args.parallelism
+            )
+
+    try:
+        summary = asyncio.run(_run())
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+
+    print_batch_summary(summary)
+    if summary["failed"]:
+        sys.exit(1)
@@ -0,0 +1,242 @@
+"""Bench command for the Trioexplorer CLI."""
+
+import argparse
+import sys
+from typing import Any, Optional
+
+from ..bench import BENCH_MODES
+from ..metrics import format_ms
+from .batch import prepare_search_params, read_batch_records
+from .search import add_search_options
+
+# Default number of closed-loop workers (and open-loop connections)
+DEFAULT_WORKERS = 8
+
+
+def add_bench_parser(subparsers: argparse._SubParsersAction) -> None:
+    """Add the bench command parser."""
+    parser = subparsers.add_parser(
+        "bench",
+        help="Benchmark /search latency under load",
+        description=(
+            "Replay a query set against /search and report latency percentiles "
+            "(p50/p90/p99/p99.9), throughput and error rates, overall and by "
+            "search type, rerank and k. The query file uses the batch-search "
+            "format; command-line search options apply as defaults. The "
+            "response cache and retries are disabled so every request reaches "
+            "the server. Point --api-url at a local stub to benchmark the "
+            "client itself."
+        ),
+    )
+
+    parser.add_argument(
+        "input",
+        nargs="?",
+        default="-",
+        help="Query file (JSONL or one query per line); '-' reads stdin (default)",
+    )
+
+    parser.add_argument(
+        "--mode",
+        choices=BENCH_MODES,
+        default="closed",
+        help="closed: --workers concurrent loops; open: fixed --rate arrivals (default: closed)",
+    )
+
+    parser.add_argument(
+        "-j", "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        metavar="NUM",
+        help=f"Concurrent workers; in open-loop mode, the in-flight limit "
+             f"(default: {DEFAULT_WORKERS})",
+    )
+
+    parser.add_argument(
+        "--rate",
+        type=float,
+        metavar="RPS",
+        help="Arrival rate in requests per second (open-loop mode)",
+    )
+
+    parser.add_argument(
+        "-n", "--requests",
+        type=int,
+        metavar="NUM",
+        help="Number of measured requests, cycling through the query set "
+             "(default: each query once, unless --duration is given)",
+    )
+
+    parser.add_argument(
+        "--duration",
+        type=float,
+        metavar="SECONDS",
+        help="Stop sending new requests after this many seconds",
+    )
+
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=0,
+        metavar="NUM",
+        help="Unmeasured requests sent first to open connections (default: 0)",
+    )
+
+    parser.add_argument(
+        "-o", "--format",
+        dest="output_format",
+        choices=["table", "json"],
+        default="table",
+        help="Output format (default: table)",
+    )
+
+    add_search_options(parser)
+
+
+def load_bench_requests(args: argparse.Namespace) -> list[dict[str, Any]]:
+    """Read the query set and build /search parameters for every query.
+
+    Raises:
+        ValueError: If a query line is invalid (with its line number).
+    """
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    try:
+        requests = []
+        for lineno, record in read_batch_records(source):
+            if isinstance(record, ValueError):
+                raise ValueError(f"line {lineno}: {record}")
+            try:
+                requests.append(prepare_search_params(args, record))
+            except ValueError as e:
+                raise ValueError(f"line {lineno}: {e}") from e
+        return requests
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+
+def validate_bench_args(args: argparse.Namespace) -> Optional[str]:
+    """Return an error message for inconsistent options, or None."""
+    if args.workers < 1:
+        return "--workers must be at least 1"
+    if args.mode == "open" and (args.rate is None or args.rate <= 0):
+        return "--mode open requires a positive --rate"
+    if args.mode == "closed" and args.rate is not None:
+        return "--rate only applies to --mode open"
+    if args.requests is not None and args.requests < 1:
+        return "--requests must be at least 1"
+    if args.duration is not None and args.duration <= 0:
+        return "--duration must be positive"
+    return None
+
+
+def print_bench_report(report: dict[str, Any]) -> None:
+    """Print the benchmark report as tables."""
+    from rich.table import Table
+
+    from ..output import console
+
+    if report["mode"] == "open":
+        load = f"open loop at {report['target_rate_rps']:g} req/s"
+    else:
+        load = f"closed loop, {report['workers']} workers"
+
+    table = Table(
+        title=f"Benchmark ({load}, {report['requests']} requests in "
+              f"{report['wall_seconds']:.2f}s)",
+        show_header=True,
+        header_style="bold cyan",
+    )
+    table.add_column("Type")
+    table.add_column("Rerank")
+    table.add_column("k", justify="right")
+    table.add_column("Requests", justify="right")
+    table.add_column("Errors", justify="right")
+    table.add_column("Req/s", justify="right")
+    for label in ("p50", "p90", "p99", "p99.9", "max"):
+        table.add_column(label, justify="right")
+
+    def add_row(cells: list[str], stats: dict[str, Any], style: Optional[str] = None) -> None:
+        latency = stats["latency_ms"]
+        error_cell = str(stats["errors"])
+        if stats["errors"]:
+            error_cell = f"[red]{stats['errors']} ({stats['error_rate']:.1%})[/red]"
+        table.add_row(
+            *cells,
+            str(stats["requests"]),
+            error_cell,
+            f"{stats['throughput_rps']:.1f}",
+            *(format_ms(latency[label]) for label in ("p50", "p90", "p99", "p99.9", "max")),
+            style=style,
+        )
+
+    for group in report["groups"]:
+        add_row([group["search_type"], group["rerank"], group["k"]], group)
+    if len(report["groups"]) > 1:
+        table.add_section()
+        add_row(["all", "", ""], report, style="bold")
+
+    console.print(table)
+
+    footer = [f"Peak in flight: {report['peak_in_flight']}"]
+    footer.extend(f"{kind}: {count}" for kind, count in report["errors_by_kind"].items())
+    console.print(f"[dim]{' | '.join(footer)}[/dim]")
+
+
+def run_bench(args: argparse.Namespace) -> None:
+    """Execute the bench command."""
+    import asyncio
+
+    from rich.console import Console
+
+    from ..async_client import create_async_client
+    from ..bench import run_benchmark
+    from ..output import output_json
+
+    console = Console(stderr=True)
+    error = validate_bench_args(args)
+    if error:
+        console.print(f"[red]{error}[/red]")
+        sys.exit(1)
+
+    try:
+        requests = load_bench_requests(args)
+    except OSError as e:
+        console.print(f"[red]Cannot read {args.input}: {e}[/red]")
+        sys.exit(1)
+    except ValueError as e:
+        console.print(f"[red]Invalid query set: {e}[/red]")
+        sys.exit(1)
+    if not requests:
+        console.print("[red]No queries to benchmark[/red]")
+        sys.exit(1)
+
+    async def _run() -> dict[str, Any]:
+        async with create_async_client(
+            base_url=args.api_url,
+            debug=args.debug,
+            http2=args.http2,
+            max_concurrency=args.workers,
+            per_host_limit=args.workers,
+            max_retries=0,
+        ) as client:
+            return await run_benchmark(
+                client,
+                requests,
+                mode=args.mode,
+                workers=args.workers,
+                rate=args.rate,
+                total=args.requests,
+                duration=args.duration,
+                warmup=args.warmup,
+            )
+
+    report = asyncio.run(_run())
+
+    if args.output_format == "json":
+        output_json(report)
+    else:
+        print_bench_report(report)
+
+    if report["errors"]:
+        sys.exit(1)
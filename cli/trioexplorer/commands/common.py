@@ -0,0 +1,20 @@
+"""Argument helpers shared by several Trioexplorer CLI commands.
+
+Kept free of heavy imports so building the argument parser stays cheap.
+"""
+
+import argparse
+
+
+def add_cache_options(parser: argparse.ArgumentParser) -> None:
+    """Add --no-cache and --refresh options to a command parser."""
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Bypass the local response cache entirely",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Ignore cached responses but store fresh ones",
+    )
@@ -0,0 +1,244 @@
+"""Daemon commands for the Trioexplorer CLI."""
+
+import argparse
+import sys
+from typing import Optional
+
+from ..daemon import DEFAULT_WORKERS
+
+# Seconds to wait for a started daemon to accept connections, or a stopped
+# one to remove its socket
+STARTUP_TIMEOUT = 10.0
+SHUTDOWN_TIMEOUT = 10.0
+
+
+def add_daemon_parser(subparsers: argparse._SubParsersAction) -> None:
+    """Add the daemon command parser with subcommands."""
+    daemon_parser = subparsers.add_parser(
+        "daemon",
+        help="Run a local daemon that makes API requests for other invocations",
+        description="Manage a background process that owns pooled connections, the "
+                    "response cache and the rate limiter behind a Unix socket. While "
+                    "it runs, commands using the sync client (search, list, get, "
+                    "stats history) forward their requests to it. Global options "
+                    "given with 'daemon start' configure the daemon.",
+    )
+
+    daemon_subparsers = daemon_parser.add_subparsers(
+        dest="daemon_command",
+        title="actions",
+        description="Available actions",
+    )
+
+    start_parser = daemon_subparsers.add_parser(
+        "start",
+        help="Start the daemon in the background",
+    )
+    start_parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        metavar="NUM",
+        help=f"API requests forwarded at once (default: {DEFAULT_WORKERS})",
+    )
+    start_parser.add_argument(
+        "--foreground",
+        action="store_true",
+        help="Run in this process until interrupted instead of in the background",
+    )
+
+    daemon_subparsers.add_parser(
+        "stop",
+        help="Stop the daemon",
+    )
+
+    status_parser = daemon_subparsers.add_parser(
+        "status",
+        help="Show whether the daemon runs and what it has served (exit 1 if not running)",
+    )
+    status_parser.add_argument(
+        "-o", "--format",
+        dest="output_format",
+        choices=["table", "json"],
+        default="table",
+        help="Output format (default: table)",
+    )
+
+
+def run_daemon(args: argparse.Namespace) -> None:
+    """Execute the daemon command."""
+    if args.daemon_command == "start" and args.foreground:
+        run_daemon_foreground(args)
+    elif args.daemon_command == "start":
+        run_daemon_start(args)
+    elif args.daemon_command == "stop":
+        run_daemon_stop(args)
+    elif args.daemon_command == "status":
+        run_daemon_status(args)
+    else:
+        from rich.console import Console
+        console = Console(stderr=True)
+        console.print("[red]Please specify an action: start, stop, status[/red]")
+        raise SystemExit(1)
+
+
+def _global_argv(args: argparse.Namespace) -> list[str]:
+    """Global options of this invocation that configure the daemon."""
+    argv = []
+    if args.api_url:
+        argv += ["--api-url", args.api_url]
+    if args.http2:
+        argv.append("--http2")
+    argv += ["--max-connections", str(args.max_connections), "--retries", str(args.retries)]
+    if args.rate_limit:
+        argv += ["--rate-limit", str(args.rate_limit)]
+    return argv
+
+
+def _daemon_status() -> Optional[dict]:
+    """Status of the running daemon, or None if none answers."""
+    from ..config import get_daemon_socket_path
+    from ..daemon import DaemonError, request
+
+    path = get_daemon_socket_path()
+    if not path.exists():
+        return None
+    try:
+        return request(path, {"op": "status"})
+    except (OSError, DaemonError, ValueError):
+        return None
+
+
+def run_daemon_start(args: argparse.Namespace) -> None:
+    """Start the daemon as a detached background process."""
+    import subprocess
+    import time
+
+    from rich.console import Console
+
+    from ..config import get_daemon_socket_path, validate_api_key
+
+    console = Console(stderr=True)
+    validate_api_key()
+    status = _daemon_status()
+    if status is not None:
+        console.print(f"[yellow]The daemon is already running (pid {status['pid']}).[/yellow]")
+        return
+
+    path = get_daemon_socket_path()
+    log_path = path.with_suffix(".log")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    argv = [
+        sys.executable, "-m", "trioexplorer.main", *_global_argv(args),
+        "daemon", "start", "--foreground", "--workers", str(args.workers),
+    ]
+    with open(log_path, "ab") as log:
+        process = subprocess.Popen(
+            argv,
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=log,
+            start_new_session=True,
+        )
+
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            console.print(f"[red]The daemon exited with status {process.returncode}[/red]")
+            console.print(f"[dim]See {log_path}[/dim]")
+            sys.exit(1)
+        status = _daemon_status()
+        if status is not None:
+            console.print(f"[green]Daemon started (pid {status['pid']}) on {path}[/green]")
+            return
+        time.sleep(0.1)
+
+    console.print(f"[red]The daemon did not start listening within {STARTUP_TIMEOUT:g}s[/red]")
+    console.print(f"[dim]See {log_path}[/dim]")
+    sys.exit(1)
+
+
+def run_daemon_foreground(args: argparse.Namespace) -> None:
+    """Serve requests in this process until stopped or interrupted."""
+    import signal
+
+    from rich.console import Console
+
+    from ..config import get_daemon_socket_path, validate_api_key
+    from ..daemon import DaemonError, DaemonServer
+
+    console = Console(stderr=True)
+    validate_api_key()
+    if args.workers < 1:
+        console.print("[red]--workers must be at least 1[/red]")
+        sys.exit(1)
+
+    server = DaemonServer(
+        get_daemon_socket_path(),
+        api_url=args.api_url,
+        http2=args.http2,
+        max_connections=args.max_connections,
+        max_retries=args.retries,
+        rate_limit=args.rate_limit,
+        workers=args.workers,
+    )
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: server.stop())
+
+    console.print(f"[dim]trioexplorer daemon (pid {server.info()['pid']}) serving "
+                  f"{server.api_url} on {server.path}[/dim]")
+    try:
+        server.serve_forever()
+    except (DaemonError, OSError) as e:
+        console.print(f"[red]{e}[/red]")
+        sys.exit(1)
+    console.print(f"[dim]Stopped after {server.requests} requests[/dim]")
+
+
+def run_daemon_stop(args: argparse.Namespace) -> None:
+    """Ask the running daemon to stop and wait for it to exit."""
+    import time
+
+    from rich.console import Console
+
+    from ..config import get_daemon_socket_path
+    from ..daemon import DaemonError, request
+
+    console = Console(stderr=True)
+    path = get_daemon_socket_path()
+    try:
+        status = request(path, {"op": "stop"})
+    except (OSError, DaemonError, ValueError):
+        console.print("[yellow]No daemon is running.[/yellow]")
+        return
+
+    deadline = time.monotonic() + SHUTDOWN_TIMEOUT
+    while path.exists() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    console.print(f"Stopped daemon (pid {status['pid']}) after {status['requests']} requests")
+
+
+def run_daemon_status(args: argparse.Namespace) -> None:
+    """Show the daemon's status."""
+    from rich.console import Console
+
+    from ..output import output_json
+
+    status = _daemon_status()
+    if status is None:
+        Console(stderr=True).print("[yellow]No daemon is running.[/yellow]")
+        sys.exit(1)
+
+    if args.output_format == "json":
+        output_json(status)
+        return
+
+    console = Console()
+    rate = f"{status['rate_limit']:g}/s" if status["rate_limit"] else "unlimited"
+    console.print(f"[bold cyan]trioexplorer daemon[/bold cyan] (pid {status['pid']}, v{status['version']})")
+    console.print(f"  API URL:    {status['api_url']}")
+    console.print(f"  Socket:     {status['socket']}")
+    console.print(f"  Uptime:     {status['uptime_seconds']:.0f}s")
+    console.print(f"  Workers:    {status['workers']}")
+    console.print(f"  Rate limit: {rate}")
+    console.print(f"  Requests:   {status['requests']} ({status['errors']} failed)")
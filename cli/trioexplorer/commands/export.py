@@ -0,0 +1,165 @@
+"""Export commands for the Trioexplorer CLI."""
+
+import argparse
+import sys
+
+from ..columnar import COLUMNAR_FORMATS
+from ..paging import DEFAULT_CONCURRENCY
+
+
+def add_export_parser(subparsers: argparse._SubParsersAction) -> None:
+    """Add the export command parser with subcommands."""
+    export_parser = subparsers.add_parser(
+        "export",
+        help="Export resources in bulk to a columnar file",
+        description="Download complete resources with concurrent requests and write "
+                    "them as a Parquet or Arrow IPC file.",
+    )
+
+    export_subparsers = export_parser.add_subparsers(
+        dest="export_command",
+        title="resources",
+        description="Available resources to export",
+    )
+
+    filters_parser = export_subparsers.add_parser(
+        "filters",
+        help="Export every value of every filter field of a namespace",
+        description="Write one row per filter value (field_name, text_value, cui, "
+                    "occurrence_count). Pages of all fields are fetched concurrently.",
+    )
+    filters_parser.add_argument(
+        "--namespace",
+        metavar="NS",
+        help="Search namespace (uses default if not specified)",
+    )
+    filters_parser.add_argument(
+        "-o", "--format",
+        dest="output_format",
+        choices=COLUMNAR_FORMATS,
+        default="parquet",
+        help="Output format (default: parquet)",
+    )
+    filters_parser.add_argument(
+        "--output",
+        metavar="FILE",
+        help="Write to FILE instead of stdout",
+    )
+    filters_parser.add_argument(
+        "-j", "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        metavar="NUM",
+        help=f"Pages fetched at once (default: {DEFAULT_CONCURRENCY})",
+    )
+
+
+def run_export(args: argparse.Namespace) -> None:
+    """Execute the export command."""
+    if args.export_command == "filters":
+        run_export_filters(args)
+    else:
+        from rich.console import Console
+        console = Console(stderr=True)
+        console.print("[red]Please specify a resource to export: filters[/red]")
+        raise SystemExit(1)
+
+
+def run_export_filters(args: argparse.Namespace) -> None:
+    """Export every filter value of a namespace."""
+    import asyncio
+    import os
+    import time
+
+    from rich.console import Console
+    from rich.progress import BarColumn, MofNCompleteColumn, Progress, TextColumn, TimeElapsedColumn
+
+    from ..async_client import create_async_client
+    from ..columnar import FILTER_EXPORT_COLUMNS, ColumnarUnavailableError, ColumnarWriter
+    from ..errors import SearchAPIError
+    from ..filterindex import FilterValuePager
+
+    console = Console(stderr=True)
+    if args.concurrency < 1:
+        console.print("[red]--concurrency must be at least 1[/red]")
+        sys.exit(1)
+    if not args.output and sys.stdout.isatty():
+        console.print(f"[red]Refusing to write binary {args.output_format} output to a terminal; "
+                      "redirect stdout or use --output[/red]")
+        sys.exit(1)
+
+    namespace = args.namespace or "default"
+    try:
+        sink = open(args.output, "wb") if args.output else sys.stdout.buffer
+    except OSError as e:
+        console.print(f"[red]Cannot write {args.output}: {e}[/red]")
+        sys.exit(1)
+    try:
+        writer = ColumnarWriter(sink, FILTER_EXPORT_COLUMNS, args.output_format)
+    except ColumnarUnavailableError as e:
+        console.print(f"[red]{e}[/red]")
+        if args.output:
+            sink.close()
+            os.unlink(args.output)
+        sys.exit(1)
+
+    async def _run(progress: Progress) -> FilterValuePager:
+        task = progress.add_task("Listing fields", total=None)
+        exported = 0
+        async with create_async_client(
+            base_url=args.api_url,
+            debug=args.debug,
+            http2=args.http2,
+            max_concurrency=args.concurrency,
+            per_host_limit=args.concurrency,
+            max_retries=args.retries,
+            rate_limit=args.rate_limit,
+        ) as client:
+            pager = FilterValuePager(client, namespace, concurrency=args.concurrency)
+            async for name, values, _ in pager:
+                writer.write_rows({"field_name": name, **value} for value in values)
+                exported += len(values)
+                progress.update(
+                    task,
+                    description=f"{len(pager.fields)} fields, {exported:,} values",
+                    completed=pager.pages,
+                    total=pager.planned_pages,
+                )
+            return pager
+
+    started = time.perf_counter()
+    try:
+        with Progress(
+            TextColumn("{task.description}"),
+            BarColumn(),
+            MofNCompleteColumn(),
+            TextColumn("pages"),
+            TimeElapsedColumn(),
+            console=console,
+            transient=True,
+        ) as progress:
+            pager = asyncio.run(_run(progress))
+    except SearchAPIError as e:
+        console.print(f"[red]{e.message}[/red]")
+        if e.hint:
+            console.print(f"[dim]{e.hint}[/dim]")
+        writer.close()
+        if args.output:
+            sink.close()
+            os.unlink(args.output)
+        sys.exit(1)
+
+    writer.close()
+    if args.output:
+        sink.close()
+
+    destination = args.output or "stdout"
+    console.print(
+        f"Exported {writer.row_count:,} values of {len(pager.fields)} fields in '{namespace}' "
+        f"from {pager.pages} pages in {time.perf_counter() - started:.2f}s to {destination}"
+    )
+    if pager.errors:
+        for name, message in sorted(pager.errors.items()):
+            console.print(f"[red]{name}: {message}[/red]")
+        console.print("[yellow]The export is missing values of the fields above[/yellow]")
+        sys.exit(1)
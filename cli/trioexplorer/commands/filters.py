@@ -0,0 +1,110 @@
+"""Filter index commands for the Trioexplorer CLI."""
+
+import argparse
+import sys
+
+from ..paging import DEFAULT_CONCURRENCY
+
+
+def add_filters_parser(subparsers: argparse._SubParsersAction) -> None:
+    """Add the filters command parser with subcommands."""
+    filters_parser = subparsers.add_parser(
+        "filters",
+        help="Maintain a local index of filter values",
+        description=(
+            "Keep a local SQLite index of every filter value of a namespace for "
+            "instant prefix lookups with 'list filters --field NAME --prefix TEXT' "
+            "and for shell completion. The index is stored in "
+            "~/.trioexplorer/filters.sqlite3 (override with TRIOEXPLORER_FILTER_INDEX_FILE)."
+        ),
+    )
+    filters_subparsers = filters_parser.add_subparsers(
+        dest="filters_command",
+        title="actions",
+        description="Available actions",
+    )
+
+    sync_parser = filters_subparsers.add_parser(
+        "sync",
+        help="Download every value of every field of a namespace",
+    )
+    sync_parser.add_argument(
+        "--namespace",
+        metavar="NS",
+        help="Search namespace (uses default if not specified)",
+    )
+    sync_parser.add_argument(
+        "-j", "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        metavar="NUM",
+        help=f"Pages fetched at once (default: {DEFAULT_CONCURRENCY})",
+    )
+
+
+def run_filters(args: argparse.Namespace) -> None:
+    """Execute the filters command."""
+    if args.filters_command == "sync":
+        run_filters_sync(args)
+    else:
+        from rich.console import Console
+        console = Console(stderr=True)
+        console.print("[red]Please specify a filters action: sync[/red]")
+        raise SystemExit(1)
+
+
+def run_filters_sync(args: argparse.Namespace) -> None:
+    """Rebuild the local index of a namespace's filter values."""
+    import asyncio
+    import sqlite3
+
+    from rich.console import Console
+
+    from ..async_client import create_async_client
+    from ..config import get_api_url
+    from ..errors import SearchAPIError
+    from ..filterindex import FilterIndex, sync_filter_values
+
+    console = Console(stderr=True)
+    if args.concurrency < 1:
+        console.print("[red]--concurrency must be at least 1[/red]")
+        sys.exit(1)
+
+    api_url = get_api_url(args.api_url)
+    namespace = args.namespace or "default"
+
+    async def _run(index: FilterIndex):
+        async with create_async_client(
+            base_url=api_url,
+            debug=args.debug,
+            http2=args.http2,
+            max_concurrency=args.concurrency,
+            per_host_limit=args.concurrency,
+            max_retries=args.retries,
+            rate_limit=args.rate_limit,
+        ) as client:
+            return await sync_filter_values(
+                client, index, namespace, api_url, concurrency=args.concurrency
+            )
+
+    try:
+        with FilterIndex() as index:
+            summary = asyncio.run(_run(index))
+    except SearchAPIError as e:
+        console.print(f"[red]{e.message}[/red]")
+        if e.hint:
+            console.print(f"[dim]{e.hint}[/dim]")
+        sys.exit(1)
+    except (OSError, sqlite3.Error) as e:
+        console.print(f"[red]Cannot write the filter index: {e}[/red]")
+        sys.exit(1)
+
+    for error in summary["errors"]:
+        console.print(f"[red]{error['field']}: {error['error']}[/red]")
+    console.print(
+        f"Indexed {summary['values']} values of {summary['fields']} fields in '{namespace}' "
+        f"from {summary['pages']} pages in {summary['wall_seconds']:.2f}s"
+    )
+    if summary["errors"]:
+        console.print("[yellow]Fields that failed keep their previously indexed values[/yellow]")
+        sys.exit(1)
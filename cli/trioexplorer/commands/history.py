@@ -1,13 +1,17 @@
 """History commands for the Trioexplorer CLI."""
 
 import argparse
+import sys
+from typing import TYPE_CHECKING
 
-from ..client import SearchClient
-from ..output import output_json
+from ..paging import DEFAULT_CONCURRENCY, MAX_PAGE_SIZE
+
+if TYPE_CHECKING:
+    from ..client import SearchClient
 
 
 def add_history_parsers(subparsers: argparse._SubParsersAction) -> None:
-    """Add the get history command parser."""
+    """Add the get and history command parsers."""
     get_parser = subparsers.add_parser(
         "get",
         help="Get a specific resource by ID",
@@ -37,8 +41,53 @@ def add_history_parsers(subparsers: argparse._SubParsersAction) -> None:
         help="Output format (default: table)",
     )
 
+    # Local mirror of the search history
+    mirror_parser = subparsers.add_parser(
+        "history",
+        help="Maintain a local mirror of the search history",
+        description=(
+            "Keep a local SQLite copy of /search-history for fast queries with "
+            "'list history --local'. The mirror is stored in "
+            "~/.trioexplorer/history.sqlite3 (override with TRIOEXPLORER_HISTORY_FILE)."
+        ),
+    )
+    mirror_subparsers = mirror_parser.add_subparsers(
+        dest="history_command",
+        title="actions",
+        description="Available actions",
+    )
+
+    sync_parser = mirror_subparsers.add_parser(
+        "sync",
+        help="Fetch search history entries created since the last sync",
+    )
+    sync_parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Ignore the watermark and re-read the whole history",
+    )
+    sync_parser.add_argument(
+        "--reset",
+        action="store_true",
+        help="Empty the mirror first (needed to mirror a different API URL)",
+    )
+    sync_parser.add_argument(
+        "--page-size",
+        type=int,
+        default=MAX_PAGE_SIZE,
+        metavar="NUM",
+        help=f"Entries per page (1-{MAX_PAGE_SIZE}, default: {MAX_PAGE_SIZE})",
+    )
+    sync_parser.add_argument(
+        "-j", "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        metavar="NUM",
+        help=f"Pages fetched at once (default: {DEFAULT_CONCURRENCY})",
+    )
+
 
-def run_get_history(client: SearchClient, args: argparse.Namespace) -> None:
+def run_get_history(client: "SearchClient", args: argparse.Namespace) -> None:
     """Execute the get command."""
     if args.get_command == "history":
         run_get_history_entry(client, args)
@@ -49,8 +98,10 @@ def run_get_history(client: SearchClient, args: argparse.Namespace) -> None:
         raise SystemExit(1)
 
 
-def run_get_history_entry(client: SearchClient, args: argparse.Namespace) -> None:
+def run_get_history_entry(client: "SearchClient", args: argparse.Namespace) -> None:
     """Get a specific search history entry."""
+    from ..output import output_json
+
     response = client.get(f"/search-history/{args.history_id}")
 
     if args.output_format == "json":
@@ -104,3 +155,86 @@ def run_get_history_entry(client: SearchClient, args: argparse.Namespace) -> Non
         if error_message:
             console.print()
             console.print(f"[red]Error: {error_message}[/red]")
+
+
+def run_history(args: argparse.Namespace) -> None:
+    """Execute the history command."""
+    if args.history_command == "sync":
+        run_history_sync(args)
+    else:
+        from rich.console import Console
+        console = Console(stderr=True)
+        console.print("[red]Please specify a history action: sync[/red]")
+        raise SystemExit(1)
+
+
+def run_history_sync(args: argparse.Namespace) -> None:
+    """Bring the local search history mirror up to date."""
+    import asyncio
+    import sqlite3
+
+    from rich.console import Console
+
+    from ..async_client import create_async_client
+    from ..config import get_api_url
+    from ..errors import SearchAPIError
+    from ..mirror import HistoryMirror, MirrorError, sync_history
+
+    console = Console(stderr=True)
+    if not 1 <= args.page_size <= MAX_PAGE_SIZE:
+        console.print(f"[red]--page-size must be between 1 and {MAX_PAGE_SIZE}[/red]")
+        sys.exit(1)
+    if args.concurrency < 1:
+        console.print("[red]--concurrency must be at least 1[/red]")
+        sys.exit(1)
+
+    api_url = get_api_url(args.api_url)
+
+    async def _run(mirror: HistoryMirror):
+        async with create_async_client(
+            base_url=api_url,
+            debug=args.debug,
+            http2=args.http2,
+            max_concurrency=args.concurrency,
+            per_host_limit=args.concurrency,
+            max_retries=args.retries,
+            rate_limit=args.rate_limit,
+        ) as client:
+            return await sync_history(
+                client,
+                mirror,
+                api_url,
+                full=args.full,
+                page_size=args.page_size,
+                concurrency=args.concurrency,
+            )
+
+    try:
+        with HistoryMirror() as mirror:
+            if args.reset:
+                mirror.reset()
+            summary = asyncio.run(_run(mirror))
+    except MirrorError as e:
+        console.print(f"[red]{e}[/red]")
+        console.print("[dim]Use --reset to replace it, or set TRIOEXPLORER_HISTORY_FILE[/dim]")
+        sys.exit(1)
+    except SearchAPIError as e:
+        console.print(f"[red]{e.message}[/red]")
+        if e.hint:
+            console.print(f"[dim]{e.hint}[/dim]")
+        sys.exit(1)
+    except (OSError, sqlite3.Error) as e:
+        console.print(f"[red]Cannot write the history mirror: {e}[/red]")
+        sys.exit(1)
+
+    for error in summary["errors"]:
+        console.print(f"[red]page {error['page']}: {error['error']}[/red]")
+    console.print(
+        f"Synced {summary['entries']} entries from {summary['pages']} pages in "
+        f"{summary['wall_seconds']:.2f}s; {summary['total_mirrored']} mirrored"
+    )
+    if summary["watermark"]:
+        console.print(f"[dim]Watermark: {summary['watermark']}[/dim]")
+    if summary["errors"]:
+        console.print("[yellow]Watermark not advanced; the next sync retries the missing pages[/yellow]")
+        sys.exit(1)
@@ -1,20 +1,14 @@
 """List commands for the Trioexplorer CLI."""
 
 import argparse
-from typing import Callable
-
-from ..client import SearchClient
-from ..output import (
-    output_json,
-    output_cohorts_table,
-    output_cohorts_csv,
-    output_notetypes_table,
-    output_notetypes_csv,
-    output_history_table,
-    output_history_csv,
-    output_filters_table,
-    output_filter_values_table,
-)
+import sys
+from typing import TYPE_CHECKING, Callable
+
+from ..columnar import COLUMNAR_FORMATS
+from .common import add_cache_options
+
+if TYPE_CHECKING:
+    from ..client import SearchClient
 
 
 def add_list_parser(subparsers: argparse._SubParsersAction) -> None:
@@ -45,10 +39,11 @@ def add_list_parser(subparsers: argparse._SubParsersAction) -> None:
     cohorts_parser.add_argument(
         "-o", "--format",
         dest="output_format",
-        choices=["table", "json", "csv"],
+        choices=["table", "json", "csv", "ndjson"],
         default="table",
         help="Output format (default: table)",
     )
+    add_cache_options(cohorts_parser)
 
     # List note types
     notetypes_parser = list_subparsers.add_parser(
@@ -75,10 +70,11 @@ def add_list_parser(subparsers: argparse._SubParsersAction) -> None:
     notetypes_parser.add_argument(
         "-o", "--format",
         dest="output_format",
-        choices=["table", "json", "csv"],
+        choices=["table", "json", "csv", "ndjson", *COLUMNAR_FORMATS],
         default="table",
         help="Output format (default: table)",
     )
+    add_cache_options(notetypes_parser)
 
     # List history
     history_parser = list_subparsers.add_parser(
@@ -111,7 +107,7 @@ def add_list_parser(subparsers: argparse._SubParsersAction) -> None:
     history_parser.add_argument(
         "--query",
         metavar="TEXT",
-        help="Filter by query text",
+        help="Filter by query text (with --local: entries containing all words)",
     )
     history_parser.add_argument(
         "--date-from",
@@ -126,10 +122,15 @@ def add_list_parser(subparsers: argparse._SubParsersAction) -> None:
     history_parser.add_argument(
         "-o", "--format",
         dest="output_format",
-        choices=["table", "json", "csv"],
+        choices=["table", "json", "csv", "ndjson", *COLUMNAR_FORMATS],
         default="table",
         help="Output format (default: table)",
     )
+    history_parser.add_argument(
+        "--local",
+        action="store_true",
+        help="Answer from the local mirror kept by 'history sync' instead of the API",
+    )
 
     # List entities
     entities_parser = list_subparsers.add_parser(
@@ -159,6 +160,12 @@ def add_list_parser(subparsers: argparse._SubParsersAction) -> None:
         metavar="NAME",
         help="Get values for a specific field",
     )
+    filters_parser.add_argument(
+        "--prefix",
+        metavar="TEXT",
+        help="With --field: values starting with TEXT, ignoring case, answered from "
+             "the local index kept by 'filters sync'",
+    )
     filters_parser.add_argument(
         "--category",
         choices=["entity", "assertion", "entity_assertion"],
@@ -173,13 +180,14 @@ def add_list_parser(subparsers: argparse._SubParsersAction) -> None:
     filters_parser.add_argument(
         "-o", "--format",
         dest="output_format",
-        choices=["table", "json", "csv"],
+        choices=["table", "json", "csv", "ndjson", *COLUMNAR_FORMATS],
         default="table",
         help="Output format (default: table)",
     )
+    add_cache_options(filters_parser)
 
 
-def run_list(args: argparse.Namespace, get_client: Callable[[], SearchClient]) -> None:
+def run_list(args: argparse.Namespace, get_client: Callable[[], "SearchClient"]) -> None:
     """Execute the list command.
 
     Args:
@@ -191,10 +199,15 @@ def run_list(args: argparse.Namespace, get_client: Callable[[], SearchClient]) -
     elif args.list_command == "notetypes":
         run_list_notetypes(get_client(), args)
     elif args.list_command == "history":
-        run_list_history(get_client(), args)
+        if args.local:
+            run_list_history_local(args)
+        else:
+            run_list_history(get_client(), args)
     elif args.list_command == "entities":
         # Entities command doesn't need API access - it's static data
         run_list_entities(args)
+    elif args.list_command == "filters" and args.prefix is not None:
+        run_list_filters_prefix(args, get_client)
     elif args.list_command == "filters":
         run_list_filters(get_client(), args)
     else:
@@ -204,8 +217,10 @@ def run_list(args: argparse.Namespace, get_client: Callable[[], SearchClient]) -
         raise SystemExit(1)
 
 
-def run_list_cohorts(client: SearchClient, args: argparse.Namespace) -> None:
+def run_list_cohorts(client: "SearchClient", args: argparse.Namespace) -> None:
     """List indexed cohorts."""
+    from ..output import output_json, output_ndjson, output_cohorts_table, output_cohorts_csv
+
     params = {"limit": args.limit}
     response = client.get("/cohorts/indexed", params=params)
 
@@ -216,12 +231,16 @@ def run_list_cohorts(client: SearchClient, args: argparse.Namespace) -> None:
         output_json(response)
     elif args.output_format == "csv":
         output_cohorts_csv(items)
+    elif args.output_format == "ndjson":
+        output_ndjson(items)
     else:
         output_cohorts_table(items, total_count)
 
 
-def run_list_notetypes(client: SearchClient, args: argparse.Namespace) -> None:
+def run_list_notetypes(client: "SearchClient", args: argparse.Namespace) -> None:
     """List note types."""
+    from ..output import output_json, output_ndjson, output_notetypes_table, output_notetypes_csv
+
     params = {
         "limit": args.limit,
         "offset": args.offset,
@@ -238,11 +257,17 @@ def run_list_notetypes(client: SearchClient, args: argparse.Namespace) -> None:
         output_json(response)
     elif args.output_format == "csv":
         output_notetypes_csv(items)
+    elif args.output_format == "ndjson":
+        output_ndjson(items)
+    elif args.output_format in COLUMNAR_FORMATS:
+        from ..columnar import NOTETYPE_COLUMNS
+        from ..output import output_columnar
+        output_columnar(items, NOTETYPE_COLUMNS, args.output_format)
     else:
         output_notetypes_table(items, total_count)
 
 
-def run_list_history(client: SearchClient, args: argparse.Namespace) -> None:
+def run_list_history(client: "SearchClient", args: argparse.Namespace) -> None:
     """List search history."""
     params = {
         "page": args.page,
@@ -260,6 +285,40 @@ def run_list_history(client: SearchClient, args: argparse.Namespace) -> None:
         params["date-to"] = args.date_to
 
     response = client.get("/search-history", params=params)
+    write_history_page(response, args)
+
+
+def run_list_history_local(args: argparse.Namespace) -> None:
+    """List search history from the local mirror."""
+    import sqlite3
+
+    from rich.console import Console
+
+    from ..mirror import HistoryMirror
+
+    console = Console(stderr=True)
+    try:
+        with HistoryMirror() as mirror:
+            if len(mirror) == 0:
+                console.print(f"[yellow]{mirror.path} is empty; run 'trioexplorer history sync' first[/yellow]")
+            response = mirror.query(
+                text=args.query,
+                search_type=args.search_type,
+                user_id=args.user_id,
+                date_from=args.date_from,
+                date_to=args.date_to,
+                page=args.page,
+                page_size=args.page_size,
+            )
+    except (OSError, sqlite3.Error) as e:
+        console.print(f"[red]Cannot read the history mirror: {e}[/red]")
+        sys.exit(1)
+    write_history_page(response, args)
+
+
+def write_history_page(response: dict, args: argparse.Namespace) -> None:
+    """Write one page of search history in the requested format."""
+    from ..output import output_json, output_ndjson, output_history_table, output_history_csv
 
     items = response.get("items", [])
     total_count = response.get("total_count", len(items))
@@ -271,6 +330,12 @@ def run_list_history(client: SearchClient, args: argparse.Namespace) -> None:
         output_json(response)
     elif args.output_format == "csv":
         output_history_csv(items)
+    elif args.output_format == "ndjson":
+        output_ndjson(items)
+    elif args.output_format in COLUMNAR_FORMATS:
+        from ..columnar import HISTORY_COLUMNS
+        from ..output import output_columnar
+        output_columnar(items, HISTORY_COLUMNS, args.output_format)
     else:
         output_history_table(items, total_count, page, page_size, has_more)
 
@@ -280,6 +345,8 @@ def run_list_entities(args: argparse.Namespace) -> None:
 
     Note: This command does not require API access - entity types are static.
     """
+    from ..output import output_json
+
     # Entity types are static - just display them
     entity_types = [
         {"name": "symptoms", "description": "Clinical symptoms (e.g., fever, cough)"},
@@ -344,8 +411,10 @@ def run_list_entities(args: argparse.Namespace) -> None:
         console.print("[dim]Combine entity and assertion types in filters like: symptoms_present, diagnoses_negated[/dim]")
 
 
-def run_list_filters(client: SearchClient, args: argparse.Namespace) -> None:
+def run_list_filters(client: "SearchClient", args: argparse.Namespace) -> None:
     """List available filter fields and values."""
+    from ..output import output_json, output_ndjson, output_filters_table
+
     namespace = args.namespace or "default"
 
     if args.field:
@@ -353,17 +422,7 @@ def run_list_filters(client: SearchClient, args: argparse.Namespace) -> None:
         params = {"limit": args.limit}
         path = f"/namespaces/{namespace}/filter-values/{args.field}"
         response = client.get(path, params=params)
-
-        values = response.get("values", [])
-        total_values = response.get("total_values", len(values))
-
-        if args.output_format == "json":
-            output_json(response)
-        elif args.output_format == "csv":
-            from ..output import output_csv
-            output_csv(values, ["text_value", "cui", "occurrence_count"])
-        else:
-            output_filter_values_table(values, args.field, total_values)
+        write_filter_values(response, args)
     else:
         # Get field metadata
         params = {}
@@ -380,5 +439,82 @@ def run_list_filters(client: SearchClient, args: argparse.Namespace) -> None:
         elif args.output_format == "csv":
             from ..output import output_csv
             output_csv(fields, ["field_name", "field_category", "value_count"])
+        elif args.output_format == "ndjson":
+            output_ndjson(fields)
+        elif args.output_format in COLUMNAR_FORMATS:
+            from ..columnar import FILTER_FIELD_COLUMNS
+            from ..output import output_columnar
+            output_columnar(fields, FILTER_FIELD_COLUMNS, args.output_format)
         else:
             output_filters_table(fields, namespace)
+
+
+def run_list_filters_prefix(args: argparse.Namespace, get_client: Callable[[], "SearchClient"]) -> None:
+    """List the values of a field starting with a prefix.
+
+    Answered from the local filter index when the namespace was synced;
+    otherwise the API's partial-match search is narrowed to the prefix.
+    """
+    import sqlite3
+
+    from rich.console import Console
+
+    from ..filterindex import FilterIndex, fold
+
+    console = Console(stderr=True)
+    if not args.field:
+        console.print("[red]--prefix needs --field[/red]")
+        sys.exit(1)
+
+    namespace = args.namespace or "default"
+    try:
+        with FilterIndex() as index:
+            indexed = index.namespace_info(namespace) is not None
+            if indexed:
+                response = {
+                    "namespace": namespace,
+                    "field_name": args.field,
+                    "values": index.lookup(namespace, args.field, args.prefix, limit=args.limit),
+                    "total_values": index.count(namespace, args.field, args.prefix),
+                }
+    except (OSError, sqlite3.Error) as e:
+        console.print(f"[red]Cannot read the filter index: {e}[/red]")
+        sys.exit(1)
+
+    if not indexed:
+        console.print(f"[dim]'{namespace}' is not indexed; run 'trioexplorer filters sync "
+                      f"--namespace {namespace}' for instant lookups[/dim]")
+        response = get_client().get(
+            f"/namespaces/{namespace}/filter-values/{args.field}",
+            params={"limit": args.limit, "search": args.prefix},
+        )
+        folded = fold(args.prefix)
+        values = [
+            value for value in response.get("values", [])
+            if fold(value.get("text_value") or "").startswith(folded)
+        ]
+        response = {**response, "values": values, "total_values": len(values)}
+
+    write_filter_values(response, args)
+
+
+def write_filter_values(response: dict, args: argparse.Namespace) -> None:
+    """Write the values of one filter field in the requested format."""
+    from ..output import output_json, output_ndjson, output_filter_values_table
+
+    values = response.get("values", [])
+    total_values = response.get("total_values", len(values))
+
+    if args.output_format == "json":
+        output_json(response)
+    elif args.output_format == "csv":
+        from ..output import output_csv
+        output_csv(values, ["text_value", "cui", "occurrence_count"])
+    elif args.output_format == "ndjson":
+        output_ndjson(values)
+    elif args.output_format in COLUMNAR_FORMATS:
+        from ..columnar import FILTER_VALUE_COLUMNS
+        from ..output import output_columnar
+        output_columnar(values, FILTER_VALUE_COLUMNS, args.output_format)
+    else:
+        output_filter_values_table(values, args.field, total_values)
@@ -0,0 +1,182 @@
+"""Refine command for the Trioexplorer CLI."""
+
+import argparse
+import sys
+from typing import Any
+
+from ..columnar import COLUMNAR_FORMATS
+from .search import build_filters_from_args, validate_json_arg
+
+INPUT_FORMATS = ("json", "ndjson", "csv", "parquet", "arrow")
+
+
+def add_refine_parser(subparsers: argparse._SubParsersAction) -> None:
+    """Add the refine command parser."""
+    parser = subparsers.add_parser(
+        "refine",
+        help="Filter saved search results locally",
+        description="Apply metadata filters to a saved result set without new "
+                    "searches. Results keep their original order. Requires "
+                    "pyarrow (pip install 'trioexplorer[arrow]').",
+    )
+
+    parser.add_argument(
+        "input",
+        help="Saved results (.json, .ndjson/.jsonl, .csv, .parquet, .arrow), - for stdin, "
+             "or @last for the last result set in 'trioexplorer shell'",
+    )
+
+    parser.add_argument(
+        "--input-format",
+        choices=INPUT_FORMATS,
+        help="Input format (default: from the file extension; ndjson for stdin)",
+    )
+
+    parser.add_argument(
+        "--patient-id",
+        metavar="UUID",
+        help="Keep results for this patient UUID",
+    )
+
+    parser.add_argument(
+        "--encounter-id",
+        metavar="UUID",
+        help="Keep results for this encounter UUID",
+    )
+
+    parser.add_argument(
+        "--note-types",
+        metavar="TYPES",
+        help="Comma-separated note types (e.g., 'Progress Note,Discharge Summary')",
+    )
+
+    parser.add_argument(
+        "--date-from",
+        metavar="DATE",
+        help="Keep notes from date (YYYY-MM-DD, inclusive)",
+    )
+
+    parser.add_argument(
+        "--date-to",
+        metavar="DATE",
+        help="Keep notes up to date (YYYY-MM-DD, inclusive)",
+    )
+
+    parser.add_argument(
+        "--min-quality-score",
+        type=float,
+        metavar="FLOAT",
+        help="Minimum note quality score (0.0-1.0)",
+    )
+
+    parser.add_argument(
+        "--min-chunk-quality-score",
+        type=float,
+        metavar="FLOAT",
+        help="Minimum chunk quality score (0.0-1.0)",
+    )
+
+    parser.add_argument(
+        "-f", "--filters",
+        metavar="JSON",
+        help="Metadata filters (JSON format, same DSL as search --filters)",
+    )
+
+    parser.add_argument(
+        "-k",
+        type=int,
+        metavar="NUM",
+        help="Maximum number of results to keep (default: all)",
+    )
+
+    parser.add_argument(
+        "-o", "--format",
+        dest="output_format",
+        choices=["table", "json", "csv", "ndjson", *COLUMNAR_FORMATS],
+        default="table",
+        help="Output format (default: table)",
+    )
+
+    parser.add_argument(
+        "--full-text",
+        action="store_true",
+        help="Show full note text instead of chunk",
+    )
+
+
+def refine_filters_from_args(args: argparse.Namespace) -> Any:
+    """Build the refine filter from CLI arguments.
+
+    The search filter flags are combined as for ``search``; the quality
+    score minimums become Gte conditions, since saved results carry the
+    scores as columns.
+
+    Raises:
+        FilterSyntaxError: If the user-provided filters are malformed.
+    """
+    conditions = []
+    if args.filters:
+        conditions.append(validate_json_arg(args.filters, "--filters"))
+    if args.min_quality_score is not None:
+        conditions.append(["note_quality_score", "Gte", args.min_quality_score])
+    if args.min_chunk_quality_score is not None:
+        conditions.append(["chunk_quality_score", "Gte", args.min_chunk_quality_score])
+    user_filters = ["And", conditions] if conditions else None
+    return build_filters_from_args(args, user_filters)
+
+
+def run_refine(args: argparse.Namespace) -> None:
+    """Execute the refine command."""
+    from rich.console import Console
+
+    from ..columnar import ColumnarUnavailableError
+    from ..filters import parse_filter
+    from ..output import output_json
+    from ..refine import load_results, refine, result_set_from_rows
+    from ..shell import LAST_RESULTS, active_session, keep_results
+    from .search import write_search_results
+
+    console = Console(stderr=True)
+
+    try:
+        filters = refine_filters_from_args(args)
+    except ValueError as e:
+        console.print(f"[red]Invalid --filters: {e}[/red]")
+        sys.exit(1)
+
+    session = active_session()
+    if args.input == LAST_RESULTS and (session is None or session.results is None):
+        console.print(f"[red]{LAST_RESULTS} is the last search result set of a 'trioexplorer shell'; "
+                      "none is kept yet[/red]")
+        sys.exit(1)
+
+    try:
+        if args.input == LAST_RESULTS:
+            result_set = result_set_from_rows(session.results, session.metadata)
+        else:
+            result_set = load_results(args.input, args.input_format)
+        node = parse_filter(filters) if filters is not None else None
+        results = refine(result_set, node, args.k)
+    except ColumnarUnavailableError as e:
+        console.print(f"[red]{e}[/red]")
+        sys.exit(1)
+    except OSError as e:
+        console.print(f"[red]Cannot read {args.input}: {e}[/red]")
+        sys.exit(1)
+    except ValueError as e:
+        console.print(f"[red]Cannot refine {args.input}: {e}[/red]")
+        sys.exit(1)
+
+    # Counts in the saved metadata describe the unrefined set, so they are
+    # not carried over
+    metadata = {
+        "total_results": len(results),
+        "refined_from": len(result_set),
+        "refine_filters": filters,
+    }
+    keep_results(results, metadata)
+
+    if args.output_format == "json":
+        output_json({"results": results, "metadata": metadata})
+    else:
+        write_search_results(results, metadata, args)
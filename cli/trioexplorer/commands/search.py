@@ -3,18 +3,18 @@
 import argparse
 import json
 import sys
-from typing import Any
+from typing import TYPE_CHECKING, Any, Optional
 
-from rich.console import Console
+from ..columnar import COLUMNAR_FORMATS
+from .common import add_cache_options
 
-from ..client import SearchClient
-from ..output import (
-    output_json,
-    output_search_csv,
-    output_search_table,
-)
+if TYPE_CHECKING:
+    from ..async_client import AsyncSearchClient
+    from ..client import SearchClient
+    from ..vocabulary import Vocabulary
 
-console = Console(stderr=True)
+# How --check-entities treats entity filter values missing from the vocabulary
+ENTITY_CHECK_MODES = ("off", "warn", "strict", "fix")
 
 
 def str_to_bool(value: str) -> bool:
@@ -40,6 +40,57 @@ def add_search_parser(subparsers: argparse._SubParsersAction) -> None:
         help="Search query text",
     )
 
+    add_search_options(parser)
+    add_cache_options(parser)
+
+    parser.add_argument(
+        "-o", "--format",
+        dest="output_format",
+        choices=["table", "json", "csv", "ndjson", "jsonl", *COLUMNAR_FORMATS],
+        default="table",
+        help="Output format (default: table; jsonl is an alias for ndjson)",
+    )
+
+    parser.add_argument(
+        "--full-text",
+        action="store_true",
+        help="Show full note text instead of chunk",
+    )
+
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Decode results incrementally as they arrive and write each row "
+             "(tables: every 50 rows) without holding the response; all formats "
+             "except json; bypasses the response cache",
+    )
+
+    parser.add_argument(
+        "--fan-out",
+        action="store_true",
+        help="Search each of --cohort-ids concurrently on its own cohort index "
+             "and merge the top-k client-side",
+    )
+
+    parser.add_argument(
+        "--exhaustive",
+        action="store_true",
+        help="Retrieve every match beyond the k=300 cap by searching "
+             "--date-from/--date-to in date windows, bisecting saturated ones "
+             "(-k is ignored)",
+    )
+
+    parser.add_argument(
+        "--windows",
+        type=int,
+        default=8,
+        metavar="NUM",
+        help="Initial number of date windows for --exhaustive (default: 8)",
+    )
+
+
+def add_search_options(parser: argparse.ArgumentParser) -> None:
+    """Add the search tuning and filter options shared by search commands."""
     parser.add_argument(
         "-k",
         type=int,
@@ -174,17 +225,19 @@ def add_search_parser(subparsers: argparse._SubParsersAction) -> None:
     )
 
     parser.add_argument(
-        "-o", "--format",
-        dest="output_format",
-        choices=["table", "json", "csv"],
-        default="table",
-        help="Output format (default: table)",
+        "--check-entities",
+        choices=ENTITY_CHECK_MODES,
+        default="off",
+        help="Look up --entity-filters values in the namespace's filter values first: "
+             "warn suggests close values and searches anyway, strict does not search, "
+             "fix replaces each unknown value by the closest one (default: off)",
     )
 
     parser.add_argument(
-        "--full-text",
-        action="store_true",
-        help="Show full note text instead of chunk",
+        "--filter-namespace",
+        metavar="NS",
+        help="Namespace whose filter values --check-entities uses (default: the "
+             "cohort index of a single --cohort-ids, otherwise default)",
     )
 
 
@@ -195,6 +248,8 @@ def validate_json_arg(value: str, arg_name: str) -> Any:
     try:
         return json.loads(value)
     except json.JSONDecodeError as e:
+        from rich.console import Console
+        console = Console(stderr=True)
         console.print(f"[red]Invalid JSON for {arg_name}: {e}[/red]")
         sys.exit(1)
 
@@ -204,8 +259,14 @@ def build_filters_from_args(args: argparse.Namespace, user_filters: Any) -> Any:
 
     Converts CLI filter flags (--patient-id, --encounter-id, --note-types,
     --date-from, --date-to) into the JSON filter format expected by the API.
-    Merges with any user-provided --filters argument.
+    Merges with any user-provided --filters argument and simplifies the
+    result (see trioexplorer.filters.normalize).
+
+    Raises:
+        FilterSyntaxError: If the user-provided filters are malformed.
     """
+    from ..filters import compile_filter
+
     filter_conditions = []
 
     # Patient filter
@@ -238,27 +299,25 @@ def build_filters_from_args(args: argparse.Namespace, user_filters: Any) -> Any:
     # Build final filter structure
     if not filter_conditions:
         return None
-    elif len(filter_conditions) == 1:
-        return filter_conditions[0]
-    else:
-        return ["And", filter_conditions]
-
+    return compile_filter(["And", filter_conditions])
 
-def run_search(client: SearchClient, args: argparse.Namespace) -> None:
-    """Execute the search command."""
-    # Validate JSON arguments
-    user_filters = None
-    if args.filters:
-        user_filters = validate_json_arg(args.filters, "--filters")
 
-    entity_filters = None
-    if args.entity_filters:
-        entity_filters = validate_json_arg(args.entity_filters, "--entity-filters")
+def build_search_params(
+    args: argparse.Namespace,
+    filters: Any = None,
+    entity_filters: Any = None,
+) -> dict[str, Any]:
+    """Build /search query parameters from parsed search options.
 
-    # Build filters from CLI args (--patient-id, --encounter-id, etc.)
-    filters = build_filters_from_args(args, user_filters)
+    Args:
+        args: Namespace carrying the options added by add_search_options
+            plus ``query``.
+        filters: Final metadata filter (see build_filters_from_args).
+        entity_filters: Parsed entity filter object.
 
-    # Build query parameters
+    Returns:
+        Query parameter dictionary for GET /search.
+    """
     params = {
         "query": args.query,
         "search-type": args.search_type,
@@ -292,16 +351,365 @@ def run_search(client: SearchClient, args: argparse.Namespace) -> None:
     if entity_filters:
         params["entity-filters"] = json.dumps(entity_filters)
 
+    return params
+
+
+def search_params_from_args(args: argparse.Namespace) -> dict[str, Any]:
+    """Validate the filter arguments and build /search parameters."""
+    # Validate JSON arguments
+    user_filters = None
+    if args.filters:
+        user_filters = validate_json_arg(args.filters, "--filters")
+
+    entity_filters = None
+    if args.entity_filters:
+        entity_filters = validate_json_arg(args.entity_filters, "--entity-filters")
+
+    # Build filters from CLI args (--patient-id, --encounter-id, etc.)
+    try:
+        filters = build_filters_from_args(args, user_filters)
+    except ValueError as e:
+        from rich.console import Console
+        console = Console(stderr=True)
+        console.print(f"[red]Invalid --filters: {e}[/red]")
+        sys.exit(1)
+
+    # Build query parameters
+    return build_search_params(args, filters, entity_filters)
+
+
+def entity_check_namespace(args: argparse.Namespace, params: dict[str, Any]) -> Optional[str]:
+    """Namespace to check the entity filters of /search parameters against.
+
+    Returns:
+        The namespace, or None when --check-entities is off or there are
+        no entity filters.
+    """
+    from ..vocabulary import entity_namespace
+
+    if getattr(args, "check_entities", "off") == "off" or "entity-filters" not in params:
+        return None
+    return entity_namespace(params.get("cohort-ids"), args.filter_namespace)
+
+
+def check_params_entities(
+    args: argparse.Namespace,
+    params: dict[str, Any],
+    vocabulary: "Vocabulary",
+) -> tuple[dict[str, Any], list]:
+    """Check the entity filters of /search parameters (correcting them with fix).
+
+    Returns:
+        The parameters, with corrected entity filters, and the EntityIssues.
+    """
+    from ..vocabulary import check_entity_filters
+
+    entity_filters, issues = check_entity_filters(
+        json.loads(params["entity-filters"]), vocabulary, correct=args.check_entities == "fix"
+    )
+    return {**params, "entity-filters": json.dumps(entity_filters)}, issues
+
+
+def apply_entity_check(
+    args: argparse.Namespace,
+    params: dict[str, Any],
+    vocabulary: Optional["Vocabulary"],
+) -> dict[str, Any]:
+    """Report entity filter issues to stderr and return the parameters to search with.
+
+    Exits before searching when strict or fix leaves a value that would
+    match nothing. Without a vocabulary the parameters are returned as is.
+    """
+    from rich.console import Console
+
+    from ..vocabulary import unresolved
+
+    if vocabulary is None:
+        return params
+    console = Console(stderr=True)
+    if not vocabulary:
+        console.print(f"[yellow]No filter values found for namespace '{vocabulary.namespace}'; "
+                      f"entity filters not checked[/yellow]")
+        return params
+
+    params, issues = check_params_entities(args, params, vocabulary)
+    for issue in issues:
+        console.print(f"[yellow]{issue.describe()}[/yellow]")
+    missing = unresolved(issues)
+    if missing and args.check_entities in ("strict", "fix"):
+        console.print(f"[red]Not searching: {len(missing)} entity filter entries match no known value "
+                      f"in '{vocabulary.namespace}'[/red]")
+        sys.exit(1)
+    return params
+
+
+def load_entity_vocabulary(client: "SearchClient", namespace: str) -> Optional["Vocabulary"]:
+    """Load the vocabulary for --check-entities, or None if it cannot be fetched."""
+    from ..vocabulary import load_vocabulary
+
+    try:
+        return load_vocabulary(client, namespace)
+    except SystemExit:
+        # The client already reported the error
+        from rich.console import Console
+        Console(stderr=True).print("[yellow]Entity filters not checked[/yellow]")
+        return None
+
+
+async def aload_entity_vocabulary(client: "AsyncSearchClient", namespace: str) -> Optional["Vocabulary"]:
+    """``load_entity_vocabulary`` with an async client."""
+    from ..errors import SearchAPIError
+    from ..vocabulary import aload_vocabulary
+
+    try:
+        return await aload_vocabulary(client, namespace)
+    except SearchAPIError as e:
+        from rich.console import Console
+        Console(stderr=True).print(f"[yellow]Entity filters not checked: {e.message}[/yellow]")
+        return None
+
+
+def run_search(client: "SearchClient", args: argparse.Namespace) -> None:
+    """Execute the search command."""
+    from ..output import output_json
+    from ..shell import active_session, keep_results
+
+    params = search_params_from_args(args)
+    namespace = entity_check_namespace(args, params)
+    if namespace is not None:
+        params = apply_entity_check(args, params, load_entity_vocabulary(client, namespace))
+
+    # Stream results straight from the socket into the writers; a shell
+    # still keeps the rows for refine @last
+    if getattr(args, "stream", False) and args.output_format != "json":
+        kept: list[dict] = []
+        with client.stream_get("/search", params=params) as stream:
+            rows = stream if active_session() is None else _kept_rows(stream, kept)
+            write_search_results(rows, lambda: stream.metadata, args)
+        keep_results(kept, stream.metadata)
+        return
+
     # Make the request
     response = client.get("/search", params=params)
 
     # Output results
     results = response.get("results", [])
     metadata = response.get("metadata", {})
+    keep_results(results, metadata)
 
     if args.output_format == "json":
         output_json(response)
-    elif args.output_format == "csv":
+    else:
+        write_search_results(results, metadata, args)
+
+
+def _kept_rows(rows: Any, kept: list[dict]) -> Any:
+    """Yield rows, appending each to kept."""
+    for row in rows:
+        kept.append(row)
+        yield row
+
+
+def write_search_results(results: Any, metadata: Any, args: argparse.Namespace) -> None:
+    """Write search results in the requested non-JSON output format."""
+    from ..output import output_ndjson, output_search_csv, output_search_table
+
+    if args.output_format == "csv":
         output_search_csv(results)
+    elif args.output_format in ("ndjson", "jsonl"):
+        output_ndjson(results)
+    elif args.output_format in COLUMNAR_FORMATS:
+        from ..columnar import SEARCH_COLUMNS
+        from ..output import output_columnar
+        output_columnar(results, SEARCH_COLUMNS, args.output_format)
     else:
         output_search_table(results, metadata, full_text=args.full_text)
+
+
+def run_fan_out_search(args: argparse.Namespace) -> None:
+    """Execute the search command with one concurrent request per cohort."""
+    import asyncio
+
+    from rich.console import Console
+
+    from ..async_client import create_async_client
+    from ..cache import open_cache
+    from ..fanout import fan_out_search, merge_top_k, merged_metadata, split_cohorts
+    from ..metrics import format_ms
+    from ..output import output_json
+    from ..shell import keep_results
+
+    console = Console(stderr=True)
+    cohorts = split_cohorts(args.cohort_ids)
+    if not cohorts:
+        console.print("[red]--fan-out requires --cohort-ids[/red]")
+        sys.exit(1)
+    if args.stream:
+        console.print("[red]--fan-out cannot be combined with --stream[/red]")
+        sys.exit(1)
+
+    params = search_params_from_args(args)
+    concurrency = max(1, min(len(cohorts), args.max_connections))
+
+    async def _run() -> tuple[list[dict[str, Any]], float]:
+        async with create_async_client(
+            base_url=args.api_url,
+            debug=args.debug,
+            http2=args.http2,
+            max_concurrency=concurrency,
+            per_host_limit=concurrency,
+            cache=open_cache(args),
+            refresh=args.refresh,
+            max_retries=args.retries,
+            rate_limit=args.rate_limit,
+        ) as client:
+            checked = params
+            namespace = entity_check_namespace(args, params)
+            if namespace is not None:
+                checked = apply_entity_check(args, params, await aload_entity_vocabulary(client, namespace))
+            return await fan_out_search(client, checked, cohorts)
+
+    shards, wall_ms = asyncio.run(_run())
+
+    for shard in shards:
+        if shard["status"] == "ok":
+            console.print(
+                f"[dim]cohort {shard['cohort_id']}: {shard['result_count']} results "
+                f"in {format_ms(shard['latency_ms'])}[/dim]"
+            )
+        else:
+            console.print(f"[red]cohort {shard['cohort_id']}: {shard['error']}[/red]")
+    console.print(f"[dim]{len(shards)} shards in {format_ms(wall_ms)}[/dim]")
+
+    if any(shard["status"] != "ok" for shard in shards):
+        sys.exit(1)
+
+    results = merge_top_k((shard["results"] for shard in shards), args.k, args.distinct)
+    metadata = merged_metadata(results, shards, wall_ms)
+    keep_results(results, metadata)
+
+    if args.output_format == "json":
+        output_json({"results": results, "metadata": metadata})
+    else:
+        write_search_results(results, metadata, args)
+
+
+def run_exhaustive_search(args: argparse.Namespace) -> None:
+    """Execute the search command over date windows until every match is found."""
+    import asyncio
+    import datetime
+    from copy import copy
+
+    from rich.console import Console
+
+    from ..async_client import create_async_client
+    from ..cache import open_cache
+    from ..exhaustive import MAX_K, Window, exhaustive_search, parse_date, split_range
+    from ..output import SEARCH_CSV_FIELDS, CSVRowWriter, NDJSONRowWriter, output_json
+    from ..shell import active_session, keep_results
+
+    console = Console(stderr=True)
+    if args.fan_out or args.stream:
+        console.print("[red]--exhaustive cannot be combined with --fan-out or --stream[/red]")
+        sys.exit(1)
+    if not args.date_from:
+        console.print("[red]--exhaustive requires --date-from (and optionally --date-to)[/red]")
+        sys.exit(1)
+    if args.windows < 1:
+        console.print("[red]--windows must be at least 1[/red]")
+        sys.exit(1)
+
+    try:
+        start = parse_date(args.date_from, "--date-from")
+        end = parse_date(args.date_to, "--date-to") if args.date_to else datetime.date.today()
+    except ValueError as e:
+        console.print(f"[red]{e}[/red]")
+        sys.exit(1)
+    if end < start:
+        console.print("[red]--date-to must not be before --date-from[/red]")
+        sys.exit(1)
+
+    user_filters = validate_json_arg(args.filters, "--filters") if args.filters else None
+    entity_filters = (
+        validate_json_arg(args.entity_filters, "--entity-filters") if args.entity_filters else None
+    )
+    try:
+        build_filters_from_args(args, user_filters)
+    except ValueError as e:
+        console.print(f"[red]Invalid --filters: {e}[/red]")
+        sys.exit(1)
+
+    def params_for(window: Window) -> dict[str, Any]:
+        window_args = copy(args)
+        window_args.date_from = window[0].isoformat()
+        window_args.date_to = window[1].isoformat()
+        window_args.k = MAX_K
+        filters = build_filters_from_args(window_args, user_filters)
+        return build_search_params(window_args, filters, entity_filters)
+
+    # CSV and NDJSON rows are written as each window completes (and also
+    # collected inside a shell, for refine @last)
+    collected: list[dict] = []
+    streaming = args.output_format in ("csv", "ndjson", "jsonl")
+    if args.output_format == "csv":
+        write = CSVRowWriter(fields=SEARCH_CSV_FIELDS).write
+    elif streaming:
+        write = NDJSONRowWriter().write
+    if not streaming:
+        emit = collected.append
+    elif active_session() is None:
+        emit = write
+    else:
+        def emit(result: dict[str, Any]) -> None:
+            write(result)
+            collected.append(result)
+
+    concurrency = max(1, min(args.windows, args.max_connections))
+
+    async def _run() -> dict[str, Any]:
+        nonlocal entity_filters
+        async with create_async_client(
+            base_url=args.api_url,
+            debug=args.debug,
+            http2=args.http2,
+            max_concurrency=concurrency,
+            per_host_limit=concurrency,
+            cache=open_cache(args),
+            refresh=args.refresh,
+            max_retries=args.retries,
+            rate_limit=args.rate_limit,
+        ) as client:
+            params = build_search_params(args, None, entity_filters)
+            namespace = entity_check_namespace(args, params)
+            if namespace is not None:
+                params = apply_entity_check(args, params, await aload_entity_vocabulary(client, namespace))
+                entity_filters = json.loads(params["entity-filters"])
+            return await exhaustive_search(
+                client,
+                split_range(start, end, args.windows),
+                params_for,
+                emit,
+                distinct=args.distinct,
+                concurrency=concurrency,
+            )
+
+    summary = asyncio.run(_run())
+    sys.stdout.flush()
+
+    metadata = {"query": args.query, "total_results": summary["results"], "exhaustive": summary}
+    keep_results(collected, metadata)
+    if args.output_format == "json":
+        output_json({"results": collected, "metadata": metadata})
+    elif not streaming:
+        write_search_results(collected, metadata, args)
+
+    console.print(
+        f"[dim]{summary['results']} unique results from {summary['windows']} windows "
+        f"({summary['bisected']} bisected) in {summary['wall_seconds']:.2f}s[/dim]"
+    )
+    for window in summary["saturated"]:
+        console.print(f"[yellow]Window {window} still returned {MAX_K} results; it may be incomplete[/yellow]")
+    for error in summary["errors"]:
+        console.print(f"[red]Window {error['window']}: {error['error']}[/red]")
+    if summary["errors"]:
+        sys.exit(1)
@@ -0,0 +1,195 @@
+"""Interactive shell command for the Trioexplorer CLI."""
+
+import argparse
+import sys
+from typing import TYPE_CHECKING, Any, Optional
+
+if TYPE_CHECKING:
+    from ..main import ClientProvider
+    from ..shell import Completer
+
+# Prompt shown when reading from a terminal
+PROMPT = "trioexplorer> "
+
+# Lines kept in the shell history file
+HISTORY_LENGTH = 1000
+
+SHELL_HELP = """\
+Shell commands:
+  help               Show this help and the command list
+  last               Describe the result set kept for 'refine @last'
+  reload             Refetch completion values (cohorts, note types, filter values)
+  exit, quit         Leave the shell (or press Ctrl-D)
+
+Any other line is a trioexplorer command without the 'trioexplorer' prefix,
+e.g. search "chest pain" -k 20, then refine @last --note-types "Progress Note".
+Tab completes commands, options, cohort IDs, note types and filter values."""
+
+
+def add_shell_parser(subparsers: argparse._SubParsersAction) -> None:
+    """Add the shell command parser."""
+    parser = subparsers.add_parser(
+        "shell",
+        help="Run commands interactively with a warm client",
+        description="Read trioexplorer commands from a prompt and run them in one "
+                    "process. Commands share one pooled client and connection, "
+                    "cohorts, note types and filter values are kept in memory for "
+                    "tab completion, and the last search result set can be "
+                    "refined with 'refine @last'. Global options given before "
+                    "'shell' apply to every command.",
+    )
+    parser.add_argument(
+        "--namespace",
+        metavar="NS",
+        default="default",
+        help="Namespace whose filter values are completed (default: default)",
+    )
+
+
+def global_options(parser: argparse.ArgumentParser, args: argparse.Namespace) -> argparse.Namespace:
+    """Namespace holding only the global (pre-command) options of ``args``.
+
+    Parsing a shell line into this namespace keeps the session's global
+    options unless the line sets them again.
+    """
+    dests = {
+        action.dest
+        for action in parser._actions
+        if action.option_strings and action.dest not in ("help", "version")
+    }
+    return argparse.Namespace(**{dest: getattr(args, dest) for dest in dests if hasattr(args, dest)})
+
+
+def _setup_readline(completer: "Completer") -> Optional[Any]:
+    """Enable line editing, history and tab completion where readline exists."""
+    try:
+        import readline
+    except ImportError:
+        return None
+
+    from ..config import SYSTEM_SHELL_HISTORY_FILE
+    from ..shell import COMPLETER_DELIMS
+
+    readline.set_completer(completer.complete)
+    readline.set_completer_delims(COMPLETER_DELIMS)
+    if "libedit" in (readline.__doc__ or ""):
+        readline.parse_and_bind("bind ^I rl_complete")
+    else:
+        readline.parse_and_bind("tab: complete")
+    readline.set_history_length(HISTORY_LENGTH)
+    try:
+        readline.read_history_file(str(SYSTEM_SHELL_HISTORY_FILE))
+    except OSError:
+        pass
+    return readline
+
+
+def _save_history(readline: Any) -> None:
+    from ..config import SYSTEM_SHELL_HISTORY_FILE
+
+    try:
+        SYSTEM_SHELL_HISTORY_FILE.parent.mkdir(parents=True, exist_ok=True)
+        readline.write_history_file(str(SYSTEM_SHELL_HISTORY_FILE))
+    except OSError:
+        pass
+
+
+def run_shell(args: argparse.Namespace, client_provider: "ClientProvider") -> None:
+    """Execute the shell command."""
+    import shlex
+
+    from rich.console import Console
+
+    from .. import __version__
+    from ..main import begin_timings, create_parser, report_timings, run_command
+    from ..shell import (
+        CompletionIndex,
+        Completer,
+        active_session,
+        start_session,
+        stop_session,
+    )
+
+    console = Console(stderr=True)
+    parser = create_parser()
+    index = CompletionIndex(client_provider, args.namespace)
+    interactive = sys.stdin.isatty()
+    readline = _setup_readline(Completer(parser, index)) if interactive else None
+    prompt = PROMPT if interactive else ""
+
+    start_session()
+    if interactive:
+        console.print(f"[dim]trioexplorer {__version__} shell: 'help' for commands, Ctrl-D to quit[/dim]")
+    try:
+        while True:
+            try:
+                line = input(prompt)
+            except EOFError:
+                if interactive:
+                    console.print()
+                break
+            except KeyboardInterrupt:
+                console.print()
+                continue
+
+            try:
+                words = shlex.split(line, comments=True)
+            except ValueError as e:
+                console.print(f"[red]{e}[/red]")
+                continue
+            if not words:
+                continue
+
+            if words[0] in ("exit", "quit"):
+                break
+            if words[0] == "help":
+                parser.print_help()
+                console.print()
+                console.print(SHELL_HELP)
+                continue
+            if words[0] == "last":
+                session = active_session()
+                if session is None or session.results is None:
+                    console.print("[yellow]No results kept yet; run a search first.[/yellow]")
+                else:
+                    query = session.metadata.get("query")
+                    source = f" for '{query}'" if query else ""
+                    console.print(f"{len(session.results)} results kept{source}; use 'refine @last ...'")
+                continue
+            if words[0] == "reload":
+                index.clear()
+                console.print("[dim]Completion values will be refetched.[/dim]")
+                continue
+
+            try:
+                line_args = parser.parse_args(words, namespace=global_options(parser, args))
+            except SystemExit:
+                # argparse already printed the usage error (or --help)
+                continue
+            if line_args.command is None:
+                continue
+            if line_args.command == "shell":
+                console.print("[yellow]Already in a shell.[/yellow]")
+                continue
+            if args.record or args.replay:
+                # As start_cassette does for a single command
+                line_args.no_cache = True
+
+            client_provider.args = line_args
+            try:
+                begin_timings(line_args)
+                try:
+                    run_command(line_args, parser, client_provider)
+                finally:
+                    report_timings(line_args)
+            except SystemExit:
+                # The command already reported its error
+                pass
+            except KeyboardInterrupt:
+                console.print("[yellow]Interrupted[/yellow]")
+            sys.stdout.flush()
+    finally:
+        stop_session()
+        index.clear()
+        if readline is not None:
+            _save_history(readline)
@@ -1,9 +1,14 @@
 """Stats commands for the Trioexplorer CLI."""
 
 import argparse
+import sys
+from typing import TYPE_CHECKING, Callable
 
-from ..client import SearchClient
-from ..output import output_json, output_stats_table
+from ..latency import LATENCY_GROUPS
+from ..paging import DEFAULT_CONCURRENCY, MAX_PAGE_SIZE
+
+if TYPE_CHECKING:
+    from ..client import SearchClient
 
 
 def add_stats_parser(subparsers: argparse._SubParsersAction) -> None:
@@ -43,20 +48,102 @@ def add_stats_parser(subparsers: argparse._SubParsersAction) -> None:
         help="Output format (default: table)",
     )
 
+    # Latency percentiles over the full history
+    latency_parser = stats_subparsers.add_parser(
+        "latency",
+        help="Get search latency percentiles per search type, day and user",
+        description=(
+            "Page through the search history concurrently and report p50/p95/p99 "
+            "of duration_ms overall and per search type, day and user. Entries are "
+            "summarized in mergeable histograms as pages arrive, so any history "
+            "size fits in memory."
+        ),
+    )
+    latency_parser.add_argument(
+        "--date-from",
+        metavar="DATE",
+        help="Filter from date (ISO format)",
+    )
+    latency_parser.add_argument(
+        "--date-to",
+        metavar="DATE",
+        help="Filter to date (ISO format)",
+    )
+    latency_parser.add_argument(
+        "--user-id",
+        metavar="ID",
+        help="Filter by user ID",
+    )
+    latency_parser.add_argument(
+        "--type",
+        dest="search_type",
+        choices=["hybrid", "semantic", "keyword"],
+        help="Filter by search type",
+    )
+    latency_parser.add_argument(
+        "--group-by",
+        default="search_type,day,user",
+        metavar="GROUPS",
+        help="Comma-separated groupings to show: search_type, day, user "
+             "(default: all)",
+    )
+    latency_parser.add_argument(
+        "--page-size",
+        type=int,
+        default=MAX_PAGE_SIZE,
+        metavar="NUM",
+        help=f"Entries per page (1-{MAX_PAGE_SIZE}, default: {MAX_PAGE_SIZE})",
+    )
+    latency_parser.add_argument(
+        "-j", "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        metavar="NUM",
+        help=f"Pages fetched at once (default: {DEFAULT_CONCURRENCY})",
+    )
+    latency_parser.add_argument(
+        "--max-pages",
+        type=int,
+        metavar="NUM",
+        help="Stop after this many pages (default: all)",
+    )
+    latency_parser.add_argument(
+        "--top",
+        type=int,
+        metavar="NUM",
+        help="In tables, show only the NUM groups with the highest p99",
+    )
+    latency_parser.add_argument(
+        "-o", "--format",
+        dest="output_format",
+        choices=["table", "json"],
+        default="table",
+        help="Output format (default: table)",
+    )
+
+
+def run_stats(args: argparse.Namespace, get_client: Callable[[], "SearchClient"]) -> None:
+    """Execute the stats command.
 
-def run_stats(client: SearchClient, args: argparse.Namespace) -> None:
-    """Execute the stats command."""
+    Args:
+        args: Parsed arguments.
+        get_client: Factory function to create the client (deferred until needed).
+    """
     if args.stats_command == "history":
-        run_stats_history(client, args)
+        run_stats_history(get_client(), args)
+    elif args.stats_command == "latency":
+        run_stats_latency(args)
     else:
         from rich.console import Console
         console = Console(stderr=True)
-        console.print("[red]Please specify a stats type: history[/red]")
+        console.print("[red]Please specify a stats type: history, latency[/red]")
         raise SystemExit(1)
 
 
-def run_stats_history(client: SearchClient, args: argparse.Namespace) -> None:
+def run_stats_history(client: "SearchClient", args: argparse.Namespace) -> None:
     """Get search history statistics."""
+    from ..output import output_json, output_stats_table
+
     params = {}
     if args.date_from:
         params["date-from"] = args.date_from
@@ -69,3 +156,87 @@ def run_stats_history(client: SearchClient, args: argparse.Namespace) -> None:
         output_json(response)
     else:
         output_stats_table(response)
+
+
+def run_stats_latency(args: argparse.Namespace) -> None:
+    """Get search latency percentiles from the full search history."""
+    import asyncio
+
+    from rich.console import Console
+
+    from ..async_client import create_async_client
+    from ..errors import SearchAPIError
+    from ..latency import collect_latency
+    from ..output import output_json, output_latency_tables
+
+    console = Console(stderr=True)
+    groups = [group.strip() for group in args.group_by.split(",") if group.strip()]
+    unknown = [group for group in groups if group not in LATENCY_GROUPS]
+    if unknown:
+        console.print(
+            f"[red]Unknown --group-by {', '.join(unknown)} "
+            f"(choose from {', '.join(LATENCY_GROUPS)})[/red]"
+        )
+        sys.exit(1)
+    if not 1 <= args.page_size <= MAX_PAGE_SIZE:
+        console.print(f"[red]--page-size must be between 1 and {MAX_PAGE_SIZE}[/red]")
+        sys.exit(1)
+    if args.concurrency < 1:
+        console.print("[red]--concurrency must be at least 1[/red]")
+        sys.exit(1)
+
+    params = {}
+    if args.date_from:
+        params["date-from"] = args.date_from
+    if args.date_to:
+        params["date-to"] = args.date_to
+    if args.user_id:
+        params["user-id"] = args.user_id
+    if args.search_type:
+        params["search-type"] = args.search_type
+
+    async def _run():
+        async with create_async_client(
+            base_url=args.api_url,
+            debug=args.debug,
+            http2=args.http2,
+            max_concurrency=args.concurrency,
+            per_host_limit=args.concurrency,
+            max_retries=args.retries,
+            rate_limit=args.rate_limit,
+        ) as client:
+            return await collect_latency(
+                client,
+                params,
+                page_size=args.page_size,
+                concurrency=args.concurrency,
+                max_pages=args.max_pages,
+            )
+
+    try:
+        stats, summary = asyncio.run(_run())
+    except SearchAPIError as e:
+        console.print(f"[red]{e.message}[/red]")
+        if e.hint:
+            console.print(f"[dim]{e.hint}[/dim]")
+        sys.exit(1)
+
+    report = stats.report()
+    for error in summary["errors"]:
+        console.print(f"[red]page {error['page']}: {error['error']}[/red]")
+
+    if args.output_format == "json":
+        output_json({
+            "entries": report["entries"],
+            "missing_duration": report["missing_duration"],
+            "overall": report["overall"],
+            **{group: report[group] for group in groups},
+            "pages": summary["pages"],
+            "failed_pages": [error["page"] for error in summary["errors"]],
+        })
+    else:
+        output_latency_tables(report, groups, max_rows=args.top)
+        console.print(f"[dim]{summary['pages']} pages in {summary['wall_seconds']:.2f}s[/dim]")
+
+    if summary["errors"]:
+        sys.exit(1)
@@ -0,0 +1,131 @@
+"""Stub server command for the Trioexplorer CLI."""
+
+import argparse
+import sys
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8001
+
+
+def add_stub_parser(subparsers: argparse._SubParsersAction) -> None:
+    """Add the stub-server command parser."""
+    parser = subparsers.add_parser(
+        "stub-server",
+        help="Run a local stand-in Search API for offline testing",
+        description=(
+            "Serve every path in docs/openapi.json with synthetic, schema-valid "
+            "data. /search returns k results. Latency, errors and payload size "
+            "are configurable. Point the CLI at it with --api-url (any API key "
+            "is accepted)."
+        ),
+    )
+
+    parser.add_argument(
+        "--host",
+        default=DEFAULT_HOST,
+        help=f"Interface to bind (default: {DEFAULT_HOST})",
+    )
+
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=DEFAULT_PORT,
+        help=f"Port to bind; 0 picks a free port (default: {DEFAULT_PORT})",
+    )
+
+    parser.add_argument(
+        "--spec",
+        metavar="FILE",
+        help="OpenAPI document (default: docs/openapi.json in the source tree)",
+    )
+
+    parser.add_argument(
+        "--latency",
+        default="0",
+        metavar="MODEL",
+        help="Response delay in ms: MS, fixed:MS, uniform:LOW:HIGH, normal:MEAN:STDDEV, "
+             "lognormal:MEDIAN:SIGMA or exponential:MEAN (default: 0)",
+    )
+
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.0,
+        metavar="FLOAT",
+        help="Fraction of requests failed with an injected error (0.0-1.0, default: 0)",
+    )
+
+    parser.add_argument(
+        "--error-status",
+        default="500,503",
+        metavar="CODES",
+        help="Comma-separated status codes for injected errors (default: 500,503)",
+    )
+
+    parser.add_argument(
+        "--text-bytes",
+        type=int,
+        default=200,
+        metavar="NUM",
+        help="Characters of note text per search result (default: 200)",
+    )
+
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        metavar="NUM",
+        help="Random seed for generated data, latency and errors (default: 0)",
+    )
+
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Log every request to stderr",
+    )
+
+
+def run_stub_server(args: argparse.Namespace) -> None:
+    """Execute the stub-server command."""
+    from rich.console import Console
+
+    from ..stub import StubAPI, StubConfig, StubServer, load_spec, parse_latency
+
+    console = Console(stderr=True)
+
+    try:
+        latency = parse_latency(args.latency)
+        statuses = tuple(int(code) for code in args.error_status.split(","))
+    except ValueError as e:
+        console.print(f"[red]{e}[/red]")
+        sys.exit(1)
+    if not 0.0 <= args.error_rate <= 1.0:
+        console.print("[red]--error-rate must be between 0.0 and 1.0[/red]")
+        sys.exit(1)
+
+    try:
+        spec = load_spec(args.spec)
+    except (OSError, ValueError) as e:
+        console.print(f"[red]Cannot load OpenAPI spec: {e}[/red]")
+        sys.exit(1)
+
+    config = StubConfig(
+        latency=latency,
+        error_rate=args.error_rate,
+        error_statuses=statuses,
+        text_bytes=args.text_bytes,
+        seed=args.seed,
+    )
+    try:
+        server = StubServer((args.host, args.port), StubAPI(spec, config), verbose=args.verbose)
+    except OSError as e:
+        console.print(f"[red]Cannot bind {args.host}:{args.port}: {e}[/red]")
+        sys.exit(1)
+
+    console.print(f"Stub Search API listening on [bold]{server.url}[/bold] (Ctrl-C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
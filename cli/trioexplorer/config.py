@@ -1,28 +1,53 @@
 """Configuration management for the Trioexplorer CLI."""
 
+import functools
 import os
 from pathlib import Path
 from typing import Optional
 
-from dotenv import load_dotenv, find_dotenv
-
 # System-wide config directory
 SYSTEM_CONFIG_DIR = Path.home() / ".trioexplorer"
 SYSTEM_ENV_FILE = SYSTEM_CONFIG_DIR / ".env"
-
-# Load environment files in order (later loads don't override existing values):
-# 1. System-wide config (~/.trioexplorer/.env) - loaded first, takes priority
-# 2. Local .env (repo root or cwd) - fallback for project-specific overrides
-load_dotenv(SYSTEM_ENV_FILE)
-load_dotenv(find_dotenv(usecwd=True))
+SYSTEM_CACHE_FILE = SYSTEM_CONFIG_DIR / "cache.sqlite3"
+SYSTEM_HISTORY_FILE = SYSTEM_CONFIG_DIR / "history.sqlite3"
+SYSTEM_FILTER_INDEX_FILE = SYSTEM_CONFIG_DIR / "filters.sqlite3"
+SYSTEM_SHELL_HISTORY_FILE = SYSTEM_CONFIG_DIR / "shell_history"
+SYSTEM_DAEMON_SOCKET = SYSTEM_CONFIG_DIR / "daemon.sock"
 
 # Environment variable names
 API_KEY_ENV = "TRIOEXPLORER_API_KEY"
 API_URL_ENV = "TRIOEXPLORER_API_URL"
+CACHE_FILE_ENV = "TRIOEXPLORER_CACHE_FILE"
+HISTORY_FILE_ENV = "TRIOEXPLORER_HISTORY_FILE"
+FILTER_INDEX_FILE_ENV = "TRIOEXPLORER_FILTER_INDEX_FILE"
+DAEMON_SOCKET_ENV = "TRIOEXPLORER_DAEMON_SOCKET"
 
 # Default values - production API
 DEFAULT_API_URL = "https://search.trioexplorer.com"
 
+# Transport defaults (kept here so the argument parser can show them
+# without importing the HTTP stack)
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_MAX_RETRIES = 3
+
+
+@functools.lru_cache(maxsize=None)
+def load_env_files() -> None:
+    """Load environment files once, on first use.
+
+    Files are loaded in order (later loads don't override existing values):
+    1. System-wide config (~/.trioexplorer/.env) - loaded first, takes priority
+    2. Local .env (repo root or cwd) - fallback for project-specific overrides
+
+    Deferred until a setting is actually read so that commands such as
+    ``--help``, ``--version`` and ``list entities`` skip the dotenv import
+    and the directory walk entirely.
+    """
+    from dotenv import load_dotenv, find_dotenv
+
+    load_dotenv(SYSTEM_ENV_FILE)
+    load_dotenv(find_dotenv(usecwd=True))
+
 
 def get_api_url(override: Optional[str] = None) -> str:
     """Get the Search API base URL.
@@ -35,6 +60,7 @@ def get_api_url(override: Optional[str] = None) -> str:
     if override:
         return override.rstrip("/")
 
+    load_env_files()
     env_url = os.getenv(API_URL_ENV)
     if env_url:
         return env_url.rstrip("/")
@@ -42,11 +68,68 @@ def get_api_url(override: Optional[str] = None) -> str:
     return DEFAULT_API_URL
 
 
+def get_cache_path() -> Path:
+    """Get the response cache database path.
+
+    Priority:
+    1. Environment variable (TRIOEXPLORER_CACHE_FILE)
+    2. ~/.trioexplorer/cache.sqlite3
+    """
+    load_env_files()
+    env_path = os.getenv(CACHE_FILE_ENV)
+    if env_path:
+        return Path(env_path).expanduser()
+    return SYSTEM_CACHE_FILE
+
+
+def get_history_path() -> Path:
+    """Get the local search history mirror database path.
+
+    Priority:
+    1. Environment variable (TRIOEXPLORER_HISTORY_FILE)
+    2. ~/.trioexplorer/history.sqlite3
+    """
+    load_env_files()
+    env_path = os.getenv(HISTORY_FILE_ENV)
+    if env_path:
+        return Path(env_path).expanduser()
+    return SYSTEM_HISTORY_FILE
+
+
+def get_filter_index_path() -> Path:
+    """Get the local filter value index database path.
+
+    Priority:
+    1. Environment variable (TRIOEXPLORER_FILTER_INDEX_FILE)
+    2. ~/.trioexplorer/filters.sqlite3
+    """
+    load_env_files()
+    env_path = os.getenv(FILTER_INDEX_FILE_ENV)
+    if env_path:
+        return Path(env_path).expanduser()
+    return SYSTEM_FILTER_INDEX_FILE
+
+
+def get_daemon_socket_path() -> Path:
+    """Get the Unix socket path of the local daemon.
+
+    Priority:
+    1. Environment variable (TRIOEXPLORER_DAEMON_SOCKET)
+    2. ~/.trioexplorer/daemon.sock
+    """
+    load_env_files()
+    env_path = os.getenv(DAEMON_SOCKET_ENV)
+    if env_path:
+        return Path(env_path).expanduser()
+    return SYSTEM_DAEMON_SOCKET
+
+
 def get_api_key() -> Optional[str]:
     """Get the API key from environment.
 
     Returns None if not set, which will cause auth errors.
     """
+    load_env_files()
     return os.getenv(API_KEY_ENV)
 
 
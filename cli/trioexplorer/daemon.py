@@ -0,0 +1,584 @@
+"""Local daemon that makes API requests for short-lived CLI processes.
+
+``trioexplorer daemon start`` runs a background process listening on a
+Unix domain socket (``~/.trioexplorer/daemon.sock``, owner-only). It owns
+the pooled HTTP connections, the response cache and the rate limiter.
+Commands that use the sync client then forward their requests to it
+instead of building a client, so a cron job firing many searches pays for
+connection setup and cache opening once, in the daemon, rather than on
+every invocation. Parsing and output stay in the CLI process.
+
+The daemon serves requests, not connections: one thread watches the
+listening socket and every idle connection with a selector, answers
+control messages (hello, status, stop) itself and hands each API request
+to a pool of worker threads, then watches the connection again once the
+reply is sent. A CLI process that stays connected between requests (a
+``shell`` session, a long ``list``) holds no worker, so ``--workers``
+bounds concurrent API requests, not connected processes. Each worker
+keeps its own SearchClient (pooled connections and SQLite cache
+connection), and all of them share one TokenBucket, so ``--rate-limit``
+holds across every forwarding process.
+
+The protocol is one JSON object per line in each direction over a
+connection that lasts for the CLI process::
+
+    {"op": "get", "path": "/search", "params": {...}, "refresh": false, "no_cache": false}
+    {"ok": true, "data": {...}}
+    {"ok": false, "error": {"message": "...", "hint": "..."}}
+
+A CLI process only forwards to a daemon serving the same API URL with the
+same API key; otherwise it makes its requests itself.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterator, Optional
+
+from . import __version__
+
+if TYPE_CHECKING:
+    import argparse
+    import queue
+    import selectors
+    import socket
+
+    from .client import SearchClient
+
+# Bump when the request or reply format changes
+PROTOCOL_VERSION = 1
+
+# Worker threads (and so API requests forwarded at once)
+DEFAULT_WORKERS = 8
+
+# Seconds to wait when connecting to the socket
+CONNECT_TIMEOUT = 1.0
+
+# Seconds between checks for a stop request while waiting for connections
+ACCEPT_POLL_INTERVAL = 0.5
+
+# Bytes read from a connection at a time
+RECV_SIZE = 65536
+
+
+class DaemonError(Exception):
+    """The daemon cannot be started or reached."""
+
+
+def key_identity(api_key: Optional[str]) -> str:
+    """Short digest identifying an API key without revealing it."""
+    return hashlib.sha256((api_key or "").encode()).hexdigest()[:16]
+
+
+def _encode(message: dict[str, Any]) -> bytes:
+    return json.dumps(message, separators=(",", ":")).encode() + b"\n"
+
+
+def _send(stream: Any, message: dict[str, Any]) -> None:
+    stream.write(_encode(message))
+    stream.flush()
+
+
+def _connect(path: Path, timeout: Optional[float] = CONNECT_TIMEOUT) -> "socket.socket":
+    import socket
+
+    if not hasattr(socket, "AF_UNIX"):
+        raise DaemonError("Unix domain sockets are not available on this platform")
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(str(path))
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def request(path: Path, message: dict[str, Any], timeout: float = CONNECT_TIMEOUT) -> dict[str, Any]:
+    """Send one control message (hello, status, stop) and return the reply.
+
+    Raises:
+        OSError: If the daemon cannot be reached.
+        DaemonError: If the daemon replies with an error.
+    """
+    with _connect(path, timeout) as sock, sock.makefile("rwb") as stream:
+        _send(stream, message)
+        line = stream.readline()
+    if not line:
+        raise DaemonError("The daemon closed the connection")
+    reply = json.loads(line)
+    if not reply.get("ok"):
+        raise DaemonError(reply.get("error", {}).get("message", "Daemon error"))
+    return reply["data"]
+
+
+class _BufferedResponse:
+    """A complete response standing in for a StreamedResponse."""
+
+    def __init__(self, data: dict[str, Any], array_key: str):
+        self._items = data.get(array_key) or []
+        self.members = {key: value for key, value in data.items() if key != array_key}
+
+    @property
+    def metadata(self) -> dict[str, Any]:
+        return self.members.get("metadata") or {}
+
+    @property
+    def item_count(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._items)
+
+
+class DaemonClient:
+    """Stand-in for SearchClient that forwards requests to the daemon.
+
+    Errors are reported like SearchClient reports them: message and hint
+    on stderr, then exit status 1.
+    """
+
+    def __init__(self, sock: "socket.socket", info: dict[str, Any], refresh: bool = False, no_cache: bool = False):
+        """Initialize the client on a connected socket.
+
+        Args:
+            sock: Connection to the daemon (hello already exchanged).
+            info: The daemon's hello reply.
+            refresh: Skip cache reads (responses are still stored).
+            no_cache: Bypass the daemon's response cache entirely.
+        """
+        self._sock = sock
+        self._stream = sock.makefile("rwb")
+        self.info = info
+        self.base_url = info["api_url"]
+        self.refresh = refresh
+        self.no_cache = no_cache
+
+    def close(self) -> None:
+        """Close the connection to the daemon."""
+        self._stream.close()
+        self._sock.close()
+
+    def __enter__(self) -> "DaemonClient":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _call(self, message: dict[str, Any]) -> dict[str, Any]:
+        from rich.console import Console
+
+        console = Console(stderr=True)
+        try:
+            _send(self._stream, {**message, "refresh": self.refresh, "no_cache": self.no_cache})
+            line = self._stream.readline()
+        except OSError as e:
+            line = b""
+            console.print(f"[dim]{e}[/dim]")
+        if not line:
+            console.print("[red]Lost the connection to the trioexplorer daemon[/red]")
+            console.print("[dim]Check 'trioexplorer daemon status' or run with --no-daemon[/dim]")
+            sys.exit(1)
+        reply = json.loads(line)
+        if not reply.get("ok"):
+            error = reply.get("error") or {}
+            console.print(f"[red]{error.get('message', 'Request failed in the daemon')}[/red]")
+            if error.get("hint"):
+                console.print(f"[dim]{error['hint']}[/dim]")
+            sys.exit(1)
+        return reply["data"]
+
+    def get(self, path: str, params: Optional[dict] = None) -> dict[str, Any]:
+        """Make a GET request through the daemon (see SearchClient.get)."""
+        return self._call({"op": "get", "path": path, "params": params})
+
+    def post(self, path: str, json_data: Optional[dict] = None) -> dict[str, Any]:
+        """Make a POST request through the daemon (see SearchClient.post)."""
+        return self._call({"op": "post", "path": path, "json": json_data})
+
+    @contextmanager
+    def stream_get(
+        self,
+        path: str,
+        params: Optional[dict] = None,
+        array_key: str = "results",
+    ) -> Iterator[_BufferedResponse]:
+        """GET through the daemon, iterated like SearchClient.stream_get.
+
+        The daemon returns complete responses, so the body is not streamed.
+        """
+        yield _BufferedResponse(self.get(path, params), array_key)
+
+
+def connect_daemon(args: "argparse.Namespace") -> Optional[DaemonClient]:
+    """Connect to a running daemon that can serve this command.
+
+    Returns None (make requests locally) when no daemon is running, it
+    serves another API URL or API key, or the command uses options the
+    daemon does not apply: --no-daemon, --debug, --record, --replay,
+    --timings and --timings-export.
+    """
+    if (
+        getattr(args, "no_daemon", False)
+        or args.debug
+        or args.record
+        or args.replay
+        or args.timings
+        or args.timings_export
+    ):
+        return None
+
+    from .config import get_api_key, get_api_url, get_daemon_socket_path
+
+    path = get_daemon_socket_path()
+    if not path.exists():
+        return None
+    try:
+        sock = _connect(path)
+    except (OSError, DaemonError):
+        return None
+    try:
+        stream = sock.makefile("rwb")
+        _send(stream, {"op": "hello"})
+        reply = json.loads(stream.readline() or b"{}")
+        stream.close()
+        sock.settimeout(None)
+    except (OSError, ValueError):
+        sock.close()
+        return None
+
+    info = reply.get("data") or {}
+    if (
+        not reply.get("ok")
+        or info.get("protocol") != PROTOCOL_VERSION
+        or info.get("api_url") != get_api_url(args.api_url)
+        or info.get("identity") != key_identity(get_api_key())
+    ):
+        sock.close()
+        return None
+    return DaemonClient(
+        sock,
+        info,
+        refresh=getattr(args, "refresh", False),
+        no_cache=getattr(args, "no_cache", False),
+    )
+
+
+class _Connection:
+    """A CLI process's connection and the bytes of its unanswered requests."""
+
+    def __init__(self, sock: "socket.socket"):
+        self.sock = sock
+        self.buffer = b""
+
+    def close(self) -> None:
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class DaemonServer:
+    """Serve API requests from CLI processes on a Unix socket."""
+
+    def __init__(
+        self,
+        path: Path,
+        api_url: Optional[str] = None,
+        http2: bool = False,
+        max_connections: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        rate_limit: Optional[float] = None,
+        workers: int = DEFAULT_WORKERS,
+    ):
+        """Initialize the server (call ``serve_forever`` to run it).
+
+        Args:
+            path: Socket path.
+            api_url: Override for the API base URL.
+            http2: Enable HTTP/2 multiplexing.
+            max_connections: Pooled connections per worker.
+            max_retries: Retries for transient failures.
+            rate_limit: Requests per second across all workers.
+            workers: Worker threads (API requests forwarded at once).
+        """
+        from .config import DEFAULT_MAX_CONNECTIONS, DEFAULT_MAX_RETRIES, get_api_key, get_api_url
+        from .retry import TokenBucket
+
+        self.path = Path(path)
+        self.api_url = get_api_url(api_url)
+        self.identity = key_identity(get_api_key())
+        self.http2 = http2
+        self.max_connections = max_connections or DEFAULT_MAX_CONNECTIONS
+        self.max_retries = DEFAULT_MAX_RETRIES if max_retries is None else max_retries
+        self.rate_limiter = TokenBucket(rate_limit) if rate_limit else None
+        self.workers = max(1, workers)
+        self.started_at = time.time()
+        self.requests = 0
+        self.errors = 0
+        self._local = threading.local()
+        # Connections whose request a worker finished, back to the selector
+        self._returned: list[_Connection] = []
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    def info(self) -> dict[str, Any]:
+        """The hello reply: what a CLI process checks before forwarding."""
+        return {
+            "protocol": PROTOCOL_VERSION,
+            "version": __version__,
+            "pid": os.getpid(),
+            "api_url": self.api_url,
+            "identity": self.identity,
+        }
+
+    def status(self) -> dict[str, Any]:
+        """Counters for ``daemon status``."""
+        return {
+            **self.info(),
+            "socket": str(self.path),
+            "workers": self.workers,
+            "uptime_seconds": time.time() - self.started_at,
+            "requests": self.requests,
+            "errors": self.errors,
+            "rate_limit": self.rate_limiter.rate if self.rate_limiter else None,
+        }
+
+    def _client(self) -> "SearchClient":
+        """This worker thread's client, created on its first request."""
+        client = getattr(self._local, "client", None)
+        if client is None:
+            import sqlite3
+
+            from .cache import ResponseCache
+            from .client import SearchClient
+            from .errors import translate_error
+            from .retry import RetryPolicy
+
+            class _RaisingClient(SearchClient):
+                # Errors go back to the CLI process instead of exiting the daemon
+                def _handle_error(self, error: Exception, url: str) -> None:
+                    raise translate_error(error, self.base_url, self.timeout) from error
+
+            try:
+                cache: Optional[ResponseCache] = ResponseCache()
+            except (OSError, sqlite3.Error):
+                # Caching is best-effort, as in open_cache
+                cache = None
+            client = _RaisingClient(
+                base_url=self.api_url,
+                http2=self.http2,
+                max_connections=self.max_connections,
+                cache=cache,
+                retry_policy=RetryPolicy(max_retries=self.max_retries),
+                rate_limiter=self.rate_limiter,
+            )
+            self._local.client = client
+        return client
+
+    def _forward(self, message: dict[str, Any]) -> dict[str, Any]:
+        client = self._client()
+        cache = client.cache
+        client.refresh = bool(message.get("refresh"))
+        if message.get("no_cache"):
+            client.cache = None
+        try:
+            if message["op"] == "get":
+                return client.get(message["path"], params=message.get("params"))
+            return client.post(message["path"], json_data=message.get("json"))
+        finally:
+            client.cache = cache
+
+    def handle(self, message: dict[str, Any]) -> dict[str, Any]:
+        """Answer one request message."""
+        from .errors import SearchAPIError
+
+        op = message.get("op")
+        if op == "hello":
+            return {"ok": True, "data": self.info()}
+        if op == "status":
+            return {"ok": True, "data": self.status()}
+        if op == "stop":
+            self._stopping.set()
+            return {"ok": True, "data": self.status()}
+        if op not in ("get", "post"):
+            return {"ok": False, "error": {"message": f"Unknown daemon operation: {op}"}}
+
+        with self._lock:
+            self.requests += 1
+        try:
+            return {"ok": True, "data": self._forward(message)}
+        except SearchAPIError as e:
+            with self._lock:
+                self.errors += 1
+            return {"ok": False, "error": {"message": e.message, "hint": e.hint}}
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+            return {"ok": False, "error": {"message": f"Daemon error: {e}"}}
+
+    def _dispatch(
+        self,
+        connection: "_Connection",
+        selector: "selectors.BaseSelector",
+        jobs: "queue.Queue[Optional[tuple[_Connection, dict[str, Any]]]]",
+    ) -> None:
+        """Answer the complete lines a connection has sent.
+
+        Control messages are answered here. An API request goes to the
+        workers, which return the connection once they replied; otherwise
+        the connection is watched for its next request.
+        """
+        import selectors
+
+        while b"\n" in connection.buffer:
+            line, connection.buffer = connection.buffer.split(b"\n", 1)
+            try:
+                message = json.loads(line)
+            except ValueError:
+                message = None
+            try:
+                if not isinstance(message, dict):
+                    connection.sock.sendall(_encode({"ok": False, "error": {"message": "Malformed request"}}))
+                elif message.get("op") in ("get", "post"):
+                    jobs.put((connection, message))
+                    return
+                else:
+                    connection.sock.sendall(_encode(self.handle(message)))
+            except OSError:
+                # The CLI process went away
+                connection.close()
+                return
+        selector.register(connection.sock, selectors.EVENT_READ, connection)
+
+    def _worker(
+        self,
+        jobs: "queue.Queue[Optional[tuple[_Connection, dict[str, Any]]]]",
+        wakeup: "socket.socket",
+    ) -> None:
+        """Answer queued API requests until a None sentinel arrives."""
+        try:
+            while True:
+                job = jobs.get()
+                if job is None:
+                    return
+                connection, message = job
+                try:
+                    connection.sock.sendall(_encode(self.handle(message)))
+                except OSError:
+                    # The CLI process went away mid-request
+                    connection.close()
+                    continue
+                with self._lock:
+                    self._returned.append(connection)
+                try:
+                    wakeup.send(b"\0")
+                except OSError:
+                    # Shutting down; the connection is closed with the others
+                    pass
+        finally:
+            # SQLite connections must be closed by the thread that opened them
+            client = getattr(self._local, "client", None)
+            if client is not None:
+                client.close()
+
+    def stop(self) -> None:
+        """Ask ``serve_forever`` to return."""
+        self._stopping.set()
+
+    def serve_forever(self, ready: Optional[threading.Event] = None) -> None:
+        """Listen on the socket until stopped.
+
+        Args:
+            ready: Set once the socket is accepting connections.
+
+        Raises:
+            DaemonError: If another daemon is already listening on the socket.
+        """
+        import queue
+        import selectors
+        import socket
+
+        if not hasattr(socket, "AF_UNIX"):
+            raise DaemonError("Unix domain sockets are not available on this platform")
+        if self.path.exists():
+            try:
+                _connect(self.path).close()
+            except OSError:
+                # Left behind by a daemon that did not shut down cleanly
+                self.path.unlink()
+            else:
+                raise DaemonError(f"A daemon is already listening on {self.path}")
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            listener.bind(str(self.path))
+        finally:
+            os.umask(old_umask)
+        listener.listen(64)
+        if ready is not None:
+            ready.set()
+
+        # Workers wake the selector through this pair when they return a connection
+        wakeup_reader, wakeup_writer = socket.socketpair()
+        selector = selectors.DefaultSelector()
+        selector.register(listener, selectors.EVENT_READ)
+        selector.register(wakeup_reader, selectors.EVENT_READ)
+        jobs: "queue.Queue[Optional[tuple[_Connection, dict[str, Any]]]]" = queue.Queue()
+        workers = [
+            threading.Thread(
+                target=self._worker, args=(jobs, wakeup_writer), name=f"trioexplorer-daemon-{i}"
+            )
+            for i in range(self.workers)
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            while not self._stopping.is_set():
+                for key, _ in selector.select(ACCEPT_POLL_INTERVAL):
+                    if key.fileobj is listener:
+                        conn, _ = listener.accept()
+                        conn.setblocking(True)
+                        selector.register(conn, selectors.EVENT_READ, _Connection(conn))
+                    elif key.fileobj is wakeup_reader:
+                        wakeup_reader.recv(RECV_SIZE)
+                        with self._lock:
+                            returned, self._returned = self._returned, []
+                        for connection in returned:
+                            self._dispatch(connection, selector, jobs)
+                    else:
+                        connection = key.data
+                        selector.unregister(connection.sock)
+                        try:
+                            data = connection.sock.recv(RECV_SIZE)
+                        except OSError:
+                            data = b""
+                        if not data:
+                            connection.close()
+                            continue
+                        connection.buffer += data
+                        self._dispatch(connection, selector, jobs)
+        finally:
+            listener.close()
+            self.path.unlink(missing_ok=True)
+            # Requests in progress are answered; every connection is then
+            # closed, so idle CLI processes read EOF on their next request
+            for _ in workers:
+                jobs.put(None)
+            for worker in workers:
+                worker.join()
+            for key in list(selector.get_map().values()):
+                if isinstance(key.data, _Connection):
+                    key.data.close()
+            for connection in self._returned:
+                connection.close()
+            selector.close()
+            wakeup_reader.close()
+            wakeup_writer.close()
@@ -0,0 +1,81 @@
+"""Typed exceptions for the Search API clients."""
+
+from typing import Optional
+
+import httpx
+
+from .auth import check_auth_error
+
+
+class SearchAPIError(Exception):
+    """Base class for all Search API client errors."""
+
+    def __init__(self, message: str, hint: Optional[str] = None):
+        super().__init__(message)
+        self.message = message
+        self.hint = hint
+
+
+class APIStatusError(SearchAPIError):
+    """The API returned a non-success HTTP status code."""
+
+    def __init__(self, message: str, status_code: int, detail: str, hint: Optional[str] = None):
+        super().__init__(message, hint)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class AuthenticationError(APIStatusError):
+    """The API key was rejected (401) or lacks permission (403)."""
+
+
+class APIConnectionError(SearchAPIError):
+    """The API could not be reached."""
+
+
+class APITimeoutError(SearchAPIError):
+    """The request timed out."""
+
+
+class APINetworkError(SearchAPIError):
+    """Any other transport-level failure."""
+
+
+def translate_error(error: Exception, base_url: str, timeout: float) -> SearchAPIError:
+    """Convert an httpx (or unexpected) exception into a typed SearchAPIError.
+
+    Args:
+        error: The exception raised while making the request.
+        base_url: API base URL, used in connection error messages.
+        timeout: Configured request timeout, used in timeout messages.
+
+    Returns:
+        The matching SearchAPIError subclass instance.
+    """
+    if isinstance(error, SearchAPIError):
+        return error
+
+    if isinstance(error, httpx.HTTPStatusError):
+        status_code = error.response.status_code
+        auth_error = check_auth_error(status_code, error.response.text)
+        if auth_error:
+            return AuthenticationError(auth_error, status_code, error.response.text)
+        try:
+            detail = error.response.json().get("detail", error.response.text)
+        except Exception:
+            detail = error.response.text
+        return APIStatusError(f"Error {status_code}: {detail}", status_code, str(detail))
+
+    if isinstance(error, httpx.ConnectError):
+        return APIConnectionError(
+            f"Cannot connect to Search API at {base_url}",
+            hint="Is the server running?",
+        )
+
+    if isinstance(error, httpx.TimeoutException):
+        return APITimeoutError(f"Request timed out after {timeout}s")
+
+    if isinstance(error, httpx.RequestError):
+        return APINetworkError(f"Network error: {error}")
+
+    return SearchAPIError(f"Unexpected error: {error}")
@@ -0,0 +1,171 @@
+"""Exhaustive retrieval by date-window partitioning.
+
+/search returns at most ``k=300`` distinct results. To collect every match,
+the ``note_date`` range is split into windows that are searched
+concurrently at the maximum ``k``. A window that comes back saturated
+(exactly ``k`` results, so more may exist) is bisected and both halves are
+searched again, recursively, until every window is below the cap or covers
+a single day. Results are de-duplicated by the active distinct key and
+handed to a callback as soon as their window completes.
+"""
+
+import datetime
+import time
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from .fanout import DISTINCT_FIELDS
+
+if TYPE_CHECKING:
+    from .async_client import AsyncSearchClient
+
+# Server-side cap on k for /search
+MAX_K = 300
+
+# Initial number of date windows
+DEFAULT_WINDOWS = 8
+
+# Inclusive (date_from, date_to) range
+Window = tuple[datetime.date, datetime.date]
+
+
+def parse_date(value: str, name: str) -> datetime.date:
+    """Parse an ISO date (the date part of a timestamp is accepted).
+
+    Raises:
+        ValueError: If the value is not an ISO date.
+    """
+    try:
+        return datetime.date.fromisoformat(value[:10])
+    except ValueError as e:
+        raise ValueError(f"Invalid date for {name}: {value!r} (expected YYYY-MM-DD)") from e
+
+
+def split_range(start: datetime.date, end: datetime.date, parts: int) -> list[Window]:
+    """Split an inclusive date range into up to ``parts`` contiguous windows."""
+    days = (end - start).days + 1
+    parts = max(1, min(parts, days))
+    windows: list[Window] = []
+    offset = 0
+    for index in range(parts):
+        size = days // parts + (1 if index < days % parts else 0)
+        window_start = start + datetime.timedelta(days=offset)
+        windows.append((window_start, window_start + datetime.timedelta(days=size - 1)))
+        offset += size
+    return windows
+
+
+def bisect_window(window: Window) -> Optional[tuple[Window, Window]]:
+    """Split a window into two halves, or None for a single day."""
+    start, end = window
+    if start >= end:
+        return None
+    middle = start + datetime.timedelta(days=(end - start).days // 2)
+    return (start, middle), (middle + datetime.timedelta(days=1), end)
+
+
+def format_window(window: Window) -> str:
+    """Format a window for display."""
+    start, end = window
+    return start.isoformat() if start == end else f"{start.isoformat()}..{end.isoformat()}"
+
+
+async def exhaustive_search(
+    client: "AsyncSearchClient",
+    windows: list[Window],
+    params_for: Callable[[Window], dict[str, Any]],
+    emit: Callable[[dict], None],
+    distinct: str = "encounter",
+    concurrency: int = DEFAULT_WINDOWS,
+    k: int = MAX_K,
+) -> dict[str, Any]:
+    """Search every window, bisecting saturated ones, and emit unique results.
+
+    Args:
+        client: Async client used for all requests.
+        windows: Initial date windows.
+        params_for: Build /search parameters (with ``k``) for a window.
+        emit: Called once per unique result, in window completion order.
+        distinct: Distinct mode; results are de-duplicated on its key.
+        concurrency: Number of windows searched at once.
+        k: Per-window result cap; a window returning ``k`` results is bisected.
+
+    Returns:
+        Summary with window counts, result count, errors and wall time.
+
+    Raises:
+        Exception: The first error other than SearchAPIError raised while
+            searching a window or by ``emit`` (e.g. BrokenPipeError); the
+            remaining windows are abandoned.
+    """
+    import asyncio
+
+    from .errors import SearchAPIError
+
+    field = DISTINCT_FIELDS.get(distinct, DISTINCT_FIELDS["encounter"])
+    seen: set[Any] = set()
+    queue: asyncio.Queue = asyncio.Queue()
+    summary: dict[str, Any] = {
+        "windows": 0,
+        "bisected": 0,
+        "saturated": [],
+        "errors": [],
+        "results": 0,
+        "duplicates": 0,
+    }
+
+    for window in windows:
+        queue.put_nowait(window)
+
+    async def worker() -> None:
+        while True:
+            window = await queue.get()
+            try:
+                await search_window(window)
+            finally:
+                queue.task_done()
+
+    async def search_window(window: Window) -> None:
+        summary["windows"] += 1
+        try:
+            response = await client.get("/search", params=params_for(window))
+        except SearchAPIError as e:
+            summary["errors"].append({"window": format_window(window), "error": e.message})
+            return
+
+        results = response.get("results", [])
+        if len(results) >= k:
+            halves = bisect_window(window)
+            if halves is not None:
+                summary["bisected"] += 1
+                for half in halves:
+                    queue.put_nowait(half)
+                return
+            # A single day still at the cap cannot be split further
+            summary["saturated"].append(format_window(window))
+
+        for result in results:
+            key = result.get(field)
+            if key is not None:
+                if key in seen:
+                    summary["duplicates"] += 1
+                    continue
+                seen.add(key)
+            summary["results"] += 1
+            emit(result)
+
+    started = time.perf_counter()
+    workers = [asyncio.create_task(worker()) for _ in range(max(1, concurrency))]
+    joined = asyncio.create_task(queue.join())
+    try:
+        # A worker only finishes by raising; stop at the first failure
+        # instead of waiting for windows that no worker will take.
+        await asyncio.wait([joined, *workers], return_when=asyncio.FIRST_COMPLETED)
+        for task in workers:
+            if task.done() and not task.cancelled() and task.exception() is not None:
+                raise task.exception()
+    finally:
+        for task in [joined, *workers]:
+            task.cancel()
+        await asyncio.gather(joined, *workers, return_exceptions=True)
+    summary["wall_seconds"] = time.perf_counter() - started
+    return summary
@@ -0,0 +1,143 @@
+"""Cohort-sharded fan-out search.
+
+A /search with several ``cohort-ids`` runs against the global index with
+cohort filtering, while a single-cohort search uses that cohort's dedicated
+index. Fan-out issues one single-cohort request per cohort concurrently and
+merges the per-shard rankings client-side.
+
+Every shard is asked for the full ``k``, so any result in the global top-k
+is in the top-k of its shard. Shard results arrive ranked by score, which
+lets a heap merge (``heapq.merge``) produce the global order lazily and
+stop as soon as ``k`` distinct results have been taken.
+"""
+
+import heapq
+import time
+from typing import TYPE_CHECKING, Any, Iterable, Optional
+
+if TYPE_CHECKING:
+    from .async_client import AsyncSearchClient
+
+# Result field that identifies a unique result for each distinct mode.
+# 'none' returns every chunk; chunk_id only removes exact duplicates that
+# appear in more than one cohort.
+DISTINCT_FIELDS = {
+    "encounter": "encounter_id",
+    "patient": "patient_id",
+    "note": "note_id",
+    "none": "chunk_id",
+}
+
+
+def split_cohorts(cohort_ids: Optional[str]) -> list[str]:
+    """Split a comma-separated cohort list, dropping blanks and duplicates."""
+    if not cohort_ids:
+        return []
+    cohorts: list[str] = []
+    for cohort in cohort_ids.split(","):
+        cohort = cohort.strip()
+        if cohort and cohort not in cohorts:
+            cohorts.append(cohort)
+    return cohorts
+
+
+def _score_key(result: dict) -> float:
+    """Sort key placing the highest score first (missing scores last)."""
+    score = result.get("score")
+    return -score if score is not None else float("inf")
+
+
+def merge_top_k(shards: Iterable[list[dict]], k: int, distinct: str = "encounter") -> list[dict]:
+    """Merge per-shard rankings into the global top-k.
+
+    Args:
+        shards: Result lists, each ranked by descending score.
+        k: Number of distinct results to keep.
+        distinct: Distinct mode used for the search; later results with an
+            already-seen distinct key are dropped.
+
+    Returns:
+        Up to ``k`` results ranked by descending score.
+    """
+    field = DISTINCT_FIELDS.get(distinct, DISTINCT_FIELDS["encounter"])
+    seen: set[Any] = set()
+    merged: list[dict] = []
+    for result in heapq.merge(*shards, key=_score_key):
+        key = result.get(field)
+        if key is not None:
+            if key in seen:
+                continue
+            seen.add(key)
+        merged.append(result)
+        if len(merged) >= k:
+            break
+    return merged
+
+
+def merged_metadata(results: list[dict], shards: list[dict[str, Any]], wall_ms: float) -> dict[str, Any]:
+    """Build search metadata for merged fan-out results.
+
+    Args:
+        results: Merged results.
+        shards: Per-shard reports from fan_out_search.
+        wall_ms: Wall-clock time of the whole fan-out.
+    """
+    metadata: dict[str, Any] = {
+        "total_results": len(results),
+        "unique_patients": len({r.get("patient_id") for r in results if r.get("patient_id")}),
+        "unique_encounters": len({r.get("encounter_id") for r in results if r.get("encounter_id")}),
+        "unique_notes": len({r.get("note_id") for r in results if r.get("note_id")}),
+    }
+    shard_metadata = [s["metadata"] for s in shards if s.get("metadata")]
+    if shard_metadata:
+        metadata["search_type"] = shard_metadata[0].get("search_type")
+        metadata["reranked"] = shard_metadata[0].get("reranked")
+    metadata["fan_out"] = {
+        "wall_ms": wall_ms,
+        "shards": [{k: v for k, v in s.items() if k not in ("results", "metadata")} for s in shards],
+    }
+    return metadata
+
+
+async def fan_out_search(
+    client: "AsyncSearchClient",
+    params: dict[str, Any],
+    cohorts: list[str],
+) -> tuple[list[dict[str, Any]], float]:
+    """Run one single-cohort search per cohort concurrently.
+
+    Args:
+        client: Async client; its scheduler bounds the concurrency.
+        params: /search parameters shared by every shard.
+        cohorts: Cohort IDs, one shard each.
+
+    Returns:
+        (shard reports, wall time in ms). Each report has ``cohort_id``,
+        ``status`` ("ok" or "error"), ``latency_ms`` and either
+        ``result_count``/``results``/``metadata`` or ``error``.
+    """
+    import asyncio
+
+    from .errors import SearchAPIError
+
+    async def _shard(cohort_id: str) -> dict[str, Any]:
+        report: dict[str, Any] = {"cohort_id": cohort_id}
+        start = time.perf_counter()
+        try:
+            response = await client.get("/search", params={**params, "cohort-ids": cohort_id})
+        except SearchAPIError as e:
+            report.update(status="error", latency_ms=(time.perf_counter() - start) * 1000, error=e.message)
+            return report
+        results = response.get("results", [])
+        report.update(
+            status="ok",
+            latency_ms=(time.perf_counter() - start) * 1000,
+            result_count=len(results),
+            results=results,
+            metadata=response.get("metadata", {}),
+        )
+        return report
+
+    started = time.perf_counter()
+    shards = await asyncio.gather(*(_shard(cohort_id) for cohort_id in cohorts))
+    return list(shards), (time.perf_counter() - started) * 1000
@@ -0,0 +1,356 @@
+"""Local prefix index over the filter values of a namespace.
+
+``filters sync`` downloads every value of every field of a namespace (the
+field list from ``/filter-fields``, then all pages of each
+``/filter-values/{field}`` fetched concurrently by FilterValuePager, which
+``export filters`` uses as well) into a SQLite database
+under ``~/.trioexplorer/``. Values are stored casefolded in a WITHOUT ROWID
+table whose primary key starts with (namespace, field, folded value), so
+the table is itself a sorted array of values per field and a prefix
+lookup is one B-tree range scan: ``folded >= prefix AND folded < prefix
++ U+10FFFF``. ``list filters --field X --prefix P`` and shell completion
+answer from it without a request.
+
+A namespace is replaced field by field: a field whose download failed
+keeps its previous values.
+"""
+
+import sqlite3
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, AsyncIterator, Optional, Union
+
+from .config import get_filter_index_path
+from .paging import DEFAULT_CONCURRENCY
+
+if TYPE_CHECKING:
+    from .async_client import AsyncSearchClient
+
+# Largest page /filter-values/{field} serves
+MAX_VALUE_PAGE_SIZE = 1000
+
+# Sorts after every character, so prefix + _PREFIX_END bounds a prefix range
+_PREFIX_END = "\U0010ffff"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS filter_values (
+    namespace TEXT NOT NULL,
+    field_name TEXT NOT NULL,
+    folded TEXT NOT NULL,
+    text_value TEXT NOT NULL,
+    cui TEXT,
+    occurrence_count INTEGER,
+    PRIMARY KEY (namespace, field_name, folded, text_value)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS filter_fields (
+    namespace TEXT NOT NULL,
+    field_name TEXT NOT NULL,
+    field_category TEXT,
+    value_count INTEGER,
+    PRIMARY KEY (namespace, field_name)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS namespaces (
+    namespace TEXT PRIMARY KEY,
+    api_url TEXT,
+    synced_at TEXT
+);
+"""
+
+
+def fold(value: str) -> str:
+    """Normalize a value for indexing: casefolded, without surrounding space."""
+    return value.strip().casefold()
+
+
+class FilterIndex:
+    """SQLite prefix index of filter values by namespace and field."""
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        """Open the index, creating the database if needed.
+
+        Args:
+            path: Database file path (defaults to ~/.trioexplorer/filters.sqlite3).
+        """
+        self.path = Path(path) if path else get_filter_index_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), timeout=10.0)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._db.close()
+
+    def __enter__(self) -> "FilterIndex":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def namespace_info(self, namespace: str) -> Optional[dict[str, Any]]:
+        """When and from where a namespace was synced, or None if it never was."""
+        row = self._db.execute(
+            "SELECT api_url, synced_at FROM namespaces WHERE namespace = ?", (namespace,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def fields(self, namespace: str) -> list[dict[str, Any]]:
+        """Field metadata of a namespace, shaped like /filter-fields items."""
+        rows = self._db.execute(
+            "SELECT field_name, field_category, value_count FROM filter_fields "
+            "WHERE namespace = ? ORDER BY field_name",
+            (namespace,),
+        )
+        return [dict(row) for row in rows]
+
+    def replace_field(
+        self,
+        namespace: str,
+        field: dict[str, Any],
+        values: list[dict[str, Any]],
+    ) -> int:
+        """Replace every value of one field in one transaction.
+
+        Args:
+            namespace: Search namespace.
+            field: /filter-fields item (field_name, field_category, value_count).
+            values: /filter-values items of the field.
+
+        Returns:
+            Number of distinct values stored.
+        """
+        name = field["field_name"]
+        rows = {
+            (fold(value["text_value"]), value["text_value"]): (
+                namespace, name, fold(value["text_value"]), value["text_value"],
+                value.get("cui"), value.get("occurrence_count"),
+            )
+            for value in values if value.get("text_value")
+        }
+        with self._db:
+            self._db.execute(
+                "DELETE FROM filter_values WHERE namespace = ? AND field_name = ?", (namespace, name)
+            )
+            self._db.executemany("INSERT INTO filter_values VALUES (?, ?, ?, ?, ?, ?)", rows.values())
+            self._db.execute(
+                "INSERT OR REPLACE INTO filter_fields VALUES (?, ?, ?, ?)",
+                (namespace, name, field.get("field_category"), len(rows)),
+            )
+        return len(rows)
+
+    def retain_fields(self, namespace: str, names: list[str]) -> None:
+        """Drop the fields of a namespace that are not in ``names``."""
+        placeholders = ", ".join("?" for _ in names)
+        with self._db:
+            for table in ("filter_values", "filter_fields"):
+                self._db.execute(
+                    f"DELETE FROM {table} WHERE namespace = ? AND field_name NOT IN ({placeholders})",
+                    (namespace, *names),
+                )
+
+    def mark_synced(self, namespace: str, api_url: str, synced_at: str) -> None:
+        """Record a sync of a namespace."""
+        with self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO namespaces VALUES (?, ?, ?)", (namespace, api_url, synced_at)
+            )
+
+    def lookup(
+        self,
+        namespace: str,
+        field: str,
+        prefix: str = "",
+        limit: Optional[int] = None,
+    ) -> list[dict[str, Any]]:
+        """Values of a field starting with ``prefix``, ignoring case.
+
+        Args:
+            namespace: Search namespace.
+            field: Field name (e.g., "medications_present").
+            prefix: Leading text of the values.
+            limit: Most values returned (None for all).
+
+        Returns:
+            /filter-values items in value order.
+        """
+        folded = fold(prefix)
+        rows = self._db.execute(
+            "SELECT text_value, cui, occurrence_count FROM filter_values "
+            "WHERE namespace = ? AND field_name = ? AND folded >= ? AND folded < ? "
+            "ORDER BY folded, text_value LIMIT ?",
+            (namespace, field, folded, folded + _PREFIX_END, -1 if limit is None else limit),
+        )
+        return [dict(row) for row in rows]
+
+    def count(self, namespace: str, field: str, prefix: str = "") -> int:
+        """Number of values of a field starting with ``prefix``."""
+        folded = fold(prefix)
+        return self._db.execute(
+            "SELECT COUNT(*) FROM filter_values "
+            "WHERE namespace = ? AND field_name = ? AND folded >= ? AND folded < ?",
+            (namespace, field, folded, folded + _PREFIX_END),
+        ).fetchone()[0]
+
+    def contains(self, namespace: str, field: str, value: str) -> bool:
+        """Whether a field has a value, ignoring case."""
+        return self._db.execute(
+            "SELECT 1 FROM filter_values WHERE namespace = ? AND field_name = ? AND folded = ? LIMIT 1",
+            (namespace, field, fold(value)),
+        ).fetchone() is not None
+
+
+class FilterValuePager:
+    """Fetch every value of every field of a namespace concurrently.
+
+    Reads the field list from ``/filter-fields``, then pages of all fields'
+    ``/filter-values/{field}`` are fetched by one pool of workers. Each
+    field's pages are planned from its ``value_count``; a field that turns
+    out to have more values (``total_values`` of any page) gets the extra
+    pages queued.
+
+    Iterate with ``async for field, values, last in pager``: pages arrive
+    as they complete (not in order), and ``last`` is true for the page
+    that completes a field. A page that fails with a SearchAPIError marks
+    its field in ``errors`` and the field's remaining pages are skipped;
+    failure of the field list is raised. Pages that are done but not yet
+    consumed are capped at the number of workers.
+    """
+
+    def __init__(
+        self,
+        client: "AsyncSearchClient",
+        namespace: str,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        page_size: int = MAX_VALUE_PAGE_SIZE,
+    ):
+        """Initialize the pager.
+
+        Args:
+            client: Async client used for all requests.
+            namespace: Search namespace.
+            concurrency: Pages fetched at once.
+            page_size: Values per page (1-1000).
+        """
+        self.client = client
+        self.namespace = namespace
+        self.concurrency = max(1, concurrency)
+        self.page_size = page_size
+        self.fields: dict[str, dict[str, Any]] = {}
+        self.pages = 0
+        self.planned_pages = 0
+        self.errors: dict[str, str] = {}
+
+    async def __aiter__(self) -> AsyncIterator[tuple[str, list[dict[str, Any]], bool]]:
+        import asyncio
+
+        from .errors import SearchAPIError
+
+        response = await self.client.get(f"/namespaces/{self.namespace}/filter-fields")
+        self.fields = {
+            field["field_name"]: field for field in response.get("fields", []) if field.get("field_name")
+        }
+
+        pending: asyncio.Queue = asyncio.Queue()
+        done: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency)
+        planned: dict[str, int] = {}
+        outstanding: dict[str, int] = {}
+
+        def plan(name: str, total: int) -> None:
+            for offset in range(planned.get(name, 0), max(total, 1), self.page_size):
+                pending.put_nowait((name, offset))
+                outstanding[name] = outstanding.get(name, 0) + 1
+                planned[name] = offset + self.page_size
+                self.planned_pages += 1
+
+        for name, field in self.fields.items():
+            plan(name, field.get("value_count") or 0)
+
+        async def worker() -> None:
+            while True:
+                name, offset = await pending.get()
+                result: Any = None
+                if name not in self.errors:
+                    try:
+                        result = await self.client.get(
+                            f"/namespaces/{self.namespace}/filter-values/{name}",
+                            params={"limit": self.page_size, "offset": offset},
+                        )
+                    except Exception as error:
+                        result = error
+                await done.put((name, result))
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        try:
+            while any(outstanding.values()):
+                name, result = await done.get()
+                outstanding[name] -= 1
+                if isinstance(result, SearchAPIError):
+                    self.errors.setdefault(name, result.message)
+                    continue
+                if isinstance(result, Exception):
+                    raise result
+                if result is None:
+                    # Skipped after an earlier page of the field failed
+                    continue
+                self.pages += 1
+                plan(name, result.get("total_values", 0))
+                yield name, result.get("values", []), outstanding[name] == 0
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+
+async def sync_filter_values(
+    client: "AsyncSearchClient",
+    index: FilterIndex,
+    namespace: str,
+    api_url: str,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    page_size: int = MAX_VALUE_PAGE_SIZE,
+) -> dict[str, Any]:
+    """Download every filter value of a namespace into the index.
+
+    A field is written once all of its pages arrived (see FilterValuePager).
+
+    Args:
+        client: Async client used for all requests.
+        index: Index to update.
+        namespace: Search namespace.
+        api_url: API base URL the values come from.
+        concurrency: Pages fetched at once.
+        page_size: Values per page (1-1000).
+
+    Returns:
+        Summary with fields, values stored, pages, failed fields and wall time.
+
+    Raises:
+        SearchAPIError: If the field list cannot be fetched.
+    """
+    import datetime
+
+    started = time.perf_counter()
+    synced_at = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    pager = FilterValuePager(client, namespace, concurrency, page_size)
+    values: dict[str, list[dict[str, Any]]] = {}
+    stored = 0
+    async for name, page, last in pager:
+        values.setdefault(name, []).extend(page)
+        if last:
+            stored += index.replace_field(namespace, pager.fields[name], values.pop(name))
+
+    if not pager.errors:
+        index.retain_fields(namespace, list(pager.fields))
+    index.mark_synced(namespace, api_url, synced_at)
+
+    return {
+        "namespace": namespace,
+        "fields": len(pager.fields) - len(pager.errors),
+        "values": stored,
+        "pages": pager.pages,
+        "errors": [{"field": name, "error": message} for name, message in sorted(pager.errors.items())],
+        "wall_seconds": time.perf_counter() - started,
+    }
@@ -0,0 +1,397 @@
+"""Typed AST for the /search metadata filter DSL.
+
+The API takes filters as nested JSON arrays (see ``filters`` in
+docs/openapi.json)::
+
+    ["And", [expr, ...]]    ["Or", [expr, ...]]    ["Not", expr]
+    [field, op, value]      op: Eq, NotEq, Lt, Lte, Gt, Gte, In, NotIn,
+                                Contains, ContainsAny
+
+``parse_filter`` turns that into immutable nodes, ``normalize`` simplifies
+the tree without reordering it, and ``canonicalize`` additionally sorts it
+so logically equivalent filters serialize identically. ``filter_hash`` is
+a stable digest of the canonical form for cache keys and request
+coalescing.
+
+Normalization rules:
+
+- nested And/Or of the same kind are flattened and single-child groups
+  are unwrapped; ``Not(Not(x))`` becomes ``x``;
+- duplicate children are dropped;
+- under And, range bounds on a field fold into the tightest lower and
+  upper bound, Eq/In on a field intersect, and NotEq/NotIn on a field
+  merge into one NotIn;
+- under Or, Eq/In on a field merge into one In, and Contains/ContainsAny
+  on a field merge into one ContainsAny;
+- one-element In/NotIn/ContainsAny become Eq/NotEq/Contains;
+- an empty And matches everything and becomes None (no filter); an empty
+  Or matches nothing and is kept, as are Or([]) for ``Not`` of an empty
+  And and And groups containing an empty Or.
+
+Contradictions (e.g. disjoint Eq values) are left for the server to
+evaluate rather than guessed at.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, Union
+
+COMPARISON_OPS = (
+    "Eq", "NotEq", "Lt", "Lte", "Gt", "Gte", "In", "NotIn", "Contains", "ContainsAny",
+)
+
+# Operators whose value is a list
+LIST_OPS = ("In", "NotIn", "ContainsAny")
+
+LOWER_BOUND_OPS = ("Gt", "Gte")
+UPPER_BOUND_OPS = ("Lt", "Lte")
+
+
+class FilterSyntaxError(ValueError):
+    """A filter expression does not follow the filter DSL."""
+
+
+@dataclass(frozen=True)
+class Condition:
+    """Comparison of one field: ``[field, op, value]``.
+
+    List values are stored as tuples so nodes stay hashable.
+    """
+
+    field: str
+    op: str
+    value: Any
+
+
+@dataclass(frozen=True)
+class And:
+    """All children must match."""
+
+    children: tuple["Node", ...]
+
+
+@dataclass(frozen=True)
+class Or:
+    """At least one child must match."""
+
+    children: tuple["Node", ...]
+
+
+@dataclass(frozen=True)
+class Not:
+    """The child must not match."""
+
+    child: "Node"
+
+
+Node = Union[Condition, And, Or, Not]
+
+# An empty disjunction: the filter that matches nothing
+NOTHING = Or(())
+
+
+def parse_filter(data: Any) -> Node:
+    """Parse a filter DSL value (already JSON-decoded) into an AST.
+
+    Raises:
+        FilterSyntaxError: If the expression is malformed.
+    """
+    if not isinstance(data, list) or not data:
+        raise FilterSyntaxError(f"Filter expression must be a non-empty array, got {data!r}")
+
+    head = data[0]
+    if head in ("And", "Or") and len(data) == 2:
+        if not isinstance(data[1], list):
+            raise FilterSyntaxError(f"{head} expects an array of expressions")
+        children = tuple(parse_filter(child) for child in data[1])
+        return And(children) if head == "And" else Or(children)
+
+    if head == "Not" and len(data) == 2:
+        return Not(parse_filter(data[1]))
+
+    if len(data) != 3 or not isinstance(head, str):
+        raise FilterSyntaxError(f"Expected [field, op, value] or a logical operator, got {data!r}")
+
+    field, op, value = data
+    if op not in COMPARISON_OPS:
+        raise FilterSyntaxError(f"Unknown filter operator {op!r} for field {field!r}")
+    if op in LIST_OPS:
+        if not isinstance(value, list):
+            raise FilterSyntaxError(f"{op} on {field!r} expects an array value")
+        value = tuple(value)
+    elif isinstance(value, (list, dict)):
+        raise FilterSyntaxError(f"{op} on {field!r} expects a scalar value")
+    return Condition(field, op, value)
+
+
+def to_dsl(node: Node) -> list:
+    """Serialize an AST back to the filter DSL."""
+    if isinstance(node, Condition):
+        value = list(node.value) if node.op in LIST_OPS else node.value
+        return [node.field, node.op, value]
+    if isinstance(node, Not):
+        return ["Not", to_dsl(node.child)]
+    return [type(node).__name__, [to_dsl(child) for child in node.children]]
+
+
+def _value_key(value: Any) -> tuple[str, Any]:
+    """Identity of a scalar value that keeps 1, 1.0, True and "1" apart."""
+    return type(value).__name__, value
+
+
+def _unique(values: list[Any]) -> list[Any]:
+    """Drop duplicate values, keeping first occurrences in order."""
+    seen: set[tuple[str, Any]] = set()
+    unique = []
+    for value in values:
+        key = _value_key(value)
+        if key not in seen:
+            seen.add(key)
+            unique.append(value)
+    return unique
+
+
+def _values(condition: Condition) -> list[Any]:
+    return list(condition.value) if condition.op in LIST_OPS else [condition.value]
+
+
+def _set_condition(field: str, single_op: str, list_op: str, values: list[Any]) -> Condition:
+    """Build Eq/In-style conditions, using the scalar form for one value."""
+    if len(values) == 1:
+        return Condition(field, single_op, values[0])
+    return Condition(field, list_op, tuple(values))
+
+
+def _comparable(a: Any, b: Any) -> bool:
+    """Whether two bound values can be ordered safely."""
+    numeric = (int, float)
+    if isinstance(a, bool) or isinstance(b, bool):
+        return False
+    if isinstance(a, numeric) and isinstance(b, numeric):
+        return True
+    return isinstance(a, str) and isinstance(b, str)
+
+
+def _fold_ranges(field: str, conditions: list[Condition]) -> list[Condition]:
+    """Fold range conditions on one field into at most two bounds."""
+    values = [c.value for c in conditions]
+    if not all(_comparable(values[0], v) for v in values):
+        return conditions
+
+    lower: Optional[Condition] = None
+    upper: Optional[Condition] = None
+    for condition in conditions:
+        if condition.op in LOWER_BOUND_OPS:
+            if (
+                lower is None
+                or condition.value > lower.value
+                or (condition.value == lower.value and condition.op == "Gt")
+            ):
+                lower = condition
+        elif (
+            upper is None
+            or condition.value < upper.value
+            or (condition.value == upper.value and condition.op == "Lt")
+        ):
+            upper = condition
+
+    if (
+        lower is not None
+        and upper is not None
+        and lower.op == "Gte"
+        and upper.op == "Lte"
+        and lower.value == upper.value
+    ):
+        return [Condition(field, "Eq", lower.value)]
+    return [c for c in (lower, upper) if c is not None]
+
+
+def _intersect_members(field: str, conditions: list[Condition]) -> list[Condition]:
+    """Intersect Eq/In conditions on one field (under And)."""
+    allowed = _unique(_values(conditions[0]))
+    for condition in conditions[1:]:
+        keys = {_value_key(v) for v in _values(condition)}
+        allowed = [v for v in allowed if _value_key(v) in keys]
+    if not allowed:
+        # Contradiction: keep the original conditions
+        return conditions
+    return [_set_condition(field, "Eq", "In", allowed)]
+
+
+def _union(single_op: str, list_op: str) -> Callable[[str, list[Condition]], list[Condition]]:
+    """Merge conditions on one field into a single set condition."""
+    def merge(field: str, conditions: list[Condition]) -> list[Condition]:
+        values = _unique([v for c in conditions for v in _values(c)])
+        return [_set_condition(field, single_op, list_op, values)]
+    return merge
+
+
+# (operators, merge function) applied per field among And / Or children
+AND_MERGES = [
+    (LOWER_BOUND_OPS + UPPER_BOUND_OPS, _fold_ranges),
+    (("Eq", "In"), _intersect_members),
+    (("NotEq", "NotIn"), _union("NotEq", "NotIn")),
+]
+
+OR_MERGES = [
+    (("Eq", "In"), _union("Eq", "In")),
+    (("Contains", "ContainsAny"), _union("Contains", "ContainsAny")),
+]
+
+
+def _merge_conditions(children: list[Node], merges: list) -> list[Node]:
+    """Merge same-field conditions, placing results at the first occurrence."""
+    for ops, merge in merges:
+        groups: dict[str, list[Condition]] = {}
+        for child in children:
+            if isinstance(child, Condition) and child.op in ops:
+                groups.setdefault(child.field, []).append(child)
+
+        merged: list[Node] = []
+        emitted: set[str] = set()
+        for child in children:
+            if isinstance(child, Condition) and child.op in ops:
+                group = groups[child.field]
+                if len(group) == 1:
+                    merged.append(child)
+                elif child.field not in emitted:
+                    emitted.add(child.field)
+                    merged.extend(merge(child.field, group))
+            else:
+                merged.append(child)
+        children = merged
+    return children
+
+
+def _dedupe(nodes: list[Node]) -> list[Node]:
+    """Drop duplicate nodes, keeping first occurrences in order.
+
+    Nodes are compared by their serialized form because dataclass equality
+    would treat ``True`` and ``1`` as the same value.
+    """
+    seen: set[str] = set()
+    unique = []
+    for node in nodes:
+        key = _sort_key(node)
+        if key not in seen:
+            seen.add(key)
+            unique.append(node)
+    return unique
+
+
+def _normalize_condition(node: Condition) -> Condition:
+    """Dedupe list values and collapse one-element lists."""
+    if node.op not in LIST_OPS:
+        return node
+    values = _unique(list(node.value))
+    if len(values) == 1:
+        single = {"In": "Eq", "NotIn": "NotEq", "ContainsAny": "Contains"}[node.op]
+        return Condition(node.field, single, values[0])
+    return Condition(node.field, node.op, tuple(values))
+
+
+def normalize(node: Optional[Node]) -> Optional[Node]:
+    """Simplify a filter tree, preserving the order of its clauses.
+
+    Returns:
+        The simplified tree, or None if it matches everything (an empty
+        And). A tree that matches nothing normalizes to NOTHING.
+    """
+    if node is None:
+        return None
+    if isinstance(node, Condition):
+        return _normalize_condition(node)
+
+    if isinstance(node, Not):
+        child = normalize(node.child)
+        if child is None:
+            return NOTHING
+        if child == NOTHING:
+            return None
+        if isinstance(child, Not):
+            return child.child
+        return Not(child)
+
+    kind = type(node)
+    children: list[Node] = []
+    for child in node.children:
+        child = normalize(child)
+        if child is None:
+            # Matches everything: drop it from an And; an Or containing it
+            # matches everything too
+            if kind is Or:
+                return None
+            continue
+        if child == NOTHING and kind is And:
+            return NOTHING
+        # Flattening drops a NOTHING child from an Or
+        children.extend(child.children if isinstance(child, kind) else (child,))
+
+    children = _dedupe(_merge_conditions(_dedupe(children), AND_MERGES if kind is And else OR_MERGES))
+
+    if not children:
+        return None if kind is And else NOTHING
+    if len(children) == 1:
+        return children[0]
+    return kind(tuple(children))
+
+
+def _sort_key(node: Node) -> str:
+    return json.dumps(to_dsl(node), sort_keys=True, separators=(",", ":"), default=str)
+
+
+def canonicalize(node: Optional[Node]) -> Optional[Node]:
+    """Normalize and sort a filter tree into its canonical form.
+
+    And/Or children and set values are ordered, so equivalent filters
+    written in different orders produce identical trees.
+    """
+    node = normalize(node)
+    if node is None:
+        return None
+    if isinstance(node, Condition):
+        if node.op in LIST_OPS:
+            return Condition(node.field, node.op, tuple(sorted(node.value, key=_value_key)))
+        return node
+    if isinstance(node, Not):
+        child = canonicalize(node.child)
+        # Mirrors normalize: negating "match everything" matches nothing
+        return NOTHING if child is None else Not(child)
+    return type(node)(tuple(sorted((canonicalize(c) for c in node.children), key=_sort_key)))
+
+
+def canonical_json(node: Optional[Node]) -> str:
+    """Serialize the canonical form compactly ("null" for no filter)."""
+    node = canonicalize(node)
+    if node is None:
+        return "null"
+    return _sort_key(node)
+
+
+def filter_hash(node: Optional[Node]) -> str:
+    """Stable SHA-256 hex digest of a filter's canonical form."""
+    return hashlib.sha256(canonical_json(node).encode("utf-8")).hexdigest()
+
+
+def condition_count(node: Optional[Node]) -> int:
+    """Number of field comparisons in a filter (a measure of its complexity)."""
+    if node is None:
+        return 0
+    if isinstance(node, Condition):
+        return 1
+    if isinstance(node, Not):
+        return condition_count(node.child)
+    return sum(condition_count(child) for child in node.children)
+
+
+def compile_filter(data: Any) -> Optional[list]:
+    """Parse and normalize a filter DSL value, returning the simplified DSL.
+
+    Raises:
+        FilterSyntaxError: If the expression is malformed.
+    """
+    if data is None:
+        return None
+    node = normalize(parse_filter(data))
+    return to_dsl(node) if node is not None else None
@@ -0,0 +1,128 @@
+"""Tail-latency analytics over the search history.
+
+``/search-history/stats/summary`` reports only the mean duration. Here the
+history is paged through concurrently and each entry's ``duration_ms`` is
+recorded into LatencyHistogram sketches, overall and per search type, per
+day and per user. Every page is folded into the sketches and dropped as
+soon as it arrives, so memory depends on the number of groups, not on the
+number of entries.
+"""
+
+import time
+from typing import TYPE_CHECKING, Any, Optional
+
+from .metrics import LatencyHistogram
+from .paging import DEFAULT_CONCURRENCY, MAX_PAGE_SIZE, Pager
+
+if TYPE_CHECKING:
+    from .async_client import AsyncSearchClient
+
+# Groupings reported (see group_keys)
+LATENCY_GROUPS = ("search_type", "day", "user")
+
+# Percentiles reported per group
+DEFAULT_QUANTILES = (50, 95, 99)
+
+# Group key for entries without a user
+NO_USER = "(none)"
+
+
+def group_keys(entry: dict[str, Any]) -> dict[str, str]:
+    """The key of a history entry in each grouping."""
+    return {
+        "search_type": entry.get("search_type") or "unknown",
+        "day": str(entry.get("created_at") or "unknown")[:10],
+        "user": entry.get("user_id") or NO_USER,
+    }
+
+
+class LatencyStats:
+    """Mergeable latency sketches, overall and per group."""
+
+    def __init__(self, significant_digits: int = 3):
+        self.significant_digits = significant_digits
+        self.overall = LatencyHistogram(significant_digits)
+        self.groups: dict[str, dict[str, LatencyHistogram]] = {name: {} for name in LATENCY_GROUPS}
+        self.entries = 0
+        self.missing = 0
+
+    def add(self, entry: dict[str, Any]) -> None:
+        """Record one history entry; entries without ``duration_ms`` are counted as missing."""
+        self.entries += 1
+        duration_ms = entry.get("duration_ms")
+        if duration_ms is None:
+            self.missing += 1
+            return
+        value_us = float(duration_ms) * 1000
+        self.overall.record(value_us)
+        for name, key in group_keys(entry).items():
+            histogram = self.groups[name].get(key)
+            if histogram is None:
+                histogram = self.groups[name][key] = LatencyHistogram(self.significant_digits)
+            histogram.record(value_us)
+
+    def merge(self, other: "LatencyStats") -> None:
+        """Add another set of sketches (same precision) to this one."""
+        self.overall.merge(other.overall)
+        for name, histograms in other.groups.items():
+            for key, histogram in histograms.items():
+                mine = self.groups[name].get(key)
+                if mine is None:
+                    mine = self.groups[name][key] = LatencyHistogram(self.significant_digits)
+                mine.merge(histogram)
+        self.entries += other.entries
+        self.missing += other.missing
+
+    def report(self, quantiles: tuple[float, ...] = DEFAULT_QUANTILES) -> dict[str, Any]:
+        """Summaries in milliseconds (see LatencyHistogram.summary_ms).
+
+        Returns:
+            Dictionary with ``entries``, ``missing_duration``, ``overall``
+            and one ``{key: summary}`` mapping per grouping, sorted by key.
+        """
+        report: dict[str, Any] = {
+            "entries": self.entries,
+            "missing_duration": self.missing,
+            "overall": self.overall.summary_ms(quantiles),
+        }
+        for name, histograms in self.groups.items():
+            report[name] = {key: histograms[key].summary_ms(quantiles) for key in sorted(histograms)}
+        return report
+
+
+async def collect_latency(
+    client: "AsyncSearchClient",
+    params: Optional[dict[str, Any]] = None,
+    page_size: int = MAX_PAGE_SIZE,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    max_pages: Optional[int] = None,
+    significant_digits: int = 3,
+) -> tuple[LatencyStats, dict[str, Any]]:
+    """Page through /search-history concurrently into latency sketches.
+
+    Args:
+        client: Async client used for all requests.
+        params: History filters (user-id, search-type, date-from, date-to).
+        page_size: Entries per page (1-100).
+        concurrency: Pages fetched at once.
+        max_pages: Stop after this many pages (None for all).
+        significant_digits: Precision of the sketches.
+
+    Returns:
+        (sketches, summary with pages, failed pages and wall time).
+
+    Raises:
+        SearchAPIError: If the first page cannot be fetched.
+    """
+    stats = LatencyStats(significant_digits)
+    started = time.perf_counter()
+    pager = Pager(client, "/search-history", params, page_size, concurrency, max_pages)
+    async for _, response in pager:
+        for entry in response.get("items", []):
+            stats.add(entry)
+    summary = {
+        "pages": pager.pages,
+        "errors": pager.errors,
+        "wall_seconds": time.perf_counter() - started,
+    }
+    return stats, summary
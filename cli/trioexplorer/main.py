@@ -1,14 +1,39 @@
-"""Main entry point for the Trioexplorer CLI."""
+"""Main entry point for the Trioexplorer CLI.
+
+Startup cost matters because the CLI is invoked from shell pipelines many
+times a day: this module and the command modules only import argparse and
+other light modules at import time. The HTTP stack (httpx), rich, asyncio
+and the response cache are imported by the code paths that use them.
+"""
 
 import argparse
 import sys
+from typing import TYPE_CHECKING, Optional
 
 from . import __version__
-from .client import create_client, SearchClient
-from .commands.search import add_search_parser, run_search
+from .config import DEFAULT_MAX_CONNECTIONS, DEFAULT_MAX_RETRIES
+from .commands.search import (
+    add_search_parser,
+    run_exhaustive_search,
+    run_fan_out_search,
+    run_search,
+)
+from .commands.batch import add_batch_parser, run_batch_search
 from .commands.list import add_list_parser, run_list
-from .commands.history import add_history_parsers, run_get_history
+from .commands.history import add_history_parsers, run_get_history, run_history
+from .commands.filters import add_filters_parser, run_filters
+from .commands.export import add_export_parser, run_export
 from .commands.stats import add_stats_parser, run_stats
+from .commands.refine import add_refine_parser, run_refine
+from .commands.bench import add_bench_parser, run_bench
+from .commands.stub import add_stub_parser, run_stub_server
+from .commands.analyze import add_analyze_parser, run_analyze
+from .commands.shell import add_shell_parser, run_shell
+from .commands.daemon import add_daemon_parser, run_daemon
+
+if TYPE_CHECKING:
+    from .cache import ResponseCache
+    from .client import SearchClient
 
 
 def create_parser() -> argparse.ArgumentParser:
@@ -36,6 +61,75 @@ def create_parser() -> argparse.ArgumentParser:
         help="Override TRIOEXPLORER_API_URL",
     )
 
+    parser.add_argument(
+        "--http2",
+        action="store_true",
+        help="Enable HTTP/2 multiplexing (requires the 'h2' package)",
+    )
+
+    parser.add_argument(
+        "--max-connections",
+        type=int,
+        default=DEFAULT_MAX_CONNECTIONS,
+        metavar="NUM",
+        help=f"Connection pool size (default: {DEFAULT_MAX_CONNECTIONS})",
+    )
+
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=DEFAULT_MAX_RETRIES,
+        metavar="NUM",
+        help=f"Retries for timeouts, 429 and 5xx responses (default: {DEFAULT_MAX_RETRIES})",
+    )
+
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        metavar="RPS",
+        help="Client-side limit on requests per second (default: unlimited)",
+    )
+
+    cassette = parser.add_mutually_exclusive_group()
+    cassette.add_argument(
+        "--record",
+        metavar="FILE",
+        help="Record all HTTP exchanges (API key redacted) to a gzipped cassette",
+    )
+    cassette.add_argument(
+        "--replay",
+        metavar="FILE",
+        help="Answer requests from a recorded cassette instead of the network",
+    )
+
+    parser.add_argument(
+        "--replay-speed",
+        type=float,
+        default=0.0,
+        metavar="FACTOR",
+        help="With --replay, wait each response's recorded latency divided by "
+             "FACTOR (1 = original speed; default: 0, no delay)",
+    )
+
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="Make requests from this process even if 'trioexplorer daemon' is running",
+    )
+
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="Print per-request connect/TLS/TTFB/download/decode and render "
+             "times to stderr",
+    )
+
+    parser.add_argument(
+        "--timings-export",
+        metavar="FILE",
+        help="Append the timing spans of this run to FILE as JSON Lines",
+    )
+
     # Create subparsers for commands
     subparsers = parser.add_subparsers(
         dest="command",
@@ -45,44 +139,226 @@ def create_parser() -> argparse.ArgumentParser:
 
     # Add command parsers
     add_search_parser(subparsers)
+    add_batch_parser(subparsers)
     add_list_parser(subparsers)
     add_history_parsers(subparsers)
+    add_filters_parser(subparsers)
+    add_export_parser(subparsers)
     add_stats_parser(subparsers)
+    add_refine_parser(subparsers)
+    add_bench_parser(subparsers)
+    add_stub_parser(subparsers)
+    add_analyze_parser(subparsers)
+    add_shell_parser(subparsers)
+    add_daemon_parser(subparsers)
 
     return parser
 
 
-def get_client(args: argparse.Namespace) -> SearchClient:
-    """Create the client with global options (deferred creation)."""
-    return create_client(
-        base_url=args.api_url,
-        debug=args.debug,
-    )
+class ClientProvider:
+    """Lazily create a single shared SearchClient for the whole run.
 
+    Every command asking for a client gets the same pooled instance, so
+    multiple requests within one invocation reuse connections. When a
+    ``trioexplorer daemon`` can serve the run, a DaemonClient forwarding
+    to it is handed out instead.
+    """
 
-def main() -> None:
-    """Main entry point."""
-    parser = create_parser()
-    args = parser.parse_args()
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self._client: Optional["SearchClient"] = None
+        self._cache: Optional["ResponseCache"] = None
 
-    if args.command is None:
-        parser.print_help()
-        sys.exit(0)
+    def __call__(self) -> "SearchClient":
+        from .daemon import DaemonClient, connect_daemon
+
+        if self._client is None:
+            self._client = connect_daemon(self.args)
+        if self._client is None:
+            from .cache import open_cache
+            from .client import create_client
 
-    # Route to appropriate command handler
+            self._cache = open_cache(self.args)
+            self._client = create_client(
+                base_url=self.args.api_url,
+                debug=self.args.debug,
+                http2=self.args.http2,
+                max_connections=self.args.max_connections,
+                cache=self._cache,
+                refresh=getattr(self.args, "refresh", False),
+                max_retries=self.args.retries,
+                rate_limit=self.args.rate_limit,
+            )
+            return self._client
+
+        # The shell reuses the client for commands with their own --refresh
+        # and --no-cache
+        no_cache = getattr(self.args, "no_cache", False)
+        self._client.refresh = getattr(self.args, "refresh", False)
+        if isinstance(self._client, DaemonClient):
+            self._client.no_cache = no_cache
+        elif no_cache:
+            self._client.cache = None
+        else:
+            if self._cache is None:
+                from .cache import open_cache
+
+                self._cache = open_cache(self.args)
+            self._client.cache = self._cache
+        return self._client
+
+    def close(self) -> None:
+        """Close the shared client if one was created."""
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+        if self._cache is not None:
+            self._cache.close()
+            self._cache = None
+
+
+def start_cassette(args: argparse.Namespace) -> None:
+    """Start recording or replaying HTTP traffic if requested.
+
+    The response cache is bypassed so every request goes through the
+    cassette.
+    """
+    if not (args.record or args.replay):
+        return
+
+    from rich.console import Console
+
+    from .cassette import CassetteError, start_recording, start_replay
+
+    args.no_cache = True
+    if args.record:
+        start_recording(args.record)
+        return
+    try:
+        start_replay(args.replay, args.replay_speed)
+    except CassetteError as e:
+        Console(stderr=True).print(f"[red]{e}[/red]")
+        sys.exit(1)
+
+
+def stop_cassette(args: argparse.Namespace) -> None:
+    """Finish the cassette session, writing any recording."""
+    if not (args.record or args.replay):
+        return
+
+    from rich.console import Console
+
+    from .cassette import CassetteError, stop_session
+
+    console = Console(stderr=True)
+    try:
+        stop_session()
+    except CassetteError as e:
+        console.print(f"[red]{e}[/red]")
+        sys.exit(1)
+    if args.record:
+        console.print(f"[dim]Recorded HTTP exchanges to {args.record}[/dim]")
+
+
+def begin_timings(args: argparse.Namespace) -> None:
+    """Start collecting request and render timings if requested.
+
+    The shell times each command it runs separately instead.
+    """
+    if not (args.timings or args.timings_export) or args.command == "shell":
+        return
+
+    from .timings import start_timings
+
+    start_timings(f"trioexplorer {args.command}")
+
+
+def report_timings(args: argparse.Namespace) -> None:
+    """Print and/or export the timings collected during the run."""
+    if not (args.timings or args.timings_export):
+        return
+
+    from rich.console import Console
+
+    from .timings import print_timings, stop_timings
+
+    timings = stop_timings()
+    if timings is None:
+        return
+    if args.timings:
+        print_timings(timings)
+    if args.timings_export:
+        try:
+            timings.export(args.timings_export)
+        except OSError as e:
+            Console(stderr=True).print(f"[red]Cannot write timings to {args.timings_export}: {e}[/red]")
+            sys.exit(1)
+
+
+def run_command(
+    args: argparse.Namespace,
+    parser: argparse.ArgumentParser,
+    client_provider: ClientProvider,
+) -> None:
+    """Route parsed arguments to their command handler."""
     # Client creation is deferred to commands that need it
-    if args.command == "search":
-        run_search(get_client(args), args)
+    if args.command == "search" and args.exhaustive:
+        run_exhaustive_search(args)
+    elif args.command == "search" and args.fan_out:
+        run_fan_out_search(args)
+    elif args.command == "search":
+        run_search(client_provider(), args)
+    elif args.command == "batch-search":
+        run_batch_search(args)
     elif args.command == "list":
-        run_list(args, lambda: get_client(args))
+        run_list(args, client_provider)
     elif args.command == "get":
-        run_get_history(get_client(args), args)
+        run_get_history(client_provider(), args)
+    elif args.command == "history":
+        run_history(args)
+    elif args.command == "filters":
+        run_filters(args)
+    elif args.command == "export":
+        run_export(args)
     elif args.command == "stats":
-        run_stats(get_client(args), args)
+        run_stats(args, client_provider)
+    elif args.command == "refine":
+        run_refine(args)
+    elif args.command == "bench":
+        run_bench(args)
+    elif args.command == "stub-server":
+        run_stub_server(args)
+    elif args.command == "analyze":
+        run_analyze(args)
+    elif args.command == "shell":
+        run_shell(args, client_provider)
+    elif args.command == "daemon":
+        run_daemon(args)
     else:
         parser.print_help()
         sys.exit(1)
 
 
+def main() -> None:
+    """Main entry point."""
+    parser = create_parser()
+    args = parser.parse_args()
+
+    if args.command is None:
+        parser.print_help()
+        sys.exit(0)
+
+    start_cassette(args)
+    begin_timings(args)
+
+    client_provider = ClientProvider(args)
+    try:
+        run_command(args, parser, client_provider)
+    finally:
+        client_provider.close()
+        stop_cassette(args)
+        report_timings(args)
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,150 @@
+"""Latency and throughput helpers for the Trioexplorer CLI."""
+
+import math
+from typing import Iterable, Optional
+
+
+def percentile(sorted_values: list[float], q: float) -> Optional[float]:
+    """Compute a percentile using the nearest-rank method.
+
+    Args:
+        sorted_values: Values sorted in ascending order.
+        q: Percentile in the range 0-100.
+
+    Returns:
+        The percentile value, or None if there are no values.
+    """
+    if not sorted_values:
+        return None
+    if q <= 0:
+        return sorted_values[0]
+    rank = math.ceil(q / 100 * len(sorted_values))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize_latencies(
+    latencies_ms: Iterable[float],
+    quantiles: tuple[float, ...] = (50, 90, 99),
+) -> dict[str, Optional[float]]:
+    """Summarize a set of latencies.
+
+    Args:
+        latencies_ms: Latency samples in milliseconds.
+        quantiles: Percentiles to report.
+
+    Returns:
+        Dictionary with count, min, mean, max and ``p<q>`` entries.
+    """
+    values = sorted(latencies_ms)
+    summary: dict[str, Optional[float]] = {
+        "count": len(values),
+        "min": values[0] if values else None,
+        "mean": sum(values) / len(values) if values else None,
+        "max": values[-1] if values else None,
+    }
+    for q in quantiles:
+        summary[f"p{q:g}"] = percentile(values, q)
+    return summary
+
+
+def format_ms(value: Optional[float]) -> str:
+    """Format a millisecond value for display."""
+    if value is None:
+        return "-"
+    return f"{value:.1f}ms"
+
+
+class LatencyHistogram:
+    """HDR-style latency histogram with bounded relative error.
+
+    Values (integer microseconds) are counted in log-linear buckets: each
+    power-of-two range is split into enough linear sub-buckets to keep
+    ``significant_digits`` decimal digits of precision, so memory stays
+    small and constant while p99.9 remains accurate to within 0.1% (with
+    the default three digits) across microseconds to hours.
+    """
+
+    def __init__(self, significant_digits: int = 3):
+        """Initialize an empty histogram.
+
+        Args:
+            significant_digits: Decimal digits of precision (1-5).
+        """
+        if not 1 <= significant_digits <= 5:
+            raise ValueError("significant_digits must be between 1 and 5")
+        self.significant_digits = significant_digits
+        largest_single_unit = 2 * 10 ** significant_digits
+        self._half_magnitude = math.ceil(math.log2(largest_single_unit)) - 1
+        self._half_count = 1 << self._half_magnitude
+        self._counts: dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+
+    def _index(self, value: int) -> int:
+        bucket = max(0, value.bit_length() - self._half_magnitude - 1)
+        sub_bucket = value >> bucket
+        return ((bucket + 1) << self._half_magnitude) + sub_bucket - self._half_count
+
+    def _highest_equivalent(self, index: int) -> int:
+        """Largest value counted in the same bucket as ``index``."""
+        bucket = (index >> self._half_magnitude) - 1
+        sub_bucket = (index & (self._half_count - 1)) + self._half_count
+        if bucket < 0:
+            sub_bucket -= self._half_count
+            bucket = 0
+        return (sub_bucket << bucket) + (1 << bucket) - 1
+
+    def record(self, value_us: float, count: int = 1) -> None:
+        """Record a latency in microseconds (negative values count as 0)."""
+        value = max(0, int(round(value_us)))
+        index = self._index(value)
+        self._counts[index] = self._counts.get(index, 0) + count
+        self.count += count
+        self.total += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Add another histogram's counts (same precision) to this one."""
+        if other.significant_digits != self.significant_digits:
+            raise ValueError("Cannot merge histograms with different precision")
+        for index, count in other._counts.items():
+            self._counts[index] = self._counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+
+    def value_at_percentile(self, q: float) -> Optional[int]:
+        """Latency (microseconds) at or below which ``q`` percent of samples fall."""
+        if not self.count:
+            return None
+        target = max(1, math.ceil(q / 100 * self.count))
+        seen = 0
+        for index in sorted(self._counts):
+            seen += self._counts[index]
+            if seen >= target:
+                return min(self._highest_equivalent(index), self.max)
+        return self.max
+
+    def summary_ms(
+        self,
+        quantiles: tuple[float, ...] = (50, 90, 99, 99.9),
+    ) -> dict[str, Optional[float]]:
+        """Summarize in milliseconds, in the shape of summarize_latencies."""
+        def ms(value: Optional[int]) -> Optional[float]:
+            return None if value is None else value / 1000
+
+        summary: dict[str, Optional[float]] = {
+            "count": self.count,
+            "min": ms(self.min),
+            "mean": self.total / self.count / 1000 if self.count else None,
+            "max": ms(self.max),
+        }
+        for q in quantiles:
+            summary[f"p{q:g}"] = ms(self.value_at_percentile(q))
+        return summary
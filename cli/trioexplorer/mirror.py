@@ -0,0 +1,335 @@
+"""Local SQLite mirror of the search history.
+
+``history sync`` copies ``/search-history`` entries into a SQLite database
+under ``~/.trioexplorer/``. It stores the request payload and the response
+metadata, but not the result rows. Each sync fetches only entries created
+at or after the stored ``created_at`` watermark, up to the time the sync
+started, so pagination is stable while new searches are logged. Entries
+are upserted by ID, and the watermark only advances when every page was
+read. ``list history --local`` then answers from the mirror: query text
+through an FTS5 index, and type, user and date through ordinary indexes.
+
+A mirror belongs to one API URL; syncing it from another URL is refused.
+"""
+
+import datetime
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterator, Optional, Union
+
+from .config import get_history_path
+from .paging import DEFAULT_CONCURRENCY, MAX_PAGE_SIZE, Pager
+
+if TYPE_CHECKING:
+    from .async_client import AsyncSearchClient
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    search_type TEXT,
+    user_id TEXT,
+    api_key_id TEXT,
+    query TEXT NOT NULL,
+    result_count INTEGER,
+    duration_ms INTEGER,
+    status_code INTEGER,
+    error_message TEXT,
+    request_payload TEXT,
+    response_metadata TEXT
+);
+CREATE INDEX IF NOT EXISTS history_created_at ON history (created_at);
+CREATE INDEX IF NOT EXISTS history_type_created_at ON history (search_type, created_at);
+CREATE INDEX IF NOT EXISTS history_user_created_at ON history (user_id, created_at);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5(
+    query, content='history', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS history_fts_insert AFTER INSERT ON history BEGIN
+    INSERT INTO history_fts (rowid, query) VALUES (new.rowid, new.query);
+END;
+CREATE TRIGGER IF NOT EXISTS history_fts_delete AFTER DELETE ON history BEGIN
+    INSERT INTO history_fts (history_fts, rowid, query) VALUES ('delete', old.rowid, old.query);
+END;
+CREATE TRIGGER IF NOT EXISTS history_fts_update AFTER UPDATE ON history BEGIN
+    INSERT INTO history_fts (history_fts, rowid, query) VALUES ('delete', old.rowid, old.query);
+    INSERT INTO history_fts (rowid, query) VALUES (new.rowid, new.query);
+END;
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_COLUMNS = (
+    "id", "created_at", "search_type", "user_id", "api_key_id", "query", "result_count",
+    "duration_ms", "status_code", "error_message", "request_payload", "response_metadata",
+)
+
+_UPSERT = (
+    f"INSERT INTO history ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' for _ in _COLUMNS)}) "
+    f"ON CONFLICT (id) DO UPDATE SET "
+    + ", ".join(f"{column} = excluded.{column}" for column in _COLUMNS[1:])
+)
+
+# Response payload members not mirrored (the result rows themselves)
+DROPPED_RESPONSE_KEYS = ("results",)
+
+
+class MirrorError(Exception):
+    """The mirror cannot be used for the requested operation."""
+
+
+def parse_timestamp(value: str) -> datetime.datetime:
+    """Parse an ISO timestamp from the API; naive values are taken as UTC."""
+    parsed = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed
+
+
+def fts_query(text: str) -> str:
+    """Turn free text into an FTS5 query matching all of its words.
+
+    Each word is quoted, so FTS operators and punctuation in the text are
+    matched literally instead of raising syntax errors.
+    """
+    return " ".join('"' + word.replace('"', '""') + '"' for word in text.split())
+
+
+def _row_for(entry: dict[str, Any]) -> tuple:
+    response = entry.get("response_payload") or {}
+    metadata = {key: value for key, value in response.items() if key not in DROPPED_RESPONSE_KEYS}
+    return (
+        entry["id"],
+        entry["created_at"],
+        entry.get("search_type"),
+        entry.get("user_id"),
+        entry.get("api_key_id"),
+        entry.get("query") or "",
+        entry.get("result_count"),
+        entry.get("duration_ms"),
+        entry.get("status_code"),
+        entry.get("error_message"),
+        json.dumps(entry.get("request_payload") or {}, separators=(",", ":")),
+        json.dumps(metadata, separators=(",", ":")),
+    )
+
+
+def _entry_for(row: sqlite3.Row) -> dict[str, Any]:
+    entry = {column: row[column] for column in _COLUMNS if column != "response_metadata"}
+    entry["request_payload"] = json.loads(row["request_payload"] or "{}")
+    entry["response_payload"] = json.loads(row["response_metadata"] or "{}")
+    return entry
+
+
+class HistoryMirror:
+    """SQLite mirror of /search-history entries."""
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        """Open the mirror, creating the database if needed.
+
+        Args:
+            path: Database file path (defaults to ~/.trioexplorer/history.sqlite3).
+        """
+        self.path = Path(path) if path else get_history_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), timeout=10.0)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._db.close()
+
+    def __enter__(self) -> "HistoryMirror":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def get_state(self, key: str) -> Optional[str]:
+        """Read a sync state value (api_url, watermark, synced_at)."""
+        row = self._db.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def set_state(self, **values: Optional[str]) -> None:
+        """Write sync state values."""
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)",
+                list(values.items()),
+            )
+
+    @property
+    def watermark(self) -> Optional[str]:
+        """``created_at`` of the newest mirrored entry after the last complete sync."""
+        return self.get_state("watermark")
+
+    def upsert(self, entries: list[dict[str, Any]]) -> int:
+        """Insert or update entries by ID in one transaction.
+
+        Returns:
+            Number of entries written.
+        """
+        rows = [_row_for(entry) for entry in entries if entry.get("id") and entry.get("created_at")]
+        with self._db:
+            self._db.executemany(_UPSERT, rows)
+        return len(rows)
+
+    def reset(self) -> None:
+        """Delete every mirrored entry and the sync state."""
+        with self._db:
+            self._db.execute("DELETE FROM history")
+            self._db.execute("DELETE FROM sync_state")
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+
+    def _where(
+        self,
+        text: Optional[str],
+        search_type: Optional[str],
+        user_id: Optional[str],
+        date_from: Optional[str],
+        date_to: Optional[str],
+    ) -> tuple[str, list[Any]]:
+        clauses: list[str] = []
+        params: list[Any] = []
+        if text and text.strip():
+            clauses.append("rowid IN (SELECT rowid FROM history_fts WHERE history_fts MATCH ?)")
+            params.append(fts_query(text))
+        if search_type:
+            clauses.append("search_type = ?")
+            params.append(search_type)
+        if user_id:
+            clauses.append("user_id = ?")
+            params.append(user_id)
+        if date_from:
+            clauses.append("created_at >= ?")
+            params.append(date_from)
+        if date_to:
+            # A bare date includes the whole day
+            clauses.append("created_at <= ?" if "T" in date_to else "substr(created_at, 1, 10) <= ?")
+            params.append(date_to)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(
+        self,
+        text: Optional[str] = None,
+        search_type: Optional[str] = None,
+        user_id: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        page: int = 1,
+        page_size: int = 20,
+    ) -> dict[str, Any]:
+        """Query mirrored entries, newest first.
+
+        Args:
+            text: Words that must all appear in the query text (full-text).
+            search_type: Exact search type.
+            user_id: Exact user ID.
+            date_from: Earliest ``created_at`` (ISO date or timestamp).
+            date_to: Latest ``created_at``; a bare date includes that day.
+            page: Page number (1-indexed).
+            page_size: Entries per page.
+
+        Returns:
+            A response shaped like /search-history (items, total_count,
+            page, page_size, has_more).
+        """
+        where, params = self._where(text, search_type, user_id, date_from, date_to)
+        total = self._db.execute(f"SELECT COUNT(*) FROM history{where}", params).fetchone()[0]
+        rows = self._db.execute(
+            f"SELECT * FROM history{where} ORDER BY created_at DESC, id LIMIT ? OFFSET ?",
+            [*params, page_size, (page - 1) * page_size],
+        ).fetchall()
+        return {
+            "items": [_entry_for(row) for row in rows],
+            "total_count": total,
+            "page": page,
+            "page_size": page_size,
+            "has_more": page * page_size < total,
+        }
+
+    def entries(
+        self,
+        text: Optional[str] = None,
+        search_type: Optional[str] = None,
+        user_id: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Iterate over every matching entry (filters as in ``query``), unordered."""
+        where, params = self._where(text, search_type, user_id, date_from, date_to)
+        for row in self._db.execute(f"SELECT * FROM history{where}", params):
+            yield _entry_for(row)
+
+
+async def sync_history(
+    client: "AsyncSearchClient",
+    mirror: HistoryMirror,
+    api_url: str,
+    full: bool = False,
+    page_size: int = MAX_PAGE_SIZE,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> dict[str, Any]:
+    """Bring the mirror up to date with /search-history.
+
+    Args:
+        client: Async client used for all requests.
+        mirror: Mirror to update.
+        api_url: API base URL the mirror belongs to.
+        full: Ignore the watermark and re-read the whole history.
+        page_size: Entries per page (1-100).
+        concurrency: Pages fetched at once.
+
+    Returns:
+        Summary with pages, entries written, failed pages, the watermark
+        before and after, and wall time.
+
+    Raises:
+        MirrorError: If the mirror was synced from another API URL.
+        SearchAPIError: If the first page cannot be fetched.
+    """
+    mirrored_url = mirror.get_state("api_url")
+    if mirrored_url and mirrored_url != api_url:
+        raise MirrorError(f"{mirror.path} mirrors {mirrored_url}, not {api_url}")
+
+    started = time.perf_counter()
+    previous = None if full else mirror.watermark
+    until = datetime.datetime.now(datetime.timezone.utc)
+    params = {"date-to": until.isoformat()}
+    if previous:
+        params["date-from"] = previous
+
+    newest = parse_timestamp(previous) if previous else None
+    newest_raw = previous
+    written = 0
+    pager = Pager(client, "/search-history", params, page_size, concurrency)
+    async for _, response in pager:
+        items = response.get("items", [])
+        written += mirror.upsert(items)
+        for entry in items:
+            created_at = entry.get("created_at")
+            if created_at and (newest is None or parse_timestamp(created_at) > newest):
+                newest, newest_raw = parse_timestamp(created_at), created_at
+
+    # A missed page would be skipped for good if the watermark moved past it
+    if not pager.errors:
+        mirror.set_state(api_url=api_url, watermark=newest_raw, synced_at=until.isoformat())
+
+    return {
+        "pages": pager.pages,
+        "entries": written,
+        "errors": pager.errors,
+        "watermark_before": previous,
+        "watermark": newest_raw if not pager.errors else previous,
+        "total_mirrored": len(mirror),
+        "wall_seconds": time.perf_counter() - started,
+    }
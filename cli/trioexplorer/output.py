@@ -1,20 +1,61 @@
 """Output formatters for the Trioexplorer CLI."""
 
 import csv
-import io
 import json
-from typing import Any, Optional
+import sys
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Optional, TextIO, Union
 
-from rich.console import Console
-from rich.table import Table
-from rich.text import Text
+from .timings import timed
 
-console = Console()
+if TYPE_CHECKING:
+    from rich.text import Text
+
+
+class _LazyConsole:
+    """Stand-in for the rich Console that creates it on first use.
+
+    JSON and CSV output never touch the console, so machine-readable
+    pipelines do not pay for importing rich.
+    """
+
+    _console = None
+
+    def __getattr__(self, name: str) -> Any:
+        if _LazyConsole._console is None:
+            from rich.console import Console
+
+            _LazyConsole._console = Console()
+        return getattr(_LazyConsole._console, name)
+
+
+console = _LazyConsole()
+
+# Search result columns written in CSV output
+SEARCH_CSV_FIELDS = [
+    "score",
+    "distance",
+    "keyword_score",
+    "patient_id",
+    "encounter_id",
+    "note_id",
+    "note_date",
+    "note_type",
+    "text_chunk",
+    "chunk_id",
+    "chunk_index",
+    "chunk_count",
+    "note_quality_score",
+    "chunk_quality_score",
+]
 
 # Default column widths
 DEFAULT_TEXT_WIDTH = 80
 SCORE_WIDTH = 8
 
+# Rows per table when streamed results are printed as a table
+STREAM_TABLE_ROWS = 50
+
 
 def format_score(score: Optional[float], style: str = "yellow") -> str:
     """Format a score value with color coding."""
@@ -23,8 +64,10 @@ def format_score(score: Optional[float], style: str = "yellow") -> str:
     return f"{score:.4f}"
 
 
-def color_score(score: Optional[float]) -> Text:
+def color_score(score: Optional[float]) -> "Text":
     """Create a color-coded score text based on value."""
+    from rich.text import Text
+
     if score is None:
         return Text("-", style="dim")
 
@@ -47,56 +90,125 @@ def truncate_text(text: Optional[str], max_length: int = DEFAULT_TEXT_WIDTH) ->
     return text[: max_length - 3] + "..."
 
 
+@timed("render")
 def output_json(data: Any) -> None:
     """Output data as formatted JSON."""
     print(json.dumps(data, indent=2, default=str))
 
 
-def output_csv(data: list[dict], fields: Optional[list[str]] = None) -> None:
-    """Output data as CSV.
+class RowWriter(ABC):
+    """Streaming writer that emits rows as they are consumed.
 
-    Args:
-        data: List of dictionaries to output.
-        fields: Optional list of fields to include. If None, uses all keys from first row.
+    Rows go straight to the target stream without building the output in
+    memory, so writers compose with generators such as streamed responses
+    and paginated or concurrent fetchers.
     """
-    if not data:
-        print("")
-        return
 
-    if fields is None:
-        fields = list(data[0].keys())
+    def __init__(self, out: Optional[TextIO] = None):
+        """Initialize the writer.
 
-    output = io.StringIO()
-    writer = csv.DictWriter(output, fieldnames=fields, extrasaction="ignore")
-    writer.writeheader()
-    for row in data:
-        # Convert any non-string values to strings
-        writer.writerow({k: str(v) if v is not None else "" for k, v in row.items()})
+        Args:
+            out: Target text stream (defaults to stdout).
+        """
+        self.out = out if out is not None else sys.stdout
+        self.count = 0
 
-    print(output.getvalue().rstrip())
+    @abstractmethod
+    def write(self, row: dict) -> None:
+        """Write one row."""
 
+    @timed("render")
+    def write_rows(self, rows: Iterable[dict]) -> int:
+        """Write every row from an iterable and flush.
 
-def output_search_table(
-    results: list[dict],
-    metadata: dict,
-    full_text: bool = False,
-    text_width: int = DEFAULT_TEXT_WIDTH,
-) -> None:
-    """Output search results as a formatted table.
+        Returns:
+            Total number of rows written by this writer.
+        """
+        for row in rows:
+            self.write(row)
+        self.flush()
+        return self.count
+
+    def flush(self) -> None:
+        """Flush the target stream."""
+        self.out.flush()
+
+
+class CSVRowWriter(RowWriter):
+    """Write rows as CSV, emitting the header with the first row.
+
+    None values are written as empty fields and other values as their
+    ``str()``, without copying the row.
+    """
+
+    def __init__(self, out: Optional[TextIO] = None, fields: Optional[list[str]] = None):
+        """Initialize the writer.
+
+        Args:
+            out: Target text stream (defaults to stdout).
+            fields: Columns to write. If None, uses the keys of the first row.
+        """
+        super().__init__(out)
+        self.fields = fields
+        self._writer: Optional[csv.DictWriter] = None
+
+    def write(self, row: dict) -> None:
+        if self._writer is None:
+            fields = self.fields if self.fields is not None else list(row.keys())
+            self._writer = csv.DictWriter(self.out, fieldnames=fields, extrasaction="ignore")
+            self._writer.writeheader()
+        self._writer.writerow(row)
+        self.count += 1
+
+
+class NDJSONRowWriter(RowWriter):
+    """Write rows as newline-delimited JSON, one object per line."""
+
+    def __init__(self, out: Optional[TextIO] = None, flush_each: bool = False):
+        """Initialize the writer.
+
+        Args:
+            out: Target text stream (defaults to stdout).
+            flush_each: Flush after every line so consumers see rows immediately.
+        """
+        super().__init__(out)
+        self.flush_each = flush_each
+
+    def write(self, row: dict) -> None:
+        self.out.write(json.dumps(row, default=str))
+        self.out.write("\n")
+        self.count += 1
+        if self.flush_each:
+            self.out.flush()
+
+
+@timed("render")
+def output_csv(data: Iterable[dict], fields: Optional[list[str]] = None) -> None:
+    """Output data as CSV.
+
+    Rows are written as they are consumed, so ``data`` may be a generator
+    (e.g. a streamed search response).
 
     Args:
-        results: List of search result dictionaries.
-        metadata: Search metadata dictionary.
-        full_text: If True, show full note text instead of chunk.
-        text_width: Maximum width for text columns.
+        data: Dictionaries to output.
+        fields: Optional list of fields to include. If None, uses all keys from first row.
     """
-    if not results:
-        console.print("[yellow]No results found.[/yellow]")
-        return
+    if CSVRowWriter(fields=fields).write_rows(data) == 0:
+        print("")
+
+
+@timed("render")
+def output_ndjson(rows: Iterable[dict]) -> None:
+    """Output rows as newline-delimited JSON as they are consumed."""
+    NDJSONRowWriter().write_rows(rows)
+
+
+def _search_table(text_width: int, show_header: bool = True) -> "Table":
+    """Empty search results table; every column has a fixed width."""
+    from rich.table import Table
 
     table = Table(
-        title=f"Search Results ({metadata.get('total_results', len(results))} results)",
-        show_header=True,
+        show_header=show_header,
         header_style="bold cyan",
     )
 
@@ -109,7 +221,33 @@ def output_search_table(
     table.add_column("Note Type", width=20)
     table.add_column("Date", width=12)
     table.add_column("Text", width=text_width, overflow="fold")
+    return table
+
 
+@timed("render")
+def output_search_table(
+    results: Iterable[dict],
+    metadata: Union[dict, Callable[[], dict]],
+    full_text: bool = False,
+    text_width: int = DEFAULT_TEXT_WIDTH,
+) -> None:
+    """Output search results as a formatted table.
+
+    A rich table is rendered once complete, so streamed results (a callable
+    ``metadata``) are printed as consecutive tables of STREAM_TABLE_ROWS
+    rows, keeping memory flat; the fixed column widths line them up.
+
+    Args:
+        results: Search result dictionaries (list or iterator).
+        metadata: Search metadata dictionary, or a callable returning it once
+            ``results`` is exhausted (for streamed responses).
+        full_text: If True, show full note text instead of chunk.
+        text_width: Maximum width for text columns.
+    """
+    streamed = callable(metadata)
+    table = _search_table(text_width)
+
+    row_count = 0
     for idx, result in enumerate(results, 1):
         score = result.get("score")
         text_field = "text_full" if full_text else "text_chunk"
@@ -125,8 +263,26 @@ def output_search_table(
             str(result.get("note_date", ""))[:10],
             text,
         )
+        row_count = idx
+        if streamed and idx % STREAM_TABLE_ROWS == 0:
+            console.print(table)
+            table = _search_table(text_width, show_header=False)
 
-    console.print(table)
+    if callable(metadata):
+        metadata = metadata()
+
+    if not row_count:
+        console.print("[yellow]No results found.[/yellow]")
+        return
+
+    title = f"Search Results ({metadata.get('total_results', row_count)} results)"
+    if streamed:
+        if table.row_count:
+            console.print(table)
+        console.print(f"[bold]{title}[/bold]")
+    else:
+        table.title = title
+        console.print(table)
 
     # Print metadata footer
     console.print()
@@ -146,27 +302,45 @@ def output_search_table(
         console.print(f"[dim]{' | '.join(meta_parts)}[/dim]")
 
 
-def output_search_csv(results: list[dict]) -> None:
+@timed("render")
+def output_search_csv(results: Iterable[dict]) -> None:
     """Output search results as CSV with appropriate fields."""
-    fields = [
-        "score",
-        "distance",
-        "keyword_score",
-        "patient_id",
-        "encounter_id",
-        "note_id",
-        "note_date",
-        "note_type",
-        "text_chunk",
-        "chunk_id",
-        "chunk_index",
-        "chunk_count",
-        "note_quality_score",
-        "chunk_quality_score",
-    ]
-    output_csv(results, fields)
+    output_csv(results, SEARCH_CSV_FIELDS)
+
+
+@timed("render")
+def output_columnar(rows: Iterable[dict], columns: list[tuple[str, str]], fmt: str) -> None:
+    """Output rows to stdout as a Parquet or Arrow IPC file.
+
+    Rows are written in typed record batches as they are consumed. Binary
+    output is refused when stdout is a terminal.
+
+    Args:
+        rows: Dictionaries to output (list or iterator).
+        columns: (name, kind) column specification from trioexplorer.columnar.
+        fmt: Either "parquet" or "arrow".
+    """
+    from rich.console import Console
+
+    from .columnar import ColumnarUnavailableError, write_columnar
 
+    error_console = Console(stderr=True)
+    if sys.stdout.isatty():
+        error_console.print(
+            f"[red]Refusing to write binary {fmt} output to a terminal; "
+            "redirect stdout to a file[/red]"
+        )
+        raise SystemExit(1)
+
+    sys.stdout.flush()
+    try:
+        write_columnar(rows, columns, fmt, sys.stdout.buffer)
+    except ColumnarUnavailableError as e:
+        error_console.print(f"[red]{e}[/red]")
+        raise SystemExit(1)
 
+
+@timed("render")
 def output_history_table(
     items: list[dict],
     total_count: int,
@@ -187,6 +361,8 @@ def output_history_table(
         console.print("[yellow]No search history found.[/yellow]")
         return
 
+    from rich.table import Table
+
     table = Table(
         title=f"Search History (Page {page}, {total_count} total)",
         show_header=True,
@@ -219,6 +395,7 @@ def output_history_table(
         console.print(f"[dim]Page {page} of {(total_count + page_size - 1) // page_size}. Use --page to see more.[/dim]")
 
 
+@timed("render")
 def output_history_csv(items: list[dict]) -> None:
     """Output search history as CSV."""
     fields = [
@@ -234,12 +411,15 @@ def output_history_csv(items: list[dict]) -> None:
     output_csv(items, fields)
 
 
+@timed("render")
 def output_cohorts_table(items: list[dict], total_count: int) -> None:
     """Output indexed cohorts as a formatted table."""
     if not items:
         console.print("[yellow]No indexed cohorts found.[/yellow]")
         return
 
+    from rich.table import Table
+
     table = Table(
         title=f"Indexed Cohorts ({total_count} total)",
         show_header=True,
@@ -262,18 +442,22 @@ def output_cohorts_table(items: list[dict], total_count: int) -> None:
     console.print(table)
 
 
+@timed("render")
 def output_cohorts_csv(items: list[dict]) -> None:
     """Output indexed cohorts as CSV."""
     fields = ["cohort_id", "cohort_name", "namespace", "chunk_count", "index_status"]
     output_csv(items, fields)
 
 
+@timed("render")
 def output_notetypes_table(items: list[dict], total_count: int) -> None:
     """Output note types as a formatted table."""
     if not items:
         console.print("[yellow]No note types found.[/yellow]")
         return
 
+    from rich.table import Table
+
     table = Table(
         title=f"Note Types ({total_count} total)",
         show_header=True,
@@ -296,17 +480,21 @@ def output_notetypes_table(items: list[dict], total_count: int) -> None:
     console.print(table)
 
 
+@timed("render")
 def output_notetypes_csv(items: list[dict]) -> None:
     """Output note types as CSV."""
     fields = ["id", "note_type", "note_count", "first_seen_at", "last_seen_at"]
     output_csv(items, fields)
 
 
+@timed("render")
 def output_stats_table(stats: dict) -> None:
     """Output search history stats as a formatted display."""
     console.print("[bold cyan]Search History Statistics[/bold cyan]")
     console.print()
 
+    from rich.table import Table
+
     table = Table(show_header=False, box=None)
     table.add_column("Metric", style="bold")
     table.add_column("Value", justify="right")
@@ -343,12 +531,137 @@ def output_stats_table(stats: dict) -> None:
             console.print(f"[dim]Latest: {str(latest)[:19]}[/dim]")
 
 
+@timed("render")
+def output_latency_tables(report: dict, groups: Iterable[str], max_rows: Optional[int] = None) -> None:
+    """Output search history latency percentiles, one table per grouping.
+
+    Args:
+        report: Report from trioexplorer.latency.LatencyStats.report.
+        groups: Groupings to show (search_type, day, user).
+        max_rows: Show only the groups with the highest top percentile.
+    """
+    from rich.table import Table
+
+    from .metrics import format_ms
+
+    overall = report["overall"]
+    quantile_keys = [key for key in overall if key.startswith("p")]
+    titles = {"search_type": "Search Type", "day": "Day", "user": "User"}
+
+    console.print("[bold cyan]Search Latency[/bold cyan]")
+    console.print(
+        f"[dim]{report['entries']} searches, {report['missing_duration']} without duration[/dim]"
+    )
+    console.print()
+
+    for group in ["overall", *groups]:
+        rows = {"all": overall} if group == "overall" else report[group]
+        if max_rows is not None and len(rows) > max_rows:
+            top = sorted(rows, key=lambda key: rows[key][quantile_keys[-1]] or 0, reverse=True)
+            rows = {key: rows[key] for key in sorted(top[:max_rows])}
+
+        table = Table(show_header=True, header_style="bold cyan")
+        table.add_column(titles.get(group, "Overall"))
+        table.add_column("Count", justify="right")
+        for key in quantile_keys:
+            table.add_column(key, justify="right")
+        table.add_column("max", justify="right")
+        for key, summary in rows.items():
+            table.add_row(
+                str(key),
+                str(summary["count"]),
+                *(format_ms(summary[q]) for q in quantile_keys),
+                format_ms(summary["max"]),
+            )
+        console.print(table)
+
+
+@timed("render")
+def output_slow_report(report: dict, sort: str = "p95") -> None:
+    """Output the slow-query analysis: marginal costs and top templates.
+
+    Args:
+        report: Report from trioexplorer.analyze.SlowQueryAnalyzer.report.
+        sort: Ranking used for the templates ("p95" or "total").
+    """
+    from rich.table import Table
+
+    from .metrics import format_ms
+
+    fit = report["fit"]
+    console.print("[bold cyan]Slow Query Analysis[/bold cyan]")
+    console.print(
+        f"[dim]{report['analyzed']} searches analyzed, {report['skipped']} skipped "
+        f"(failed or without duration), {report['distinct_templates']} parameter combinations[/dim]"
+    )
+    console.print()
+
+    if fit["intercept"] is None:
+        console.print("[yellow]Not enough varied searches to estimate parameter costs.[/yellow]")
+    else:
+        r2 = f"{fit['r2']:.2f}" if fit["r2"] is not None else "-"
+        table = Table(
+            title=f"Marginal Cost (baseline {format_ms(fit['intercept'])}, R² {r2})",
+            show_header=True,
+            header_style="bold cyan",
+        )
+        table.add_column("Parameter")
+        table.add_column("ms / unit", justify="right")
+        table.add_column("ms / std dev", justify="right")
+        coefficients = sorted(
+            fit["coefficients"].items(),
+            key=lambda item: abs(item[1]["ms_per_std"] or 0),
+            reverse=True,
+        )
+        for name, coefficient in coefficients:
+            if coefficient["ms_per_unit"] is None:
+                table.add_row(name, "[dim]constant[/dim]", "-")
+                continue
+            table.add_row(
+                name,
+                f"{coefficient['ms_per_unit']:+.1f}",
+                f"{coefficient['ms_per_std']:+.1f}",
+            )
+        console.print(table)
+    console.print()
+
+    templates = report["templates"]
+    if not templates:
+        console.print("[yellow]No parameter combination was seen often enough to rank.[/yellow]")
+        return
+    ranking = "p95 latency" if sort == "p95" else "total time"
+    table = Table(
+        title=f"Top Parameter Combinations by {ranking}",
+        show_header=True,
+        header_style="bold cyan",
+    )
+    table.add_column("Parameters")
+    table.add_column("Count", justify="right")
+    table.add_column("mean", justify="right")
+    table.add_column("p50", justify="right")
+    table.add_column("p95", justify="right")
+    table.add_column("Time %", justify="right")
+    for template in templates:
+        table.add_row(
+            template["template"],
+            str(template["count"]),
+            format_ms(template["mean_ms"]),
+            format_ms(template["p50_ms"]),
+            format_ms(template["p95_ms"]),
+            f"{template['time_share'] * 100:.1f}",
+        )
+    console.print(table)
+
+
+@timed("render")
 def output_filters_table(fields: list[dict], namespace: str) -> None:
     """Output filter fields as a formatted table."""
     if not fields:
         console.print(f"[yellow]No filter fields found for namespace '{namespace}'.[/yellow]")
         return
 
+    from rich.table import Table
+
     table = Table(
         title=f"Filter Fields ({len(fields)} fields)",
         show_header=True,
@@ -369,12 +682,15 @@ def output_filters_table(fields: list[dict], namespace: str) -> None:
     console.print(table)
 
 
+@timed("render")
 def output_filter_values_table(values: list[dict], field_name: str, total_values: int) -> None:
     """Output filter values for a specific field as a formatted table."""
     if not values:
         console.print(f"[yellow]No values found for field '{field_name}'.[/yellow]")
         return
 
+    from rich.table import Table
+
     table = Table(
         title=f"Filter Values for '{field_name}' ({total_values} total)",
         show_header=True,
@@ -0,0 +1,115 @@
+"""Concurrent prefetch of paginated list endpoints.
+
+Endpoints such as ``/search-history`` answer ``page``/``page_size`` with
+``items``, ``total_count`` and ``has_more``. Pager reads the first page
+to learn the total, then fetches the remaining pages with a pool of
+workers and yields each page as it arrives (not in page order). Pages that
+are done but not yet consumed are capped at the number of workers, so
+memory stays bounded when the consumer is slower than the network.
+"""
+
+from typing import TYPE_CHECKING, Any, AsyncIterator, Optional
+
+if TYPE_CHECKING:
+    from .async_client import AsyncSearchClient
+
+# Largest page the API serves
+MAX_PAGE_SIZE = 100
+
+# Pages fetched at once
+DEFAULT_CONCURRENCY = 8
+
+
+class Pager:
+    """Fetch every page of a list endpoint concurrently.
+
+    Iterate with ``async for page, response in pager``. A page that fails
+    with a SearchAPIError is recorded in ``errors`` and skipped; failure of
+    the first page is raised.
+    """
+
+    def __init__(
+        self,
+        client: "AsyncSearchClient",
+        path: str,
+        params: Optional[dict[str, Any]] = None,
+        page_size: int = MAX_PAGE_SIZE,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        max_pages: Optional[int] = None,
+    ):
+        """Initialize the pager.
+
+        Args:
+            client: Async client used for all requests.
+            path: API endpoint path (e.g., "/search-history").
+            params: Filters sent with every page.
+            page_size: Entries per page.
+            concurrency: Pages fetched at once.
+            max_pages: Stop after this many pages (None for all).
+        """
+        self.client = client
+        self.path = path
+        self.params = dict(params or {})
+        self.page_size = page_size
+        self.concurrency = max(1, concurrency)
+        self.max_pages = max_pages
+        self.pages = 0
+        self.errors: list[dict[str, Any]] = []
+
+    def page_params(self, page: int) -> dict[str, Any]:
+        """Query parameters for one page."""
+        return {**self.params, "page": page, "page_size": self.page_size}
+
+    def _within_limit(self, page: int) -> bool:
+        return self.max_pages is None or page <= self.max_pages
+
+    async def __aiter__(self) -> AsyncIterator[tuple[int, dict[str, Any]]]:
+        import asyncio
+        import math
+
+        from .errors import SearchAPIError
+
+        first = await self.client.get(self.path, params=self.page_params(1))
+        self.pages = 1
+        total_pages = max(1, math.ceil(first.get("total_count", 0) / self.page_size))
+        if self.max_pages is not None:
+            total_pages = min(total_pages, self.max_pages)
+        last_page = total_pages if first.get("has_more") else 1
+
+        pending: asyncio.Queue = asyncio.Queue()
+        done: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency)
+        for page in range(2, last_page + 1):
+            pending.put_nowait(page)
+        outstanding = last_page - 1
+
+        async def worker() -> None:
+            while True:
+                page = await pending.get()
+                try:
+                    result: Any = await self.client.get(self.path, params=self.page_params(page))
+                except Exception as error:
+                    result = error
+                await done.put((page, result))
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        try:
+            yield 1, first
+            while outstanding:
+                page, result = await done.get()
+                outstanding -= 1
+                if isinstance(result, SearchAPIError):
+                    self.errors.append({"page": page, "error": result.message})
+                    continue
+                if isinstance(result, Exception):
+                    raise result
+                self.pages += 1
+                # Entries added while paging push the end past total_count
+                if page == last_page and result.get("has_more") and self._within_limit(page + 1):
+                    last_page += 1
+                    pending.put_nowait(last_page)
+                    outstanding += 1
+                yield page, result
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
@@ -0,0 +1,218 @@
+"""Local, vectorized evaluation of the filter DSL over saved result sets.
+
+A broad search saved with ``-o json``, ``ndjson``, ``csv``, ``parquet`` or
+``arrow`` is loaded into an Arrow table (search result columns typed as in
+trioexplorer.columnar). A filter AST (trioexplorer.filters) is then
+evaluated column-at-a-time with ``pyarrow.compute``, so narrowing by date,
+note type or quality score needs no further /search requests.
+
+Requires pyarrow (``pip install 'trioexplorer[arrow]'``).
+"""
+
+import json
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any, Optional
+
+from .columnar import SEARCH_COLUMNS, import_pyarrow, rows_to_table
+from .filters import And, Condition, Node, Not
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+# Input formats recognized by file extension
+FORMAT_EXTENSIONS = {
+    ".json": "json",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+    ".ipc": "arrow",
+}
+
+# pyarrow.compute functions for scalar comparisons
+_COMPARISONS = {
+    "Eq": "equal",
+    "NotEq": "not_equal",
+    "Lt": "less",
+    "Lte": "less_equal",
+    "Gt": "greater",
+    "Gte": "greater_equal",
+}
+
+
+class FilterEvaluationError(ValueError):
+    """A filter cannot be evaluated against the saved results."""
+
+
+class ResultSet:
+    """Search results loaded for local filtering.
+
+    ``table`` holds the typed search columns used for evaluation. For JSON
+    and NDJSON inputs the original rows are kept too, so fields outside the
+    typed columns survive refinement unchanged; CSV rows are returned typed
+    from the table since every CSV value is a string.
+    """
+
+    def __init__(self, table: "pa.Table", rows: Optional[list[dict]] = None, metadata: Optional[dict] = None):
+        self.table = table
+        self.rows = rows
+        self.metadata = metadata or {}
+
+    def __len__(self) -> int:
+        return self.table.num_rows
+
+    def select(self, mask: "pa.ChunkedArray", limit: Optional[int] = None) -> list[dict]:
+        """Return the rows where ``mask`` is true, in their original order."""
+        if self.rows is None:
+            rows = self.table.filter(mask).to_pylist()
+        else:
+            rows = [row for row, keep in zip(self.rows, mask.to_pylist()) if keep]
+        return rows[:limit] if limit is not None else rows
+
+
+def detect_format(path: str) -> str:
+    """Guess the input format from a file extension (default: ndjson for stdin)."""
+    if path == "-":
+        return "ndjson"
+    fmt = FORMAT_EXTENSIONS.get(Path(path).suffix.lower())
+    if fmt is None:
+        raise ValueError(
+            f"Cannot tell the format of {path}; use --input-format "
+            f"({', '.join(sorted(set(FORMAT_EXTENSIONS.values())))})"
+        )
+    return fmt
+
+
+def _rows_from_text(stream: IO[str], fmt: str) -> tuple[list[dict], dict]:
+    """Read result rows (and metadata, if any) from JSON, NDJSON or CSV text."""
+    if fmt == "csv":
+        import csv
+
+        return list(csv.DictReader(stream)), {}
+
+    if fmt == "ndjson":
+        return [json.loads(line) for line in stream if line.strip()], {}
+
+    data = json.load(stream)
+    if isinstance(data, list):
+        return data, {}
+    if isinstance(data, dict) and isinstance(data.get("results"), list):
+        return data["results"], data.get("metadata") or {}
+    raise ValueError("JSON input must be a search response or a list of results")
+
+
+def load_results(path: str, fmt: Optional[str] = None, stdin: Optional[IO[str]] = None) -> ResultSet:
+    """Load a saved result set.
+
+    Args:
+        path: File path, or "-" for stdin.
+        fmt: Input format (detected from the extension if omitted).
+        stdin: Stream used for "-" (defaults to sys.stdin).
+
+    Raises:
+        ValueError: If the input cannot be parsed.
+        OSError: If the file cannot be read.
+        ColumnarUnavailableError: If pyarrow is not installed.
+    """
+    pa = import_pyarrow()
+    fmt = fmt or detect_format(path)
+
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        return ResultSet(pq.read_table(path))
+    if fmt == "arrow":
+        with pa.memory_map(path) as source:
+            return ResultSet(pa.ipc.open_file(source).read_all())
+
+    if path == "-":
+        import sys
+
+        rows, metadata = _rows_from_text(stdin or sys.stdin, fmt)
+    else:
+        with open(path, encoding="utf-8", newline="") as stream:
+            rows, metadata = _rows_from_text(stream, fmt)
+    if fmt == "csv":
+        return ResultSet(rows_to_table(rows, SEARCH_COLUMNS))
+    return result_set_from_rows(rows, metadata)
+
+
+def result_set_from_rows(rows: list[dict], metadata: Optional[dict] = None) -> ResultSet:
+    """Wrap result rows held in memory (e.g. the shell's last search).
+
+    Raises:
+        ColumnarUnavailableError: If pyarrow is not installed.
+    """
+    return ResultSet(rows_to_table(rows, SEARCH_COLUMNS), rows, metadata)
+
+
+def _column(table: "pa.Table", field: str) -> "pa.ChunkedArray":
+    """Get a column for comparison, decoding dictionary columns."""
+    pa = import_pyarrow()
+    if field not in table.column_names:
+        raise FilterEvaluationError(f"Field '{field}' is not available in the saved results")
+    column = table.column(field)
+    if pa.types.is_dictionary(column.type):
+        column = column.cast(column.type.value_type)
+    return column
+
+
+def _typed_values(values: list[Any], field: str, column_type: "pa.DataType") -> "pa.Array":
+    """Convert filter values to the column's type."""
+    pa = import_pyarrow()
+    try:
+        return pa.array(values).cast(column_type)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError) as e:
+        raise FilterEvaluationError(f"Cannot compare '{field}' with {values!r}: {e}") from e
+
+
+def _evaluate_condition(condition: Condition, table: "pa.Table") -> "pa.ChunkedArray":
+    import pyarrow.compute as pc
+
+    column = _column(table, condition.field)
+    if condition.op in _COMPARISONS:
+        value = _typed_values([condition.value], condition.field, column.type)[0]
+        return getattr(pc, _COMPARISONS[condition.op])(column, value)
+    if condition.op in ("In", "NotIn"):
+        matches = pc.is_in(column, value_set=_typed_values(list(condition.value), condition.field, column.type))
+        return pc.invert(matches) if condition.op == "NotIn" else matches
+    raise FilterEvaluationError(
+        f"{condition.op} is not supported for local filtering (field '{condition.field}')"
+    )
+
+
+def evaluate(node: Optional[Node], table: "pa.Table") -> "pa.ChunkedArray":
+    """Evaluate a filter AST to a boolean mask over ``table``.
+
+    Comparisons against missing values are false, as is a field that is
+    absent from every row.
+
+    Raises:
+        FilterEvaluationError: If the filter uses an unavailable field or an
+            unsupported operator.
+    """
+    pa = import_pyarrow()
+    import pyarrow.compute as pc
+
+    if node is None:
+        return pa.chunked_array([pa.array([True] * table.num_rows, type=pa.bool_())])
+    if isinstance(node, Condition):
+        mask = _evaluate_condition(node, table)
+    elif isinstance(node, Not):
+        mask = pc.invert(evaluate(node.child, table))
+    else:
+        masks = [evaluate(child, table) for child in node.children]
+        if not masks:
+            return evaluate(None, table) if isinstance(node, And) else pc.invert(evaluate(None, table))
+        combine = pc.and_ if isinstance(node, And) else pc.or_
+        mask = masks[0]
+        for other in masks[1:]:
+            mask = combine(mask, other)
+    return pc.fill_null(mask, False)
+
+
+def refine(result_set: ResultSet, node: Optional[Node], limit: Optional[int] = None) -> list[dict]:
+    """Apply a filter to a result set and return the matching rows."""
+    return result_set.select(evaluate(node, result_set.table), limit)
@@ -0,0 +1,187 @@
+"""Retry policy and client-side rate limiting for the Search API clients."""
+
+import email.utils
+import random
+import threading
+import time
+from typing import Callable, Optional
+
+import httpx
+
+from .config import DEFAULT_MAX_RETRIES
+
+# Default retry settings
+DEFAULT_BASE_DELAY = 0.5
+DEFAULT_MAX_DELAY = 30.0
+DEFAULT_MAX_RETRY_AFTER = 120.0
+
+# Status codes that indicate a transient server-side condition
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# Methods that are safe to repeat after the request may have reached the server
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Parse a Retry-After header into seconds to wait.
+
+    Args:
+        value: Header value, either delay-seconds or an HTTP-date.
+        now: Current UNIX time (for testing).
+
+    Returns:
+        Non-negative delay in seconds, or None if missing or unparseable.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    now = time.time() if now is None else now
+    return max(0.0, retry_at.timestamp() - now)
+
+
+class RetryPolicy:
+    """Decide whether and when a failed request should be retried.
+
+    Transient failures (timeouts, connection errors, 429 and 5xx responses)
+    are retried with capped exponential backoff and full jitter, honoring
+    ``Retry-After`` when the server sends it. Non-idempotent methods (POST,
+    e.g. creating a judgement list) are only retried when the request never
+    left the client or was refused with 429 (the server did not process
+    it), unless ``retry_non_idempotent`` is set.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        base_delay: float = DEFAULT_BASE_DELAY,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        max_retry_after: float = DEFAULT_MAX_RETRY_AFTER,
+        jitter: bool = True,
+        retry_non_idempotent: bool = False,
+        status_codes: frozenset[int] = RETRY_STATUS_CODES,
+        random_func: Callable[[], float] = random.random,
+    ):
+        """Initialize the policy.
+
+        Args:
+            max_retries: Retries after the first attempt (0 disables retrying).
+            base_delay: Backoff delay for the first retry in seconds.
+            max_delay: Upper bound for computed backoff delays.
+            max_retry_after: Give up instead of waiting longer than this
+                for a server-requested Retry-After.
+            jitter: Apply full jitter to computed delays.
+            retry_non_idempotent: Also retry POST requests that may have
+                reached the server.
+            status_codes: HTTP status codes considered transient.
+            random_func: Source of randomness in [0, 1) (for testing).
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.jitter = jitter
+        self.retry_non_idempotent = retry_non_idempotent
+        self.status_codes = status_codes
+        self._random = random_func
+
+    def is_retryable(self, method: str, error: Exception) -> bool:
+        """Check whether an error is transient and safe to retry for a method."""
+        # Connection failures mean nothing was sent, so any method is safe.
+        if isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout)):
+            return True
+
+        # A 429 was rejected before processing, so any method is safe too.
+        if isinstance(error, httpx.HTTPStatusError) and error.response.status_code == 429:
+            return 429 in self.status_codes
+
+        if method.upper() not in IDEMPOTENT_METHODS and not self.retry_non_idempotent:
+            return False
+
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code in self.status_codes
+        return isinstance(error, (httpx.TimeoutException, httpx.TransportError))
+
+    def backoff(self, attempt: int) -> float:
+        """Compute the backoff delay before retry number ``attempt + 1``."""
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        if self.jitter:
+            delay *= self._random()
+        return delay
+
+    def next_delay(self, method: str, attempt: int, error: Exception) -> Optional[float]:
+        """Return how long to wait before retrying, or None to give up.
+
+        Args:
+            method: HTTP method of the failed request.
+            attempt: Zero-based number of the attempt that just failed.
+            error: Exception raised by the attempt.
+        """
+        if attempt >= self.max_retries or not self.is_retryable(method, error):
+            return None
+
+        if isinstance(error, httpx.HTTPStatusError):
+            retry_after = parse_retry_after(error.response.headers.get("Retry-After"))
+            if retry_after is not None:
+                if retry_after > self.max_retry_after:
+                    return None
+                return retry_after
+        return self.backoff(attempt)
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by all in-flight requests.
+
+    Each request reserves one token. When the bucket is empty the caller is
+    told how long to wait; reservations are handed out in order, so a burst
+    of concurrent requests is spread evenly at ``rate`` per second instead of
+    all hitting the API at once and collecting 429s.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the bucket (full).
+
+        Args:
+            rate: Tokens added per second (sustained requests per second).
+            capacity: Maximum burst size (defaults to ``max(1, rate)``).
+            clock: Monotonic clock (for testing).
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """Reserve tokens and return the seconds to wait before using them."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        """Block until the reserved tokens are available."""
+        delay = self.reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
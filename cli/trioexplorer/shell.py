@@ -0,0 +1,316 @@
+"""Interactive shell session: completion index and kept results.
+
+``trioexplorer shell`` reads commands in the normal CLI grammar and runs
+them in one process, sharing one pooled SearchClient, so only the first
+command pays for interpreter startup, client construction and the
+connection handshake.
+
+This module holds the state a session keeps between commands:
+
+- a CompletionIndex of cohort IDs, note types and filter values, fetched
+  once (through the response cache) the first time completion needs them,
+  or read from the local filter index when ``filters sync`` indexed the
+  namespace;
+- the last search result set, which ``refine @last`` narrows without a
+  new request. Like timings, the session is process-wide: search and
+  refine commands hand their results to ``keep_results``, which does
+  nothing outside a shell.
+"""
+
+import re
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+if TYPE_CHECKING:
+    import argparse
+
+    from .client import SearchClient
+    from .filterindex import FilterIndex
+
+# refine input naming the last result set of the session
+LAST_RESULTS = "@last"
+
+# Commands handled by the shell itself
+BUILTINS = ("help", "last", "reload", "exit", "quit")
+
+# Characters ending the word readline hands to the completer
+COMPLETER_DELIMS = " \t\n\"',"
+
+# Most values fetched per list endpoint (the API maximums)
+COHORT_LIMIT = 100
+NOTE_TYPE_LIMIT = 1000
+FILTER_VALUE_LIMIT = 100
+
+# Most filter values completed from the local filter index
+INDEXED_VALUE_LIMIT = 500
+
+# Partial --entity-filters JSON ending in an object key or a list value
+_JSON_KEY = re.compile(r'[{,]\s*"([^"]*)$')
+_JSON_VALUE = re.compile(r'"([^"]+)"\s*:\s*\[(?:\s*"[^"]*"\s*,)*\s*"([^"]*)$')
+
+
+class ShellSession:
+    """State kept across the commands of one shell."""
+
+    def __init__(self) -> None:
+        self.results: Optional[list[dict[str, Any]]] = None
+        self.metadata: dict[str, Any] = {}
+
+
+_session: Optional[ShellSession] = None
+
+
+def start_session() -> ShellSession:
+    """Start keeping state for an interactive shell."""
+    global _session
+    _session = ShellSession()
+    return _session
+
+
+def stop_session() -> None:
+    """End the shell session and drop its state."""
+    global _session
+    _session = None
+
+
+def active_session() -> Optional[ShellSession]:
+    """The running shell session, if any."""
+    return _session
+
+
+def keep_results(results: list[dict[str, Any]], metadata: dict[str, Any]) -> None:
+    """Remember a result set for ``refine @last`` (only inside a shell)."""
+    if _session is not None:
+        _session.results = list(results)
+        _session.metadata = dict(metadata)
+
+
+def split_partial(line: str) -> tuple[list[str], str]:
+    """Split a line up to the cursor into finished words and the word being typed.
+
+    Quotes group words as in a POSIX shell; an unclosed quote runs to the
+    end of the line, so the word being typed may contain spaces.
+    """
+    words: list[str] = []
+    current: list[str] = []
+    quote: Optional[str] = None
+    in_word = False
+    for char in line:
+        if quote:
+            if char == quote:
+                quote = None
+            else:
+                current.append(char)
+        elif char in "\"'":
+            quote = char
+            in_word = True
+        elif char.isspace():
+            if in_word:
+                words.append("".join(current))
+                current = []
+                in_word = False
+        else:
+            current.append(char)
+            in_word = True
+    return words, "".join(current)
+
+
+class CompletionIndex:
+    """Completion values, fetched once per session through the shared client.
+
+    The endpoints are cached on disk for a day, so a new session usually
+    fills the index without a network request. A failed fetch leaves that
+    list empty until ``reload``.
+    """
+
+    def __init__(self, get_client: Callable[[], "SearchClient"], namespace: str = "default"):
+        """Initialize an empty index.
+
+        Args:
+            get_client: Returns the session's shared client.
+            namespace: Search namespace whose filter values are completed.
+        """
+        self.get_client = get_client
+        self.namespace = namespace
+        self._values: dict[str, Any] = {}
+
+    def clear(self) -> None:
+        """Forget every fetched list."""
+        local = self._values.get("local_index")
+        if local is not None:
+            local.close()
+        self._values.clear()
+
+    def _load(self, name: str, fetch: Callable[["SearchClient"], Any], empty: Any) -> Any:
+        if name not in self._values:
+            try:
+                self._values[name] = fetch(self.get_client())
+            except SystemExit:
+                # The client already reported the error
+                self._values[name] = empty
+        return self._values[name]
+
+    def cohort_ids(self) -> list[str]:
+        """Indexed cohort IDs."""
+        def fetch(client: "SearchClient") -> list[str]:
+            response = client.get("/cohorts/indexed", params={"limit": COHORT_LIMIT})
+            return [item["cohort_id"] for item in response.get("items", []) if item.get("cohort_id")]
+
+        return self._load("cohorts", fetch, [])
+
+    def note_types(self) -> list[str]:
+        """Note type names."""
+        def fetch(client: "SearchClient") -> list[str]:
+            response = client.get("/note-types", params={"limit": NOTE_TYPE_LIMIT})
+            return [item["note_type"] for item in response.get("items", []) if item.get("note_type")]
+
+        return self._load("note_types", fetch, [])
+
+    def filter_values(self) -> dict[str, list[str]]:
+        """Filter values by field, from /namespaces/{ns}/filter-values."""
+        def fetch(client: "SearchClient") -> dict[str, list[str]]:
+            response = client.get(
+                f"/namespaces/{self.namespace}/filter-values",
+                params={"limit": FILTER_VALUE_LIMIT},
+            )
+            return {
+                field: [value["text_value"] for value in values if value.get("text_value")]
+                for field, values in (response.get("fields") or {}).items()
+            }
+
+        return self._load("filter_values", fetch, {})
+
+    def filter_fields(self) -> list[str]:
+        """Filter field names."""
+        return sorted(self.filter_values())
+
+    def local_index(self) -> Optional["FilterIndex"]:
+        """The local filter index, if it holds this namespace."""
+        if "local_index" not in self._values:
+            import sqlite3
+
+            from .config import get_filter_index_path
+            from .filterindex import FilterIndex
+
+            index = None
+            if get_filter_index_path().exists():
+                try:
+                    index = FilterIndex()
+                    if index.namespace_info(self.namespace) is None:
+                        index.close()
+                        index = None
+                except (OSError, sqlite3.Error):
+                    index = None
+            self._values["local_index"] = index
+        return self._values["local_index"]
+
+    def field_values(self, field: str, prefix: str) -> list[str]:
+        """Values of a filter field starting with ``prefix``, ignoring case.
+
+        Every value is available when the namespace is in the local filter
+        index; otherwise only the most frequent ones /filter-values returns.
+        """
+        local = self.local_index()
+        if local is not None:
+            values = local.lookup(self.namespace, field, prefix, limit=INDEXED_VALUE_LIMIT)
+            return [value["text_value"] for value in values]
+        return _matching(self.filter_values().get(field, []), prefix)
+
+
+def _matching(values: list[str], prefix: str) -> list[str]:
+    folded = prefix.casefold()
+    return [value for value in values if value.casefold().startswith(folded)]
+
+
+def _subparsers(parser: "argparse.ArgumentParser") -> Optional[Any]:
+    import argparse
+
+    for action in parser._actions:
+        if isinstance(action, argparse._SubParsersAction):
+            return action
+    return None
+
+
+class Completer:
+    """Tab completion over the CLI grammar of ``create_parser()``.
+
+    Completes command and subcommand names, option names, option choices,
+    and values for --cohort-ids, --note-types, --field and the keys and
+    values of --entity-filters JSON from the CompletionIndex.
+    """
+
+    def __init__(self, parser: "argparse.ArgumentParser", index: CompletionIndex):
+        self.parser = parser
+        self.index = index
+        self._matches: list[str] = []
+
+    def candidates(self, line: str) -> list[str]:
+        """Completions for the word being typed at the end of ``line``.
+
+        Returns:
+            Full replacements for the current word, sorted.
+        """
+        words, current = split_partial(line)
+        parser = self.parser
+        expecting = None
+        for word in words:
+            if expecting is not None:
+                expecting = None
+                continue
+            if word.startswith("-"):
+                action = parser._option_string_actions.get(word)
+                if action is not None and action.nargs != 0:
+                    expecting = action
+                continue
+            subparsers = _subparsers(parser)
+            if subparsers is not None and word in subparsers.choices:
+                parser = subparsers.choices[word]
+
+        if expecting is not None:
+            return sorted(self._values(expecting, current))
+        if current.startswith("-"):
+            return sorted(option for option in parser._option_string_actions if option.startswith(current))
+        if current.startswith("@"):
+            return [LAST_RESULTS] if LAST_RESULTS.startswith(current) else []
+        subparsers = _subparsers(parser)
+        names = list(subparsers.choices) if subparsers is not None else []
+        if not words:
+            names.extend(BUILTINS)
+        return sorted(name for name in names if name.startswith(current))
+
+    def _values(self, action: "argparse.Action", current: str) -> list[str]:
+        if action.choices:
+            return [str(choice) for choice in action.choices if str(choice).startswith(current)]
+        if action.dest == "entity_filters":
+            return self._json_values(current)
+        if action.dest == "field":
+            return _matching(self.index.filter_fields(), current)
+        if action.dest in ("cohort_ids", "note_types"):
+            values = self.index.cohort_ids() if action.dest == "cohort_ids" else self.index.note_types()
+            head, comma, segment = current.rpartition(",")
+            return [head + comma + value for value in _matching(values, segment)]
+        return []
+
+    def _json_values(self, current: str) -> list[str]:
+        match = _JSON_VALUE.search(current)
+        if match:
+            field, prefix = match.groups()
+            head = current[:len(current) - len(prefix)]
+            return [head + value for value in self.index.field_values(field, prefix)]
+        match = _JSON_KEY.search(current)
+        if not match:
+            return []
+        (prefix,) = match.groups()
+        values = self.index.filter_fields()
+        head = current[:len(current) - len(prefix)]
+        return [head + value for value in _matching(values, prefix)]
+
+    def complete(self, text: str, state: int) -> Optional[str]:
+        """readline completer: ``text`` is the word after the last delimiter."""
+        if state == 0:
+            import readline
+
+            line = readline.get_line_buffer()[:readline.get_endidx()]
+            _, current = split_partial(line)
+            cut = len(current) - len(text)
+            self._matches = [candidate[cut:] for candidate in self.candidates(line)] if cut >= 0 else []
+        return self._matches[state] if state < len(self._matches) else None
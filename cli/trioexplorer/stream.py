@@ -0,0 +1,326 @@
+"""Incremental JSON decoding for large Search API responses.
+
+The Search API returns ``{"results": [...], "metadata": {...}}``. With
+``distinct=none``, a large ``top_k_retrieval`` and full note text, that
+body can be many megabytes. StreamingJSONDecoder consumes the body chunk
+by chunk as it arrives and emits each element of one top-level array as
+soon as it is complete, so callers can render rows before the download
+finishes and peak memory stays at roughly one element plus one chunk.
+"""
+
+import codecs
+import json
+import re
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_STRING_BODY = re.compile(r'[^"\\]*')
+_SCALAR = re.compile(r"[^,\]}\s]*")
+_STRUCTURAL = re.compile(r'[\[\]{}"]')
+
+# Decoder states
+_START = "start"
+_KEY = "key"
+_COLON = "colon"
+_VALUE = "value"
+_ARRAY = "array"
+_ARRAY_NEXT = "array_next"
+_AFTER_VALUE = "after_value"
+_DONE = "done"
+
+
+class StreamDecodeError(ValueError):
+    """The streamed body is not the expected JSON object."""
+
+
+def _loads(text: str) -> Any:
+    """Decode one complete JSON value, reporting errors as StreamDecodeError."""
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError as e:
+        raise StreamDecodeError(f"Invalid JSON in streamed response: {e}") from e
+
+
+class _ValueScanner:
+    """Find the end of one JSON value that may span several chunks.
+
+    The string, escape and nesting state is kept between calls, so each
+    character of the value is scanned once however many chunks it spans.
+    """
+
+    def __init__(self, first: str):
+        """Initialize the scanner for a value starting with ``first``."""
+        self._scalar = first not in '"[{'
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def scan(self, text: str, pos: int) -> Optional[int]:
+        """Scan ``text`` from ``pos``.
+
+        Returns:
+            Index one past the end of the value, or None if ``text`` ends
+            before the value does.
+        """
+        if self._scalar:
+            # Numbers, true, false, null: only complete once a delimiter follows.
+            end = _SCALAR.match(text, pos).end()
+            return end if end < len(text) else None
+
+        while True:
+            if self._in_string:
+                if self._escape:
+                    if pos >= len(text):
+                        return None
+                    pos += 1
+                    self._escape = False
+                pos = _STRING_BODY.match(text, pos).end()
+                if pos >= len(text):
+                    return None
+                pos += 1
+                if text[pos - 1] == "\\":
+                    self._escape = True
+                    continue
+                self._in_string = False
+                if self._depth == 0:
+                    return pos
+                continue
+
+            match = _STRUCTURAL.search(text, pos)
+            if match is None:
+                return None
+            pos = match.end()
+            token = match.group()
+            if token == '"':
+                self._in_string = True
+                continue
+            self._depth += 1 if token in "[{" else -1
+            if self._depth == 0:
+                return pos
+
+
+class StreamingJSONDecoder:
+    """Push-style decoder for a top-level JSON object with one streamed array.
+
+    Feed text with ``feed()``; each call returns the array elements that
+    became complete. All other top-level members are decoded normally and
+    collected in ``members`` (available once they have been seen). A value
+    that does not end in the text fed so far is kept as a list of pieces
+    with a _ValueScanner, so feeding a large element costs time linear in
+    its size whatever the chunk size.
+    """
+
+    def __init__(self, array_key: str = "results"):
+        """Initialize the decoder.
+
+        Args:
+            array_key: Top-level member whose array elements are streamed.
+        """
+        self.array_key = array_key
+        self.members: dict[str, Any] = {}
+        self.item_count = 0
+        self._buf = ""
+        self._pos = 0
+        self._state = _START
+        self._key: Optional[str] = None
+        self._scanner: Optional[_ValueScanner] = None
+        self._pieces: list[str] = []
+
+    @property
+    def done(self) -> bool:
+        """Whether the closing brace of the top-level object was seen."""
+        return self._state == _DONE
+
+    def _skip_whitespace(self) -> bool:
+        """Advance past whitespace; return False if the buffer is exhausted."""
+        self._pos = _WHITESPACE.match(self._buf, self._pos).end()
+        return self._pos < len(self._buf)
+
+    def _expect(self, chars: str) -> Optional[str]:
+        """Consume one of ``chars`` or raise; return None if out of data."""
+        if not self._skip_whitespace():
+            return None
+        char = self._buf[self._pos]
+        if char not in chars:
+            raise StreamDecodeError(
+                f"Expected one of {chars!r} but found {char!r} in streamed response"
+            )
+        self._pos += 1
+        return char
+
+    def _scan_value(self) -> Optional[str]:
+        """Consume the value at the current position and return its text.
+
+        If the buffer ends first, the rest of the buffer is set aside and
+        None is returned; ``feed`` resumes the scan on the next text.
+        """
+        scanner = _ValueScanner(self._buf[self._pos])
+        end = scanner.scan(self._buf, self._pos)
+        if end is None:
+            self._scanner = scanner
+            self._pieces = [self._buf[self._pos:]]
+            self._pos = len(self._buf)
+            return None
+        text = self._buf[self._pos:end]
+        self._pos = end
+        return text
+
+    def _take_value(self, text: str, items: list[Any]) -> None:
+        """Store a complete value according to the state that expected it."""
+        if self._state == _KEY:
+            self._key = _loads(text)
+            self._state = _COLON
+        elif self._state == _VALUE:
+            self.members[self._key] = _loads(text)
+            self._state = _AFTER_VALUE
+        else:
+            items.append(_loads(text))
+            self.item_count += 1
+            self._state = _ARRAY_NEXT
+
+    def feed(self, text: str) -> list[Any]:
+        """Consume more text and return newly completed array elements."""
+        items: list[Any] = []
+
+        if self._scanner is not None:
+            end = self._scanner.scan(text, 0)
+            if end is None:
+                self._pieces.append(text)
+                return items
+            self._pieces.append(text[:end])
+            value = "".join(self._pieces)
+            self._scanner = None
+            self._pieces = []
+            self._buf, self._pos = text, end
+            self._take_value(value, items)
+        else:
+            self._buf = self._buf[self._pos:] + text
+            self._pos = 0
+
+        while self._state != _DONE:
+            if self._state == _START:
+                if self._expect("{") is None:
+                    break
+                self._state = _KEY
+
+            elif self._state == _KEY:
+                if not self._skip_whitespace():
+                    break
+                if self._buf[self._pos] == "}":
+                    self._pos += 1
+                    self._state = _DONE
+                    break
+                value = self._scan_value()
+                if value is None:
+                    break
+                self._take_value(value, items)
+
+            elif self._state == _COLON:
+                if self._expect(":") is None:
+                    break
+                self._state = _VALUE
+
+            elif self._state == _VALUE:
+                if not self._skip_whitespace():
+                    break
+                if self._key == self.array_key and self._buf[self._pos] == "[":
+                    self._pos += 1
+                    self._state = _ARRAY
+                    continue
+                value = self._scan_value()
+                if value is None:
+                    break
+                self._take_value(value, items)
+
+            elif self._state in (_ARRAY, _ARRAY_NEXT):
+                if not self._skip_whitespace():
+                    break
+                char = self._buf[self._pos]
+                if char == "]":
+                    self._pos += 1
+                    self._state = _AFTER_VALUE
+                    continue
+                if self._state == _ARRAY_NEXT:
+                    if char != ",":
+                        raise StreamDecodeError(f"Expected ',' or ']' but found {char!r}")
+                    self._pos += 1
+                    self._state = _ARRAY
+                    if not self._skip_whitespace():
+                        break
+                value = self._scan_value()
+                if value is None:
+                    break
+                self._take_value(value, items)
+
+            elif self._state == _AFTER_VALUE:
+                char = self._expect(",}")
+                if char is None:
+                    break
+                self._state = _KEY if char == "," else _DONE
+
+        return items
+
+    def close(self) -> None:
+        """Verify the whole object was received.
+
+        Raises:
+            StreamDecodeError: If the stream ended before the object closed.
+        """
+        if self._state != _DONE:
+            raise StreamDecodeError("Streamed response ended before the JSON object was complete")
+
+
+class StreamedResponse:
+    """Iterate the streamed array elements of a JSON response body.
+
+    Iterating yields array elements as they are decoded. Other top-level
+    members (e.g. ``metadata``) are available from ``members`` and are
+    guaranteed complete once iteration finishes.
+    """
+
+    def __init__(
+        self,
+        chunks: Iterable[bytes],
+        array_key: str = "results",
+        on_complete: Optional[Callable[["StreamedResponse"], None]] = None,
+    ):
+        """Initialize the streamed response.
+
+        Args:
+            chunks: Raw body byte chunks, in order.
+            array_key: Top-level member whose elements are streamed.
+            on_complete: Called once after the body has been fully decoded.
+        """
+        self._chunks = chunks
+        self._decoder = StreamingJSONDecoder(array_key)
+        self._on_complete = on_complete
+        self._consumed = False
+
+    @property
+    def members(self) -> dict[str, Any]:
+        """Top-level members other than the streamed array."""
+        return self._decoder.members
+
+    @property
+    def metadata(self) -> dict[str, Any]:
+        """The ``metadata`` member, or an empty dict if not (yet) seen."""
+        return self._decoder.members.get("metadata") or {}
+
+    @property
+    def item_count(self) -> int:
+        """Number of array elements decoded so far."""
+        return self._decoder.item_count
+
+    def __iter__(self) -> Iterator[Any]:
+        if self._consumed:
+            raise RuntimeError("Streamed response can only be iterated once")
+        self._consumed = True
+
+        text_decoder = codecs.getincrementaldecoder("utf-8")()
+        for chunk in self._chunks:
+            yield from self._decoder.feed(text_decoder.decode(chunk))
+        yield from self._decoder.feed(text_decoder.decode(b"", final=True))
+        self._decoder.close()
+        if self._on_complete is not None:
+            self._on_complete(self)
+
@@ -0,0 +1,463 @@
+"""Local stand-in for the Search API, driven by docs/openapi.json.
+
+The stub serves every path in the OpenAPI document over real sockets
+(HTTP/1.1 with keep-alive, one thread per connection), so client transport,
+connection reuse, concurrency, parsing and rendering can be measured without
+network access or credentials:
+
+- ``/search`` returns ``k`` synthetic results shaped like the real API's,
+  with ``text_bytes`` of note text per result;
+- other JSON endpoints return data generated from their response schema,
+  with list sizes taken from ``limit`` / ``page_size`` when given;
+- required and range-checked query parameters are validated, answering 422
+  like the real API;
+- each response is delayed by a sample from a latency model, and a fraction
+  of requests can be failed with injected status codes.
+
+Data is generated from a seeded random source, so runs are repeatable.
+"""
+
+import json
+import math
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+# Spec location in a source checkout (cli/trioexplorer/stub.py -> docs/)
+DEFAULT_SPEC_PATH = Path(__file__).resolve().parents[2] / "docs" / "openapi.json"
+
+# Default number of items in generated lists
+DEFAULT_LIST_SIZE = 5
+
+# Upper bound for generated list sizes
+MAX_LIST_SIZE = 1000
+
+# Query parameters that size the list in a response
+SIZE_PARAMS = ("limit", "page_size")
+
+# Largest k accepted by /search
+MAX_SEARCH_K = 300
+
+NOTE_TYPES = (
+    "Progress Note",
+    "Discharge Summary",
+    "History and Physical",
+    "Consult Note",
+    "Radiology Report",
+    "Nursing Note",
+)
+
+WORDS = (
+    "patient", "presents", "with", "chest", "pain", "shortness", "of",
+    "breath", "history", "hypertension", "diabetes", "denies", "fever",
+    "exam", "unremarkable", "plan", "continue", "metformin", "follow", "up",
+)
+
+LatencyModel = Callable[[random.Random], float]
+
+
+def parse_latency(spec: str) -> LatencyModel:
+    """Parse a latency model specification.
+
+    Formats (milliseconds): ``MS`` or ``fixed:MS``, ``uniform:LOW:HIGH``,
+    ``normal:MEAN:STDDEV``, ``lognormal:MEDIAN:SIGMA`` and
+    ``exponential:MEAN``. Samples are never negative.
+
+    Returns:
+        Function drawing one latency (ms) from a random source.
+
+    Raises:
+        ValueError: If the specification is malformed.
+    """
+    name, _, rest = spec.partition(":")
+    try:
+        if not rest:
+            value = float(name)
+            return lambda rng: max(0.0, value)
+        args = [float(part) for part in rest.split(":")]
+    except ValueError:
+        raise ValueError(f"Invalid latency model: {spec}") from None
+
+    models: dict[str, tuple[int, Callable[..., LatencyModel]]] = {
+        "fixed": (1, lambda ms: lambda rng: ms),
+        "uniform": (2, lambda low, high: lambda rng: rng.uniform(low, high)),
+        "normal": (2, lambda mean, sd: lambda rng: rng.gauss(mean, sd)),
+        "lognormal": (2, lambda median, sigma: lambda rng: rng.lognormvariate(math.log(median), sigma)),
+        "exponential": (1, lambda mean: lambda rng: rng.expovariate(1 / mean)),
+    }
+    if name not in models or len(args) != models[name][0]:
+        raise ValueError(
+            f"Invalid latency model: {spec} (expected MS, fixed:MS, uniform:LOW:HIGH, "
+            "normal:MEAN:STDDEV, lognormal:MEDIAN:SIGMA or exponential:MEAN)"
+        )
+    if name in ("lognormal", "exponential") and args[0] <= 0:
+        raise ValueError(f"Invalid latency model: {spec} (the first value must be positive)")
+    sample = models[name][1](*args)
+    return lambda rng: max(0.0, sample(rng))
+
+
+@dataclass
+class StubConfig:
+    """Behavior of the stub server."""
+
+    latency: LatencyModel = field(default=lambda rng: 0.0)
+    error_rate: float = 0.0
+    error_statuses: tuple[int, ...] = (500, 503)
+    text_bytes: int = 200
+    seed: Optional[int] = 0
+
+
+def load_spec(path: Optional[str] = None) -> dict[str, Any]:
+    """Load the OpenAPI document.
+
+    Raises:
+        FileNotFoundError: If no spec is found.
+    """
+    spec_path = Path(path) if path else DEFAULT_SPEC_PATH
+    if not spec_path.is_file():
+        raise FileNotFoundError(
+            f"OpenAPI spec not found at {spec_path}; pass --spec path/to/openapi.json"
+        )
+    with open(spec_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def resolve(spec: dict[str, Any], schema: dict[str, Any]) -> dict[str, Any]:
+    """Follow ``$ref`` pointers within the spec."""
+    while "$ref" in schema:
+        target: Any = spec
+        for part in schema["$ref"].lstrip("#/").split("/"):
+            target = target[part]
+        schema = {**target, **{k: v for k, v in schema.items() if k != "$ref"}}
+    return schema
+
+
+def check_schema(spec: dict[str, Any], value: Any, schema: dict[str, Any], where: str = "$") -> None:
+    """Check a value against the subset of JSON Schema used by the spec.
+
+    Raises:
+        ValueError: Describing the first mismatch.
+    """
+    schema = resolve(spec, schema)
+    if "anyOf" in schema:
+        for option in schema["anyOf"]:
+            try:
+                check_schema(spec, value, option, where)
+                return
+            except ValueError:
+                continue
+        raise ValueError(f"{where}: {value!r} matches no anyOf option")
+
+    kind = schema.get("type")
+    types = {
+        "object": dict, "array": list, "string": str, "boolean": bool,
+        "integer": int, "number": (int, float), "null": type(None),
+    }
+    if kind is not None:
+        if not isinstance(value, types[kind]) or (kind in ("integer", "number") and isinstance(value, bool)):
+            raise ValueError(f"{where}: expected {kind}, got {value!r}")
+    if "enum" in schema and value not in schema["enum"]:
+        raise ValueError(f"{where}: {value!r} not in {schema['enum']}")
+    if "minimum" in schema and value < schema["minimum"]:
+        raise ValueError(f"{where}: {value!r} below minimum {schema['minimum']}")
+    if "minLength" in schema and len(value) < schema["minLength"]:
+        raise ValueError(f"{where}: shorter than {schema['minLength']}")
+    if "minItems" in schema and len(value) < schema["minItems"]:
+        raise ValueError(f"{where}: fewer than {schema['minItems']} items")
+
+    if kind == "object":
+        for name in schema.get("required", []):
+            if name not in value:
+                raise ValueError(f"{where}: missing required property {name!r}")
+        for name, subschema in schema.get("properties", {}).items():
+            if name in value:
+                check_schema(spec, value[name], subschema, f"{where}.{name}")
+    elif kind == "array" and "items" in schema:
+        for i, item in enumerate(value):
+            check_schema(spec, item, schema["items"], f"{where}[{i}]")
+
+
+class SchemaFaker:
+    """Generate synthetic values that satisfy a response schema."""
+
+    def __init__(self, spec: dict[str, Any], rng: random.Random):
+        self.spec = spec
+        self.rng = rng
+
+    def timestamp(self) -> str:
+        seconds = self.rng.randint(1_700_000_000, 1_760_000_000)
+        return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(seconds))
+
+    def uuid(self) -> str:
+        return "%08x-%04x-4%03x-a%03x-%012x" % (
+            self.rng.getrandbits(32), self.rng.getrandbits(16), self.rng.getrandbits(12),
+            self.rng.getrandbits(12), self.rng.getrandbits(48),
+        )
+
+    def text(self, size: int) -> str:
+        """Words joined up to roughly ``size`` characters."""
+        words: list[str] = []
+        length = 0
+        while length < size:
+            word = self.rng.choice(WORDS)
+            words.append(word)
+            length += len(word) + 1
+        return " ".join(words)[:size]
+
+    def generate(self, schema: dict[str, Any], name: str = "", list_size: int = DEFAULT_LIST_SIZE) -> Any:
+        """Generate a value for ``schema``.
+
+        Args:
+            schema: JSON schema (``$ref`` allowed).
+            name: Property name, used to pick realistic strings.
+            list_size: Length of generated arrays.
+        """
+        schema = resolve(self.spec, schema)
+        if "anyOf" in schema:
+            options = [o for o in schema["anyOf"] if resolve(self.spec, o).get("type") != "null"]
+            return self.generate(options[0], name, list_size) if options else None
+        if "enum" in schema:
+            return self.rng.choice(schema["enum"])
+
+        kind = schema.get("type")
+        if kind == "object":
+            return {
+                prop: self.generate(subschema, prop, list_size)
+                for prop, subschema in schema.get("properties", {}).items()
+            }
+        if kind == "array":
+            size = max(list_size, schema.get("minItems", 0))
+            return [self.generate(schema.get("items", {}), name, list_size) for _ in range(size)]
+        if kind == "integer":
+            return self.rng.randint(int(schema.get("minimum", 0)), int(schema.get("maximum", 10_000)))
+        if kind == "number":
+            return round(self.rng.uniform(schema.get("minimum", 0.0), schema.get("maximum", 1000.0)), 3)
+        if kind == "boolean":
+            return self.rng.random() < 0.5
+        if kind == "string":
+            return self._string(schema, name)
+        return {}
+
+    def _string(self, schema: dict[str, Any], name: str) -> str:
+        if schema.get("format") == "date-time":
+            return self.timestamp()
+        if name == "id" or name.endswith("_id"):
+            return self.uuid()
+        if name == "note_type":
+            return self.rng.choice(NOTE_TYPES)
+        return self.text(max(schema.get("minLength", 1), 12))
+
+
+class StubAPI:
+    """Route requests to synthetic responses."""
+
+    def __init__(self, spec: dict[str, Any], config: Optional[StubConfig] = None):
+        self.spec = spec
+        self.config = config or StubConfig()
+        self.rng = random.Random(self.config.seed)
+        self.faker = SchemaFaker(spec, self.rng)
+        self.routes = [
+            (re.compile("^" + re.sub(r"\{[^/]+\}", "[^/]+", path) + "$"), path, operations)
+            for path, operations in spec.get("paths", {}).items()
+        ]
+        # Templated routes after literal ones, so /search-history/stats/summary
+        # wins over /search-history/{history_id}
+        self.routes.sort(key=lambda route: "{" in route[1])
+        self._search_pool = [self._search_result(i) for i in range(MAX_SEARCH_K)]
+        self._encoded_results: dict[int, bytes] = {}
+
+    def _search_result(self, rank: int) -> dict[str, Any]:
+        faker = self.faker
+        text = faker.text(self.config.text_bytes)
+        chunk_count = self.rng.randint(1, 8)
+        score = round(1 - rank / (MAX_SEARCH_K * 1.25), 6)
+        return {
+            "score": score,
+            "distance": round(1 - score, 6),
+            "keyword_score": round(self.rng.random(), 6),
+            "patient_id": f"P{self.rng.randint(10000, 99999)}",
+            "encounter_id": faker.uuid(),
+            "note_id": faker.uuid(),
+            "note_date": f"{self.rng.randint(2019, 2025)}-{self.rng.randint(1, 12):02d}-{self.rng.randint(1, 28):02d}",
+            "note_type": self.rng.choice(NOTE_TYPES),
+            "text_full": text,
+            "text_chunk": text[: max(1, len(text) // 2)],
+            "chunk_id": faker.uuid(),
+            "chunk_index": self.rng.randint(0, chunk_count - 1),
+            "chunk_count": chunk_count,
+            "note_quality_score": round(self.rng.uniform(0.5, 1.0), 4),
+            "chunk_quality_score": round(self.rng.uniform(0.5, 1.0), 4),
+        }
+
+    def _search(self, params: dict[str, str]) -> bytes:
+        """Build a /search body; result arrays are encoded once per k."""
+        k = int(float(params.get("k", 10)))
+        encoded = self._encoded_results.get(k)
+        if encoded is None:
+            encoded = self._encoded_results[k] = json.dumps(self._search_pool[:k]).encode()
+        results = self._search_pool[:k]
+        metadata = {
+            "total_results": k,
+            "exact_match_count": k,
+            "semantic_match_count": k,
+            "unique_patients": len({r["patient_id"] for r in results}),
+            "unique_encounters": k,
+            "unique_notes": k,
+            "search_type": params.get("search-type", "hybrid"),
+            "reranked": params.get("rerank", "true") == "true",
+            "query": params["query"],
+        }
+        return b'{"results": ' + encoded + b', "metadata": ' + json.dumps(metadata).encode() + b"}"
+
+    def _validate(self, operation: dict[str, Any], params: dict[str, str]) -> Optional[list[dict]]:
+        """Check query parameters, returning FastAPI-style errors if invalid."""
+        errors = []
+        for parameter in operation.get("parameters", []):
+            if parameter.get("in") != "query":
+                continue
+            name = parameter["name"]
+            schema = resolve(self.spec, parameter.get("schema", {}))
+            loc = ["query", name]
+            if name not in params:
+                if parameter.get("required"):
+                    errors.append({"loc": loc, "msg": "Field required", "type": "missing"})
+                continue
+            if schema.get("type") not in ("integer", "number"):
+                continue
+            try:
+                value = float(params[name])
+            except ValueError:
+                errors.append({"loc": loc, "msg": f"Input should be a valid {schema['type']}", "type": "parsing"})
+                continue
+            if "minimum" in schema and value < schema["minimum"]:
+                errors.append({"loc": loc, "msg": f"Input should be >= {schema['minimum']:g}", "type": "greater_than_equal"})
+            if "maximum" in schema and value > schema["maximum"]:
+                errors.append({"loc": loc, "msg": f"Input should be <= {schema['maximum']:g}", "type": "less_than_equal"})
+        return errors or None
+
+    def handle(self, method: str, path: str, params: dict[str, str]) -> tuple[int, bytes, str]:
+        """Answer one request.
+
+        Returns:
+            (status code, body, content type).
+        """
+        def reply(status: int, data: Any) -> tuple[int, bytes, str]:
+            return status, json.dumps(data).encode(), "application/json"
+
+        for pattern, template, operations in self.routes:
+            if pattern.match(path):
+                break
+        else:
+            return reply(404, {"detail": "Not Found"})
+
+        operation = operations.get(method.lower())
+        if operation is None:
+            return reply(405, {"detail": "Method Not Allowed"})
+
+        if self.config.error_rate and self.rng.random() < self.config.error_rate:
+            status = self.rng.choice(self.config.error_statuses)
+            return reply(status, {"detail": f"Injected error ({status})"})
+
+        errors = self._validate(operation, params)
+        if errors:
+            return reply(422, {"detail": errors})
+
+        if template == "/search":
+            return 200, self._search(params), "application/json"
+        if template == "/metrics":
+            return 200, b"search_requests_total 0\n", "text/plain; version=0.0.4"
+
+        responses = operation.get("responses", {})
+        status = next((int(code) for code in responses if code.startswith("2")), 200)
+        schema = responses.get(str(status), {}).get("content", {}).get("application/json", {}).get("schema")
+        if not schema:
+            return status, b"", "application/json"
+        size = next((int(params[name]) for name in SIZE_PARAMS if name in params), DEFAULT_LIST_SIZE)
+        return reply(status, self.faker.generate(schema, list_size=min(size, MAX_LIST_SIZE)))
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "StubServer"
+
+    def _dispatch(self) -> None:
+        url = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+
+        api = self.server.api
+        delay_ms = api.config.latency(api.rng)
+        if delay_ms:
+            time.sleep(delay_ms / 1000)
+
+        status, body, content_type = api.handle(self.command, url.path, dict(parse_qsl(url.query)))
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _dispatch
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class StubServer(ThreadingHTTPServer):
+    """HTTP server answering with a StubAPI.
+
+    ``connections`` counts accepted TCP connections, which shows whether a
+    client reuses pooled connections.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], api: StubAPI, verbose: bool = False):
+        super().__init__(address, _StubHandler)
+        self.api = api
+        self.verbose = verbose
+        self.connections = 0
+
+    def process_request(self, request: Any, client_address: Any) -> None:
+        self.connections += 1
+        super().process_request(request, client_address)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+@contextmanager
+def running_stub_server(
+    config: Optional[StubConfig] = None,
+    spec: Optional[dict[str, Any]] = None,
+    host: str = "127.0.0.1",
+    port: int = 0,
+) -> Iterator[StubServer]:
+    """Run a stub server on a background thread.
+
+    Args:
+        config: Stub behavior (defaults to StubConfig()).
+        spec: OpenAPI document (defaults to load_spec()).
+        host: Interface to bind.
+        port: Port to bind (0 picks a free port; see ``server.url``).
+    """
+    server = StubServer((host, port), StubAPI(spec or load_spec(), config))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
@@ -0,0 +1,366 @@
+"""Per-phase timings of HTTP requests and output rendering (``--timings``).
+
+Every request made by the sync and async clients is broken into phases
+taken from the trace events httpcore emits on the connection:
+
+- connect: TCP connect, including the DNS lookup (httpcore resolves the
+  host inside the connect call, so the two cannot be told apart)
+- tls: TLS handshake (https only)
+- send: writing the request headers and body
+- ttfb: waiting for the response headers (time to first byte)
+- download: reading the response body
+- decode: parsing the JSON body
+
+A connection reused from the pool has no connect or tls phase. Each phase
+of each attempt is a child span of its request span, and the output
+writers in ``output.py`` add ``render`` spans. Spans can be printed as a
+summary table or written as JSON Lines (see ``Timings.export``).
+
+Like the cassette session, timings are process-wide: ``main`` starts them
+from the global options and the clients look them up with
+``request_trace``. When timings are off, ``request_trace`` returns a no-op
+trace and ``timed`` calls the wrapped function directly.
+"""
+
+import functools
+import json
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional, TypeVar
+
+# Phases of one request, in the order they happen
+REQUEST_PHASES = ("connect", "tls", "send", "ttfb", "download", "decode")
+
+# httpcore operations (trace event names without the "connection."/"http11."/
+# "http2." prefix and ".started"/".complete" suffix) opening and closing each phase
+_PHASE_OPERATIONS = {
+    "connect": ("connect_tcp", "connect_tcp"),
+    "tls": ("start_tls", "start_tls"),
+    "send": ("send_request_headers", "send_request_body"),
+    "ttfb": ("receive_response_headers", "receive_response_headers"),
+    "download": ("receive_response_body", "receive_response_body"),
+}
+_PHASE_BY_CLOSING_OPERATION = {closing: name for name, (_, closing) in _PHASE_OPERATIONS.items()}
+
+# Requests listed individually in the summary table
+MAX_SUMMARY_ROWS = 20
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class Span:
+    """A named, timed operation (times are ``time.perf_counter`` seconds)."""
+
+    __slots__ = ("span_id", "parent", "name", "start", "end", "attributes")
+
+    def __init__(self, span_id: str, parent: Optional["Span"], name: str, start: float,
+                 attributes: Optional[dict[str, Any]] = None):
+        self.span_id = span_id
+        self.parent = parent
+        self.name = name
+        self.start = start
+        self.end: Optional[float] = None
+        self.attributes = attributes or {}
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end if self.end is not None else time.perf_counter()
+        return (end - self.start) * 1000
+
+
+class Timings:
+    """Collect the spans of one CLI run under a root span."""
+
+    def __init__(self, name: str = "trioexplorer"):
+        self.trace_id = os.urandom(16).hex()
+        # Anchor perf_counter readings to wall-clock time for export
+        self._epoch_ns = time.time_ns() - int(time.perf_counter() * 1e9)
+        self.spans: list[Span] = []
+        self.requests: list["RequestTrace"] = []
+        self._active: set[str] = set()
+        self.root = self.start_span(name, parent=None)
+
+    def start_span(self, name: str, parent: Optional[Span] = None, start: Optional[float] = None,
+                   **attributes: Any) -> Span:
+        """Open a span; ``parent`` defaults to the root span."""
+        span = Span(
+            os.urandom(8).hex(),
+            parent if parent is not None or not self.spans else self.root,
+            name,
+            start if start is not None else time.perf_counter(),
+            attributes,
+        )
+        self.spans.append(span)
+        return span
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[None]:
+        """Time a block as a child of the root span.
+
+        Nested blocks with the same name are timed once, by the outermost.
+        """
+        if name in self._active:
+            yield
+            return
+        self._active.add(name)
+        span = self.start_span(name, **attributes)
+        try:
+            yield
+        finally:
+            span.end = time.perf_counter()
+            self._active.discard(name)
+
+    def request(self, method: str, url: str) -> "RequestTrace":
+        """Start the trace of one logical request (all of its attempts)."""
+        trace = RequestTrace(self, method, url)
+        self.requests.append(trace)
+        return trace
+
+    def finish(self) -> None:
+        """Close the root span."""
+        if self.root.end is None:
+            self.root.end = time.perf_counter()
+
+    def to_records(self) -> Iterator[dict[str, Any]]:
+        """Yield every span as a flat, JSON-serializable record.
+
+        Records carry ``trace_id``, ``span_id`` and ``parent_span_id`` so
+        runs can be merged and rebuilt into trees, with start and end times
+        in Unix nanoseconds.
+        """
+        for span in self.spans:
+            end = span.end if span.end is not None else time.perf_counter()
+            yield {
+                "trace_id": self.trace_id,
+                "span_id": span.span_id,
+                "parent_span_id": span.parent.span_id if span.parent is not None else None,
+                "name": span.name,
+                "start_time_unix_nano": self._epoch_ns + int(span.start * 1e9),
+                "end_time_unix_nano": self._epoch_ns + int(end * 1e9),
+                "duration_ms": round(span.duration_ms, 3),
+                "attributes": span.attributes,
+            }
+
+    def export(self, path: str) -> None:
+        """Append all spans to ``path`` as JSON Lines.
+
+        Raises:
+            OSError: If the file cannot be written.
+        """
+        with open(path, "a", encoding="utf-8") as f:
+            for record in self.to_records():
+                f.write(json.dumps(record, separators=(",", ":"), default=str) + "\n")
+
+    def phase_totals(self) -> dict[str, float]:
+        """Total milliseconds per request phase and for rendering."""
+        totals = {name: 0.0 for name in (*REQUEST_PHASES, "render")}
+        for span in self.spans:
+            phase = span.attributes.get("phase", span.name)
+            if phase in totals and span.end is not None:
+                totals[phase] += span.duration_ms
+        return totals
+
+
+class RequestTrace:
+    """Timings of one request, fed by httpcore trace events.
+
+    Pass ``extensions`` (sync clients) or ``async_extensions`` (async
+    clients) with each attempt, call ``attempt`` before sending, time
+    client-side work with ``phase`` and call ``finish`` at the end.
+    """
+
+    def __init__(self, timings: Timings, method: str, url: str):
+        self.timings = timings
+        self.span = timings.start_span(f"{method} {_path_of(url)}", method=method, url=url)
+        self.phases: dict[str, float] = {}
+        self.attempts = 0
+        self._events: dict[str, float] = {}
+
+    @property
+    def extensions(self) -> dict[str, Any]:
+        """Request extensions installing the trace callback (sync clients)."""
+        return {"trace": self.on_event}
+
+    @property
+    def async_extensions(self) -> dict[str, Any]:
+        """Request extensions installing the trace callback (async clients)."""
+        return {"trace": self.on_event_async}
+
+    def attempt(self) -> None:
+        """Start a new attempt (the first send or a retry)."""
+        self.attempts += 1
+        self._events = {}
+
+    def on_event(self, event_name: str, info: dict[str, Any]) -> None:
+        """Handle an httpcore trace event such as ``http11.send_request_headers.started``."""
+        now = time.perf_counter()
+        operation, _, state = event_name.partition(".")[2].rpartition(".")
+        if state == "started":
+            self._events.setdefault(operation, now)
+            return
+        phase = _PHASE_BY_CLOSING_OPERATION.get(operation)
+        opened = self._events.get(_PHASE_OPERATIONS[phase][0]) if phase else None
+        if opened is not None:
+            self._add_phase(phase, opened, now, failed=state == "failed")
+
+    async def on_event_async(self, event_name: str, info: dict[str, Any]) -> None:
+        """Async form of ``on_event``; httpcore awaits trace callbacks in async clients."""
+        self.on_event(event_name, info)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time client-side work (such as ``decode``) as a phase."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add_phase(name, started, time.perf_counter())
+
+    def _add_phase(self, name: str, start: float, end: float, failed: bool = False) -> None:
+        attributes: dict[str, Any] = {"phase": name, "attempt": self.attempts}
+        if failed:
+            attributes["failed"] = True
+        span = self.timings.start_span(name, parent=self.span, start=start, **attributes)
+        span.end = end
+        self.phases[name] = self.phases.get(name, 0.0) + (end - start) * 1000
+
+    def finish(self, status: Optional[int] = None, error: Optional[Exception] = None,
+               num_bytes: Optional[int] = None) -> None:
+        """Close the request span, recording its outcome."""
+        if self.span.end is not None:
+            return
+        self.span.end = time.perf_counter()
+        self.span.attributes["attempts"] = self.attempts
+        if status is not None:
+            self.span.attributes["status"] = status
+        if num_bytes is not None:
+            self.span.attributes["bytes"] = num_bytes
+        if error is not None:
+            self.span.attributes["error"] = type(error).__name__
+
+
+class _NullTrace(RequestTrace):
+    """Stand-in used when timings are off; does nothing."""
+
+    def __init__(self) -> None:
+        self.attempts = 0
+
+    @property
+    def extensions(self) -> dict[str, Any]:
+        return {}
+
+    @property
+    def async_extensions(self) -> dict[str, Any]:
+        return {}
+
+    def attempt(self) -> None:
+        pass
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        yield
+
+    def finish(self, status: Optional[int] = None, error: Optional[Exception] = None,
+               num_bytes: Optional[int] = None) -> None:
+        pass
+
+
+NULL_TRACE: RequestTrace = _NullTrace()
+
+
+def _path_of(url: str) -> str:
+    """The path of a URL, for span names."""
+    without_scheme = url.split("://", 1)[-1]
+    slash = without_scheme.find("/")
+    return without_scheme[slash:].split("?", 1)[0] if slash >= 0 else "/"
+
+
+_timings: Optional[Timings] = None
+
+
+def start_timings(name: str = "trioexplorer") -> Timings:
+    """Collect timings for all requests and output of this process."""
+    global _timings
+    _timings = Timings(name)
+    return _timings
+
+
+def stop_timings() -> Optional[Timings]:
+    """Stop collecting and return the finished timings, if any."""
+    global _timings
+    timings, _timings = _timings, None
+    if timings is not None:
+        timings.finish()
+    return timings
+
+
+def active_timings() -> Optional[Timings]:
+    """The timings being collected, if any."""
+    return _timings
+
+
+def request_trace(method: str, url: str) -> RequestTrace:
+    """Start tracing a request, or return a no-op trace when timings are off."""
+    if _timings is None:
+        return NULL_TRACE
+    return _timings.request(method, url)
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """Decorate a function so each call is timed as a ``name`` span."""
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if _timings is None:
+                return func(*args, **kwargs)
+            with _timings.span(name, function=func.__name__):
+                return func(*args, **kwargs)
+        return wrapper  # type: ignore[return-value]
+    return decorator
+
+
+def print_timings(timings: Timings) -> None:
+    """Print a per-request phase breakdown to stderr."""
+    from rich.console import Console
+    from rich.table import Table
+
+    console = Console(stderr=True)
+    table = Table(title="Timings (ms)", show_header=True, header_style="bold cyan")
+    table.add_column("Request")
+    table.add_column("Status", justify="right")
+    for name in REQUEST_PHASES:
+        table.add_column(name, justify="right")
+    table.add_column("total", justify="right", style="bold")
+
+    def _cell(value: Optional[float]) -> str:
+        return f"{value:.1f}" if value else "-"
+
+    for trace in timings.requests[:MAX_SUMMARY_ROWS]:
+        attributes = trace.span.attributes
+        status = str(attributes.get("status", attributes.get("error", "-")))
+        if trace.attempts > 1:
+            status += f" ({trace.attempts} tries)"
+        table.add_row(
+            trace.span.name,
+            status,
+            *(_cell(trace.phases.get(name)) for name in REQUEST_PHASES),
+            _cell(trace.span.duration_ms),
+        )
+    if len(timings.requests) > MAX_SUMMARY_ROWS:
+        table.add_row(f"[dim]... {len(timings.requests) - MAX_SUMMARY_ROWS} more[/dim]")
+
+    totals = timings.phase_totals()
+    if len(timings.requests) > 1:
+        table.add_section()
+        table.add_row(
+            f"all {len(timings.requests)} requests",
+            "",
+            *(_cell(totals[name]) for name in REQUEST_PHASES),
+            _cell(sum(trace.span.duration_ms for trace in timings.requests)),
+        )
+    console.print(table)
+    console.print(
+        f"[dim]render: {totals['render']:.1f} ms | wall: {timings.root.duration_ms:.1f} ms | "
+        f"connect includes DNS lookup[/dim]"
+    )
@@ -0,0 +1,331 @@
+"""Client-side checking of --entity-filters values against a namespace's vocabulary.
+
+The server matches entity filter values exactly, so a misspelled value
+(``"metfromin"``) costs a full search, rerank included, and returns
+nothing. With ``--check-entities`` the CLI first looks every value up in
+the namespace's filter values and suggests close matches by trigram
+similarity (as PostgreSQL's pg_trgm does): each string is padded with
+spaces and split into overlapping three-character windows, an inverted
+index maps each trigram to the values containing it, and candidates are
+ranked by the Jaccard similarity of their trigram sets, then by
+``occurrence_count``.
+
+The vocabulary comes from the local filter index when ``filters sync``
+indexed the namespace (every value), and otherwise from one
+``/namespaces/{ns}/filter-values`` request through the response cache.
+That endpoint returns at most 1000 values per field, so for a field that
+reaches the limit an unknown value cannot be told apart from a rare one:
+it is reported as unverified and never rejected or corrected.
+"""
+
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Optional
+
+if TYPE_CHECKING:
+    from .async_client import AsyncSearchClient
+    from .client import SearchClient
+
+# Values per field requested from /filter-values (the API maximum)
+VOCABULARY_LIMIT = 1000
+
+# Least trigram similarity of a suggestion
+SUGGEST_THRESHOLD = 0.3
+
+# Least trigram similarity of an automatic correction
+CORRECT_THRESHOLD = 0.4
+
+# Suggestions shown per unknown value
+MAX_SUGGESTIONS = 3
+
+
+def trigrams(text: str) -> set[str]:
+    """Trigrams of a string: casefolded, each word padded like pg_trgm."""
+    grams: set[str] = set()
+    for word in text.casefold().split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """Inverted trigram index for fuzzy lookups in a list of values."""
+
+    def __init__(self, counts: dict[str, int]):
+        """Build the index.
+
+        Args:
+            counts: Occurrence count by value.
+        """
+        self.values = list(counts)
+        self.counts = counts
+        self._grams = [trigrams(value) for value in self.values]
+        self._postings: dict[str, list[int]] = {}
+        for position, grams in enumerate(self._grams):
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(position)
+
+    def suggest(
+        self,
+        text: str,
+        limit: int = MAX_SUGGESTIONS,
+        threshold: float = SUGGEST_THRESHOLD,
+    ) -> list[tuple[str, int, float]]:
+        """Values similar to ``text``, most similar first.
+
+        Only values sharing a trigram with ``text`` are scored.
+
+        Returns:
+            (value, occurrence count, similarity) tuples.
+        """
+        query = trigrams(text)
+        shared: Counter = Counter()
+        for gram in query:
+            shared.update(self._postings.get(gram, ()))
+        scored = []
+        for position, common in shared.items():
+            similarity = common / (len(query) + len(self._grams[position]) - common)
+            if similarity >= threshold:
+                value = self.values[position]
+                scored.append((value, self.counts[value], similarity))
+        scored.sort(key=lambda item: (-item[2], -item[1], item[0]))
+        return scored[:limit]
+
+
+class Vocabulary:
+    """Known filter values of one namespace, by field."""
+
+    def __init__(
+        self,
+        namespace: str,
+        fields: dict[str, dict[str, int]],
+        truncated: Optional[set[str]] = None,
+    ):
+        """Initialize the vocabulary.
+
+        Args:
+            namespace: Search namespace the values belong to.
+            fields: Occurrence count by value, by field name.
+            truncated: Fields whose values may be incomplete.
+        """
+        self.namespace = namespace
+        self.fields = fields
+        self.truncated = truncated or set()
+        self._folded = {
+            name: {value.casefold() for value in values} for name, values in fields.items()
+        }
+        self._indexes: dict[Optional[str], TrigramIndex] = {}
+
+    @classmethod
+    def from_response(
+        cls,
+        namespace: str,
+        response: dict[str, Any],
+        limit: int = VOCABULARY_LIMIT,
+    ) -> "Vocabulary":
+        """Build a vocabulary from a /namespaces/{ns}/filter-values response.
+
+        Fields with ``limit`` values are marked truncated.
+        """
+        listed = response.get("fields") or {}
+        fields = {
+            name: {
+                value["text_value"]: value.get("occurrence_count") or 0
+                for value in values if value.get("text_value")
+            }
+            for name, values in listed.items()
+        }
+        truncated = {name for name, values in listed.items() if len(values) >= limit}
+        return cls(namespace, fields, truncated)
+
+    def __bool__(self) -> bool:
+        return bool(self.fields)
+
+    def knows(self, field_name: str, value: str) -> bool:
+        """Whether a field has a value, ignoring case."""
+        return value.casefold() in self._folded.get(field_name, ())
+
+    def suggest(self, field_name: str, value: str) -> list[tuple[str, int, float]]:
+        """Known values of a field similar to ``value``."""
+        if field_name not in self._indexes:
+            self._indexes[field_name] = TrigramIndex(self.fields.get(field_name, {}))
+        return self._indexes[field_name].suggest(value)
+
+    def suggest_field(self, field_name: str) -> list[tuple[str, int, float]]:
+        """Field names similar to ``field_name``, with their value counts."""
+        # Keyed by None, which is no field name
+        if None not in self._indexes:
+            self._indexes[None] = TrigramIndex({name: len(values) for name, values in self.fields.items()})
+        return self._indexes[None].suggest(field_name)
+
+
+def vocabulary_request(namespace: str) -> tuple[str, dict[str, Any]]:
+    """Path and parameters of the request a vocabulary is built from."""
+    return f"/namespaces/{namespace}/filter-values", {"limit": VOCABULARY_LIMIT}
+
+
+def local_vocabulary(namespace: str) -> Optional[Vocabulary]:
+    """The complete vocabulary from the local filter index, if it holds the namespace."""
+    import sqlite3
+
+    from .config import get_filter_index_path
+    from .filterindex import FilterIndex
+
+    if not get_filter_index_path().exists():
+        return None
+    try:
+        with FilterIndex() as index:
+            if index.namespace_info(namespace) is None:
+                return None
+            fields = {
+                item["field_name"]: {
+                    value["text_value"]: value["occurrence_count"] or 0
+                    for value in index.lookup(namespace, item["field_name"])
+                }
+                for item in index.fields(namespace)
+            }
+    except (OSError, sqlite3.Error):
+        return None
+    return Vocabulary(namespace, fields)
+
+
+def load_vocabulary(client: "SearchClient", namespace: str) -> Vocabulary:
+    """The vocabulary of a namespace: local if indexed, else fetched (and cached)."""
+    vocabulary = local_vocabulary(namespace)
+    if vocabulary is None:
+        vocabulary = Vocabulary.from_response(namespace, client.get(*vocabulary_request(namespace)))
+    return vocabulary
+
+
+async def aload_vocabulary(client: "AsyncSearchClient", namespace: str) -> Vocabulary:
+    """``load_vocabulary`` with an async client."""
+    vocabulary = local_vocabulary(namespace)
+    if vocabulary is None:
+        vocabulary = Vocabulary.from_response(namespace, await client.get(*vocabulary_request(namespace)))
+    return vocabulary
+
+
+def entity_namespace(cohort_ids: Optional[str], namespace: Optional[str] = None) -> str:
+    """Namespace whose vocabulary checks a search's entity filters.
+
+    An explicit namespace wins; a single cohort maps to its cohort index
+    (``v2-cohort-{id}-arctic``); anything else uses ``default``.
+    """
+    if namespace:
+        return namespace
+    cohorts = [c.strip() for c in (cohort_ids or "").split(",") if c.strip()]
+    if len(cohorts) == 1:
+        return f"v2-cohort-{cohorts[0]}-arctic"
+    return "default"
+
+
+@dataclass
+class EntityIssue:
+    """An entity filter field or value not found in the vocabulary."""
+
+    field: str
+    value: Optional[str] = None
+    suggestions: list[tuple[str, int, float]] = field(default_factory=list)
+    unverified: bool = False
+    correction: Optional[str] = None
+
+    def describe(self) -> str:
+        """One-line description for the user."""
+        if self.value is None:
+            subject = f"Entity filter field '{self.field}' does not exist"
+        elif self.unverified:
+            subject = (f"{self.field}: '{self.value}' is not among the {VOCABULARY_LIMIT} most frequent "
+                       f"values (run 'filters sync' to check every value)")
+        else:
+            subject = f"{self.field}: '{self.value}' is not a known value"
+        if self.correction is not None:
+            return f"{subject}; corrected to '{self.correction}'"
+        if self.suggestions:
+            hints = ", ".join(f"'{text}' ({count:,})" for text, count, _ in self.suggestions)
+            return f"{subject}; did you mean {hints}?"
+        return subject
+
+    def as_dict(self) -> dict[str, Any]:
+        """JSON form for batch-search output records."""
+        return {
+            "field": self.field,
+            "value": self.value,
+            "suggestions": [
+                {"text_value": text, "occurrence_count": count} for text, count, _ in self.suggestions
+            ],
+            "unverified": self.unverified,
+            "correction": self.correction,
+        }
+
+
+def check_entity_filters(
+    entity_filters: Any,
+    vocabulary: Vocabulary,
+    correct: bool = False,
+) -> tuple[Any, list[EntityIssue]]:
+    """Look up every entity filter field and value in a vocabulary.
+
+    Only string values and lists of strings are checked; other values pass
+    through unchanged.
+
+    Args:
+        entity_filters: Parsed --entity-filters object.
+        vocabulary: Vocabulary of the searched namespace.
+        correct: Replace unknown fields and values by their best suggestion
+            when it is similar enough (unverified values are kept).
+
+    Returns:
+        The entity filters (corrected when asked) and the issues found.
+        An issue is resolved when its ``correction`` is set or it is
+        ``unverified``.
+    """
+    if not isinstance(entity_filters, dict) or not vocabulary:
+        return entity_filters, []
+
+    issues: list[EntityIssue] = []
+    checked: dict[str, Any] = {}
+    for name, values in entity_filters.items():
+        if name not in vocabulary.fields:
+            issue = EntityIssue(name, suggestions=vocabulary.suggest_field(name))
+            if correct and issue.suggestions and issue.suggestions[0][2] >= CORRECT_THRESHOLD:
+                issue.correction = issue.suggestions[0][0]
+                name = issue.correction
+            issues.append(issue)
+            if name not in vocabulary.fields:
+                checked[name] = values
+                continue
+
+        if isinstance(values, str):
+            checked[name] = _check_value(name, values, vocabulary, correct, issues)
+        elif isinstance(values, list) and all(isinstance(value, str) for value in values):
+            checked[name] = [_check_value(name, value, vocabulary, correct, issues) for value in values]
+        else:
+            checked[name] = values
+    return checked, issues
+
+
+def _check_value(
+    name: str,
+    value: str,
+    vocabulary: Vocabulary,
+    correct: bool,
+    issues: list[EntityIssue],
+) -> str:
+    if vocabulary.knows(name, value):
+        return value
+    issue = EntityIssue(
+        name,
+        value,
+        suggestions=vocabulary.suggest(name, value),
+        unverified=name in vocabulary.truncated,
+    )
+    issues.append(issue)
+    if correct and not issue.unverified and issue.suggestions and issue.suggestions[0][2] >= CORRECT_THRESHOLD:
+        issue.correction = issue.suggestions[0][0]
+        return issue.correction
+    return value
+
+
+def unresolved(issues: list[EntityIssue]) -> list[EntityIssue]:
+    """Issues that would make the search miss (neither corrected nor unverified)."""
+    return [issue for issue in issues if issue.correction is None and not issue.unverified]